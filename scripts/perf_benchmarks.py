@@ -0,0 +1,661 @@
+#!/usr/bin/env python3
+"""
+Performance micro-benchmarks for TestPilot hot paths.
+
+Usage:
+    python scripts/perf_benchmarks.py            # run all benchmarks
+    python scripts/perf_benchmarks.py config     # run selected benchmarks
+    python scripts/perf_benchmarks.py --list
+
+Each benchmark prints the time per iteration for the old and new code path
+so regressions are easy to spot when the hot paths change.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+BENCHMARKS: Dict[str, Callable[[int], None]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark function under the given name."""
+
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
+
+
+def timed(func: Callable[[], object], iterations: int) -> float:
+    """Return seconds per call of func averaged over iterations."""
+    func()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def report(label: str, baseline: float, optimized: float) -> None:
+    speedup = baseline / optimized if optimized else float("inf")
+    print(
+        f"  {label:<38} {baseline * 1e6:>10.1f} us -> "
+        f"{optimized * 1e6:>8.1f} us  ({speedup:.1f}x)"
+    )
+
+
+@benchmark("config")
+def bench_config_snapshot(iterations: int) -> None:
+    """Config lookups done per step: file reads vs. frozen snapshot."""
+    from src.testpilot.core.test_pilot_core import (
+        _generate_logs_capture_command,
+        build_command_for_step,
+        resolve_namespace,
+    )
+    from src.testpilot.core.validation_engine import ValidationDispatcher
+    from src.testpilot.utils.config_resolver import (
+        load_config_snapshot,
+        set_config_snapshot,
+    )
+
+    config = {
+        "connect_to": "bench",
+        "pod_mode": False,
+        "nf_name": "SLF",
+        "hosts": [
+            {"name": f"host{i}", "hostname": f"10.0.0.{i}", "namespace": "ns"}
+            for i in range(20)
+        ]
+        + [{"name": "bench", "hostname": "bench", "namespace": "bench-ns"}],
+        "kubectl_logs_settings": {"capture_duration": 5},
+        "validation_settings": {"json_match_threshold": 50},
+    }
+    step_data = {
+        "url": "http://{bench-svc}/nudr-dr/v1/subscription-data",
+        "command": "curl",
+        "method": "GET",
+        "headers": {"Content-Type": "application/json"},
+        "request_payload": None,
+        "pod_exec": None,
+    }
+    dispatcher = ValidationDispatcher()
+
+    def one_step():
+        resolve_namespace(None, "bench")
+        _generate_logs_capture_command(
+            "kubectl logs pod-1 -n ns", "ns", None, "bench"
+        )
+        dispatcher._get_validation_config()
+        build_command_for_step(
+            dict(step_data), {}, None, "bench-ns", {}, "bench", None
+        )
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "config"))
+        config_path = os.path.join(tmp, "config", "hosts.json")
+        with open(config_path, "w") as f:
+            json.dump(config, f)
+        os.chdir(tmp)
+        try:
+            # build_command_for_step prints placeholder diagnostics
+            with contextlib.redirect_stdout(io.StringIO()):
+                set_config_snapshot(None)
+                legacy = timed(one_step, iterations)
+                load_config_snapshot("config/hosts.json")
+                snapshot = timed(one_step, iterations)
+        finally:
+            set_config_snapshot(None)
+            os.chdir(cwd)
+
+    print("config: per-step config access")
+    report("hosts.json re-read vs snapshot", legacy, snapshot)
+    saved = (legacy - snapshot) * 5000
+    print(f"  saved on a 5k-step run: {saved:.2f} s")
+
+
+@benchmark("native_http")
+def bench_native_http(iterations: int) -> None:
+    """pod_mode HTTP rows: curl subprocess vs. in-process native client."""
+    import logging
+    import threading
+
+    from werkzeug.serving import make_server
+
+    from src.testpilot.core.test_pilot_core import execute_command
+    from src.testpilot.mock.enhanced_mock_server import EnhancedMockServer
+    from src.testpilot.utils.http_exchange import parse_curl_command
+    from src.testpilot.utils.native_http import NativeHttpClient
+    from src.testpilot.utils.response_parser import parse_curl_output
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    with contextlib.redirect_stdout(io.StringIO()):
+        server = EnhancedMockServer(enhanced_data_file="", port=0)
+    http_server = make_server("127.0.0.1", 0, server.app, threaded=True)
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+
+    # The mock server speaks HTTP/1.1 only, so no --http2-prior-knowledge
+    command = (
+        f"curl -v -X PUT http://127.0.0.1:{http_server.server_port}"
+        "/nudr-dr/v1/subscription-data/imsi-1 "
+        "-H 'Content-Type: application/json' -d '{\"imsi\": \"1\"}'"
+    )
+    request = parse_curl_command(command)
+    client = NativeHttpClient()
+
+    def curl_step():
+        output, error, _ = execute_command(command, "bench", None)
+        return parse_curl_output(output, error)
+
+    def native_step():
+        return client.send(request).to_parsed_output()
+
+    # curl forks a process per request; keep the run short
+    iterations = min(iterations, 200)
+    try:
+        # The mock server prints every request it answers
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert curl_step()["http_status"] == native_step()["http_status"]
+            curl = timed(curl_step, iterations)
+            native = timed(native_step, iterations)
+    finally:
+        client.close()
+        http_server.shutdown()
+
+    print("native_http: one HTTP row against the mock server")
+    report("curl subprocess vs native client", curl, native)
+    saved = (curl - native) * 5000
+    print(f"  saved on a 5k-step run: {saved:.2f} s")
+
+
+@benchmark("log_matcher")
+def bench_log_matcher(iterations: int) -> None:
+    """kubectl Pattern_Match on a 50 MB log: every line vs. prefiltered."""
+    import logging
+
+    from src.testpilot.core.enhanced_response_validator import (
+        validate_response_enhanced,
+    )
+    from src.testpilot.core.log_matcher import LogPatternMatcher
+
+    quiet = logging.getLogger("bench.log_matcher")
+    quiet.disabled = True
+    lines = []
+    size = 0
+    i = 0
+    while size < 50 * 1024 * 1024:
+        line = json.dumps(
+            {
+                "timestamp": f"2024-01-01T10:{i // 6000 % 60:02d}:00Z",
+                "level": "INFO" if i % 50 else "WARN",
+                "pod": f"nudr-drservice-{i % 4}-7d9f",
+                "thread": f"http-nio-{i % 32}",
+                "message": f"Processed GET /nudr-dr/v2/subscription-data/"
+                f"imsi-{100000 + i} in {i % 17} ms",
+            }
+        )
+        lines.append(line)
+        size += len(line) + 1
+        i += 1
+    lines.append(
+        json.dumps({"level": "ERROR", "message": "Subscriber not found"})
+    )
+    text = "\n".join(lines)
+    pattern = "Subscriber not found"
+
+    def check_line(line):
+        return (
+            validate_response_enhanced(pattern, {}, line, None, quiet)[
+                "pattern_match_overall"
+            ]
+            is True
+        )
+
+    def every_line():
+        return next(
+            (line for line in text.split("\n") if check_line(line)), None
+        )
+
+    def prefiltered():
+        return LogPatternMatcher(pattern, check_line).find(text)
+
+    # A full per-line pass takes seconds; one timed run of each is enough
+    iterations = min(iterations, 1)
+    assert every_line() == prefiltered() is not None
+    baseline = timed(every_line, iterations)
+    optimized = timed(prefiltered, iterations)
+
+    print(f"log_matcher: {len(lines)} lines, {size / 1e6:.0f} MB")
+    report("validate every line vs anchor scan", baseline, optimized)
+
+
+@benchmark("json_match")
+def bench_json_match(iterations: int) -> None:
+    """structure_and_values on mock_data/ payloads and a large NF profile."""
+    import copy
+    import random
+
+    from src.testpilot.core.json_match import compare_structure_and_values
+
+    def legacy_flatten(obj, parent_key=""):
+        # Recursive flatten_json as it was before the single-pass rewrite
+        items = []
+        if isinstance(obj, dict):
+            for k, v in obj.items():
+                new_key = f"{parent_key}.{k}" if parent_key else k
+                items.extend(legacy_flatten(v, new_key).items())
+        elif isinstance(obj, list):
+            try:
+                if all(
+                    isinstance(x, (str, int, float, bool, type(None)))
+                    for x in obj
+                ):
+                    obj = sorted(obj, key=str)
+                else:
+                    obj = sorted(
+                        obj,
+                        key=lambda x: (
+                            json.dumps(x, sort_keys=True)
+                            if isinstance(x, (dict, list))
+                            else str(x)
+                        ),
+                    )
+            except (TypeError, ValueError):
+                pass
+            for i, v in enumerate(obj):
+                items.extend(
+                    legacy_flatten(v, f"{parent_key}[item_{i}]").items()
+                )
+        else:
+            return {parent_key: obj}
+        return dict(items)
+
+    def legacy_compare(obj1, obj2):
+        flat1, flat2 = legacy_flatten(obj1), legacy_flatten(obj2)
+        keys = set(flat1).union(set(flat2))
+        return sum(
+            1
+            for k in keys
+            if k in flat1 and k in flat2 and flat1[k] == flat2[k]
+        )
+
+    payloads = []
+    profile = None
+    mock_dir = os.path.join(PROJECT_ROOT, "mock_data")
+    for name in sorted(os.listdir(mock_dir)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(mock_dir, name)) as f:
+            for entry in json.load(f).get("results", []):
+                try:
+                    body = json.loads(entry.get("output") or "")
+                except ValueError:
+                    continue
+                if isinstance(body, (dict, list)):
+                    payloads.append(body)
+                    if isinstance(body, dict) and body.get("nfServices"):
+                        profile = body
+    pairs = list(zip(payloads, payloads[1:] + payloads[:1]))
+
+    # NRF profile with hundreds of services, compared against a reordered
+    # copy of itself
+    services = profile["nfServices"] if profile else [{"serviceName": "s"}]
+    large = copy.deepcopy(profile or {})
+    large["nfServices"] = [
+        dict(
+            copy.deepcopy(services[i % len(services)]),
+            serviceInstanceId=str(i),
+        )
+        for i in range(300)
+    ]
+    reordered = copy.deepcopy(large)
+    random.Random(1).shuffle(reordered["nfServices"])
+
+    def legacy_payloads():
+        for first, second in pairs:
+            legacy_compare(first, second)
+
+    def single_pass_payloads():
+        for first, second in pairs:
+            compare_structure_and_values(first, second)
+
+    assert legacy_compare(large, reordered) == (
+        compare_structure_and_values(large, reordered)["matching_fields"]
+    )
+    iterations = max(1, iterations // 50)
+    print(f"json_match: {len(pairs)} recorded payload pairs")
+    report(
+        "recorded payload pairs",
+        timed(legacy_payloads, iterations),
+        timed(single_pass_payloads, iterations),
+    )
+    report(
+        "300-service NF profile",
+        timed(lambda: legacy_compare(large, reordered), iterations),
+        timed(
+            lambda: compare_structure_and_values(large, reordered), iterations
+        ),
+    )
+
+
+@benchmark("check_diff")
+def bench_check_diff(iterations: int) -> None:
+    """Payload verdicts: DeepDiff(ignore_order=True) vs. native json_equal."""
+    import copy
+    import random
+
+    from deepdiff import DeepDiff
+
+    from src.testpilot.utils.json_diff import json_equal
+
+    profile = {
+        "nfInstanceId": "6faf1bbc-6e4a-4454-a507-a14ef8e1bc5c",
+        "nfType": "UDR",
+        "nfStatus": "REGISTERED",
+        "nfServices": [
+            {
+                "serviceInstanceId": str(i),
+                "serviceName": f"nudr-dr-{i % 7}",
+                "versions": [{"apiVersionInUri": "v1", "apiFullVersion": "1"}],
+                "ipEndPoints": [
+                    {"ipv4Address": f"10.0.{i // 250}.{i % 250}", "port": p}
+                    for p in (8080, 8443)
+                ],
+                "allowedNfTypes": ["PCF", "UDM", "NEF"],
+            }
+            for i in range(300)
+        ],
+    }
+    reordered = copy.deepcopy(profile)
+    random.Random(1).shuffle(reordered["nfServices"])
+    for service in reordered["nfServices"]:
+        service["allowedNfTypes"].reverse()
+    changed = copy.deepcopy(reordered)
+    changed["nfServices"][150]["ipEndPoints"][0]["port"] = 9090
+
+    assert not DeepDiff(profile, reordered, ignore_order=True)
+    assert json_equal(profile, reordered) is True
+    assert json_equal(profile, changed) is False
+    iterations = max(1, iterations // 200)
+    print("check_diff: 300-service NF profile against a reordered copy")
+    for label, actual in (
+        ("reordered (pass)", reordered),
+        ("one port changed", changed),
+    ):
+        report(
+            label,
+            timed(
+                lambda: DeepDiff(profile, actual, ignore_order=True),
+                iterations,
+            ),
+            timed(lambda: json_equal(profile, actual), iterations),
+        )
+
+
+@benchmark("lazy_details")
+def bench_lazy_details(iterations: int) -> None:
+    """Failing payload rows: failure details built eagerly vs. on read."""
+    import copy
+
+    from src.testpilot.core.validation_engine import (
+        ValidationContext,
+        check_diff,
+    )
+
+    expected = {
+        "nfInstanceId": "6faf1bbc-6e4a-4454-a507-a14ef8e1bc5c",
+        "nfServices": [
+            {"serviceInstanceId": str(i), "port": 8080 + i % 4}
+            for i in range(100)
+        ],
+    }
+    actual = copy.deepcopy(expected)
+    actual["nfServices"][50]["port"] = 9090
+    context = ValidationContext(
+        method="PUT",
+        request_payload=None,
+        expected_status=200,
+        response_payload=expected,
+        pattern_match=None,
+        actual_status=200,
+        response_body=json.dumps(actual),
+        response_headers={},
+    )
+
+    def eager():
+        # What every failing row paid before: the DeepDiff report
+        return dict(check_diff(context).details)
+
+    iterations = max(1, iterations // 100)
+    print("lazy_details: 100-service payload with one changed port")
+    report(
+        "failing row, details not read",
+        timed(eager, iterations),
+        timed(lambda: check_diff(context), iterations),
+    )
+
+
+@benchmark("parse_once")
+def bench_parse_once(iterations: int) -> None:
+    """One GET step on a large body: plain strings vs. ParsedResponse."""
+    from unittest.mock import patch
+
+    from src.testpilot.core.validation_engine import (
+        ValidationContext,
+        ValidationDispatcher,
+    )
+    from src.testpilot.exporters.test_results_exporter import (
+        TestResultsExporter,
+    )
+    from src.testpilot.utils.parsed_response import ParsedResponse
+
+    body = json.dumps(
+        {
+            "nfInstanceId": "6faf1bbc-6e4a-4454-a507-a14ef8e1bc5c",
+            "nfStatus": "REGISTERED",
+            "nfServices": [
+                {
+                    "serviceInstanceId": str(i),
+                    "serviceName": f"nudr-dr-{i % 7}",
+                    "ipEndPoints": [{"port": 8080 + i % 4}],
+                }
+                for i in range(300)
+            ],
+        }
+    )
+    headers = {"content-type": "application/json"}
+    exporter = TestResultsExporter.__new__(TestResultsExporter)
+
+    class Result:
+        output = ""
+        error = ""
+
+    def step(wrap):
+        response = ParsedResponse(body, headers) if wrap else body
+        payload = ParsedResponse(body) if wrap else body
+        context = ValidationContext(
+            method="GET",
+            request_payload=None,
+            expected_status=200,
+            response_payload=payload,
+            pattern_match="nudr-dr-3",
+            actual_status=200,
+            response_body=response,
+            response_headers=headers,
+        )
+        assert ValidationDispatcher().dispatch(context).passed
+        result = Result()
+        result.response_payload = payload
+        result.output = response
+        exporter._extract_response_body(result)
+
+    real_loads = json.loads
+
+    def profile(wrap):
+        # Calls to and seconds spent in json.loads per step
+        spent = [0, 0.0]
+
+        def loads(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return real_loads(*args, **kwargs)
+            finally:
+                spent[0] += 1
+                spent[1] += time.perf_counter() - start
+
+        runs = max(1, iterations // 20)
+        with patch("json.loads", loads):
+            for _ in range(runs):
+                step(wrap)
+        return spent[0] // runs, spent[1] / runs
+
+    (old_calls, old_time), (new_calls, new_time) = profile(False), profile(
+        True
+    )
+    print(
+        f"parse_once: 300-service body, json.loads per step "
+        f"{old_calls} -> {new_calls}"
+    )
+    report("JSON decoding per GET step", old_time, new_time)
+
+
+@benchmark("dispatch")
+def bench_dispatch(iterations: int) -> None:
+    """Strategy selection: dispatcher per step vs. shared, planned dispatch."""
+    from unittest.mock import patch
+
+    from src.testpilot.core import validation_engine
+    from src.testpilot.core.validation_engine import (
+        ValidationContext,
+        ValidationDispatcher,
+        ValidationPlan,
+        ValidationResult,
+        strategy_key,
+    )
+
+    class Passed:
+        # Leaves only the selection work in the measurement
+        def validate(self, context):
+            return ValidationResult(True)
+
+    contexts = [
+        ValidationContext(
+            method=method,
+            request_payload=None,
+            expected_status=200,
+            response_payload=None,
+            pattern_match="nfStatus" if method == "PATCH" else None,
+            actual_status=200,
+            response_body="{}",
+            response_headers={},
+        )
+        for method in ("PUT", "GET", "DELETE", "POST", "PATCH")
+    ]
+    plans = [
+        ValidationPlan(
+            strategy_key(c),
+            validation_engine.select_strategy(*strategy_key(c)),
+        )
+        for c in contexts
+    ]
+    uncached = validation_engine.select_strategy.__wrapped__
+    shared = ValidationDispatcher()
+    strategies = {
+        name: Passed() for name in validation_engine.VALIDATION_STRATEGIES
+    }
+
+    def per_step():
+        # A new dispatcher per step, selection walked every time
+        for context in contexts:
+            ValidationDispatcher().dispatch(context)
+
+    def planned():
+        for context, plan in zip(contexts, plans):
+            shared.dispatch(context, plan)
+
+    with patch.dict(validation_engine.VALIDATION_STRATEGIES, strategies):
+        with patch.object(validation_engine, "select_strategy", uncached):
+            baseline = timed(per_step, iterations)
+        optimized = timed(planned, iterations)
+    print("dispatch: one step per method (PUT/GET/DELETE/POST/PATCH)")
+    report("select strategy for 5 steps", baseline, optimized)
+
+
+@benchmark("payload_files")
+def bench_payload_files(iterations: int) -> None:
+    """Response_Payload files: read and decoded per use vs. repository."""
+    from src.testpilot.utils.parsed_response import load_json
+    from src.testpilot.utils.payload_repository import PayloadRepository
+
+    payload = {
+        "nfInstanceId": "6faf1bbc-6e4a-4454-a507-a14ef8e1bc5c",
+        "nfType": "UDR",
+        "nfServices": [
+            {"serviceInstanceId": str(i), "port": 8080 + i % 4}
+            for i in range(50)
+        ],
+    }
+    repository = PayloadRepository()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "reg_02_payload_01.json")
+        with open(path, "w") as f:
+            json.dump(payload, f, indent=2)
+
+        def per_use():
+            with open(path, "r", encoding="utf-8") as f:
+                return json.loads(f.read().strip())
+
+        def cached():
+            return load_json(repository.get(path).text)
+
+        print("payload_files: 50-service NF profile file")
+        report(
+            "load and decode per step",
+            timed(per_use, iterations),
+            timed(cached, iterations),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("names", nargs="*", help="Benchmarks to run")
+    parser.add_argument(
+        "-n",
+        "--iterations",
+        type=int,
+        default=2000,
+        help="Iterations per measurement (default: 2000)",
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="List available benchmarks"
+    )
+    args = parser.parse_args()
+
+    if args.list:
+        for name, func in BENCHMARKS.items():
+            print(f"{name:<12} {func.__doc__}")
+        return
+
+    names = args.names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmark(s): {', '.join(unknown)}")
+
+    for name in names:
+        BENCHMARKS[name](args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,10 @@ def main():
     if project_root not in sys.path:
         sys.path.insert(0, project_root)
 
+    # `testpilot revalidate RESULTS_JSON -i ...` is `--revalidate RESULTS_JSON`
+    if len(sys.argv) > 1 and sys.argv[1] == "revalidate":
+        sys.argv[1:2] = ["--revalidate"]
+
     try:
         # Import and run the main function from test_pilot.py
         from test_pilot import main as test_pilot_main
@@ -0,0 +1,221 @@
+"""
+asyncio execution core for TestPilot
+
+The step pipeline (process_single_step -> _execute_step_on_host -> command
+execution) is written as coroutines in test_pilot_core. A StepRuntime
+decides how the coroutines wait and how they run blocking work:
+
+- StepRuntime (the default) keeps every call on the calling thread and
+  sleeps with time.sleep. Its coroutines never suspend, so
+  process_single_step() and _execute_step_on_host() drive them with
+  run_blocking() and behave exactly as before, with no event loop involved.
+- AsyncStepRuntime is meant for a single event loop that runs many flows.
+  Waits (pacing, wait(N) rows, rate limiting, step_delay) are asyncio
+  sleeps. Blocking calls (paramiko, requests, pod lookups) go to one
+  bounded thread pool. A step waiting on its turn therefore costs a
+  coroutine, not a thread, and the pool size caps the threads of the whole
+  run. An optional per-host step timeout cancels the step and records a
+  failed result.
+
+run_flows_async() is the asyncio counterpart of FlowScheduler.run(). Flows
+run as tasks on one loop, at most max_concurrency at a time, and results
+are released in flow order. If one flow fails, the others are cancelled
+before the error propagates.
+"""
+
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Iterable,
+    List,
+    Optional,
+)
+
+from ..utils.logger import get_logger
+from .test_result import TestFlow, TestResult
+
+logger = get_logger("TestPilot.AsyncRunner")
+
+AsyncFlowRunner = Callable[[TestFlow], Awaitable[List[TestResult]]]
+FlowCallback = Callable[[TestFlow, List[TestResult]], None]
+
+
+def run_blocking(coro: Coroutine) -> Any:
+    """
+    Run a step coroutine under the blocking StepRuntime to completion.
+
+    Such a coroutine never suspends, so it is driven on the calling thread
+    without an event loop and can be used from any thread, including one
+    that is already running a loop.
+    """
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coro.close()
+    raise RuntimeError("Step coroutine suspended under the blocking runtime")
+
+
+async def gather_or_cancel(coros: Iterable[Awaitable]) -> List[Any]:
+    """
+    Run awaitables concurrently and return their results in order.
+
+    If one of them fails, the others are cancelled and awaited before the
+    error is re-raised, so no task outlives the call.
+    """
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class StepRuntime:
+    """Blocking runtime: everything runs on the calling thread."""
+
+    # Blocking calls are handed off instead of run in place
+    offloads = False
+    step_timeout: Optional[float] = None
+
+    async def call(self, func: Callable, *args, **kwargs) -> Any:
+        return func(*args, **kwargs)
+
+    async def map_concurrently(
+        self, func: Callable[[Any], Awaitable], items: List[Any]
+    ) -> List[Any]:
+        """
+        Await func(item) for all items at the same time (one thread per
+        item); results come back in item order.
+        """
+        with ThreadPoolExecutor(
+            max_workers=max(1, len(items)),
+            thread_name_prefix="testpilot-host",
+        ) as executor:
+            return list(
+                executor.map(lambda item: run_blocking(func(item)), items)
+            )
+
+    async def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+    async def pace_before(self, pacer, flow, step_data) -> float:
+        return pacer.before_step(flow, step_data)
+
+    async def pace_wait(self, pacer, flow, seconds: float) -> None:
+        pacer.wait(flow, seconds)
+
+    async def throttle(self, rate_limiter, host, **scope) -> float:
+        return rate_limiter.acquire(host, **scope)
+
+    def close(self) -> None:
+        pass
+
+
+class AsyncStepRuntime(StepRuntime):
+    """Event-loop runtime: asyncio waits, blocking calls on a bounded pool."""
+
+    offloads = True
+
+    def __init__(
+        self, max_io_workers: int = 32, step_timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            max_io_workers: Threads available to blocking calls of all
+                steps in flight
+            step_timeout: Seconds one step may take on one host before it is
+                cancelled and recorded as failed (None: no limit)
+        """
+        self.step_timeout = step_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, int(max_io_workers)),
+            thread_name_prefix="testpilot-io",
+        )
+
+    async def call(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def map_concurrently(
+        self, func: Callable[[Any], Awaitable], items: List[Any]
+    ) -> List[Any]:
+        return await gather_or_cancel(func(item) for item in items)
+
+    async def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    async def pace_before(self, pacer, flow, step_data) -> float:
+        return await pacer.before_step_async(flow, step_data)
+
+    async def pace_wait(self, pacer, flow, seconds: float) -> None:
+        await pacer.wait_async(flow, seconds)
+
+    async def throttle(self, rate_limiter, host, **scope) -> float:
+        return await rate_limiter.acquire_async(host, **scope)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+SYNC_RUNTIME = StepRuntime()
+
+
+async def run_flows_async(
+    flows: List[TestFlow],
+    run_flow: AsyncFlowRunner,
+    on_flow_done: Optional[FlowCallback] = None,
+    max_concurrency: int = 1,
+) -> List[TestResult]:
+    """
+    Run flows as tasks on the current loop; results come back in flow order.
+
+    Args:
+        flows: Flows to execute (order defines result order)
+        run_flow: Coroutine function executing every step of one flow
+        on_flow_done: Called in flow order once a flow's results are ready
+        max_concurrency: Flows allowed in flight at the same time
+    """
+    results: List[TestResult] = []
+    if not flows:
+        return results
+    limit = asyncio.Semaphore(max(1, int(max_concurrency or 1)))
+
+    async def guarded(flow):
+        async with limit:
+            return await run_flow(flow) or []
+
+    logger.info(
+        f"Running {len(flows)} flows on the async core "
+        f"({max(1, int(max_concurrency or 1))} at a time)"
+    )
+    tasks = [asyncio.ensure_future(guarded(flow)) for flow in flows]
+    try:
+        # A flow is released only after all flows before it
+        for flow, task in zip(flows, tasks):
+            flow_results = await task
+            results.extend(flow_results)
+            if on_flow_done is not None:
+                on_flow_done(flow, flow_results)
+            logger.debug(
+                f"Flow completed: {flow.sheet}/{flow.test_name} "
+                f"({len(flow_results)} results)"
+            )
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return results
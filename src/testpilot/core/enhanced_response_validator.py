@@ -3,13 +3,19 @@ Enhanced Response Validator
 - Subset dict comparison
 - Advanced pattern matching (substring, key-value, regex, JSONPath)
 - Configurable partial match and ignore fields
+- Compiled Pattern_Match cache shared across lines, hosts and reruns
 """
 
 import json
+import logging
 import re
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Pattern, Tuple
 
+from ..utils.parsed_response import ParsedResponse, load_json
 from .json_match import compare_json_objects
+from .test_result import LazyDetails
 
 try:
     from jsonpath_ng import parse as jsonpath_parse
@@ -237,6 +243,118 @@ def _parse_comma_separated_key_values(pattern_match):
     return []
 
 
+# Distinct Pattern_Match strings kept compiled
+PATTERN_CACHE_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class CompiledPattern:
+    """
+    Everything validate_response_enhanced derives from one Pattern_Match.
+
+    Instances are shared through the compile cache; the parsed JSON values
+    are read-only.
+    """
+
+    text: str
+    unquoted: Optional[str]
+    key_value_pairs: Tuple[Tuple[str, str, Any], ...]
+    skip_key_value: Optional[str]
+    regex: Optional[Pattern]
+    regex_error: Optional[str]
+    jsonpath: Any
+    jsonpath_error: Optional[str]
+    is_json: bool
+    json_value: Any
+    json_error: Optional[str]
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def _compile_pattern(pattern_match: str, jsonpath_parser) -> CompiledPattern:
+    trimmed = pattern_match.strip()
+
+    unquoted = None
+    if (pattern_match.startswith('"') and pattern_match.endswith('"')) or (
+        pattern_match.startswith("'") and pattern_match.endswith("'")
+    ):
+        unquoted = pattern_match[1:-1]
+
+    key_value_pairs = ()
+    skip_key_value = None
+    if ":" in pattern_match or "=" in pattern_match:
+        if trimmed.startswith("{") and trimmed.endswith("}"):
+            skip_key_value = "JSON string pattern"
+        elif trimmed.startswith("[") and trimmed.endswith("]"):
+            skip_key_value = "JSON array pattern"
+        else:
+            pairs = []
+            for key, val in _parse_comma_separated_key_values(pattern_match):
+                try:
+                    val_json = json.loads(val)
+                except Exception:
+                    val_json = val
+                pairs.append((key, val, val_json))
+            key_value_pairs = tuple(pairs)
+
+    regex = regex_error = None
+    try:
+        regex = re.compile(pattern_match)
+    except Exception as e:
+        regex_error = str(e)
+
+    jsonpath = jsonpath_error = None
+    if jsonpath_parser:
+        try:
+            jsonpath = jsonpath_parser(pattern_match)
+        except Exception as e:
+            jsonpath_error = str(e)
+
+    is_json = trimmed.startswith("{") or trimmed.startswith("[")
+    json_value = json_error = None
+    if is_json:
+        try:
+            json_value = json.loads(pattern_match)
+        except Exception as e:
+            json_error = str(e)
+
+    return CompiledPattern(
+        text=pattern_match,
+        unquoted=unquoted,
+        key_value_pairs=key_value_pairs,
+        skip_key_value=skip_key_value,
+        regex=regex,
+        regex_error=regex_error,
+        jsonpath=jsonpath,
+        jsonpath_error=jsonpath_error,
+        is_json=is_json,
+        json_value=json_value,
+        json_error=json_error,
+    )
+
+
+def compile_pattern(pattern_match: str) -> CompiledPattern:
+    """
+    Return the compiled form of a Pattern_Match string.
+
+    Results are cached by pattern text (LRU, PATTERN_CACHE_SIZE entries),
+    so a pattern checked against every line of a kubectl log, or on every
+    host and rerun, is parsed and compiled once.
+    """
+    # The JSONPath parser is part of the key so swapping it (e.g. once
+    # jsonpath-ng is installed) never serves stale expressions
+    return _compile_pattern(pattern_match, jsonpath_parse)
+
+
+def clear_pattern_cache() -> None:
+    """Drop all compiled patterns."""
+    _compile_pattern.cache_clear()
+
+
+def pattern_cache_info():
+    """Return hits/misses/size of the compiled pattern cache."""
+    return _compile_pattern.cache_info()
+
+
 def _deep_array_search(obj, pattern_array):
     """
     Search for pattern array elements deeply within a nested structure.
@@ -267,6 +385,13 @@ def _deep_array_search(obj, pattern_array):
     return True
 
 
+def _compiled_jsonpath(compiled: CompiledPattern):
+    """JSONPath expression of compiled; raises if it did not parse."""
+    if compiled.jsonpath is None:
+        raise ValueError(compiled.jsonpath_error)
+    return compiled.jsonpath
+
+
 def validate_response_enhanced(
     pattern_match: Optional[str],
     response_headers: Optional[dict],
@@ -297,7 +422,7 @@ def validate_response_enhanced(
     actual = response_body
     if isinstance(response_body, str):
         try:
-            actual = json.loads(response_body)
+            actual = load_json(response_body)
             logger.debug(
                 "Parsed response_body string to dict/list for comparison."
             )
@@ -310,7 +435,7 @@ def validate_response_enhanced(
     # check if response_payload is a str
     if isinstance(response_payload, str):
         try:
-            response_payload = json.loads(response_payload)
+            response_payload = load_json(response_payload)
             logger.debug(
                 "Parsed response_payload string to dict/list for comparison."
             )
@@ -327,12 +452,16 @@ def validate_response_enhanced(
         dict_match = _is_subset_dict(
             expected, actual_clean, partial=partial_dict_match
         )
+        # Built when a report or the debug log reads it
         differences = (
-            None if dict_match else _dict_diff(expected, actual_clean)
-        )
-        logger.debug(
-            f"Dict comparison result: {dict_match}, differences: {differences}"
+            None
+            if dict_match
+            else LazyDetails(lambda: _dict_diff(expected, actual_clean))
         )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Dict comparison result: {dict_match}, differences: {differences}"
+            )
     elif isinstance(response_payload, dict):
         logger.debug(
             "Performing dict comparison using response_payload as expected."
@@ -364,9 +493,10 @@ def validate_response_enhanced(
         logger.info(
             f"Response payload matches actual with {dict_match_result['match_percentage']}% "
         )
-        logger.debug(
-            f"Dict comparison result: {dict_match}, differences: {differences}"
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Dict comparison result: {dict_match}, differences: {differences}"
+            )
     elif isinstance(actual, list) and isinstance(response_payload, dict):
         logger.debug(
             "Actual is a list, expected is a dict. Checking if any item in actual matches expected."
@@ -381,9 +511,10 @@ def validate_response_enhanced(
             if dict_match
             else f"No item in actual list matched expected dict."
         )
-        logger.debug(
-            f"List[dict] comparison result: {dict_match}, differences: {differences}"
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"List[dict] comparison result: {dict_match}, differences: {differences}"
+            )
     elif isinstance(actual, list) and isinstance(response_payload, list):
         logger.debug(
             "Both actual and expected are lists. Checking if all expected dicts are present in actual list."
@@ -398,9 +529,10 @@ def validate_response_enhanced(
             if dict_match
             else f"Not all expected dicts found in actual list."
         )
-        logger.debug(
-            f"List[List[dict]] comparison result: {dict_match}, differences: {differences}"
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"List[List[dict]] comparison result: {dict_match}, differences: {differences}"
+            )
     else:
         logger.debug(
             "No dict/list comparison performed (no expected dict/list provided)."
@@ -414,17 +546,27 @@ def validate_response_enhanced(
     if raw_output:
         actual_str = raw_output
         logger.debug("Using raw_output for pattern matching")
+    elif isinstance(response_body, ParsedResponse):
+        actual_str = response_body.compact
     else:
         actual_str = (
             json.dumps(actual, separators=(",", ":"), ensure_ascii=False)
             if isinstance(actual, (dict, list))
             else str(actual)
         )
-    headers_str = (
-        json.dumps(response_headers, separators=(",", ":"), ensure_ascii=False)
-        if isinstance(response_headers, dict)
-        else str(response_headers)
-    )
+    if (
+        isinstance(response_body, ParsedResponse)
+        and response_headers is response_body.headers
+    ):
+        headers_str = response_body.headers_compact
+    else:
+        headers_str = (
+            json.dumps(
+                response_headers, separators=(",", ":"), ensure_ascii=False
+            )
+            if isinstance(response_headers, dict)
+            else str(response_headers)
+        )
 
     if not pattern_match or (
         isinstance(pattern_match, str) and pattern_match.strip() == ""
@@ -434,8 +576,15 @@ def validate_response_enhanced(
         logger.debug("No pattern matching criteria provided (empty or None)")
     elif pattern_match and isinstance(pattern_match, str):
         logger.debug(f"Starting pattern matching for pattern: {pattern_match}")
+        compiled = compile_pattern(pattern_match)
         # Check if actual_str contains multiple JSON log lines (kubectl logs format)
-        if isinstance(actual_str, str) and actual_str.startswith('{"'):
+        # The scan below only logs, so skip re-decoding the body unless
+        # DEBUG is on
+        if (
+            isinstance(actual_str, str)
+            and actual_str.startswith('{"')
+            and logger.isEnabledFor(logging.DEBUG)
+        ):
             # Try to parse as multiple JSON lines (common in kubectl logs)
             log_lines = []
             for line in actual_str.split("\n"):
@@ -490,12 +639,8 @@ def validate_response_enhanced(
 
         # If still not found, try removing surrounding quotes from pattern
         if not found_body and not found_headers:
-            if (
-                pattern_match.startswith('"') and pattern_match.endswith('"')
-            ) or (
-                pattern_match.startswith("'") and pattern_match.endswith("'")
-            ):
-                pattern_no_quotes = pattern_match[1:-1]
+            if compiled.unquoted is not None:
+                pattern_no_quotes = compiled.unquoted
                 found_body = pattern_no_quotes in actual_str
                 found_headers = pattern_no_quotes in headers_str
                 if found_body or found_headers:
@@ -522,36 +667,22 @@ def validate_response_enhanced(
             found_kv_headers = False
             if ":" in pattern_match or "=" in pattern_match:
                 # Skip key-value parsing for JSON string patterns
-                if pattern_match.strip().startswith(
-                    "{"
-                ) and pattern_match.strip().endswith("}"):
+                if compiled.skip_key_value:
                     logger.debug(
-                        "Skipping key-value parsing for JSON string pattern"
-                    )
-                elif pattern_match.strip().startswith(
-                    "["
-                ) and pattern_match.strip().endswith("]"):
-                    logger.debug(
-                        "Skipping key-value parsing for JSON array pattern"
+                        f"Skipping key-value parsing for {compiled.skip_key_value}"
                     )
                 else:
-                    # Parse comma-separated key-value pairs
-                    key_value_pairs = _parse_comma_separated_key_values(
-                        pattern_match
-                    )
+                    # Comma-separated key-value pairs, parsed at compile time
+                    key_value_pairs = compiled.key_value_pairs
 
                     if key_value_pairs:
                         all_pairs_found = True
                         found_pairs = []
                         not_found_pairs = []
 
-                        for key, val in key_value_pairs:
-                            # Try to parse as JSON, but also keep original string for comparison
+                        for key, val, val_json in key_value_pairs:
+                            # Keep original string for comparison too
                             val_original = val
-                            try:
-                                val_json = json.loads(val)
-                            except Exception:
-                                val_json = val
 
                             pair_found_body = False
                             pair_found_headers = False
@@ -675,7 +806,9 @@ def validate_response_enhanced(
 
             # 2.3 Regex search
             try:
-                regex = re.compile(pattern_match)
+                regex = compiled.regex
+                if regex is None:
+                    raise re.error(compiled.regex_error)
                 found_regex_body = bool(regex.search(actual_str))
                 found_regex_headers = bool(regex.search(headers_str))
                 found_regex = found_regex_body or found_regex_headers
@@ -710,7 +843,7 @@ def validate_response_enhanced(
             if jsonpath_parse:
                 if isinstance(actual, (dict, list)):
                     try:
-                        expr = jsonpath_parse(pattern_match)
+                        expr = _compiled_jsonpath(compiled)
                         matches = [match.value for match in expr.find(actual)]
                         found_jsonpath_body = len(matches) > 0
                         jsonpath_details += (
@@ -723,7 +856,7 @@ def validate_response_enhanced(
                         logger.debug(f"JSONPath search (body) error: {e}")
                 if isinstance(response_headers, dict):
                     try:
-                        expr = jsonpath_parse(pattern_match)
+                        expr = _compiled_jsonpath(compiled)
                         matches = [
                             match.value
                             for match in expr.find(response_headers)
@@ -765,11 +898,11 @@ def validate_response_enhanced(
                 pattern_match, str
             ):
                 # Check if pattern_match is a JSON string
-                if pattern_match.strip().startswith(
-                    "{"
-                ) or pattern_match.strip().startswith("["):
+                if compiled.is_json:
                     try:
-                        pattern_json = json.loads(pattern_match)
+                        if compiled.json_error is not None:
+                            raise ValueError(compiled.json_error)
+                        pattern_json = compiled.json_value
 
                         # Use raw_output if available for more accurate comparison
                         comparison_target = actual
@@ -856,7 +989,8 @@ def validate_response_enhanced(
                             f"Section 2.5: Failed to parse pattern as JSON: {e}"
                         )
 
-    # Compose user-friendly summary
+    # Compose user-friendly summary. differences goes to the log as an
+    # argument, so a lazy diff is only built when the message is emitted.
     if dict_match is True and pattern_match_overall is True:
         summary = "✅ Test PASSED: Response structure and content match expectations."
     elif dict_match is True and pattern_match_overall is False:
@@ -866,14 +1000,14 @@ def validate_response_enhanced(
         summary = "✅ Test PASSED: Response structure matches expected format."
     elif dict_match is False and pattern_match_overall is True:
         summary = "⚠️ Test PARTIAL: Expected text/pattern found, but response structure differs from expected."
-        logger.info(f"Differences Found: {differences}")
+        logger.info("Differences Found: %s", differences)
     elif dict_match is False and pattern_match_overall is False:
         summary = "❌ Test FAILED: Response structure is incorrect AND expected text/pattern was not found."
-        logger.info(f"Differences: {differences}")
+        logger.info("Differences: %s", differences)
         logger.info(f"Pattern matches: {pattern_matches}")
     elif dict_match is False and pattern_match_overall is None:
         summary = "❌ Test FAILED: Response structure does not match expected format."
-        logger.info(f"Differences Found: {differences}")
+        logger.info("Differences Found: %s", differences)
     elif dict_match is None and pattern_match_overall is True:
         summary = "✅ Test PASSED: Expected text/pattern found in response."
     elif dict_match is None and pattern_match_overall is False:
@@ -0,0 +1,105 @@
+"""
+Flow Scheduler for TestPilot
+
+Runs independent TestFlows concurrently on a worker pool.
+
+- Steps inside one flow always run in order on a single worker, because
+  flow.context carries Save_As/Compare_With payloads between them.
+- Results are released in flow order (sheet/row order as parsed from Excel),
+  so exporters and dashboards see the same ordering as a sequential run.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from ..utils.logger import get_logger
+from .test_result import TestFlow, TestResult
+
+logger = get_logger("TestPilot.FlowScheduler")
+
+FlowRunner = Callable[[TestFlow], List[TestResult]]
+FlowCallback = Callable[[TestFlow, List[TestResult]], None]
+
+
+class FlowScheduler:
+    """
+    Execute TestFlows on a thread pool with per-flow ordering guarantees.
+
+    The runner callable receives one TestFlow and returns the TestResults it
+    produced. The optional on_flow_done callback is always invoked from the
+    calling thread, in flow order, so it can safely update non thread-safe
+    consumers such as dashboards.
+    """
+
+    def __init__(self, max_workers: int = 1):
+        """
+        Initialize flow scheduler.
+
+        Args:
+            max_workers: Number of flows allowed to run at the same time
+        """
+        self.max_workers = max(1, int(max_workers or 1))
+
+    def run(
+        self,
+        flows: List[TestFlow],
+        run_flow: FlowRunner,
+        on_flow_done: Optional[FlowCallback] = None,
+    ) -> List[TestResult]:
+        """
+        Run all flows and return their results in deterministic flow order.
+
+        Args:
+            flows: Flows to execute (order defines result order)
+            run_flow: Callable executing every step of a single flow
+            on_flow_done: Called in flow order once a flow's results are ready
+
+        Returns:
+            List of TestResult objects ordered by flow, then by step/host
+        """
+        results: List[TestResult] = []
+        if not flows:
+            return results
+
+        if self.max_workers == 1 or len(flows) == 1:
+            for flow in flows:
+                flow_results = run_flow(flow) or []
+                self._release(flow, flow_results, results, on_flow_done)
+            return results
+
+        workers = min(self.max_workers, len(flows))
+        logger.info(
+            f"Running {len(flows)} flows with {workers} parallel workers"
+        )
+
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="testpilot-flow"
+        ) as executor:
+            futures = [executor.submit(run_flow, flow) for flow in flows]
+            try:
+                # Wait in submission order: a flow is released only after all
+                # flows before it, which keeps the output order stable.
+                for flow, future in zip(flows, futures):
+                    flow_results = future.result() or []
+                    self._release(flow, flow_results, results, on_flow_done)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        return results
+
+    @staticmethod
+    def _release(
+        flow: TestFlow,
+        flow_results: List[TestResult],
+        results: List[TestResult],
+        on_flow_done: Optional[FlowCallback],
+    ) -> None:
+        results.extend(flow_results)
+        if on_flow_done is not None:
+            on_flow_done(flow, flow_results)
+        logger.debug(
+            f"Flow completed: {flow.sheet}/{flow.test_name} "
+            f"({len(flow_results)} results)"
+        )
@@ -133,65 +133,79 @@ def compare_values_only(
     }
 
 
-def compare_structure_and_values(
-    obj1: Any, obj2: Any, ignore_array_order: bool = True
-) -> Dict[str, Any]:
-    """Compare both structure and values."""
+# json.dumps(x, sort_keys=True) without building an encoder per call
+_canonical_json = json.JSONEncoder(sort_keys=True).encode
+_SIMPLE_TYPES = (str, int, float, bool, type(None))
+
+
+def _normalize_array_for_comparison(arr: list) -> list:
+    """Order arr canonically for order-independent comparison."""
+    try:
+        # Sort simple values (strings, numbers, booleans) by str()
+        if all(isinstance(item, _SIMPLE_TYPES) for item in arr):
+            return sorted(arr, key=str)
+        # Complex objects sort by their canonical JSON text, which sorted()
+        # computes once per element
+        return sorted(
+            arr,
+            key=lambda x: (
+                _canonical_json(x) if isinstance(x, (dict, list)) else str(x)
+            ),
+        )
+    except (TypeError, ValueError):
+        # If sorting fails, keep the original order
+        return arr
 
-    def normalize_array_for_comparison(arr):
-        """Normalize array for order-independent comparison"""
-        if not ignore_array_order:
-            return arr
-
-        # Create a normalized version for comparison
-        # For simple values, sort them. For complex objects, use a different approach
-        try:
-            # Try to sort if all elements are simple (strings, numbers, booleans)
-            if all(
-                isinstance(item, (str, int, float, bool, type(None)))
-                for item in arr
-            ):
-                return sorted(arr, key=str)
-            else:
-                # For complex objects, sort by string representation
-                # This ensures consistent ordering for comparison
-                return sorted(
-                    arr,
-                    key=lambda x: (
-                        json.dumps(x, sort_keys=True)
-                        if isinstance(x, (dict, list))
-                        else str(x)
-                    ),
-                )
-        except (TypeError, ValueError):
-            # If sorting fails, return original array
-            return arr
 
-    def flatten_json(obj, parent_key="", sep="."):
-        items = []
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                new_key = f"{parent_key}{sep}{k}" if parent_key else k
-                items.extend(flatten_json(v, new_key, sep=sep).items())
-        elif isinstance(obj, list):
-            if ignore_array_order:
-                # For order-independent comparison, normalize the array first
-                normalized_list = normalize_array_for_comparison(obj)
-                for i, v in enumerate(normalized_list):
-                    # Use a consistent key that doesn't depend on original position
-                    new_key = f"{parent_key}[item_{i}]"
-                    items.extend(flatten_json(v, new_key, sep=sep).items())
-            else:
-                # Original behavior - order-sensitive
-                for i, v in enumerate(obj):
-                    new_key = f"{parent_key}[{i}]"
-                    items.extend(flatten_json(v, new_key, sep=sep).items())
+def _flatten_json(obj: Any, ignore_array_order: bool = True) -> Dict:
+    """
+    Flatten obj into {"a.b[item_0].c": leaf} in a single pass.
+
+    Walks the tree iteratively with a stack of child iterators and writes
+    every leaf straight into one mapping in document order, so nested
+    levels are never copied. Empty dicts and lists contribute no keys.
+    """
+    if not isinstance(obj, (dict, list)):
+        return {"": obj}
+
+    def children(node, parent_key):
+        if isinstance(node, dict):
+            if parent_key:
+                return [(f"{parent_key}.{k}", v) for k, v in node.items()]
+            return list(node.items())
+        if ignore_array_order:
+            # Keys don't depend on the original position
+            return [
+                (f"{parent_key}[item_{i}]", v)
+                for i, v in enumerate(_normalize_array_for_comparison(node))
+            ]
+        return [(f"{parent_key}[{i}]", v) for i, v in enumerate(node)]
+
+    flat = {}
+    stack = [(iter(children(obj, "")), id(obj))]
+    # Containers on the current path; a repeat is a circular reference,
+    # which the recursive version reported as RecursionError
+    active = {id(obj)}
+    while stack:
+        for key, value in stack[-1][0]:
+            if isinstance(value, (dict, list)):
+                if id(value) in active:
+                    raise RecursionError(f"Circular reference at {key}")
+                active.add(id(value))
+                stack.append((iter(children(value, key)), id(value)))
+                break
+            flat[key] = value
         else:
-            return {parent_key: obj}
-        return dict(items)
+            active.discard(stack.pop()[1])
+    return flat
 
-    flat1 = flatten_json(obj1)
-    flat2 = flatten_json(obj2)
+
+def compare_structure_and_values(
+    obj1: Any, obj2: Any, ignore_array_order: bool = True
+) -> Dict[str, Any]:
+    """Compare both structure and values."""
+    flat1 = _flatten_json(obj1, ignore_array_order)
+    flat2 = _flatten_json(obj2, ignore_array_order)
 
     all_keys = set(flat1.keys()).union(set(flat2.keys()))
     matching_pairs = 0
@@ -0,0 +1,232 @@
+"""
+Single-pass Pattern_Match search over multi-line kubectl log output
+
+KubectlPatternValidator passes when any log line satisfies
+validate_response_enhanced. Running that pipeline on every line of a large
+log means a json.loads, a json.dumps and every pattern pass per line.
+
+LogPatternMatcher derives from the compiled pattern a few literal "anchor"
+words that every way of matching a line requires (the substring itself,
+the regex's fixed text, the key of each key:value pair, JSONPath field
+names, the keys of a JSON pattern). It scans the log once for those anchors
+and runs the full pipeline only on the lines that contain one. Lines
+without an anchor cannot match, so the outcome is the same as checking
+every line.
+
+Anchors are runs of two or more letters. A JSON line is matched against
+its re-serialised form, which keeps letters in keys and strings as they
+are; only \\u escapes can add letters, so lines containing one are always
+checked. Words Python or JSON may produce for numbers and literals
+("Infinity", "True", "None", ...) are never used as anchors.
+"""
+
+import re
+from typing import Any, Callable, List, Optional
+
+from ..utils.logger import get_logger
+from ..utils.parsed_response import ParsedResponse
+from .enhanced_response_validator import compile_pattern
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+logger = get_logger("TestPilot.LogMatcher")
+
+# Below this many lines every line is checked; the prefilter is not worth
+# its setup
+PREFILTER_MIN_LINES = 64
+
+_WORD_RE = re.compile(r"[^\W\d]{2,}")
+# Text str()/json.dumps() can produce for numbers, booleans and null
+_GENERATED_WORDS = ("Infinity", "NaN", "inf", "nan", "True", "False", "None")
+# A \uXXXX escape decodes to characters the raw line does not show
+_ESCAPE_ANCHOR = "\\u"
+
+
+def _best_word(texts) -> Optional[str]:
+    """Longest safe anchor word in texts (all of which are required)."""
+    best = None
+    for text in texts:
+        for word in _WORD_RE.findall(text):
+            if any(word in generated for generated in _GENERATED_WORDS):
+                continue
+            if best is None or len(word) > len(best):
+                best = word
+    return best
+
+
+def _regex_literals(regex) -> Optional[List[str]]:
+    """Literal runs every match of regex contains, or None if unknown."""
+    try:
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+    except Exception:
+        return None
+    if parsed.state.flags & re.IGNORECASE:
+        return None
+    literals, current = [], []
+    for op, value in parsed:
+        if op is sre_parse.LITERAL:
+            current.append(chr(value))
+            continue
+        if current:
+            literals.append("".join(current))
+            current = []
+    if current:
+        literals.append("".join(current))
+    return literals
+
+
+def _jsonpath_fields(expr) -> Optional[List[str]]:
+    """Field names a plain a.b..c JSONPath needs, or None if unknown."""
+    kind = type(expr).__name__
+    if kind in ("Root", "This"):
+        return []
+    if kind == "Fields":
+        fields = getattr(expr, "fields", ())
+        if len(fields) != 1 or fields[0] == "*":
+            return None
+        return list(fields)
+    if kind in ("Child", "Descendants"):
+        left = _jsonpath_fields(expr.left)
+        right = _jsonpath_fields(expr.right)
+        if left is None or right is None:
+            return None
+        return left + right
+    return None
+
+
+def _json_required_strings(value: Any) -> List[str]:
+    """Keys and strings a line must contain to match a JSON pattern."""
+    items = value if isinstance(value, list) else [value]
+    required = []
+    for item in items:
+        if isinstance(item, dict):
+            required.extend(item.keys())
+        elif isinstance(item, str):
+            required.append(item)
+    return required
+
+
+def line_anchors(pattern_match: Any) -> Optional[List[str]]:
+    """
+    Return words of which every matching log line contains at least one.
+
+    Returns None when no such words can be derived (e.g. alternations,
+    wildcards, patterns without letters), in which case every line has to
+    be checked.
+    """
+    if not isinstance(pattern_match, str) or not pattern_match.strip():
+        return None
+    compiled = compile_pattern(pattern_match)
+    anchors = []
+
+    # Substring: the pattern, trimmed or unquoted
+    base = (
+        compiled.unquoted
+        if compiled.unquoted is not None
+        else pattern_match.strip()
+    )
+    word = _best_word([base])
+    if word is None:
+        return None
+    anchors.append(word)
+
+    if compiled.regex is not None:
+        literals = _regex_literals(compiled.regex)
+        word = _best_word(literals) if literals else None
+        if word is None:
+            return None
+        anchors.append(word)
+
+    # Key-value: all pairs must match, so at least one key is in the line
+    # (pairs found only in headers are covered by the header probe)
+    if compiled.key_value_pairs and not compiled.skip_key_value:
+        for key, _, _ in compiled.key_value_pairs:
+            word = _best_word([key])
+            if word is None:
+                return None
+            anchors.append(word)
+
+    if compiled.jsonpath is not None:
+        fields = _jsonpath_fields(compiled.jsonpath)
+        word = _best_word(fields) if fields else None
+        if word is None:
+            return None
+        anchors.append(word)
+
+    if compiled.is_json and compiled.json_error is None:
+        word = _best_word(_json_required_strings(compiled.json_value))
+        if word is None:
+            return None
+        anchors.append(word)
+
+    return list(dict.fromkeys(anchors))
+
+
+class LogPatternMatcher:
+    """Find the first log line that satisfies a Pattern_Match."""
+
+    def __init__(
+        self,
+        pattern_match: Any,
+        check_line: Callable[[str], bool],
+        min_lines: int = PREFILTER_MIN_LINES,
+    ):
+        """
+        Initialize log matcher.
+
+        Args:
+            pattern_match: Pattern_Match value from the test row
+            check_line: Full per-line check, e.g. validate_response_enhanced
+                with the row's headers and payload
+            min_lines: Logs shorter than this are checked line by line
+        """
+        self.pattern_match = pattern_match
+        self.check_line = check_line
+        self.min_lines = min_lines
+        self.lines_checked = 0
+
+    def find(self, text: str) -> Optional[str]:
+        """Return the first line of text that matches, or None."""
+        if text.count("\n") + 1 >= self.min_lines:
+            anchors = line_anchors(self.pattern_match)
+            # Headers are the same for every line; if they match on their
+            # own, any line can pass and the anchors prove nothing
+            if anchors and not self._check(""):
+                return self._find_prefiltered(text, anchors)
+        lines = (
+            text.lines
+            if isinstance(text, ParsedResponse)
+            else text.split("\n")
+        )
+        for line in lines:
+            if self._check(line):
+                return line
+        return None
+
+    def _check(self, line: str) -> bool:
+        self.lines_checked += 1
+        return self.check_line(line)
+
+    def _find_prefiltered(
+        self, text: str, anchors: List[str]
+    ) -> Optional[str]:
+        candidate_re = re.compile(
+            "|".join(re.escape(a) for a in anchors + [_ESCAPE_ANCHOR])
+        )
+        logger.debug(f"Scanning log for anchors {anchors}")
+        pos = 0
+        while True:
+            hit = candidate_re.search(text, pos)
+            if hit is None:
+                return None
+            start = text.rfind("\n", 0, hit.start()) + 1
+            end = text.find("\n", hit.end())
+            if end == -1:
+                end = len(text)
+            line = text[start:end]
+            if self._check(line):
+                return line
+            pos = end + 1
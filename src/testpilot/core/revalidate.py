@@ -0,0 +1,297 @@
+"""
+Re-validation of stored results for TestPilot
+
+After Pattern_Match or Response_Payload cells are tuned in the workbook,
+revalidate() re-runs only the validation of a previous run: it reads the
+outputs saved by TestResultsExporter.export_to_json(), pairs every result
+with its row in the current workbook and dispatches the validators again.
+No command is sent to any host.
+
+Rows are validated in a process pool. Every Pattern_Match is compiled in
+the parent before the pool starts, so forked workers share the warm
+compile cache; the enhanced pattern index and the config snapshot are
+handed to each worker when it starts.
+
+kubectl logs rows cannot be re-validated: the exported results do not
+keep the captured logs. Their previous result is kept as it was.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from ..utils.config_resolver import (
+    ConfigSnapshot,
+    get_config_snapshot,
+    set_config_snapshot,
+)
+from ..utils.logger import get_logger
+from ..utils.pattern_store import get_pattern_store
+from ..utils.response_parser import parse_curl_output
+from .enhanced_response_validator import compile_pattern
+from .test_pilot_core import (
+    _is_wait_command,
+    extract_step_data,
+    manage_workflow_context,
+    validate_and_create_result,
+)
+from .test_result import TestFlow, TestResult, TestStep
+from .validation_engine import _is_kubectl_logs_command
+
+logger = get_logger("TestPilot.Revalidate")
+
+
+@dataclass
+class RevalidationJob:
+    """One stored result paired with its workbook row."""
+
+    index: int
+    sheet: str
+    test_name: str
+    step: TestStep
+    step_data: Dict[str, Any]
+    # flow.context as it is when the step runs (Save_As payloads)
+    flow_context: Dict[str, Any]
+    record: Dict[str, Any]
+
+
+@dataclass
+class RevalidationReport:
+    results: List[TestResult]
+    revalidated: int = 0
+    # kubectl logs rows whose previous result was kept
+    kept: int = 0
+    # Stored results without a matching row in the workbook
+    unmatched: int = 0
+    # Rows whose verdict differs from the stored one
+    changed: int = 0
+
+
+def load_result_records(path: str) -> List[Dict[str, Any]]:
+    """Results list of a file written by TestResultsExporter.export_to_json."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    records = data.get("results") if isinstance(data, dict) else data
+    if not isinstance(records, list):
+        raise ValueError(f"No test results found in {path}")
+    return records
+
+
+def _is_kubectl_logs_step(step: TestStep) -> bool:
+    plan = getattr(step, "validation_plan", None)
+    if plan is not None:
+        return plan.key[5]
+    return _is_kubectl_logs_command(step.other_fields.get("Command"))
+
+
+def _runnable_steps(flow: TestFlow) -> List[Tuple[TestStep, Dict, Dict]]:
+    """
+    Steps of flow that produce results, each with its step_data and the
+    workflow context it sees (mirrors process_single_step()).
+    """
+    runnable = []
+    context_flow = TestFlow(flow.sheet, flow.test_name)
+    for step in flow.steps:
+        step_data = extract_step_data(step)
+        command = step_data["command"]
+        if command is None or pd.isna(command):
+            continue
+        step_data["save_key"] = step.other_fields.get("Save_As")
+        manage_workflow_context(context_flow, step_data)
+        if _is_wait_command(command):
+            continue
+        runnable.append((step, step_data, dict(context_flow.context)))
+    return runnable
+
+
+def _match_records(
+    records: List[Dict[str, Any]], flows: List[TestFlow]
+) -> Tuple[List[RevalidationJob], List[int]]:
+    """
+    Pair stored results with workbook steps.
+
+    Results exported with "excel_row" are matched by (sheet, test name,
+    row). Older files are matched by position: results of a test follow
+    its steps in order, one per host, so a host seen twice starts the
+    next step with the same method.
+    """
+    by_row = {}
+    by_flow = {}
+    for flow in flows:
+        runnable = _runnable_steps(flow)
+        by_flow[(flow.sheet, flow.test_name)] = runnable
+        for entry in runnable:
+            by_row[(flow.sheet, flow.test_name, entry[0].row_idx)] = entry
+
+    jobs = []
+    unmatched = []
+    # (sheet, test_name) -> [step position, hosts seen for that step]
+    cursors: Dict[Tuple[str, str], List[Any]] = {}
+    for index, record in enumerate(records):
+        sheet = record.get("sheet")
+        test_name = record.get("test_name")
+        entry = None
+        if record.get("excel_row") is not None:
+            entry = by_row.get((sheet, test_name, record["excel_row"]))
+        else:
+            runnable = by_flow.get((sheet, test_name), [])
+            cursor = cursors.setdefault((sheet, test_name), [-1, set()])
+            host = record.get("host")
+            method = str(record.get("method") or "").upper()
+            position = cursor[0]
+            if position < 0 or host in cursor[1]:
+                position += 1
+                while position < len(runnable) and (
+                    str(runnable[position][1]["method"]).upper() != method
+                ):
+                    position += 1
+                cursor[0], cursor[1] = position, set()
+            cursor[1].add(host)
+            if position < len(runnable):
+                entry = runnable[position]
+
+        if entry is None:
+            unmatched.append(index)
+            continue
+        step, step_data, flow_context = entry
+        jobs.append(
+            RevalidationJob(
+                index, sheet, test_name, step, step_data, flow_context, record
+            )
+        )
+    return jobs, unmatched
+
+
+def _stored_result(record: Dict[str, Any], step: TestStep) -> TestResult:
+    """TestResult rebuilt from a stored record, verdict unchanged."""
+    passed = bool(record.get("passed", False))
+    return TestResult(
+        sheet=record.get("sheet", ""),
+        row_idx=step.row_idx,
+        host=record.get("host", ""),
+        command=record.get("command", ""),
+        output=record.get("output", ""),
+        error=record.get("error", ""),
+        expected_status=step.expected_status,
+        actual_status=None,
+        pattern_match=record.get("pattern_match", {}).get("raw_pattern_match"),
+        pattern_found=None,
+        passed=passed,
+        fail_reason=(
+            None if passed else "kubectl logs row kept from the stored run"
+        ),
+        test_name=record.get("test_name", ""),
+        duration=record.get("duration", 0.0),
+        method=record.get("method", ""),
+    )
+
+
+def _revalidate_job(job: RevalidationJob) -> TestResult:
+    record = job.record
+    output = record.get("output") or ""
+    error = record.get("error") or ""
+    flow = TestFlow(job.sheet, job.test_name)
+    flow.context = dict(job.flow_context)
+    return validate_and_create_result(
+        job.step,
+        flow,
+        dict(job.step_data),
+        parse_curl_output(output, error),
+        output,
+        error,
+        record.get("duration", 0.0),
+        record.get("host", ""),
+        record.get("command", ""),
+    )
+
+
+def _init_worker(config: Optional[Tuple[Dict[str, Any], str]], patterns):
+    if config is not None:
+        set_config_snapshot(ConfigSnapshot.from_dict(*config))
+    if patterns:
+        get_pattern_store().load_data(patterns)
+
+
+def _revalidate_chunk(jobs: List[RevalidationJob]) -> List[TestResult]:
+    return [_revalidate_job(job) for job in jobs]
+
+
+def revalidate(
+    records: List[Dict[str, Any]],
+    flows: List[TestFlow],
+    workers: Optional[int] = None,
+    enhanced_patterns: Optional[Dict[str, Any]] = None,
+) -> RevalidationReport:
+    """
+    Validate stored results again against the rows of flows.
+
+    Args:
+        records: Results loaded with load_result_records()
+        flows: Flows parsed from the current workbook
+        workers: Size of the process pool (default: CPU count); 1 runs in
+            this process
+        enhanced_patterns: Enhanced pattern data for the workers (as
+            returned by process_patterns())
+    """
+    jobs, unmatched = _match_records(records, flows)
+    if unmatched:
+        logger.warning(
+            f"{len(unmatched)} stored results have no matching row in the workbook and were skipped"
+        )
+
+    results: Dict[int, TestResult] = {}
+    pending = []
+    for job in jobs:
+        if _is_kubectl_logs_step(job.step):
+            results[job.index] = _stored_result(job.record, job.step)
+        else:
+            pending.append(job)
+    kept = len(results)
+
+    # Compile once here; forked workers inherit the cache
+    for pattern in {job.step_data["pattern_match"] for job in pending}:
+        if isinstance(pattern, str) and pattern:
+            compile_pattern(pattern)
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(pending)) or 1
+    if workers == 1:
+        revalidated = _revalidate_chunk(pending)
+    else:
+        snapshot = get_config_snapshot()
+        config = (
+            (snapshot.to_dict(), snapshot.path)
+            if snapshot is not None
+            else None
+        )
+        # A few chunks per worker keeps them busy without one task per row
+        size = max(1, len(pending) // (workers * 4))
+        chunks = [pending[i : i + size] for i in range(0, len(pending), size)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(config, enhanced_patterns),
+        ) as pool:
+            revalidated = [
+                result
+                for chunk in pool.map(_revalidate_chunk, chunks)
+                for result in chunk
+            ]
+
+    changed = 0
+    for job, result in zip(pending, revalidated):
+        results[job.index] = result
+        if result.passed != bool(job.record.get("passed", False)):
+            changed += 1
+
+    return RevalidationReport(
+        results=[results[index] for index in sorted(results)],
+        revalidated=len(pending),
+        kept=kept,
+        unmatched=len(unmatched),
+        changed=changed,
+    )
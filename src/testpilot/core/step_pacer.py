@@ -0,0 +1,212 @@
+"""
+Event-driven step pacing for TestPilot
+
+Replaces the fixed step_delay sleep after every step. A step only waits when
+it depends on something that needs time to settle:
+
+- a Compare_With GET that follows a write (PUT/POST/PATCH/DELETE) in the
+  same flow waits until settle_delay has passed since that write
+- a kubectl/oc logs capture waits until settle_delay has passed since the
+  previous request of the flow, so the log lines are there to be captured
+- a per-row wait(N) sleeps for N seconds
+
+Everything else runs back-to-back (or is governed by the rate limiter).
+Time spent pacing is accounted per sheet so the cost can be reported.
+"""
+
+import asyncio
+import math
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.logger import get_logger
+
+logger = get_logger("TestPilot.Pacer")
+
+WRITE_METHODS = {"PUT", "POST", "PATCH", "DELETE"}
+
+REASON_COMPARE = "compare_with"
+REASON_LOGS = "kubectl_logs"
+REASON_WAIT = "wait"
+
+
+def _has_value(value: Any) -> bool:
+    """True for non-empty values; Excel blanks arrive as None or NaN."""
+    if value is None:
+        return False
+    if isinstance(value, float) and math.isnan(value):
+        return False
+    return bool(str(value).strip())
+
+
+def _is_logs_command(command: Any) -> bool:
+    if not isinstance(command, str):
+        return False
+    parts = command.strip().split()
+    return len(parts) > 1 and parts[0] in ("kubectl", "oc") and "logs" in parts
+
+
+@dataclass
+class PacingStats:
+    """Pacing cost of one sheet."""
+
+    total_seconds: float = 0.0
+    paced_steps: int = 0
+    steps: int = 0
+    by_reason: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class _FlowState:
+    last_request_at: Optional[float] = None
+    last_write_at: Optional[float] = None
+
+
+class StepPacer:
+    """
+    Decide, per step, whether and how long to wait before it runs.
+
+    One pacer is shared by all flows of a run; it is safe to use from the
+    parallel flow and host workers.
+    """
+
+    def __init__(self, settle_delay: float = 1.0):
+        """
+        Initialize step pacer.
+
+        Args:
+            settle_delay: Seconds a dependent step waits after the step it
+                depends on (the old fixed step_delay)
+        """
+        self.settle_delay = max(0.0, float(settle_delay or 0.0))
+        self._lock = threading.Lock()
+        # flow -> _FlowState, dropped together with the flow
+        self._flows = weakref.WeakKeyDictionary()
+        self._stats: Dict[str, PacingStats] = {}
+
+    def _flow_state(self, flow) -> _FlowState:
+        with self._lock:
+            state = self._flows.get(flow)
+            if state is None:
+                state = self._flows[flow] = _FlowState()
+            return state
+
+    def _account(self, flow, reason: Optional[str], seconds: float) -> None:
+        sheet = getattr(flow, "sheet", None) or "default"
+        with self._lock:
+            stats = self._stats.setdefault(sheet, PacingStats())
+            stats.steps += 1
+            if reason is not None:
+                stats.paced_steps += 1
+                stats.total_seconds += seconds
+                stats.by_reason[reason] = (
+                    stats.by_reason.get(reason, 0.0) + seconds
+                )
+
+    def delay_for(
+        self, flow, step_data: Dict[str, Any]
+    ) -> Tuple[float, Optional[str]]:
+        """
+        Return (seconds, reason) the step has to wait; reason is None when
+        the step has no dependency that needs settling.
+        """
+        state = self._flow_state(flow)
+        method = str(step_data.get("method") or "GET").upper()
+        now = time.monotonic()
+
+        if (
+            method == "GET"
+            and _has_value(step_data.get("compare_with_key"))
+            and state.last_write_at is not None
+        ):
+            remaining = self.settle_delay - (now - state.last_write_at)
+            return max(0.0, remaining), REASON_COMPARE
+
+        if (
+            method == "KUBECTL" or _is_logs_command(step_data.get("command"))
+        ) and state.last_request_at is not None:
+            remaining = self.settle_delay - (now - state.last_request_at)
+            return max(0.0, remaining), REASON_LOGS
+
+        return 0.0, None
+
+    def before_step(self, flow, step_data: Dict[str, Any]) -> float:
+        """Sleep as long as the step's dependencies require; return seconds."""
+        delay, reason = self.delay_for(flow, step_data)
+        if delay > 0:
+            logger.debug(
+                f"Pacing {getattr(flow, 'test_name', 'N/A')}: "
+                f"waiting {delay:.2f}s ({reason})"
+            )
+            time.sleep(delay)
+        self._account(flow, reason, delay)
+        return delay
+
+    async def before_step_async(
+        self, flow, step_data: Dict[str, Any]
+    ) -> float:
+        """before_step() for the async core: waits without blocking the loop."""
+        delay, reason = self.delay_for(flow, step_data)
+        if delay > 0:
+            logger.debug(
+                f"Pacing {getattr(flow, 'test_name', 'N/A')}: "
+                f"waiting {delay:.2f}s ({reason})"
+            )
+            await asyncio.sleep(delay)
+        self._account(flow, reason, delay)
+        return delay
+
+    def after_step(self, flow, step_data: Dict[str, Any]) -> None:
+        """Record that the flow's step finished talking to the target."""
+        state = self._flow_state(flow)
+        now = time.monotonic()
+        state.last_request_at = now
+        if str(step_data.get("method") or "").upper() in WRITE_METHODS:
+            state.last_write_at = now
+
+    def wait(self, flow, seconds: float) -> None:
+        """Sleep for an explicit wait(N) row and account it."""
+        if seconds > 0:
+            time.sleep(seconds)
+        self._account(flow, REASON_WAIT, max(0.0, seconds))
+
+    async def wait_async(self, flow, seconds: float) -> None:
+        """wait() for the async core."""
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+        self._account(flow, REASON_WAIT, max(0.0, seconds))
+
+    def report(self) -> Dict[str, PacingStats]:
+        """Return a copy of the per-sheet pacing statistics."""
+        with self._lock:
+            return {
+                sheet: PacingStats(
+                    stats.total_seconds,
+                    stats.paced_steps,
+                    stats.steps,
+                    dict(stats.by_reason),
+                )
+                for sheet, stats in self._stats.items()
+            }
+
+    def format_report(self) -> List[str]:
+        """Human readable per-sheet pacing cost, one line per sheet."""
+        lines = []
+        total = 0.0
+        for sheet, stats in sorted(self.report().items()):
+            total += stats.total_seconds
+            reasons = ", ".join(
+                f"{reason}={seconds:.1f}s"
+                for reason, seconds in sorted(stats.by_reason.items())
+            )
+            lines.append(
+                f"{sheet}: {stats.total_seconds:.1f}s paced over "
+                f"{stats.paced_steps}/{stats.steps} steps"
+                + (f" ({reasons})" if reasons else "")
+            )
+        if lines:
+            lines.append(f"Total pacing: {total:.1f}s")
+        return lines
@@ -2,12 +2,16 @@
 # test_pilot_core.py
 # =============================================================================
 
+import asyncio
 import copy
 import json
+import logging
 import os
 import re
+import shlex
 import subprocess
 import sys
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pprint import pprint
@@ -15,18 +19,39 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 
 import pandas as pd
 
+from ..utils.config_resolver import get_config_snapshot
 from ..utils.curl_builder import build_ssh_k8s_curl_command
+from ..utils.http_agent import (
+    HttpAgentTimeout,
+    agent_command,
+    get_http_agent_pool,
+)
+from ..utils.http_exchange import HttpExchange, parse_curl_command
+from ..utils.kubectl_log_stream import stream_many_until_match
 from ..utils.kubectl_logs_search import search_in_custom_output
+from ..utils.log_tailer import (
+    DEFAULT_MAX_LINES,
+    DEFAULT_MAX_RESTARTS,
+    get_log_tailer_registry,
+    since_to_seconds,
+)
 from ..utils.logger import get_failure_logger, get_logger
 from ..utils.myutils import (
     prettify_curl_output,
     replace_placeholder_in_command,
 )
+from ..utils.native_http import get_native_http_client
+from ..utils.parsed_response import ParsedResponse
+from ..utils.payload_repository import get_payload_repository
+from ..utils.pod_inventory import get_pod_inventory
+from ..utils.rate_limiter import parse_excel_rate_limit
+from ..utils.remote_batch import run_batch
 from ..utils.resource_map_utils import map_localhost_url
 from ..utils.response_parser import parse_curl_output
-from ..utils.rate_limiter import parse_excel_rate_limit
+from .async_runner import SYNC_RUNTIME, run_blocking
+from .enhanced_response_validator import validate_response_enhanced
 from .test_result import TestFlow, TestResult, TestStep
-from .validation_engine import ValidationContext, ValidationDispatcher
+from .validation_engine import ValidationContext, ValidationDispatcher, _cell
 
 # Mock integration imports (lazy loaded to avoid issues if not available)
 _mock_executor = None
@@ -115,10 +140,8 @@ def _load_response_payload_file(
         return filename
 
     try:
-        with open(payload_path, "r", encoding="utf-8") as f:
-            content = f.read().strip()
-            logger.debug(f"Loaded response payload from file: {payload_path}")
-            return content
+        # Shared by every step and host that names this file
+        return get_payload_repository().get(payload_path).text
     except (IOError, OSError) as e:
         logger.warning(
             f"Failed to read response payload file {payload_path}: {e}, using filename as-is"
@@ -152,6 +175,9 @@ else:
 logger = get_logger("TestPilot.Core")
 failure_logger = get_failure_logger("TestPilot.Failures")
 
+# Stateless, so one dispatcher serves every step
+_DISPATCHER = ValidationDispatcher()
+
 
 def save_kubectl_logs(
     raw_output, host, row_idx, test_name, dir_path="kubectl_logs"
@@ -164,17 +190,44 @@ def save_kubectl_logs(
         json.dump(raw_output, f, indent=2)
 
 
+def _set_mock_context(connector, flow, step):
+    """
+    Tell a mock connector which sheet, test and row the next command is for.
+
+    The mock connector keeps this context per thread, so it is set on the
+    thread that runs the command.
+    """
+    if getattr(connector, "execution_mode", None) == "mock":
+        connector._current_sheet = getattr(flow, "sheet", None)
+        connector._current_test = getattr(flow, "test_name", None)
+        connector._current_row_idx = getattr(step, "row_idx", None)
+
+
 def execute_kubectl_logs_parallel(
-    kubectl_commands, host, connector, step, flow, show_table=False
+    kubectl_commands,
+    host,
+    connector,
+    step,
+    flow,
+    show_table=False,
+    step_data=None,
 ):
-    """Execute kubectl logs commands in parallel and return accumulated results."""
+    """
+    Execute kubectl logs commands in parallel and return accumulated results.
+
+    step_data, if given, is marked when a capture was truncated (see
+    execute_command).
+    """
     if not kubectl_commands:
         return "", [], 0.0
 
     def execute_single_kubectl_command(command):
         """Execute a single kubectl logs command and return structured result."""
+        _set_mock_context(connector, flow, step)
         try:
-            output, error, duration = execute_command(command, host, connector)
+            output, error, duration = execute_command(
+                command, host, connector, step_data
+            )
             parsed_output = parse_curl_output(output, error)
             raw_output = parsed_output.get("raw_output", "")
 
@@ -260,6 +313,423 @@ def execute_kubectl_logs_parallel(
     return accumulated_raw_output, pod_names, total_duration
 
 
+def _resolve_log_collector(args, connector):
+    """
+    Return the kubectl logs collector to use: "capture", "stream" or "tail".
+
+    The --log-collector CLI flag wins over kubectl_logs_settings.collector.
+    Mock runs always use "capture" since there is no real log stream.
+    """
+    if (
+        hasattr(connector, "execution_mode")
+        and connector.execution_mode == "mock"
+    ):
+        return "capture"
+    collector = getattr(args, "log_collector", None) if args else None
+    if not collector:
+        try:
+            collector = _get_kubectl_logs_settings(connector).get(
+                "collector", "capture"
+            )
+        except Exception:
+            collector = "capture"
+    return collector
+
+
+def _get_http_settings():
+    """Return the http_settings section of the active config snapshot."""
+    snapshot = get_config_snapshot()
+    if snapshot is None:
+        return {}
+    return snapshot.get("http_settings") or {}
+
+
+def _diff_details_enabled():
+    """Whether payload mismatches get a DeepDiff report (default: yes)."""
+    snapshot = get_config_snapshot()
+    if snapshot is None:
+        return True
+    return bool(snapshot.validation_settings.get("diff_details", True))
+
+
+def _resolve_http_backend(args, connector):
+    """
+    Return the HTTP step backend to use: "curl", "agent" or "native".
+
+    The --http-backend CLI flag wins over http_settings.backend. Mock runs
+    always use "curl" since the mock connector answers the curl commands.
+    """
+    if (
+        hasattr(connector, "execution_mode")
+        and connector.execution_mode == "mock"
+    ):
+        return "curl"
+    backend = getattr(args, "http_backend", None) if args else None
+    return backend or _get_http_settings().get("backend", "curl")
+
+
+def _split_exec_curl_command(command):
+    """
+    Split `<cli> exec -it <pod> -n <ns> -c <container> -- curl ...`.
+
+    Returns ((cli, pod, namespace, container), curl_command), or None for
+    commands of any other shape (e.g. the get po | xargs pipeline).
+    """
+    if " -- " not in command:
+        return None
+    prefix, curl_command = command.split(" -- ", 1)
+    try:
+        tokens = shlex.split(prefix)
+    except ValueError:
+        return None
+    if (
+        len(tokens) != 8
+        or tokens[1:3] != ["exec", "-it"]
+        or tokens[4] != "-n"
+        or tokens[6] != "-c"
+    ):
+        return None
+    return (tokens[0], tokens[3], tokens[5], tokens[7]), curl_command
+
+
+def _send_via_agent(command, host, connector):
+    """
+    Send a curl step through the persistent HTTP agent.
+
+    Direct exec commands go to an agent inside the target pod; with
+    http_settings.agent_launch "host" plain curl commands go to an agent on
+    the host itself. Returns the HttpExchange, or None when the command
+    cannot use the agent and should be run as usual. A request that was
+    sent but got no answer comes back as an exchange with an error, never
+    as None, so it is not sent a second time.
+    """
+    settings = _get_http_settings()
+    launch = settings.get("agent_launch", "pod")
+    runner = agent_command(settings.get("agent_python", "python3"))
+
+    split = _split_exec_curl_command(command)
+    if launch == "host":
+        curl_command = split[1] if split else command
+        key = (host, None, None, None)
+        launch_command = runner
+    elif split is not None:
+        (cli_type, pod, namespace, container), curl_command = split
+        key = (host, namespace, pod, container)
+        launch_command = (
+            f"{cli_type} exec -i {shlex.quote(pod)} -n {shlex.quote(namespace)} "
+            f"-c {shlex.quote(container)} -- {runner}"
+        )
+    else:
+        return None
+
+    request = parse_curl_command(curl_command)
+    if request is None:
+        return None
+
+    pool = get_http_agent_pool()
+    session = None
+    try:
+        session = pool.get_or_start(key, launch_command, host, connector)
+        exchange = session.request(request, float(settings.get("timeout", 30)))
+    except HttpAgentTimeout as e:
+        # The request may have reached the NF; sending it again with curl
+        # could repeat a PUT, POST or DELETE
+        logger.warning(str(e))
+        return HttpExchange(request, error=str(e))
+    except RuntimeError as e:
+        logger.debug(f"HTTP agent not used on {host}: {e}")
+        if session is None or not session.alive:
+            pool.discard(key)
+        return None
+    return exchange
+
+
+def _send_natively(command, connector):
+    """
+    Send a plain curl command (pod_mode) from this process.
+
+    Only commands that would run locally qualify; over SSH the curl runs on
+    the remote host, whose network view this process does not share.
+    Returns the HttpExchange, or None to run the command with curl.
+    """
+    if connector is not None and getattr(connector, "use_ssh", False):
+        return None
+    if not command.startswith("curl "):
+        return None
+    request = parse_curl_command(command)
+    if request is None:
+        return None
+    settings = _get_http_settings()
+    client = get_native_http_client(
+        str(settings.get("native_http_version", "auto"))
+    )
+    if not client.supports(request):
+        return None
+    return client.send(request, float(settings.get("timeout", 30)))
+
+
+def _run_step_command(command, host, connector, args=None, step_data=None):
+    """
+    Run a built step command with the selected HTTP backend.
+
+    Returns (output, error, duration, exchange); exchange is the structured
+    HttpExchange when the agent or native backend sent the request, and
+    None when the command ran as a shell command. step_data is passed on to
+    execute_command.
+    """
+    backend = _resolve_http_backend(args, connector)
+    exchange = None
+    if backend == "agent":
+        exchange = _send_via_agent(command, host, connector)
+    elif backend == "native":
+        exchange = _send_natively(command, connector)
+    if exchange is not None:
+        output, error = exchange.to_curl_output()
+        return output, error, exchange.duration, exchange
+    output, error, duration = execute_command(
+        command, host, connector, step_data
+    )
+    return output, error, duration, None
+
+
+def _build_log_line_matcher(step, flow, step_data, args=None):
+    """
+    Build a per-line matcher for the step's Pattern_Match.
+
+    Uses the same per-line check as KubectlPatternValidator, so a line that
+    stops the stream early is a line the validator will accept. Returns None
+    when the step has no pattern (the stream then runs to its deadline).
+    """
+    pattern = step_data.get("pattern_match")
+    if not pattern:
+        return None
+    validation_config = ValidationDispatcher()._get_validation_config(args)
+    sheet_name = getattr(flow, "sheet", None)
+    row_idx = getattr(step, "row_idx", None)
+
+    def matcher(line):
+        result = validate_response_enhanced(
+            pattern,
+            {},
+            line,
+            None,
+            logger,
+            config=validation_config,
+            args=args,
+            sheet_name=sheet_name,
+            row_idx=row_idx,
+        )
+        return result["pattern_match_overall"] is True
+
+    return matcher
+
+
+def _pod_name_from_logs_command(command):
+    """Return the pod argument of a `kubectl/oc logs` command, if any."""
+    parts = command.split()
+    if "logs" not in parts:
+        return None
+    value_flags = {"-n", "--namespace", "-c", "--container", "--since"}
+    skip_next = False
+    for part in parts[parts.index("logs") + 1 :]:
+        if skip_next:
+            skip_next = False
+        elif part in value_flags:
+            skip_next = True
+        elif not part.startswith("-"):
+            return part
+    return None
+
+
+def execute_kubectl_logs_streaming(
+    kubectl_commands, host, connector, step, flow, matcher, show_table=False
+):
+    """
+    Stream kubectl logs for all pods and stop at the first matching line.
+
+    Takes the capture commands built by _generate_logs_capture_command and
+    follows the same pods, but returns as soon as matcher accepts a line
+    (or after capture_duration seconds). Returns the same
+    (raw_output, pod_names, duration) tuple as execute_kubectl_logs_parallel.
+    """
+    if not kubectl_commands:
+        return "", [], 0.0
+
+    follow_commands = []
+    timeout = 0
+    for command in kubectl_commands:
+        split = _split_logs_capture_command(command)
+        if split is None:
+            follow_commands.append(command)
+            continue
+        follow_commands.append(split[0])
+        timeout = max(timeout, split[1])
+    if not timeout:
+        timeout = _get_kubectl_logs_settings(connector).get(
+            "capture_duration", 30
+        )
+
+    if not show_table:
+        for command in follow_commands:
+            logger.info(f"[CALLFLOW] Streaming logs: {command}")
+
+    results = stream_many_until_match(
+        follow_commands, matcher, timeout, host, connector
+    )
+
+    accumulated_raw_output = ""
+    pod_names = []
+    total_duration = 0.0
+    for result in results:
+        pod_name = _pod_name_from_logs_command(result.command)
+        # Newline-terminate each pod's output so pods don't run together
+        raw_output = result.output + "\n" if result.output else ""
+        if raw_output:
+            save_kubectl_logs(
+                raw_output,
+                host,
+                f"{step.row_idx}_{pod_name}" if pod_name else step.row_idx,
+                getattr(flow, "test_name", "unknown"),
+            )
+        if result.error and not show_table:
+            logger.info(f"[CALLFLOW] Log stream error output: {result.error}")
+        accumulated_raw_output += raw_output
+        pod_names.append(pod_name)
+        total_duration = max(total_duration, result.duration)
+
+    if not show_table:
+        matched = any(result.matched for result in results)
+        logger.info(
+            f"[CALLFLOW] Log streaming on host {host} finished in "
+            f"{total_duration:.2f}s (pattern matched: {matched})"
+        )
+    return accumulated_raw_output, pod_names, total_duration
+
+
+def _container_from_logs_command(command):
+    parts = command.split()
+    for flag in ("-c", "--container"):
+        if flag in parts and parts.index(flag) + 1 < len(parts):
+            return parts[parts.index(flag) + 1]
+    for part in parts:
+        if part.startswith("--container="):
+            return part.split("=", 1)[1]
+    return None
+
+
+def execute_kubectl_logs_tailing(
+    kubectl_commands,
+    host,
+    connector,
+    step,
+    flow,
+    matcher,
+    namespace=None,
+    show_table=False,
+):
+    """
+    Check pod logs through long-lived background tailers.
+
+    One tailer per (host, namespace, pod, container) is started on first use
+    and kept for the rest of the run. The step looks at the lines received
+    since its flow's previous request was sent (or since_duration ago) and
+    returns at the first line accepted by matcher, or after
+    capture_duration seconds. A pod whose tailer cannot start (for example
+    when the host's long-lived SSH channels are all taken) is captured once
+    with its capture command instead. Returns the same (raw_output,
+    pod_names, duration) tuple as execute_kubectl_logs_parallel.
+    """
+    if not kubectl_commands:
+        return "", [], 0.0
+
+    start = time.time()
+    settings = {}
+    try:
+        settings = _get_kubectl_logs_settings(connector)
+    except Exception:
+        pass
+    window_start = getattr(flow, "last_request_started_at", None)
+    if not isinstance(window_start, (int, float)):
+        window_start = start - since_to_seconds(
+            settings.get("since_duration", "1s")
+        )
+    registry = get_log_tailer_registry(
+        max_lines=int(settings.get("tail_max_lines", DEFAULT_MAX_LINES)),
+        max_restarts=int(
+            settings.get("tail_max_restarts", DEFAULT_MAX_RESTARTS)
+        ),
+    )
+
+    targets = []
+    for command in kubectl_commands:
+        split = _split_logs_capture_command(command)
+        follow_command, timeout = split or (
+            command,
+            settings.get("capture_duration", 30),
+        )
+        pod_name = _pod_name_from_logs_command(follow_command)
+        key = (
+            host,
+            namespace,
+            pod_name,
+            _container_from_logs_command(follow_command),
+        )
+        try:
+            tailer = registry.get_or_start(
+                key,
+                follow_command,
+                host,
+                connector,
+                backfill_seconds=start - window_start + 1,
+            )
+        except Exception as e:
+            logger.warning(
+                f"[CALLFLOW] Could not start log tailer for {pod_name} on "
+                f"{host} ({e}); capturing instead"
+            )
+            tailer = None
+        targets.append((command, pod_name, timeout, tailer))
+
+    stop_event = threading.Event()
+
+    def collect(target):
+        command, pod_name, timeout, tailer = target
+        if tailer is None:
+            # A plain command slot, which long-lived channels never take
+            output, _, _ = execute_command(command, host, connector)
+            return output.splitlines()
+        lines, _ = tailer.wait_for(window_start, matcher, timeout, stop_event)
+        return lines
+
+    with ThreadPoolExecutor(
+        max_workers=min(len(targets), 10),
+        thread_name_prefix="testpilot-logtail",
+    ) as executor:
+        pod_lines = list(executor.map(collect, targets))
+
+    accumulated_raw_output = ""
+    pod_names = []
+    for (_, pod_name, _, _), lines in zip(targets, pod_lines):
+        raw_output = "\n".join(lines) + "\n" if lines else ""
+        if raw_output:
+            save_kubectl_logs(
+                raw_output,
+                host,
+                f"{step.row_idx}_{pod_name}" if pod_name else step.row_idx,
+                getattr(flow, "test_name", "unknown"),
+            )
+        accumulated_raw_output += raw_output
+        pod_names.append(pod_name)
+
+    duration = time.time() - start
+    if not show_table:
+        logger.info(
+            f"[CALLFLOW] Checked {len(targets)} log tailers on host {host} "
+            f"in {duration:.2f}s ({len(registry)} tailers running)"
+        )
+    return accumulated_raw_output, pod_names, duration
+
+
 def safe_str(val: Any) -> str:
 
     if val is None or (isinstance(val, float) and pd.isna(val)):
@@ -336,6 +806,9 @@ def resolve_namespace(connector, host: str) -> Optional[str]:
         host_cfg = connector.get_host_config(host)
         return getattr(host_cfg, "namespace", None) if host_cfg else None
     else:
+        snapshot = get_config_snapshot()
+        if snapshot is not None:
+            return snapshot.namespace
         try:
             # Look for config in project root first, then fallback to package directory
             config_path = os.path.join(os.getcwd(), "config", "hosts.json")
@@ -371,6 +844,69 @@ def resolve_namespace(connector, host: str) -> Optional[str]:
         return None
 
 
+def _resolve_exec_pod(container, namespace, connector, host, cli_type):
+    """
+    Return the pinned pod to exec into, or None to keep the lookup that
+    build_ssh_k8s_curl_command embeds in the exec command.
+
+    The pod is resolved once from the pod inventory and re-resolved only
+    after an exec into it fails (see _reresolve_exec_command).
+    """
+    if connector is None or getattr(connector, "execution_mode", "") == "mock":
+        return None
+    inventory = get_pod_inventory()
+    if inventory is None or not inventory.direct_exec or not container:
+        return None
+    return inventory.exec_pod(host, namespace, container, connector, cli_type)
+
+
+# kubectl/oc errors meaning the exec never reached the pod (as opposed to
+# curl's own verbose output, which also arrives on stderr)
+_EXEC_POD_GONE_RE = re.compile(
+    r"Error from server \(NotFound\): pods|"
+    r"pods? \"[^\"]+\" not found|"
+    r"container not found|"
+    r"cannot exec into a container in a completed pod|"
+    r"unable to upgrade connection",
+    re.IGNORECASE,
+)
+
+
+def _reresolve_exec_command(
+    command, output, error, step_data, namespace, connector, host, host_cli_map
+):
+    """
+    Return command retargeted at a freshly resolved pod if a direct exec
+    failed because its pinned pod is gone, otherwise None.
+    """
+    container = step_data.get("pod_exec")
+    if not container or not _EXEC_POD_GONE_RE.search(
+        f"{output or ''}\n{error or ''}"
+    ):
+        return None
+    inventory = get_pod_inventory()
+    if inventory is None:
+        return None
+    cli_type = (host_cli_map or {}).get(host, "kubectl")
+    namespace = namespace or "default"
+    old_pod = inventory.forget_exec_pod(host, namespace, container, cli_type)
+    old_exec = f"{cli_type} exec -it {shlex.quote(old_pod or '')} "
+    if not old_pod or not command.startswith(old_exec):
+        return None
+    new_pod = inventory.exec_pod(
+        host, namespace, container, connector, cli_type
+    )
+    if not new_pod or new_pod == old_pod:
+        return None
+    logger.info(
+        f"Pod {old_pod} is gone on {host}, retrying the exec on {new_pod}"
+    )
+    return (
+        f"{cli_type} exec -it {shlex.quote(new_pod)} "
+        + command[len(old_exec) :]
+    )
+
+
 def build_url_based_command(
     step_data: Dict[str, Any],
     svc_map: Dict[str, str],
@@ -379,6 +915,7 @@ def build_url_based_command(
     host_cli_map: Optional[Dict[str, str]],
     host: str,
     test_context: Optional[Dict[str, Any]] = None,
+    connector=None,
 ) -> Optional[str]:
     """Build curl command for URL-based API calls."""
     url = step_data["url"]
@@ -412,6 +949,9 @@ def build_url_based_command(
             payloads_folder="payloads",
             cli_type=cli_type,
             test_context=test_context,
+            pod_name=_resolve_exec_pod(
+                pod_exec, namespace or "default", connector, host, cli_type
+            ),
         )
         return ssh_cmd
     except Exception as e:
@@ -419,44 +959,62 @@ def build_url_based_command(
         return None
 
 
-def build_kubectl_logs_command(
-    command, namespace, connector, host, host_cli_map=None
-):
-    """Build kubectl logs command with dynamic pod name resolution and file-based capture."""
-    match = re.search(r"\{([^}]+)\}", command)
-    if not match:
-        # If no placeholder, generate file-based capture command directly
-        return _generate_logs_capture_command(
-            command, namespace, connector, host
+def _is_slf_deployment(connector):
+    """Return True when nf_name in the config names an SLF deployment."""
+    snapshot = get_config_snapshot()
+    if snapshot is not None:
+        nf_name = snapshot.nf_name
+    else:
+        config_file = (
+            getattr(connector, "config_file", "config/hosts.json")
+            if connector
+            else "config/hosts.json"
         )
+        with open(config_file, "r") as f:
+            config = json.load(f)
+        nf_name = config.get("nf_name", "")
+    return "SLF" in nf_name.upper()
 
-    to_search_pod_name = match.group(1)
 
-    # Check if we're in mock mode - if so, skip pod name resolution
-    if (
-        hasattr(connector, "execution_mode")
-        and connector.execution_mode == "mock"
-    ):
-        logger.debug(
-            f"Mock mode: skipping pod name resolution for '{to_search_pod_name}'"
-        )
-        # In mock mode, generate a mock pod name and return single command
-        mock_pod_name = f"{to_search_pod_name}-mock123-abc456"
-        mock_command = command.replace(
-            f"{{{to_search_pod_name}}}", mock_pod_name
+def _find_pods_in_inventory(
+    to_search_pod_name, namespace, connector, host, cli_type
+):
+    """
+    Look up pods by name substring in the pod inventory.
+
+    For SLF deployments, provgw pods are dropped using the cached
+    app.kubernetes.io/instance label. Returns None when the inventory is
+    disabled or the namespace could not be listed.
+    """
+    inventory = get_pod_inventory()
+    if inventory is None:
+        return None
+    try:
+        exclude_labels = (
+            {"app.kubernetes.io/instance": "provgw"}
+            if _is_slf_deployment(connector)
+            else None
         )
-        logger.debug(f"Mock mode: using mock pod name '{mock_pod_name}'")
-        return [
-            _generate_logs_capture_command(
-                mock_command, namespace, connector, host
-            )
-        ]
+    except Exception as e:
+        logger.debug(f"Could not load config for provgw filtering: {e}")
+        exclude_labels = None
+    pods = inventory.find(
+        host,
+        namespace,
+        to_search_pod_name,
+        connector,
+        cli_type,
+        exclude_labels=exclude_labels,
+    )
+    if pods is None:
+        return None
+    return [pod.name for pod in pods]
 
-    # Get CLI type (kubectl or oc) from host_cli_map
-    cli_type = "kubectl"
-    if host_cli_map and host in host_cli_map:
-        cli_type = host_cli_map[host]
 
+def _find_pods_with_cli(
+    to_search_pod_name, namespace, connector, host, cli_type
+):
+    """Look up pods with get pods | grep, filtering provgw pods per pod."""
     # Build the CLI get pods command (without awk)
     if namespace:
         find_pod = (
@@ -482,20 +1040,9 @@ def build_kubectl_logs_command(
         ]
 
     # Filter out provgw pods using app.kubernetes.io/instance label when NF is SLF
-    # Load config to check if this is an SLF deployment
-    config_file = (
-        getattr(connector, "config_file", "config/hosts.json")
-        if connector
-        else "config/hosts.json"
-    )
-
     try:
-        with open(config_file, "r") as f:
-            config = json.load(f)
-        nf_name = config.get("nf_name", "")
-
         # If this is SLF deployment, filter out provgw pods using label-based filtering
-        if "SLF" in nf_name.upper():
+        if _is_slf_deployment(connector):
             original_count = len(pod_names)
             filtered_pods = []
 
@@ -552,39 +1099,115 @@ def build_kubectl_logs_command(
     except Exception as e:
         logger.debug(f"Could not load config for provgw filtering: {e}")
 
-    if not pod_names:
-        logger.error(
-            f"No pod found matching '{to_search_pod_name}' on host {host}"
-        )
-        return None
+    return pod_names
 
-    # Generate file-based capture commands for each pod
-    commands = []
-    for pod_name in pod_names:
-        resolved_command = command.replace(
-            f"{{{to_search_pod_name}}}", pod_name
-        )
-        capture_command = _generate_logs_capture_command(
-            resolved_command, namespace, connector, host
+
+def build_kubectl_logs_command(
+    command, namespace, connector, host, host_cli_map=None
+):
+    """Build kubectl logs command with dynamic pod name resolution and file-based capture."""
+    match = re.search(r"\{([^}]+)\}", command)
+    if not match:
+        # If no placeholder, generate file-based capture command directly
+        return _generate_logs_capture_command(
+            command, namespace, connector, host
         )
-        commands.append(capture_command)
 
-    return commands
+    to_search_pod_name = match.group(1)
 
+    # Check if we're in mock mode - if so, skip pod name resolution
+    if (
+        hasattr(connector, "execution_mode")
+        and connector.execution_mode == "mock"
+    ):
+        logger.debug(
+            f"Mock mode: skipping pod name resolution for '{to_search_pod_name}'"
+        )
+        # In mock mode, generate a mock pod name and return single command
+        mock_pod_name = f"{to_search_pod_name}-mock123-abc456"
+        mock_command = command.replace(
+            f"{{{to_search_pod_name}}}", mock_pod_name
+        )
+        logger.debug(f"Mock mode: using mock pod name '{mock_pod_name}'")
+        return [
+            _generate_logs_capture_command(
+                mock_command, namespace, connector, host
+            )
+        ]
 
-def _generate_logs_capture_command(base_command, namespace, connector, host):
-    """Generate kubectl logs command with real-time capture using configurable --since duration."""
-    # Load kubectl_logs_settings from config
+    # Get CLI type (kubectl or oc) from host_cli_map
+    cli_type = "kubectl"
+    if host_cli_map and host in host_cli_map:
+        cli_type = host_cli_map[host]
+
+    # Served from the pod inventory when the namespace could be listed;
+    # otherwise fall back to get pods | grep and per-pod label lookups
+    pod_names = _find_pods_in_inventory(
+        to_search_pod_name, namespace, connector, host, cli_type
+    )
+    if pod_names is None:
+        pod_names = _find_pods_with_cli(
+            to_search_pod_name, namespace, connector, host, cli_type
+        )
+
+    if not pod_names:
+        logger.error(
+            f"No pod found matching '{to_search_pod_name}' on host {host}"
+        )
+        return None
+
+    # Generate file-based capture commands for each pod
+    commands = []
+    for pod_name in pod_names:
+        resolved_command = command.replace(
+            f"{{{to_search_pod_name}}}", pod_name
+        )
+        capture_command = _generate_logs_capture_command(
+            resolved_command, namespace, connector, host
+        )
+        commands.append(capture_command)
+
+    return commands
+
+
+# `<follow command> & sleep N; kill $!` as produced below
+_LOGS_CAPTURE_RE = re.compile(
+    r"^(?P<follow>.+?) & sleep (?P<seconds>\d+); kill \$!$"
+)
+
+
+def _get_kubectl_logs_settings(connector):
+    """Return the kubectl_logs_settings section of the config."""
+    snapshot = get_config_snapshot()
+    if snapshot is not None:
+        return snapshot.kubectl_logs_settings
     config_file = (
         getattr(connector, "config_file", "config/hosts.json")
         if connector
         else "config/hosts.json"
     )
+    with open(config_file, "r") as f:
+        config = json.load(f)
+    return config.get("kubectl_logs_settings", {})
 
+
+def _split_logs_capture_command(command):
+    """
+    Split a capture command into (follow_command, capture_duration).
+
+    Returns None for commands not produced by _generate_logs_capture_command.
+    """
+    match = _LOGS_CAPTURE_RE.match(command.strip())
+    if not match:
+        return None
+    return match.group("follow"), int(match.group("seconds"))
+
+
+def _generate_logs_capture_command(base_command, namespace, connector, host):
+    """Generate kubectl logs command with real-time capture using configurable --since duration."""
+    # Load kubectl_logs_settings from config
     try:
-        with open(config_file, "r") as f:
-            config = json.load(f)
-        kubectl_settings = config.get("kubectl_logs_settings", {})
+        kubectl_settings = _get_kubectl_logs_settings(connector)
         capture_duration = kubectl_settings.get("capture_duration", 30)
         since_duration = kubectl_settings.get("since_duration", "1s")
     except Exception as e:
@@ -654,6 +1277,7 @@ def build_command_for_step(
 
     # Check for pod_mode in config/hosts.json
     pod_mode = False
+    snapshot = get_config_snapshot()
     # Look for config in project root first, then fallback to package directory
     config_paths = [
         os.path.join(
@@ -669,16 +1293,20 @@ def build_command_for_step(
     ]
 
     config_found = False
-    for config_path in config_paths:
-        try:
-            if os.path.exists(config_path):
-                with open(config_path, "r") as f:
-                    config = json.load(f)
-                    pod_mode = config.get("pod_mode", False)
-                    config_found = True
-                    break
-        except Exception as e:
-            continue
+    if snapshot is not None:
+        pod_mode = snapshot.pod_mode
+        config_found = True
+    else:
+        for config_path in config_paths:
+            try:
+                if os.path.exists(config_path):
+                    with open(config_path, "r") as f:
+                        config = json.load(f)
+                        pod_mode = config.get("pod_mode", False)
+                        config_found = True
+                        break
+            except Exception as e:
+                continue
 
     if not config_found:
         logger.warning(
@@ -736,6 +1364,7 @@ def build_command_for_step(
             host_cli_map,
             host,
             test_context=test_context,
+            connector=connector,
         )  # host_cli_map passed
     elif command and (
         command.startswith("kubectl") or command.startswith("oc")
@@ -750,8 +1379,14 @@ def build_command_for_step(
         return None
 
 
-def execute_command(command, host, connector):
-    """Execute a command and return output, error, and duration. Handles file-based kubectl logs."""
+def execute_command(command, host, connector, step_data=None):
+    """
+    Execute a command and return output, error, and duration. Handles file-based kubectl logs.
+
+    When SSH output went past ssh_settings.output_max_bytes and was cut,
+    step_data (if given) gets output_truncated set so the step's failure
+    says so.
+    """
     if not command:
         return "", "Command build failed", 0.0
 
@@ -778,6 +1413,8 @@ def execute_command(command, host, connector):
         res = result.get(host, {"output": "", "error": ""})
         output = res["output"]
         error = res["error"]
+        if res.get("truncated") and step_data is not None:
+            step_data["output_truncated"] = True
     else:
         result = subprocess.run(
             command, shell=True, capture_output=True, text=True
@@ -788,9 +1425,10 @@ def execute_command(command, host, connector):
     duration = time.time() - start_time
 
     logger.debug(f"Command executed in {duration:.2f} seconds on [{host}]")
-    logger.debug(f"Output: {output}")
-    if error:
-        logger.debug(f"Error: {error}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Output: {output}")
+        if error:
+            logger.debug(f"Error: {error}")
     return output, error, duration
 
 
@@ -877,13 +1515,20 @@ def validate_and_create_result(
         response_payload = _load_response_payload_file(
             response_payload.strip()
         )
+    # Decoded once for all validators and the exporters
+    response_payload = ParsedResponse.wrap(response_payload)
 
     # Use actual_status and response_body from parsed_output
     actual_status = parsed_output.get("http_status") or parsed_output.get(
         "status_code"
     )
-    response_body = parsed_output.get("raw_output")
     response_headers = parsed_output.get("headers")
+    response_body = ParsedResponse.wrap(
+        parsed_output.get("raw_output"), response_headers
+    )
+    if response_body is not None and output == response_body:
+        # Let the exporters reuse the decoded body
+        output = response_body
 
     # Build ValidationContext
     context = ValidationContext(
@@ -900,11 +1545,20 @@ def validate_and_create_result(
         args=args,  # Pass args here
         sheet_name=flow.sheet,  # Pass sheet name for enhanced pattern matching
         row_idx=step.row_idx,  # Pass row index for enhanced pattern matching
+        diff_details=_diff_details_enabled(),
+    )
+
+    # Dispatch validation with the strategy planned when the step was parsed
+    result = _DISPATCHER.dispatch(
+        context, getattr(step, "validation_plan", None)
     )
 
-    # Dispatch validation
-    dispatcher = ValidationDispatcher()
-    result = dispatcher.dispatch(context)
+    fail_reason = result.fail_reason
+    if not result.passed and step_data.get("output_truncated"):
+        fail_reason = (
+            f"{fail_reason or 'Validation failed'} (command output exceeded "
+            "ssh_settings.output_max_bytes and was truncated)"
+        )
 
     test_result = TestResult(
         sheet=flow.sheet,
@@ -918,11 +1572,14 @@ def validate_and_create_result(
         pattern_match=(
             str(pattern_match) if pattern_match is not None else None
         ),
+        # LazyDetails stay unbuilt until an exporter reads them
         pattern_found=(
-            result.details.get("pattern_found") if result.details else None
+            result.details.get("pattern_found")
+            if isinstance(result.details, dict)
+            else None
         ),
         passed=result.passed,
-        fail_reason=result.fail_reason,
+        fail_reason=fail_reason,
         test_name=flow.test_name,
         duration=duration,
         method=method,
@@ -969,209 +1626,869 @@ def log_test_result(
         )
 
 
-def process_single_step(
+def _is_wait_command(command) -> bool:
+    return command.strip().lower().startswith("wait")
+
+
+def _sends_request(step_data) -> bool:
+    """False for kubectl/oc logs rows and wait() rows, True otherwise."""
+    command = str(step_data.get("command") or "").strip()
+    parts = command.split()
+    if parts and parts[0] in ("kubectl", "oc") and "logs" in parts:
+        return False
+    return not _is_wait_command(command)
+
+
+def _parse_wait_seconds(command) -> int:
+    """Return N for a wait(N) row, 0 if no duration is given."""
+    match = re.search(r"wait\((\d+)\)", command, re.IGNORECASE)
+    return int(match.group(1)) if match else 0
+
+
+def _rate_limit_scope(step, flow, step_data):
+    """Sheet, URL template, row and row rate a step's request counts against."""
+    return {
+        "sheet": getattr(flow, "sheet", None),
+        "url": getattr(step, "url", None),
+        "row": getattr(step, "row_idx", None),
+        "row_rate": step_data.get("row_rate"),
+    }
+
+
+def _collect_kubectl_logs(
+    kubectl_commands,
+    host,
+    connector,
     step,
     flow,
-    target_hosts,
+    step_data,
+    namespace,
+    args=None,
+    show_table=False,
+):
+    """Capture a step's kubectl/oc logs with the configured collector."""
+    _set_mock_context(connector, flow, step)
+    collector = _resolve_log_collector(args, connector)
+    if collector == "tail":
+        return execute_kubectl_logs_tailing(
+            kubectl_commands,
+            host,
+            connector,
+            step,
+            flow,
+            _build_log_line_matcher(step, flow, step_data, args),
+            namespace,
+            show_table,
+        )
+    if collector == "stream":
+        return execute_kubectl_logs_streaming(
+            kubectl_commands,
+            host,
+            connector,
+            step,
+            flow,
+            _build_log_line_matcher(step, flow, step_data, args),
+            show_table,
+        )
+    return execute_kubectl_logs_parallel(
+        kubectl_commands, host, connector, step, flow, show_table, step_data
+    )
+
+
+def _run_host_command(
+    command,
+    host,
+    connector,
+    step_data,
+    namespace,
+    host_cli_map,
+    args=None,
+    flow=None,
+    step=None,
+):
+    """
+    Run one built command on a host, re-resolving a vanished exec pod once.
+
+    Returns (command, output, error, duration, exchange); command is the one
+    that produced the output.
+    """
+    _set_mock_context(connector, flow, step)
+    output, error, cmd_duration, exchange = _run_step_command(
+        command, host, connector, args, step_data
+    )
+    retry_command = _reresolve_exec_command(
+        command,
+        output,
+        error,
+        step_data,
+        namespace,
+        connector,
+        host,
+        host_cli_map,
+    )
+    if retry_command:
+        command = retry_command
+        output, error, cmd_duration, exchange = _run_step_command(
+            command, host, connector, args, step_data
+        )
+    return command, output, error, cmd_duration, exchange
+
+
+async def execute_step_on_host_async(
+    step,
+    flow,
+    step_data,
+    host,
     svc_maps,
     placeholder_pattern,
     connector,
     host_cli_map,
-    test_results,
     show_table,
-    dashboard,
     args=None,
-    step_delay=1,
     rate_limiter=None,
+    runtime=SYNC_RUNTIME,
 ):
-    step_data = extract_step_data(step)
-    if step_data["command"] is None or pd.isna(step_data["command"]):
-        return
-
-    step_data["save_key"] = step.other_fields.get("Save_As")
-    manage_workflow_context(flow, step_data)
+    """
+    Build, execute and validate one step on a single host.
 
-    # Parse rate limit from Excel column if available
-    excel_rate_limit = None
-    if rate_limiter is not None:
-        excel_rate_limit = parse_excel_rate_limit(step.other_fields)
-        if excel_rate_limit is not None:
-            rate_limiter.set_rate(excel_rate_limit)
-            logger.debug(f"Using Excel rate limit: {excel_rate_limit} reqs/sec for row {step.row_idx}")
+    Namespace and pod lookups, command execution, log capture and validation
+    go through runtime.call(); wait(N) rows and rate limit delays through
+    runtime.sleep(). Returns the TestResult for the host, or None when the
+    step is a wait() row that produces no result.
+    """
     parsed_output = {}
     output = None
     error = None
     pod_names = []
+    # Hosts visited one after another share step_data; only this host's
+    # commands may flag its output as truncated
+    step_data.pop("output_truncated", None)
+
+    svc_map = svc_maps.get(host, {})
+    namespace = await runtime.call(resolve_namespace, connector, host)
+
+    if not show_table:
+        logger.info(f"[CALLFLOW] Host: {host}")
+        color_cyan = "\033[96m"
+        reset_code = "\033[0m"
+        logger.info(
+            f"{color_cyan}[CALLFLOW] Step: {getattr(step, 'step_name', 'N/A')} (Flow: {getattr(flow, 'test_name', 'N/A')}){reset_code}"
+        )
+        logger.info(
+            f"[CALLFLOW] Substituting placeholders in command: {step_data['command']}"
+        )
 
-    for host in target_hosts:
-        svc_map = svc_maps.get(host, {})
-        namespace = resolve_namespace(connector, host)
-
-        # Set sheet and test context for mock execution
-        if (
-            hasattr(connector, "execution_mode")
-            and connector.execution_mode == "mock"
-        ):
-            connector._current_sheet = getattr(flow, "sheet", None)
-            connector._current_test = getattr(flow, "test_name", None)
-            connector._current_row_idx = getattr(step, "row_idx", None)
+    # check if command is wait() if so it introduces a delay mentioned in wait(30)
+    # sleep for mentioned time in wait() and continue to next step
+    if _is_wait_command(step_data["command"]):
+        await runtime.sleep(_parse_wait_seconds(step_data["command"]))
+        return None
+
+    commands = await runtime.call(
+        build_command_for_step,
+        step_data,
+        svc_map,
+        placeholder_pattern,
+        namespace,
+        host_cli_map,
+        host,
+        connector,
+        flow=flow,
+        step=step,
+    )
+
+    if isinstance(commands, str):
+        commands = [commands]
+    elif commands is None:
+        commands = []
+
+    accumulated_raw_output = ""
+    duration = 0.0  # Initialize duration in case no commands are executed
+    command = None  # Initialize command variable
+
+    # Separate kubectl logs commands from other commands
+    kubectl_commands = []
+    other_commands = []
+
+    # Filter out empty commands and separate by type
+    for cmd in commands:
+        if not cmd:
+            if not show_table:
+                logger.warning(
+                    f"[CALLFLOW] Command could not be built for host {host}, step {getattr(step, 'step_name', 'N/A')}. Skipping."
+                )
+            continue
+
+        if cmd.startswith("kubectl logs") or cmd.startswith("oc logs"):
+            kubectl_commands.append(cmd)
+        else:
+            other_commands.append(cmd)
+
+    # Execute kubectl logs commands in parallel if any exist
+    if kubectl_commands:
         if not show_table:
-            logger.info(f"[CALLFLOW] Host: {host}")
-            color_cyan = "\033[96m"
-            reset_code = "\033[0m"
             logger.info(
-                f"{color_cyan}[CALLFLOW] Step: {getattr(step, 'step_name', 'N/A')} (Flow: {getattr(flow, 'test_name', 'N/A')}){reset_code}"
+                f"[CALLFLOW] Executing {len(kubectl_commands)} kubectl logs commands in parallel on host {host}..."
             )
-            logger.info(
-                f"[CALLFLOW] Substituting placeholders in command: {step_data['command']}"
+            logger.info(f"[CALLFLOW] Service map for host {host}: {svc_map}")
+
+        kubectl_raw_output, kubectl_pod_names, kubectl_duration = (
+            await runtime.call(
+                _collect_kubectl_logs,
+                kubectl_commands,
+                host,
+                connector,
+                step,
+                flow,
+                step_data,
+                namespace,
+                args,
+                show_table,
             )
+        )
+        accumulated_raw_output += kubectl_raw_output
+        pod_names.extend(kubectl_pod_names)
+        duration = max(duration, kubectl_duration)
+        step_data["is_kubectl"] = True
 
-        # check if command is wait() if so it introduces a delay mentioned in wait(30)
-        # sleep for mentioned time in wait() and continue to next step
-        if step_data["command"].strip().lower().startswith("wait"):
-            wait_str = step_data["command"]
-            match = re.search(r"wait\((\d+)\)", wait_str, re.IGNORECASE)
-            if match:
-                number = match.group(1)
-                time.sleep(int(number))
-            continue
+    # Execute other commands sequentially (preserve existing behavior)
+    for command in other_commands:
+        if not show_table:
+            logger.info(f"[CALLFLOW] Built command: {command}")
+            logger.info(f"[CALLFLOW] Service map for host {host}: {svc_map}")
+            logger.info(f"[CALLFLOW] Executing command on host {host}...")
+
+        # Apply rate limiting before command execution
+        if rate_limiter is not None:
+            await runtime.throttle(
+                rate_limiter, host, **_rate_limit_scope(step, flow, step_data)
+            )
 
-        commands = build_command_for_step(
+        command, output, error, cmd_duration, exchange = await runtime.call(
+            _run_host_command,
+            command,
+            host,
+            connector,
             step_data,
-            svc_map,
-            placeholder_pattern,
             namespace,
             host_cli_map,
+            args,
+            flow,
+            step,
+        )
+        if exchange is not None:
+            parsed_output = exchange.to_parsed_output()
+        else:
+            parsed_output = parse_curl_output(output, error)
+        duration = max(duration, cmd_duration)
+
+        # Get the raw_output and append to accumulated string; a single
+        # response keeps the parser's ParsedResponse
+        raw_output = parsed_output.get("raw_output", "")
+        if accumulated_raw_output:
+            accumulated_raw_output += raw_output
+        else:
+            accumulated_raw_output = raw_output
+
+        # For non-kubectl commands, append None to pod_names to maintain consistency
+        pod_names.append(None)
+
+        if not show_table:
+            logger.debug(
+                f"[CALLFLOW] Command executed in {cmd_duration:.2f} seconds"
+            )
+            logger.info(f"[CALLFLOW] Output from server: {output}")
+            if error:
+                logger.info(f"[CALLFLOW] HTTP Output from server: {error}")
+
+            # Add pattern match string to CALLFLOW output
+            pattern = step.pattern_match
+            if pattern:
+                logger.info(f"[CALLFLOW] Pattern to match: {pattern}")
+
+    # update parsed_output with accumulated raw output
+    parsed_output["raw_output"] = ParsedResponse.wrap(
+        copy.copy(accumulated_raw_output), parsed_output.get("headers")
+    )
+
+    # Validate this pod's logs
+    return await runtime.call(
+        validate_and_create_result,
+        step,
+        flow,
+        step_data,
+        parsed_output,
+        output,
+        error,
+        duration,
+        host,
+        command,
+        args,
+    )
+
+
+def _execute_step_on_host(
+    step,
+    flow,
+    step_data,
+    host,
+    svc_maps,
+    placeholder_pattern,
+    connector,
+    host_cli_map,
+    show_table,
+    args=None,
+    rate_limiter=None,
+):
+    """
+    Build, execute and validate one step on a single host, blocking.
+
+    Returns the TestResult for the host, or None when the step is a wait()
+    row that produces no result.
+    """
+    return run_blocking(
+        execute_step_on_host_async(
+            step,
+            flow,
+            step_data,
             host,
+            svc_maps,
+            placeholder_pattern,
             connector,
-            flow=flow,
-            step=step,
+            host_cli_map,
+            show_table,
+            args,
+            rate_limiter,
         )
+    )
 
-        if isinstance(commands, str):
-            commands = [commands]
-        elif commands is None:
-            commands = []
 
-        accumulated_raw_output = ""
-        duration = 0.0  # Initialize duration in case no commands are executed
-        command = None  # Initialize command variable
+def _timed_out_result(step, flow, step_data, host, timeout):
+    """Failed TestResult for a step cancelled by the async step timeout."""
+    return TestResult(
+        sheet=flow.sheet,
+        row_idx=step.row_idx,
+        host=host,
+        command=step_data.get("command"),
+        output="",
+        error=f"Step cancelled after {timeout}s",
+        expected_status=step_data.get("expected_status"),
+        actual_status=None,
+        pattern_match=(
+            str(step_data["pattern_match"])
+            if step_data.get("pattern_match") is not None
+            else None
+        ),
+        pattern_found=None,
+        passed=False,
+        fail_reason=f"Step timed out after {timeout}s",
+        test_name=flow.test_name,
+        duration=float(timeout),
+        method=step_data.get("method") or "GET",
+    )
 
-        # Separate kubectl logs commands from other commands
-        kubectl_commands = []
-        other_commands = []
 
-        # Filter out empty commands and separate by type
-        for cmd in commands:
-            if not cmd:
-                if not show_table:
-                    logger.warning(
-                        f"[CALLFLOW] Command could not be built for host {host}, step {getattr(step, 'step_name', 'N/A')}. Skipping."
-                    )
-                continue
+async def _step_on_host(runtime, step, flow, step_data, host, *args):
+    """
+    One host's part of a step under runtime.
 
-            if cmd.startswith("kubectl logs") or cmd.startswith("oc logs"):
-                kubectl_commands.append(cmd)
-            else:
-                other_commands.append(cmd)
+    The blocking runtime goes through _execute_step_on_host(); the async
+    runtime awaits the coroutine, cancelled after runtime.step_timeout.
+    Cancelling stops waiting for a blocking call already handed to a
+    thread, the call itself ends at its own (SSH or HTTP) timeout.
+    """
+    if not runtime.offloads:
+        return _execute_step_on_host(step, flow, step_data, host, *args)
+    coro = execute_step_on_host_async(
+        step, flow, step_data, host, *args, runtime=runtime
+    )
+    timeout = runtime.step_timeout
+    if not timeout or _is_wait_command(step_data["command"]):
+        return await coro
+    try:
+        return await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError:
+        logger.error(
+            f"[{flow.sheet}][row {step.row_idx}][{host}] Step timed out "
+            f"after {timeout}s"
+        )
+        return _timed_out_result(step, flow, step_data, host, timeout)
 
-        # Execute kubectl logs commands in parallel if any exist
-        if kubectl_commands:
-            if not show_table:
-                logger.info(
-                    f"[CALLFLOW] Executing {len(kubectl_commands)} kubectl logs commands in parallel on host {host}..."
-                )
-                logger.info(
-                    f"[CALLFLOW] Service map for host {host}: {svc_map}"
-                )
 
-            kubectl_raw_output, kubectl_pod_names, kubectl_duration = (
-                execute_kubectl_logs_parallel(
-                    kubectl_commands, host, connector, step, flow, show_table
-                )
+def _record_step_result(
+    final_result, step, flow, step_data, test_results, show_table, dashboard
+):
+    """Publish a host result to the results list, dashboard and logs."""
+    test_results.append(final_result)
+    step.result = final_result
+    if not show_table:
+        status_str = "PASS" if final_result.passed else "FAIL"
+        color_code = "\033[92m" if final_result.passed else "\033[91m"
+        reset_code = "\033[0m"
+        logger.info(
+            f"[CALLFLOW] Result: {color_code}{status_str}{reset_code} | Expected: {step_data.get('expected_status', 'N/A')} | Actual: {getattr(final_result, 'actual_status', 'N/A')}"
+        )
+    if show_table and dashboard is not None:
+        dashboard.add_result(final_result)
+    log_test_result(final_result, flow, step)
+
+
+async def process_single_step_async(
+    step,
+    flow,
+    target_hosts,
+    svc_maps,
+    placeholder_pattern,
+    connector,
+    host_cli_map,
+    test_results,
+    show_table,
+    dashboard,
+    args=None,
+    step_delay=1,
+    rate_limiter=None,
+    host_fanout=False,
+    pacer=None,
+    runtime=SYNC_RUNTIME,
+):
+    """
+    Run one step on every target host and record the results.
+
+    When a StepPacer is given, the step only waits if one of its
+    dependencies needs time to settle; otherwise the legacy fixed
+    step_delay sleep runs after each host (unless a rate limiter is set).
+    Waits and blocking calls go through runtime (see async_runner).
+    """
+    step_data = extract_step_data(step)
+    if step_data["command"] is None or pd.isna(step_data["command"]):
+        return
+
+    step_data["save_key"] = step.other_fields.get("Save_As")
+    manage_workflow_context(flow, step_data)
+
+    # Parse rate limit from Excel column if available; it paces this row only
+    if rate_limiter is not None:
+        excel_rate_limit = parse_excel_rate_limit(step.other_fields)
+        if excel_rate_limit is not None:
+            step_data["row_rate"] = excel_rate_limit
+            logger.debug(
+                f"Using Excel rate limit: {excel_rate_limit} reqs/sec for row {step.row_idx}"
             )
-            accumulated_raw_output += kubectl_raw_output
-            pod_names.extend(kubectl_pod_names)
-            duration = max(duration, kubectl_duration)
-            step_data["is_kubectl"] = True
 
-        # Execute other commands sequentially (preserve existing behavior)
-        for command in other_commands:
-            if not show_table:
-                logger.info(f"[CALLFLOW] Built command: {command}")
-                logger.info(
-                    f"[CALLFLOW] Service map for host {host}: {svc_map}"
-                )
-                logger.info(f"[CALLFLOW] Executing command on host {host}...")
+    if pacer is not None:
+        if _is_wait_command(step_data["command"]):
+            # One wait per step, no matter how many hosts
+            await runtime.pace_wait(
+                pacer, flow, _parse_wait_seconds(step_data["command"])
+            )
+            return
+        await runtime.pace_before(pacer, flow, step_data)
+
+    if _sends_request(step_data):
+        # Log checks later in the flow look at lines from this point on
+        flow.last_request_started_at = time.time()
+
+    host_args = (
+        svc_maps,
+        placeholder_pattern,
+        connector,
+        host_cli_map,
+        show_table,
+        args,
+        rate_limiter,
+    )
 
-            # Apply rate limiting before command execution
-            if rate_limiter is not None:
-                delay = rate_limiter.acquire(host)
-                if delay > 0:
-                    logger.debug(f"Rate limiting: waiting {delay:.2f}s for host {host}")
-                    time.sleep(delay)
+    if host_fanout and len(target_hosts) > 1:
+        # Fan-out mode: every host builds, executes and validates at the
+        # same time; results are still recorded in target_hosts order.
+        host_results = await runtime.map_concurrently(
+            lambda host: _step_on_host(
+                runtime,
+                step,
+                flow,
+                dict(step_data),  # builders mutate step_data per host
+                host,
+                *host_args,
+            ),
+            list(target_hosts),
+        )
 
-            output, error, cmd_duration = execute_command(
-                command, host, connector
+        for final_result in host_results:
+            if final_result is None:
+                continue
+            _record_step_result(
+                final_result,
+                step,
+                flow,
+                step_data,
+                test_results,
+                show_table,
+                dashboard,
             )
-            parsed_output = parse_curl_output(output, error)
-            duration = max(duration, cmd_duration)
+        if pacer is not None:
+            pacer.after_step(flow, step_data)
+        elif rate_limiter is None and any(r is not None for r in host_results):
+            # Hosts ran side by side, so one step_delay covers all of them
+            await runtime.sleep(step_delay)
+        return
 
-            # Get the raw_output and append to accumulated string
-            raw_output = parsed_output.get("raw_output", "")
-            accumulated_raw_output += raw_output
+    for host in target_hosts:
+        final_result = await _step_on_host(
+            runtime, step, flow, step_data, host, *host_args
+        )
+        if final_result is None:
+            continue
+        _record_step_result(
+            final_result,
+            step,
+            flow,
+            step_data,
+            test_results,
+            show_table,
+            dashboard,
+        )
 
-            # For non-kubectl commands, append None to pod_names to maintain consistency
-            pod_names.append(None)
+        # Apply delay - either from rate limiter or fallback to step_delay
+        if pacer is not None:
+            pass  # Dependencies are paced before the step runs
+        elif rate_limiter is not None:
+            # Rate limiter handles timing, but we might still need a minimum delay
+            # Only sleep step_delay if no rate limiting was applied
+            pass  # Rate limiting already handled above in acquire()
+        else:
+            # Fallback to original step_delay behavior when rate limiting is disabled
+            await runtime.sleep(step_delay)
 
-            if not show_table:
-                logger.debug(
-                    f"[CALLFLOW] Command executed in {cmd_duration:.2f} seconds"
-                )
-                logger.info(f"[CALLFLOW] Output from server: {output}")
-                if error:
-                    logger.info(f"[CALLFLOW] HTTP Output from server: {error}")
+    if pacer is not None:
+        pacer.after_step(flow, step_data)
 
-                # Add pattern match string to CALLFLOW output
-                pattern = step.pattern_match
-                if pattern:
-                    logger.info(f"[CALLFLOW] Pattern to match: {pattern}")
 
-        # update parsed_output with accumulated raw output
-        parsed_output["raw_output"] = copy.copy(accumulated_raw_output)
+def process_single_step(
+    step,
+    flow,
+    target_hosts,
+    svc_maps,
+    placeholder_pattern,
+    connector,
+    host_cli_map,
+    test_results,
+    show_table,
+    dashboard,
+    args=None,
+    step_delay=1,
+    rate_limiter=None,
+    host_fanout=False,
+    pacer=None,
+):
+    """
+    Run one step on every target host and record the results, blocking.
 
-        # Validate this pod's logs
-        final_result = validate_and_create_result(
+    Thin wrapper over process_single_step_async() with the blocking
+    runtime; see there for pacing and delays.
+    """
+    run_blocking(
+        process_single_step_async(
             step,
             flow,
-            step_data,
-            parsed_output,
+            target_hosts,
+            svc_maps,
+            placeholder_pattern,
+            connector,
+            host_cli_map,
+            test_results,
+            show_table,
+            dashboard,
+            args=args,
+            step_delay=step_delay,
+            rate_limiter=rate_limiter,
+            host_fanout=host_fanout,
+            pacer=pacer,
+        )
+    )
+
+
+def _is_batchable_step(step) -> bool:
+    """
+    True for rows that may share a remote batch with their neighbours:
+    plain GET requests without Compare_With or a per-row rate limit, which
+    neither wait on an earlier row nor need pacing of their own.
+    """
+    step_data = extract_step_data(step)
+    command = step_data["command"]
+    if command is None or pd.isna(command) or not step_data["url"]:
+        return False
+    if str(step_data["method"]).upper() != "GET":
+        return False
+    if not _sends_request(step_data):
+        return False
+    if _cell(step_data["compare_with_key"]) is not None:
+        return False
+    return parse_excel_rate_limit(step.other_fields) is None
+
+
+def plan_step_batches(steps, batch_size):
+    """
+    Group a flow's steps for execution.
+
+    Runs of consecutive batchable steps are split into lists of at most
+    batch_size steps; every other step is a list of its own.
+    """
+    groups = []
+    current = []
+    for step in steps:
+        if batch_size and batch_size > 1 and _is_batchable_step(step):
+            current.append(step)
+            if len(current) == batch_size:
+                groups.append(current)
+                current = []
+            continue
+        if current:
+            groups.append(current)
+            current = []
+        groups.append([step])
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _batching_available(connector, args=None) -> bool:
+    """Batches need SSH execution with the curl backend."""
+    if connector is None or not getattr(connector, "use_ssh", False):
+        return False
+    if getattr(connector, "execution_mode", None) == "mock":
+        return False
+    return _resolve_http_backend(args, connector) == "curl"
+
+
+def _execute_batch_on_host(
+    steps,
+    flow,
+    step_datas,
+    host,
+    svc_maps,
+    placeholder_pattern,
+    connector,
+    host_cli_map,
+    show_table,
+    args=None,
+    rate_limiter=None,
+):
+    """
+    Build the commands of steps for host, run them in one remote batch and
+    validate each output. Returns one TestResult per step.
+    """
+    svc_map = svc_maps.get(host, {})
+    namespace = resolve_namespace(connector, host)
+
+    commands = []
+    for step, step_data in zip(steps, step_datas):
+        built = build_command_for_step(
+            dict(step_data),
+            svc_map,
+            placeholder_pattern,
+            namespace,
+            host_cli_map,
+            host,
+            connector,
+            flow=flow,
+            step=step,
+        )
+        if isinstance(built, list):
+            built = [cmd for cmd in built if cmd]
+            built = built[0] if len(built) == 1 else None
+        if not built:
+            # Not a single command: fall back to one exec per step
+            return [
+                _execute_step_on_host(
+                    step,
+                    flow,
+                    dict(step_data),
+                    host,
+                    svc_maps,
+                    placeholder_pattern,
+                    connector,
+                    host_cli_map,
+                    show_table,
+                    args,
+                    rate_limiter,
+                )
+                for step, step_data in zip(steps, step_datas)
+            ]
+        commands.append(built)
+
+    delays = None
+    if rate_limiter is not None:
+        # One slot per command; the script waits out the gaps on the host
+        # so the commands do not go out back to back
+        slots = [
+            rate_limiter.reserve(
+                host, **_rate_limit_scope(step, flow, step_data)
+            )
+            for step, step_data in zip(steps, step_datas)
+        ]
+        if slots[0] > 0:
+            time.sleep(slots[0])
+        delays = [0.0] + [
+            max(0.0, later - earlier)
+            for earlier, later in zip(slots, slots[1:])
+        ]
+
+    if not show_table:
+        logger.info(
+            f"[CALLFLOW] Executing {len(commands)} steps as one batch on host {host}..."
+        )
+    items = run_batch(commands, host, connector, delays=delays)
+
+    results = []
+    for step, step_data, command, item in zip(
+        steps, step_datas, commands, items
+    ):
+        output, error, duration = item.output, item.error, item.duration
+        if not item.complete:
+            # The batch was cut short before this command finished
+            output, error, duration, _ = _run_step_command(
+                command, host, connector, args
+            )
+        retry_command = _reresolve_exec_command(
+            command,
             output,
             error,
-            duration,
+            step_data,
+            namespace,
+            connector,
             host,
-            command,
+            host_cli_map,
+        )
+        if retry_command:
+            command = retry_command
+            output, error, duration, _ = _run_step_command(
+                command, host, connector, args
+            )
+        parsed_output = parse_curl_output(output, error)
+        parsed_output["raw_output"] = ParsedResponse.wrap(
+            parsed_output.get("raw_output", ""), parsed_output.get("headers")
+        )
+        if not show_table:
+            logger.info(f"[CALLFLOW] Built command: {command}")
+            logger.info(f"[CALLFLOW] Output from server: {output}")
+            if error:
+                logger.info(f"[CALLFLOW] HTTP Output from server: {error}")
+        results.append(
+            validate_and_create_result(
+                step,
+                flow,
+                step_data,
+                parsed_output,
+                output,
+                error,
+                duration,
+                host,
+                command,
+                args,
+            )
+        )
+    return results
+
+
+def process_step_batch(
+    steps,
+    flow,
+    target_hosts,
+    svc_maps,
+    placeholder_pattern,
+    connector,
+    host_cli_map,
+    test_results,
+    show_table,
+    dashboard,
+    args=None,
+    step_delay=1,
+    rate_limiter=None,
+    host_fanout=False,
+    pacer=None,
+):
+    """
+    Run a group from plan_step_batches() on every target host.
+
+    A group of several steps is sent to each host as one remote batch
+    (one SSH exec instead of one per step); results are recorded in the
+    same step-then-host order as process_single_step(). Single steps, and
+    runs where batching is not possible, go through process_single_step().
+    """
+    if len(steps) == 1 or not _batching_available(connector, args):
+        for step in steps:
+            process_single_step(
+                step,
+                flow,
+                target_hosts,
+                svc_maps,
+                placeholder_pattern,
+                connector,
+                host_cli_map,
+                test_results,
+                show_table,
+                dashboard,
+                args=args,
+                step_delay=step_delay,
+                rate_limiter=rate_limiter,
+                host_fanout=host_fanout,
+                pacer=pacer,
+            )
+        return
+
+    step_datas = []
+    for step in steps:
+        step_data = extract_step_data(step)
+        step_data["save_key"] = step.other_fields.get("Save_As")
+        manage_workflow_context(flow, step_data)
+        if pacer is not None:
+            pacer.before_step(flow, step_data)
+        step_datas.append(step_data)
+    flow.last_request_started_at = time.time()
+
+    def run_host(host):
+        return _execute_batch_on_host(
+            steps,
+            flow,
+            [dict(step_data) for step_data in step_datas],
+            host,
+            svc_maps,
+            placeholder_pattern,
+            connector,
+            host_cli_map,
+            show_table,
             args,
+            rate_limiter,
         )
 
-        test_results.append(final_result)
-        step.result = final_result
-        if not show_table:
-            status_str = "PASS" if final_result.passed else "FAIL"
-            color_code = "\033[92m" if final_result.passed else "\033[91m"
-            reset_code = "\033[0m"
-            logger.info(
-                f"[CALLFLOW] Result: {color_code}{status_str}{reset_code} | Expected: {step_data.get('expected_status', 'N/A')} | Actual: {getattr(final_result, 'actual_status', 'N/A')}"
+    if host_fanout and len(target_hosts) > 1:
+        with ThreadPoolExecutor(
+            max_workers=len(target_hosts),
+            thread_name_prefix="testpilot-host",
+        ) as executor:
+            host_results = list(executor.map(run_host, target_hosts))
+    else:
+        host_results = []
+        for host in target_hosts:
+            host_results.append(run_host(host))
+            if pacer is None and rate_limiter is None:
+                # Fixed pacing: one step_delay per batch instead of per step
+                time.sleep(step_delay)
+
+    for index, step in enumerate(steps):
+        for results in host_results:
+            _record_step_result(
+                results[index],
+                step,
+                flow,
+                step_datas[index],
+                test_results,
+                show_table,
+                dashboard,
             )
-        if show_table and dashboard is not None:
-            dashboard.add_result(final_result)
-        log_test_result(final_result, flow, step)
 
-        # Apply delay - either from rate limiter or fallback to step_delay
-        if rate_limiter is not None:
-            # Rate limiter handles timing, but we might still need a minimum delay
-            # Only sleep step_delay if no rate limiting was applied
-            pass  # Rate limiting already handled above in acquire()
-        else:
-            # Fallback to original step_delay behavior when rate limiting is disabled
-            time.sleep(step_delay)
+    if pacer is not None:
+        for step_data in step_datas:
+            pacer.after_step(flow, step_data)
+    elif host_fanout and len(target_hosts) > 1 and rate_limiter is None:
+        time.sleep(step_delay)
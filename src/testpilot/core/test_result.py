@@ -1,5 +1,52 @@
+import threading
+from collections.abc import Mapping
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class LazyDetails(Mapping):
+    """
+    Read-only failure details built on first access.
+
+    Validators hand over a zero-argument factory instead of a finished
+    dict, so the DeepDiff report and payload copies are only produced when
+    an exporter or the failure logger actually reads them. Pickling or
+    deep-copying yields the plain dict.
+    """
+
+    __slots__ = ("_factory", "_data", "_lock")
+
+    def __init__(self, factory: Callable[[], Optional[Dict[str, Any]]]):
+        self._factory = factory
+        self._data: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def materialized(self) -> bool:
+        return self._factory is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self._factory is not None:
+            with self._lock:
+                if self._factory is not None:
+                    self._data = self._factory() or {}
+                    self._factory = None
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        return self.to_dict()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_dict())
+
+    def __len__(self) -> int:
+        return len(self.to_dict())
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    def __reduce__(self):
+        return (dict, (self.to_dict(),))
 
 
 @dataclass
@@ -20,7 +67,7 @@ class TestResult:
     test_name: Optional[str] = None
     duration: float = 0.0
     method: str = "GET"
-    details: Optional[Dict[str, Any]] = None
+    details: Optional[Mapping] = None  # dict or LazyDetails
     response_headers: Optional[Dict[str, Any]] = (
         None  # Headers from HTTP response
     )
@@ -51,6 +98,8 @@ class TestStep:
         self.result: Optional[TestResult] = (
             None  # Will hold TestResult after execution
         )
+        # ValidationPlan chosen when the workbook is parsed
+        self.validation_plan = None
 
 
 class TestFlow:
@@ -59,6 +108,8 @@ class TestFlow:
         self.test_name = test_name
         self.steps: List[TestStep] = []
         self.context: Dict[str, Any] = {}  # For storing data between steps
+        # time.time() just before the flow's latest request was sent
+        self.last_request_started_at: Optional[float] = None
 
     def add_step(self, step: TestStep):
         self.steps.append(step)
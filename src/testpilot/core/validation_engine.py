@@ -47,18 +47,27 @@ Validation Engine for TestPilot: Modular, rule-based validation for test steps.
 """
 import ast
 import json
+import logging
 import os
 import re
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 from deepdiff import DeepDiff
 
 from ..utils import parse_key_strings, parse_pattern_match
 from ..utils import pattern_match as ppm
+from ..utils.config_resolver import get_config_snapshot
+from ..utils.json_diff import json_equal
 from ..utils.logger import get_logger
 from ..utils.myutils import compare_dicts_ignore_timestamp
+from ..utils.parsed_response import ParsedResponse, json_digest, load_json
+from ..utils.pattern_store import get_pattern_store
+from ..utils.payload_repository import get_payload_repository
 from .enhanced_response_validator import validate_response_enhanced
+from .log_matcher import LogPatternMatcher
+from .test_result import LazyDetails
 
 
 # --- Flexible Status Code Range Helper ---
@@ -131,14 +140,14 @@ def check_diff(context: "ValidationContext") -> Optional["ValidationResult"]:
         # If direct comparison didn't match or they're not both strings, try JSON parsing
         if isinstance(resp, str):
             try:
-                resp = json.loads(resp)
+                resp = load_json(resp)
             except json.JSONDecodeError:
                 # Not valid JSON, keep as string
                 pass
 
         if isinstance(exp, str):
             try:
-                exp = json.loads(exp)
+                exp = load_json(exp)
             except json.JSONDecodeError:
                 # Not valid JSON, keep as string
                 pass
@@ -153,41 +162,44 @@ def check_diff(context: "ValidationContext") -> Optional["ValidationResult"]:
     try:
         # Add debug logging to see the actual values being compared
         logger = get_logger("ValidationEngine.check_diff")
-        logger.debug(
-            f"Comparing values: exp={exp} (type={type(exp)}), resp={resp} (type={type(resp)})"
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Comparing values: exp={exp} (type={type(exp)}), resp={resp} (type={type(resp)})"
+            )
 
-        # Try string normalization again if objects were parsed
+        # Equal canonical digests mean equal documents. Payload files and
+        # response bodies memoise theirs, so a payload file shared by many
+        # steps and hosts is normalised once
         if not isinstance(exp, str) and not isinstance(resp, str):
-            # Convert both to JSON strings for consistent comparison
             try:
-                exp_json = json.dumps(exp, sort_keys=True)
-                resp_json = json.dumps(resp, sort_keys=True)
-                if exp_json == resp_json:
-                    logger.debug(
-                        "JSON string comparison passed after normalization"
-                    )
+                if _digest(context.response_payload, exp) == _digest(
+                    context.response_body, resp
+                ):
+                    logger.debug("Canonical JSON digests match")
                     return ValidationResult(True)
             except Exception as e:
                 logger.debug(f"JSON string normalization failed: {e}")
 
-        # Proceed with DeepDiff comparison
-        diff = DeepDiff(exp, resp, ignore_order=True)
-        if diff:
-            detailed_differences = {
-                "difference": diff.to_dict(),
-                "expected": exp,
-                "actual": resp,
-                "expected_type": str(type(exp)),
-                "actual_type": str(type(resp)),
-            }
-            logger.debug(f"DeepDiff found differences: {diff}")
-            return ValidationResult(
-                False,
-                f"Response payload does not match expected payload.",
-                details=detailed_differences,
-            )
-        return ValidationResult(True)
+        # Native verdict first; DeepDiff only explains a failure or handles
+        # data that is not plain JSON
+        verdict = json_equal(exp, resp)
+        if verdict:
+            logger.debug("Native JSON comparison passed (order-insensitive)")
+            return ValidationResult(True)
+        diff = None
+        if verdict is None:
+            diff = DeepDiff(exp, resp, ignore_order=True)
+            if not diff:
+                return ValidationResult(True)
+        return ValidationResult(
+            False,
+            f"Response payload does not match expected payload.",
+            details=LazyDetails(
+                lambda: _payload_diff_details(
+                    exp, resp, context.diff_details, diff
+                )
+            ),
+        )
     except Exception as e:
         # If DeepDiff fails, fall back to direct equality check
         logger = get_logger("ValidationEngine.check_diff")
@@ -200,6 +212,37 @@ def check_diff(context: "ValidationContext") -> Optional["ValidationResult"]:
         )
 
 
+def _digest(raw: Any, parsed: Any) -> str:
+    """Canonical digest of parsed, memoised on raw when it is a response."""
+    if isinstance(raw, ParsedResponse) and raw.digest is not None:
+        return raw.digest
+    return json_digest(parsed)
+
+
+def _payload_diff_details(
+    exp: Any, resp: Any, with_difference: bool, diff: Optional[DeepDiff]
+) -> Dict[str, Any]:
+    """Failure details of check_diff, built when a report reads them."""
+    details = {}
+    if with_difference:
+        try:
+            if diff is None:
+                diff = DeepDiff(exp, resp, ignore_order=True)
+            details["difference"] = diff.to_dict()
+        except Exception as e:
+            logger = get_logger("ValidationEngine.check_diff")
+            logger.error(f"DeepDiff comparison failed: {e}")
+    details.update(
+        {
+            "expected": exp,
+            "actual": resp,
+            "expected_type": str(type(exp)),
+            "actual_type": str(type(resp)),
+        }
+    )
+    return details
+
+
 # --- Context and Result Data Classes ---
 
 
@@ -220,6 +263,9 @@ class ValidationContext:
         None  # Sheet name for enhanced pattern matching
     )
     row_idx: Optional[int] = None  # Row index for enhanced pattern matching
+    # Explain payload mismatches with DeepDiff (for the reports); when False
+    # only the pass/fail verdict is computed
+    diff_details: bool = True
     # Add more as needed
 
 
@@ -227,7 +273,8 @@ class ValidationContext:
 class ValidationResult:
     passed: bool
     fail_reason: Optional[str] = None
-    details: Optional[Dict[str, Any]] = None
+    # A dict, or LazyDetails when building the details is expensive
+    details: Optional[Mapping] = None
 
 
 # --- Strategy Base ---
@@ -249,33 +296,40 @@ class GetCompareWithPutValidator(ValidationStrategy):
             return ValidationResult(True)
         logger.debug("GET response does not match saved PUT payload")
 
-        # Create detailed comparison using DeepDiff
+        if not context.diff_details:
+            return ValidationResult(
+                False,
+                fail_reason="GET response does not match saved PUT payload",
+            )
+        return ValidationResult(
+            False,
+            fail_reason="GET response does not match saved PUT payload",
+            details=LazyDetails(
+                lambda: self._comparison_details(
+                    context.saved_payload, context.response_body, logger
+                )
+            ),
+        )
+
+    @staticmethod
+    def _comparison_details(saved, resp, logger) -> Optional[Dict[str, Any]]:
+        """Detailed comparison using DeepDiff, built when a report reads it."""
         try:
-            resp = context.response_body
-            saved = context.saved_payload
             if isinstance(resp, str) and resp.strip():
-                resp = json.loads(resp)
+                resp = load_json(resp)
             if isinstance(saved, str) and saved.strip():
-                saved = json.loads(saved)
+                saved = load_json(saved)
 
             diff = DeepDiff(saved, resp, ignore_order=True)
             if diff:
-                detailed_differences = {
+                return {
                     "expected": saved,
                     "actual": resp,
                     "difference": diff.to_dict(),
                 }
-                return ValidationResult(
-                    False,
-                    fail_reason="GET response does not match saved PUT payload",
-                    details=detailed_differences,
-                )
         except Exception as e:
             logger.debug(f"Error creating detailed comparison: {e}")
-
-        return ValidationResult(
-            False, fail_reason="GET response does not match saved PUT payload"
-        )
+        return None
 
 
 class PutStatusAndPayloadValidator(ValidationStrategy):
@@ -425,6 +479,12 @@ class ValidationDispatcher:
             if args and hasattr(args, "config"):
                 config_file = args.config
 
+            snapshot = get_config_snapshot()
+            if snapshot is not None and (
+                not hasattr(args, "config") or snapshot.path == config_file
+            ):
+                return snapshot.validation_settings
+
             with open(config_file, "r") as f:
                 config = json.load(f)
             return config.get("validation_settings", {})
@@ -432,273 +492,40 @@ class ValidationDispatcher:
             # Return default config if loading fails
             return {"json_match_threshold": 50}
 
-    def dispatch(self, context: ValidationContext) -> ValidationResult:
-        self.logger.debug(
-            f"Dispatching validation for method={context.method}, is_kubectl={context.is_kubectl}, "
-            f"expected_status={context.expected_status}, pattern_match={context.pattern_match}, "
-            f"response_payload={'present' if context.response_payload else 'none'}, "
-            f"saved_payload={'present' if context.saved_payload is not None else 'none'}"
-        )
-        # PUT rules
-        if context.method.upper() == "PUT":
-            if (
-                context.expected_status
-                and not context.response_payload
-                and not context.pattern_match
-            ):
-                self.logger.debug("Selected strategy: put_status_only")
-                result = VALIDATION_STRATEGIES["put_status_only"].validate(
-                    context
-                )
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-            if (
-                context.expected_status
-                and context.response_payload
-                and not context.pattern_match
-            ):
-                self.logger.debug("Selected strategy: put_status_and_payload")
-                result = VALIDATION_STRATEGIES[
-                    "put_status_and_payload"
-                ].validate(context)
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-            if (
-                context.expected_status
-                and context.pattern_match
-                and not context.response_payload
-            ):
-                self.logger.debug("Selected strategy: put_status_and_pattern")
-                result = VALIDATION_STRATEGIES[
-                    "put_status_and_pattern"
-                ].validate(context)
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-            if (
-                context.expected_status
-                and context.response_payload
-                and context.pattern_match
-            ):
-                self.logger.debug(
-                    "Selected strategy: put_status_payload_pattern"
-                )
-                result = VALIDATION_STRATEGIES[
-                    "put_status_payload_pattern"
-                ].validate(context)
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-        # GET rules
-        if context.method.upper() == "GET":
-            if context.saved_payload is not None:
-                self.logger.debug(
-                    "Selected strategy: get_compare_with_put (workflow-aware GET)"
-                )
-                result = VALIDATION_STRATEGIES[
-                    "get_compare_with_put"
-                ].validate(context)
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-            if (
-                context.expected_status
-                and context.response_payload
-                and context.pattern_match
-            ):
-                self.logger.debug("Selected strategy: get_full")
-                result = VALIDATION_STRATEGIES["get_full"].validate(context)
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-            if (
-                context.expected_status
-                and not context.response_payload
-                and not context.pattern_match
-            ):
-                self.logger.debug("Selected strategy: get_status_only")
-                result = VALIDATION_STRATEGIES["get_status_only"].validate(
-                    context
-                )
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-            if (
-                context.expected_status
-                and context.response_payload
-                and not context.pattern_match
-            ):
-                self.logger.debug("Selected strategy: get_status_and_payload")
-                result = VALIDATION_STRATEGIES[
-                    "get_status_and_payload"
-                ].validate(context)
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-            if (
-                context.expected_status
-                and context.pattern_match
-                and not context.response_payload
-            ):
-                self.logger.debug("Selected strategy: get_status_and_pattern")
-                result = VALIDATION_STRATEGIES[
-                    "get_status_and_pattern"
-                ].validate(context)
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-        # DELETE rules
-        if context.method.upper() == "DELETE":
-            if (
-                context.expected_status
-                and not context.response_payload
-                and not context.pattern_match
-            ):
-                self.logger.debug("Selected strategy: delete_status_only")
-                result = VALIDATION_STRATEGIES["delete_status_only"].validate(
-                    context
-                )
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-        # POST rules
-        if context.method.upper() == "POST":
-            if (
-                context.expected_status
-                and not context.response_payload
-                and not context.pattern_match
-            ):
-                self.logger.debug("Selected strategy: post_status_only")
-                result = VALIDATION_STRATEGIES["post_status_only"].validate(
-                    context
-                )
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-            if (
-                context.expected_status
-                and context.response_payload
-                and not context.pattern_match
-            ):
-                self.logger.debug("Selected strategy: post_status_and_payload")
-                result = VALIDATION_STRATEGIES[
-                    "post_status_and_payload"
-                ].validate(context)
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-            if (
-                context.expected_status
-                and context.pattern_match
-                and not context.response_payload
-            ):
-                self.logger.debug("Selected strategy: post_status_and_pattern")
-                result = VALIDATION_STRATEGIES[
-                    "post_status_and_pattern"
-                ].validate(context)
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-            if (
-                context.expected_status
-                and context.response_payload
-                and context.pattern_match
-            ):
-                self.logger.debug(
-                    "Selected strategy: post_status_payload_pattern"
-                )
-                result = VALIDATION_STRATEGIES[
-                    "post_status_payload_pattern"
-                ].validate(context)
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-        # PATCH rules
-        if context.method.upper() == "PATCH":
-            if (
-                context.expected_status
-                and not context.response_payload
-                and not context.pattern_match
-            ):
-                self.logger.debug("Selected strategy: patch_status_only")
-                result = VALIDATION_STRATEGIES["patch_status_only"].validate(
-                    context
-                )
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-            if (
-                context.expected_status
-                and context.response_payload
-                and not context.pattern_match
-            ):
-                self.logger.debug(
-                    "Selected strategy: patch_status_and_payload"
-                )
-                result = VALIDATION_STRATEGIES[
-                    "patch_status_and_payload"
-                ].validate(context)
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-            if (
-                context.expected_status
-                and context.pattern_match
-                and not context.response_payload
-            ):
-                self.logger.debug(
-                    "Selected strategy: patch_status_and_pattern"
-                )
-                result = VALIDATION_STRATEGIES[
-                    "patch_status_and_pattern"
-                ].validate(context)
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-            if (
-                context.expected_status
-                and context.response_payload
-                and context.pattern_match
-            ):
-                self.logger.debug(
-                    "Selected strategy: patch_status_payload_pattern"
-                )
-                result = VALIDATION_STRATEGIES[
-                    "patch_status_payload_pattern"
-                ].validate(context)
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
-                return result
-        # kubectl log validation
-        if context.is_kubectl and context.pattern_match:
+    def dispatch(
+        self,
+        context: ValidationContext,
+        plan: Optional["ValidationPlan"] = None,
+    ) -> ValidationResult:
+        """
+        Run the validator selected for context.
+
+        plan is the strategy chosen for the step when the workbook was
+        parsed; it is used as long as the runtime key still matches it,
+        otherwise the strategy is looked up again for the actual context.
+        """
+        if self.logger.isEnabledFor(logging.DEBUG):
             self.logger.debug(
-                "Selected strategy: kubectl_pattern (kubectl log validation)"
-            )
-            result = VALIDATION_STRATEGIES["kubectl_pattern"].validate(context)
+                f"Dispatching validation for method={context.method}, is_kubectl={context.is_kubectl}, "
+                f"expected_status={context.expected_status}, pattern_match={context.pattern_match}, "
+                f"response_payload={'present' if context.response_payload else 'none'}, "
+                f"saved_payload={'present' if context.saved_payload is not None else 'none'}"
+            )
+        key = strategy_key(context)
+        if plan is not None and plan.key == key:
+            name = plan.strategy
+        else:
+            name = select_strategy(*key)
+
+        if name is not None:
+            self.logger.debug(f"Selected strategy: {name}")
+            result = VALIDATION_STRATEGIES[name].validate(context)
+            # KubectlPatternValidator returns None when it has no verdict
             if result is not None:
-                self.logger.debug(
-                    f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
-                )
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(
+                        f"Validation outcome: passed={result.passed}, reason={result.fail_reason}"
+                    )
                 return result
 
         # self.logger.warning("No matching validation rule implemented for this context")
@@ -707,6 +534,160 @@ class ValidationDispatcher:
         )
 
 
+# --- Strategy selection ---
+
+# (method, has_expected_status, has_payload, has_pattern,
+#  has_saved_payload, is_kubectl)
+StrategyKey = Tuple[str, bool, bool, bool, bool, bool]
+
+# Method rules, keyed by (has_payload, has_pattern). Every method rule
+# needs an expected status; a GET with a saved payload and kubectl log
+# rows are handled in select_strategy().
+STRATEGY_TABLE: Dict[str, Dict[Tuple[bool, bool], str]] = {
+    "PUT": {
+        (False, False): "put_status_only",
+        (True, False): "put_status_and_payload",
+        (False, True): "put_status_and_pattern",
+        (True, True): "put_status_payload_pattern",
+    },
+    "GET": {
+        (False, False): "get_status_only",
+        (True, False): "get_status_and_payload",
+        (False, True): "get_status_and_pattern",
+        (True, True): "get_full",
+    },
+    "DELETE": {
+        (False, False): "delete_status_only",
+    },
+    "POST": {
+        (False, False): "post_status_only",
+        (True, False): "post_status_and_payload",
+        (False, True): "post_status_and_pattern",
+        (True, True): "post_status_payload_pattern",
+    },
+    "PATCH": {
+        (False, False): "patch_status_only",
+        (True, False): "patch_status_and_payload",
+        (False, True): "patch_status_and_pattern",
+        (True, True): "patch_status_payload_pattern",
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def select_strategy(
+    method: str,
+    has_expected_status: bool,
+    has_payload: bool,
+    has_pattern: bool,
+    has_saved_payload: bool,
+    is_kubectl: bool,
+) -> Optional[str]:
+    """Name of the VALIDATION_STRATEGIES entry for a step, or None."""
+    if method == "GET" and has_saved_payload:
+        # Workflow-aware GET, regardless of status/payload/pattern
+        return "get_compare_with_put"
+    if has_expected_status:
+        name = STRATEGY_TABLE.get(method, {}).get((has_payload, has_pattern))
+        if name is not None:
+            return name
+    if is_kubectl and has_pattern:
+        return "kubectl_pattern"
+    return None
+
+
+def strategy_key(context: ValidationContext) -> StrategyKey:
+    """The facts about context that select its validation strategy."""
+    return (
+        context.method.upper(),
+        bool(context.expected_status),
+        bool(context.response_payload),
+        bool(context.pattern_match),
+        context.saved_payload is not None,
+        bool(context.is_kubectl),
+    )
+
+
+@dataclass(frozen=True)
+class ValidationPlan:
+    """Strategy picked for a step at parse time, and the key it was picked for."""
+
+    key: StrategyKey
+    strategy: Optional[str]
+
+
+def _cell(value: Any) -> Any:
+    """Excel cell value with empty (NaN) cells as None."""
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _is_kubectl_logs_command(command: Any) -> bool:
+    return isinstance(command, str) and command.lstrip().startswith(
+        ("kubectl logs", "oc logs")
+    )
+
+
+def plan_flow_validation(flow) -> None:
+    """
+    Pick the validation strategy of every step in flow ahead of execution.
+
+    The choice mirrors what validate_and_create_result() will see: the
+    Response_Payload and Pattern_Match cells, whether a kubectl logs
+    command runs, and whether an earlier PUT/POST of the flow has saved
+    the payload named in Compare_With. Each step gets a ValidationPlan in
+    step.validation_plan; steps without a command get None, as they are
+    skipped at run time.
+    """
+    saved_keys = set()
+    for step in flow.steps:
+        fields = step.other_fields
+        command = _cell(fields.get("Command"))
+        method = step.method or "GET"
+        if command is None or not isinstance(method, str):
+            step.validation_plan = None
+            continue
+        method = method.upper()
+
+        # Same rule as manage_workflow_context(), which runs first
+        if method in ("PUT", "POST") and step.payload:
+            saved_keys.add(fields.get("Save_As") or "put_payload")
+        compare_with = fields.get("Compare_With")
+
+        key = (
+            method,
+            bool(step.expected_status),
+            bool(_cell(fields.get("Response_Payload"))),
+            bool(_cell(step.pattern_match)),
+            bool(compare_with) and compare_with in saved_keys,
+            _is_kubectl_logs_command(command),
+        )
+        step.validation_plan = ValidationPlan(key, select_strategy(*key))
+
+
+def validation_preflight(flows) -> List[Dict[str, Any]]:
+    """One row per step: which validation strategy it is planned to use."""
+    rows = []
+    for flow in flows:
+        for step in flow.steps:
+            plan = getattr(step, "validation_plan", None)
+            if plan is None:
+                strategy = "(skipped: no command)"
+            else:
+                strategy = plan.strategy or "(no matching rule)"
+            rows.append(
+                {
+                    "Sheet": flow.sheet,
+                    "Row": step.row_idx,
+                    "Test_Name": flow.test_name,
+                    "Method": step.method,
+                    "Strategy": strategy,
+                }
+            )
+    return rows
+
+
 class PutStatusOnlyValidator(ValidationStrategy):
     def validate(self, context: ValidationContext) -> ValidationResult:
         logger = get_logger("ValidationEngine.PutStatusOnlyValidator")
@@ -744,7 +725,7 @@ class KubectlPatternValidator(ValidationStrategy):
 
         if isinstance(response_body, str):
             try:
-                response_body = json.loads(response_body)
+                response_body = load_json(response_body)
                 logger.debug(
                     "Parsed response_body string to dict/list for comparison."
                 )
@@ -756,13 +737,12 @@ class KubectlPatternValidator(ValidationStrategy):
             if original_response_body is not None and isinstance(
                 original_response_body, str
             ):
-                lines = original_response_body.split("\n")
                 # Load validation config for enhanced response validation
                 validation_config = (
                     ValidationDispatcher()._get_validation_config(context.args)
                 )
 
-                for line in lines:
+                def check_line(line):
                     result = validate_response_enhanced(
                         context.pattern_match,
                         context.response_headers,
@@ -774,11 +754,18 @@ class KubectlPatternValidator(ValidationStrategy):
                         sheet_name=context.sheet_name,  # Pass sheet name for enhanced pattern matching
                         row_idx=context.row_idx,  # Pass row index for enhanced pattern matching
                     )
-                    if result["pattern_match_overall"] is True:
-                        logger.info(
-                            f"Pattern '{context.pattern_match}' found in line: {line}"
-                        )
-                        return ValidationResult(True)
+                    return result["pattern_match_overall"] is True
+
+                # Only lines containing the pattern's anchor words go
+                # through the full pipeline
+                line = LogPatternMatcher(
+                    context.pattern_match, check_line
+                ).find(original_response_body)
+                if line is not None:
+                    logger.info(
+                        f"Pattern '{context.pattern_match}' found in line: {line}"
+                    )
+                    return ValidationResult(True)
                 # If no pattern match found in any line, return failure
                 logger.debug(
                     f"Pattern '{context.pattern_match}' not found in any line of response body"
@@ -970,63 +957,15 @@ def load_enhanced_pattern_matches(
     sheet_name: str, row_idx: int
 ) -> Optional[Dict]:
     """
-    Load enhanced pattern matches from the JSON file based on sheet name and row index.
+    Look up the enhanced pattern match for a sheet name and row index.
     Returns the converted_pattern if found, None otherwise.
+
+    Served from the process-wide pattern store, which process_patterns fills
+    in memory; standalone, the store reads the pattern JSON files once and
+    reloads them when they change.
     """
     try:
-        # Find all pattern files in the patterns directory
-        # Try multiple possible locations for patterns directory
-        pattern_dirs = [
-            os.path.join(
-                os.getcwd(), "examples", "patterns"
-            ),  # Project root patterns
-            os.path.join(
-                os.path.dirname(
-                    os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-                ),
-                "examples",
-                "patterns",
-            ),  # Absolute path from module
-            os.path.join(
-                os.path.dirname(os.path.abspath(__file__)), "patterns"
-            ),  # Legacy path
-        ]
-
-        pattern_files = []
-        pattern_dir = None
-
-        # Try each possible pattern directory
-        for dir_path in pattern_dirs:
-            if os.path.exists(dir_path) and os.path.isdir(dir_path):
-                pattern_dir = dir_path
-                try:
-                    pattern_files = [
-                        f
-                        for f in os.listdir(pattern_dir)
-                        if f.endswith("enhanced_pattern_matches.json")
-                    ]
-                    if (
-                        pattern_files
-                    ):  # If we found pattern files, break the loop
-                        break
-                except Exception:
-                    continue
-
-        for file_name in pattern_files:
-            if pattern_dir is not None:
-                file_path = os.path.join(pattern_dir, file_name)
-                with open(file_path, "r") as f:
-                    pattern_data = json.load(f)
-
-                if "enhanced_patterns" in pattern_data:
-                    # Check if the sheet exists in the enhanced pattern matches
-                    if sheet_name in pattern_data["enhanced_patterns"]:
-                        # Find the entry with matching row_number
-                        for entry in pattern_data["enhanced_patterns"][
-                            sheet_name
-                        ]:
-                            if entry.get("row_number") == row_idx:
-                                return entry.get("converted_pattern")
+        return get_pattern_store().lookup(sheet_name, row_idx)
     except Exception as e:
         # Log error but continue with normal pattern matching
         logger = get_logger("ValidationEngine.EnhancedPatternMatcher")
@@ -1439,8 +1378,7 @@ class ValidationEngine:
             )
 
         try:
-            with open(payload_path, "r", encoding="utf-8") as f:
-                return f.read().strip()
+            return get_payload_repository().get(payload_path).text
         except (IOError, OSError) as e:
             logger = get_logger("ValidationEngine._load_json_file")
             logger.error(
@@ -10,6 +10,8 @@ import webbrowser
 from datetime import datetime
 from typing import Any, Dict, List
 
+from ..utils.parsed_response import load_json
+
 
 class TestResultsExporter:
     """Export test results to various formats (CSV, JSON, etc.)"""
@@ -60,9 +62,12 @@ class TestResultsExporter:
         if content_to_analyze:
             response_body["size_bytes"] = len(str(content_to_analyze))
             try:
-                import json
-
-                parsed = json.loads(str(content_to_analyze))
+                # A ParsedResponse was already decoded by the validators
+                parsed = load_json(
+                    content_to_analyze
+                    if isinstance(content_to_analyze, str)
+                    else str(content_to_analyze)
+                )
                 response_body["parsed_json"] = parsed
                 response_body["content_type"] = "application/json"
             except (json.JSONDecodeError, TypeError):
@@ -159,6 +164,8 @@ class TestResultsExporter:
         for index, result in enumerate(test_results):
             result_dict = {
                 "row_index": index + 1,  # 1-based indexing for readability
+                # Workbook row, used by revalidation to find the step
+                "excel_row": getattr(result, "row_idx", None),
                 "host": getattr(result, "host", ""),
                 "sheet": getattr(result, "sheet", ""),
                 "test_name": getattr(result, "test_name", ""),
@@ -7,6 +7,7 @@ Provides an SSH connector-compatible interface for mock execution mode.
 This allows mock execution to work with the existing execute_flows function.
 """
 
+import threading
 from typing import Dict, List, Optional
 
 from .mock_integration import MockExecutor
@@ -26,6 +27,33 @@ class MockConnectorWrapper:
         self.mock_server_url = getattr(
             mock_executor, "mock_server_url", "http://localhost:8082"
         )
+        # Per-thread step context so concurrent flows don't overwrite
+        # each other's sheet/test/row while a command is in flight.
+        self._step_context = threading.local()
+
+    @property
+    def _current_sheet(self) -> Optional[str]:
+        return getattr(self._step_context, "sheet", None)
+
+    @_current_sheet.setter
+    def _current_sheet(self, value: Optional[str]):
+        self._step_context.sheet = value
+
+    @property
+    def _current_test(self) -> Optional[str]:
+        return getattr(self._step_context, "test", None)
+
+    @_current_test.setter
+    def _current_test(self, value: Optional[str]):
+        self._step_context.test = value
+
+    @property
+    def _current_row_idx(self) -> Optional[int]:
+        return getattr(self._step_context, "row_idx", None)
+
+    @_current_row_idx.setter
+    def _current_row_idx(self, value: Optional[int]):
+        self._step_context.row_idx = value
 
     def setup_connections(self, config):
         """Mock implementation of setup_connections."""
@@ -5,7 +5,11 @@ Configuration resolver utility for handling environment variables and template s
 import json
 import os
 import re
-from typing import Any, Dict, Optional, Union
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Union
 
 
 def resolve_env_vars(value: Any) -> Any:
@@ -84,6 +88,150 @@ def load_config_with_env(config_path: str) -> Dict[str, Any]:
     return resolved_config
 
 
+def _freeze(value: Any) -> Any:
+    """Recursively convert dicts/lists into read-only mappings/tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Inverse of _freeze: build plain, mutable dicts/lists again."""
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    Immutable, already env-resolved view of hosts.json.
+
+    Built once per run (see load_config_snapshot) and shared by every step,
+    so hot paths read settings from memory instead of re-opening and
+    re-parsing the config file.
+    """
+
+    path: str
+    data: Mapping[str, Any]
+    loaded_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_dict(
+        cls, config: Dict[str, Any], path: str = ""
+    ) -> "ConfigSnapshot":
+        return cls(path=path, data=_freeze(config))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a mutable deep copy of the configuration."""
+        return _thaw(self.data)
+
+    @property
+    def pod_mode(self) -> bool:
+        return bool(self.data.get("pod_mode", False))
+
+    @property
+    def nf_name(self) -> str:
+        return self.data.get("nf_name", "") or ""
+
+    @property
+    def kubectl_logs_settings(self) -> Mapping[str, Any]:
+        return self.data.get("kubectl_logs_settings") or MappingProxyType({})
+
+    @property
+    def validation_settings(self) -> Mapping[str, Any]:
+        return self.data.get("validation_settings") or MappingProxyType({})
+
+    @property
+    def namespace(self) -> Optional[str]:
+        """Namespace of the host selected by connect_to, if configured."""
+        connect_to = self.data.get("connect_to")
+        hosts = self.data.get("hosts")
+        if not connect_to or not isinstance(connect_to, str):
+            return None
+        if isinstance(hosts, tuple):
+            for host_cfg in hosts:
+                if isinstance(host_cfg, Mapping) and (
+                    host_cfg.get("name") == connect_to
+                    or host_cfg.get("hostname") == connect_to
+                ):
+                    return host_cfg.get("namespace")
+        elif isinstance(hosts, Mapping):
+            host_cfg = hosts.get(connect_to)
+            if isinstance(host_cfg, Mapping):
+                return host_cfg.get("namespace")
+        return None
+
+
+_snapshot_lock = threading.Lock()
+_active_snapshot: Optional[ConfigSnapshot] = None
+
+
+def get_config_snapshot() -> Optional[ConfigSnapshot]:
+    """
+    Return the process-wide config snapshot, or None if none is installed.
+
+    Callers fall back to reading the config file themselves when this
+    returns None, which keeps library use without a snapshot working.
+    """
+    return _active_snapshot
+
+
+def set_config_snapshot(snapshot: Optional[ConfigSnapshot]) -> None:
+    """Install (or clear, with None) the process-wide config snapshot."""
+    global _active_snapshot
+    with _snapshot_lock:
+        _active_snapshot = snapshot
+
+
+def load_config_snapshot(config_path: str) -> ConfigSnapshot:
+    """
+    Load a config file via load_config_with_env and install it as snapshot.
+
+    Args:
+        config_path: Path to configuration file
+
+    Returns:
+        The newly installed ConfigSnapshot
+    """
+    snapshot = ConfigSnapshot.from_dict(
+        load_config_with_env(config_path), config_path
+    )
+    set_config_snapshot(snapshot)
+    return snapshot
+
+
+def reload_config_snapshot(
+    config_path: Optional[str] = None,
+) -> ConfigSnapshot:
+    """
+    Re-read the configuration and atomically swap the installed snapshot.
+
+    Intended for long-running sessions where hosts.json is edited while
+    TestPilot is running. Steps already in flight keep the snapshot they
+    started with.
+
+    Args:
+        config_path: Path to re-read; defaults to the current snapshot's path
+
+    Raises:
+        ValueError: If no path is given and no snapshot is installed
+    """
+    if config_path is None:
+        current = get_config_snapshot()
+        if current is None or not current.path:
+            raise ValueError("No config snapshot installed to reload")
+        config_path = current.path
+    return load_config_snapshot(config_path)
+
+
 def validate_host_config(host_config: Dict[str, Any]) -> None:
     """
     Validate host configuration for required fields and security.
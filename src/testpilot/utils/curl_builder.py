@@ -6,6 +6,9 @@ import shlex
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+from .config_resolver import get_config_snapshot
+from .payload_repository import get_payload_repository
+
 logger = logging.getLogger("CurlBuilder")
 
 
@@ -42,8 +45,10 @@ def build_curl_command(
                     f"Payload file not found: {payload_path}"
                 )
             try:
-                with open(payload_path, "r", encoding="utf-8") as f:
-                    resolved_payload = f.read().strip()
+                # Read once per run; the text keeps its decoded JSON
+                resolved_payload = (
+                    get_payload_repository().get(payload_path).text
+                )
             except (IOError, OSError) as e:
                 logger.error(
                     f"Failed to read payload file {payload_path}: {e}"
@@ -94,15 +99,19 @@ def build_curl_command(
         ),  # Absolute path from module
     ]
 
-    for config_path in config_paths:
-        try:
-            if os.path.exists(config_path):
-                with open(config_path, "r", encoding="utf-8") as f:
-                    config = json.load(f)
-                    nf_name = config.get("nf_name", "SLF")
-                    break
-        except (IOError, OSError, json.JSONDecodeError) as e:
-            continue
+    snapshot = get_config_snapshot()
+    if snapshot is not None:
+        nf_name = snapshot.get("nf_name", "SLF")
+    else:
+        for config_path in config_paths:
+            try:
+                if os.path.exists(config_path):
+                    with open(config_path, "r", encoding="utf-8") as f:
+                        config = json.load(f)
+                        nf_name = config.get("nf_name", "SLF")
+                        break
+            except (IOError, OSError, json.JSONDecodeError) as e:
+                continue
 
     # If we couldn't find or parse any config file, log the error
     if nf_name == "SLF":
@@ -193,6 +202,7 @@ def build_ssh_k8s_curl_command(
     extra_curl_args: Optional[List[str]] = None,
     cli_type: str = "kubectl",
     test_context: Optional[Dict[str, Any]] = None,
+    pod_name: Optional[str] = None,
 ) -> Tuple[str, Optional[str]]:
     """
     Returns a kubectl/oc exec command that runs curl inside a pod via SSH.
@@ -200,6 +210,8 @@ def build_ssh_k8s_curl_command(
     Args:
         cli_type: The CLI tool to use ('kubectl' or 'oc'). Defaults to 'kubectl'.
         test_context: Optional test execution context for NRF tracking.
+        pod_name: Already resolved pod to exec into. When omitted, the pod
+            is looked up by the command itself (get po | grep | head -n 1).
     """
     curl_cmd, resolved_payload = build_curl_command(
         url,
@@ -214,6 +226,10 @@ def build_ssh_k8s_curl_command(
     safe_container = shlex.quote(container)
     safe_namespace = shlex.quote(namespace)
 
+    if pod_name:
+        exec_cmd = f"{cli_type} exec -it {shlex.quote(pod_name)} -n {safe_namespace} -c {safe_container} -- {curl_cmd}"
+        return exec_cmd, resolved_payload
+
     # Build pod pattern safely
     pod_pattern = f"{container}-[a-z0-9]+-[a-z0-9]+$"
     safe_pod_pattern = shlex.quote(pod_pattern)
@@ -202,4 +202,10 @@ def parse_excel_to_flows(
             test_flows[test_name].add_step(step)
 
         flows.extend(test_flows.values())
+
+    # Imported here: validation_engine imports this package
+    from ..core.validation_engine import plan_flow_validation
+
+    for flow in flows:
+        plan_flow_validation(flow)
     return flows
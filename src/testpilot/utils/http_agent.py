@@ -0,0 +1,446 @@
+"""
+Persistent in-pod HTTP agent for TestPilot
+
+The curl backend pays for a `kubectl exec` session and a new curl process,
+with a new connection to the NF, on every HTTP step. The agent backend
+starts one long-lived `kubectl exec -i <pod> -- python3` session per host,
+pod and container. It runs a small request-runner (AGENT_SCRIPT) inside the
+container. The runner reads one JSON request per line on stdin and writes
+one JSON response per line on stdout, tagged with the request's id. It
+answers requests on a few worker threads and keeps connections to each
+origin open between requests.
+
+The runner uses httpx for HTTP/2 (h2c prior knowledge, like curl's
+--http2-prior-knowledge) and pooled http.client keep-alive connections for
+HTTP/1.1. A container without httpx reports http2 false in its ready line;
+requests that need prior knowledge then go to curl. Responses come back
+as HttpExchange records and render into curl -v text, so parse_curl_output
+and the validators see the same shape as before.
+
+Requests carry the User-Agent and Accept headers the container's curl
+would send, unless the row sets them. A failed request is sent again only
+when a kept-alive connection turned out to be closed before the request
+reached the NF, or when the method is safe to repeat.
+
+With launch "host", the runner starts on the TestPilot host (locally or
+over SSH) instead of inside a pod, which is also how it is tested against
+the mock servers.
+"""
+
+import json
+import shlex
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Dict, Optional, Tuple
+
+from .http_exchange import HttpExchange, HttpRequest
+from .kubectl_log_stream import LogLineStream
+from .logger import get_logger
+
+logger = get_logger("TestPilot.HttpAgent")
+
+AgentKey = Tuple[Optional[str], ...]
+
+DEFAULT_TIMEOUT = 30.0
+_START_TIMEOUT = 15.0
+# Time on top of the request timeout for the round trip through kubectl exec
+_ANSWER_GRACE = 5.0
+
+# Request-runner executed inside the container. Standard library only
+# (httpx is optional) and kept compatible with older python3 builds.
+AGENT_SCRIPT = r"""
+import http.client, json, ssl, subprocess, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+try:
+    import httpx
+except ImportError:
+    httpx = None
+WORKERS = 8
+# Methods that may be sent again after the NF could have seen them
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+idle = {}
+h2_clients = {}
+pool_lock = threading.Lock()
+out_lock = threading.Lock()
+
+def curl_user_agent():
+    # What curl in this container would send
+    try:
+        out = subprocess.run(["curl", "--version"], stdout=subprocess.PIPE,
+                             stderr=subprocess.DEVNULL, timeout=5).stdout
+        return "curl/" + out.decode().split()[1]
+    except Exception:
+        return None
+
+USER_AGENT = curl_user_agent()
+DEFAULT_HEADERS = [("User-Agent", USER_AGENT)] if USER_AGENT else []
+DEFAULT_HEADERS.append(("Accept", "*/*"))
+
+def with_defaults(headers):
+    names = set(name.lower() for name, _ in headers)
+    return [h for h in DEFAULT_HEADERS if h[0].lower() not in names] + list(headers)
+
+def h1(req, parts, timeout):
+    key = (parts.scheme, parts.netloc, bool(req.get("insecure")))
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+    body = req.get("body")
+    body = body.encode() if body is not None else None
+    for attempt in (0, 1):
+        with pool_lock:
+            free = idle.get(key)
+            conn = free.pop() if free else None
+        reused = conn is not None
+        sent = False
+        if conn is None:
+            if parts.scheme == "https":
+                ctx = ssl.create_default_context()
+                if req.get("insecure"):
+                    ctx.check_hostname = False
+                    ctx.verify_mode = ssl.CERT_NONE
+                conn = http.client.HTTPSConnection(parts.netloc, timeout=timeout, context=ctx)
+            else:
+                conn = http.client.HTTPConnection(parts.netloc, timeout=timeout)
+        conn.timeout = timeout
+        try:
+            conn.putrequest(req["method"], target, skip_accept_encoding=True)
+            for name, value in with_defaults(req.get("headers") or []):
+                conn.putheader(name, value)
+            if body is not None:
+                conn.putheader("Content-Length", str(len(body)))
+            conn.endheaders(body)
+            sent = True
+            resp = conn.getresponse()
+            data = resp.read()
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError, http.client.CannotSendRequest):
+            conn.close()
+            # Only a kept-alive connection the NF closed while idle is
+            # retried, and only if the request cannot have reached the NF
+            # or is safe to repeat
+            if attempt or not reused or (sent and req["method"] not in SAFE_METHODS):
+                raise
+            continue
+        except Exception:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            with pool_lock:
+                idle.setdefault(key, []).append(conn)
+        return {"status": resp.status, "reason": resp.reason,
+                "http_version": "1.1" if resp.version == 11 else "1.0",
+                "headers": resp.getheaders(),
+                "body": data.decode("utf-8", "replace")}
+
+def h2(req, parts, timeout):
+    key = (parts.scheme, parts.netloc, bool(req.get("insecure")))
+    with pool_lock:
+        client = h2_clients.get(key)
+        if client is None:
+            client = httpx.Client(http1=parts.scheme == "https", http2=True,
+                                  verify=not req.get("insecure"))
+            # No httpx User-Agent; with_defaults adds curl's
+            client.headers.clear()
+            h2_clients[key] = client
+    body = req.get("body")
+    resp = client.request(req["method"], req["url"],
+                          headers=with_defaults(req.get("headers") or []),
+                          content=body.encode() if body is not None else None,
+                          timeout=timeout)
+    return {"status": resp.status_code, "reason": resp.reason_phrase,
+            "http_version": "2" if resp.http_version == "HTTP/2" else "1.1",
+            "headers": list(resp.headers.items()), "body": resp.text}
+
+def handle(req):
+    start = time.time()
+    try:
+        parts = urlsplit(req["url"])
+        timeout = req.get("timeout") or 30
+        if req.get("http2"):
+            if httpx is None:
+                raise RuntimeError("HTTP/2 prior knowledge needs httpx")
+            resp = h2(req, parts, timeout)
+        else:
+            resp = h1(req, parts, timeout)
+    except Exception as e:
+        resp = {"error": "%s: %s" % (type(e).__name__, e)}
+    resp["id"] = req.get("id")
+    resp["duration"] = time.time() - start
+    with out_lock:
+        sys.stdout.write(json.dumps(resp) + "\n")
+        sys.stdout.flush()
+
+sys.stdout.write(json.dumps({"ready": True, "http2": httpx is not None}) + "\n")
+sys.stdout.flush()
+executor = ThreadPoolExecutor(WORKERS)
+for line in sys.stdin:
+    if line.strip():
+        executor.submit(handle, json.loads(line))
+executor.shutdown()
+"""
+
+
+def agent_command(python: str = "python3") -> str:
+    """Shell command that starts the request-runner with python."""
+    return f"{python} -u -c {shlex.quote(AGENT_SCRIPT)}"
+
+
+class HttpAgentUnavailable(RuntimeError):
+    """The agent cannot take the request; nothing was sent to the NF."""
+
+
+class HttpAgentTimeout(RuntimeError):
+    """
+    A request was written to the runner but no response came back.
+
+    The NF may already have processed it, so it must not be sent again.
+    """
+
+
+class HttpAgentSession:
+    """
+    One running request-runner shared by concurrent requests.
+
+    Callers hold the session lock only to write their request line. A reader
+    thread routes each response line to the caller waiting on its id, and
+    the runner answers requests in parallel, so slow requests do not hold
+    up the others.
+    """
+
+    def __init__(self, launch_command: str, host: str = None, connector=None):
+        """
+        Initialize agent session.
+
+        Args:
+            launch_command: Command that starts the runner, e.g.
+                `kubectl exec -i <pod> -n ns -c c -- python3 -u -c ...`
+            host: Target host name (used for SSH execution)
+            connector: SSHConnector or None for local execution
+        """
+        self.launch_command = launch_command
+        self.host = host
+        self.connector = connector
+        self.http2 = False
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._stream: Optional[LogLineStream] = None
+        self._reader: Optional[threading.Thread] = None
+        self._pending: Dict[int, Future] = {}
+        self._next_id = 0
+        self._closed = False
+
+    def start(self, timeout: float = _START_TIMEOUT) -> "HttpAgentSession":
+        """Start the runner and wait for its ready line."""
+        self._stream = LogLineStream(
+            self.launch_command, self.host, self.connector, stdin=True
+        ).start()
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            line = self._stream.read_line(max(0.0, min(0.2, remaining)))
+            if line is not None:
+                try:
+                    hello = json.loads(line)
+                except ValueError:
+                    continue  # e.g. a kubectl warning on stdout
+                if isinstance(hello, dict) and hello.get("ready"):
+                    self.http2 = bool(hello.get("http2"))
+                    self._reader = threading.Thread(
+                        target=self._read_responses,
+                        name="testpilot-http-agent",
+                        daemon=True,
+                    )
+                    self._reader.start()
+                    return self
+            if self._stream.eof or remaining <= 0:
+                error = self._stream.error_output
+                self.close()
+                raise RuntimeError(
+                    f"HTTP agent did not start on {self.host}: "
+                    f"{error or 'no ready line'}"
+                )
+
+    @property
+    def alive(self) -> bool:
+        return (
+            self._stream is not None
+            and not self._closed
+            and not self._stream.eof
+        )
+
+    def _read_responses(self) -> None:
+        """Hand each response line to the request waiting on its id."""
+        while not self._closed:
+            line = self._stream.read_line(0.5)
+            if line is None:
+                if self._stream.eof:
+                    break
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(data, dict):
+                continue
+            with self._lock:
+                future = self._pending.pop(data.get("id"), None)
+            if future is not None:
+                self.requests += 1
+                future.set_result(data)
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(
+                HttpAgentTimeout(f"HTTP agent on {self.host} exited")
+            )
+
+    def request(
+        self, request: HttpRequest, timeout: float = DEFAULT_TIMEOUT
+    ) -> HttpExchange:
+        """
+        Send one request through the runner and wait for its response.
+
+        Raises HttpAgentUnavailable when the request was not sent (closed
+        session, failed write, or HTTP/2 prior knowledge without httpx in
+        the runner), and HttpAgentTimeout when it was sent but no response
+        arrived in time.
+        """
+        if request.http2_prior_knowledge and not self.http2:
+            raise HttpAgentUnavailable(
+                f"HTTP agent on {self.host} cannot send HTTP/2 "
+                "with prior knowledge (no httpx)"
+            )
+        future: Future = Future()
+        message = request.to_dict()
+        message["timeout"] = request.timeout or timeout
+        with self._lock:
+            if not self.alive:
+                raise HttpAgentUnavailable("HTTP agent session is closed")
+            self._next_id += 1
+            request_id = self._next_id
+            message["id"] = request_id
+            self._pending[request_id] = future
+            started_at = time.time()
+            start = time.monotonic()
+            try:
+                self._stream.write(json.dumps(message) + "\n")
+            except Exception as e:
+                self._pending.pop(request_id, None)
+                self.close()
+                raise HttpAgentUnavailable(
+                    f"HTTP agent write failed: {e}"
+                ) from e
+
+        try:
+            wait = (request.timeout or timeout) + _ANSWER_GRACE
+            data = future.result(timeout=wait)
+        except FutureTimeout:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise HttpAgentTimeout(
+                f"HTTP agent on {self.host} did not answer "
+                f"{request.method} {request.url}"
+            ) from None
+        exchange = HttpExchange.from_dict(request, data)
+        exchange.started_at = started_at
+        exchange.duration = time.monotonic() - start
+        return exchange
+
+    def close(self) -> None:
+        self._closed = True
+        if self._stream is not None:
+            self._stream.close()
+
+
+class HttpAgentPool:
+    """
+    Share one HttpAgentSession per (host, namespace, pod, container).
+
+    A key whose agent failed to start (e.g. no python3 in the container) is
+    remembered and not retried, so later requests go straight to curl.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[AgentKey, HttpAgentSession] = {}
+        self._start_locks: Dict[AgentKey, threading.Lock] = {}
+        self._failed: Dict[AgentKey, str] = {}
+
+    def get_or_start(
+        self,
+        key: AgentKey,
+        launch_command: str,
+        host: str = None,
+        connector=None,
+    ) -> HttpAgentSession:
+        """
+        Return the live session for key, starting one if needed.
+
+        Raises RuntimeError if the agent cannot be started for key.
+        """
+        with self._lock:
+            start_lock = self._start_locks.setdefault(key, threading.Lock())
+        with start_lock:
+            with self._lock:
+                session = self._sessions.get(key)
+                failure = self._failed.get(key)
+            if session is not None and session.alive:
+                return session
+            if failure is not None:
+                raise RuntimeError(failure)
+            try:
+                session = HttpAgentSession(
+                    launch_command, host, connector
+                ).start()
+            except Exception as e:
+                logger.warning(f"{e}; falling back to curl for {key}")
+                with self._lock:
+                    self._failed[key] = str(e)
+                raise RuntimeError(str(e)) from e
+            logger.debug(f"Started HTTP agent {key} (http2={session.http2})")
+            with self._lock:
+                self._sessions[key] = session
+            return session
+
+    def discard(self, key: AgentKey) -> None:
+        """Close and forget the session for key."""
+        with self._lock:
+            session = self._sessions.pop(key, None)
+        if session is not None:
+            session.close()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def close_all(self) -> None:
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
+
+
+_pool: Optional[HttpAgentPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_http_agent_pool() -> HttpAgentPool:
+    """Return the process-wide agent pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = HttpAgentPool()
+        return _pool
+
+
+def shutdown_http_agents() -> None:
+    """Stop every agent started through the process-wide pool."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close_all()
@@ -0,0 +1,243 @@
+"""
+HTTP request/response records for backends that do not shell out to curl
+
+TestPilot's validators read responses through parse_curl_output(), which
+expects curl -v text: the body on stdout and the `> ` / `< ` trace on
+stderr. Backends that send requests themselves (the in-pod HTTP agent, the
+native client) describe a request with HttpRequest, usually recovered from
+the curl command the step builder produced, and return an HttpExchange that
+renders back into that curl -v shape, or straight into the dict
+parse_curl_output() would have produced from it.
+"""
+
+import json
+import re
+import shlex
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .parsed_response import ParsedResponse
+
+
+@dataclass
+class HttpRequest:
+    """One HTTP request as described by a TestPilot curl command."""
+
+    method: str
+    url: str
+    headers: List[Tuple[str, str]] = field(default_factory=list)
+    body: Optional[str] = None
+    http2_prior_knowledge: bool = False
+    insecure: bool = False
+    timeout: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "url": self.url,
+            "headers": [list(h) for h in self.headers],
+            "body": self.body,
+            "http2": self.http2_prior_knowledge,
+            "insecure": self.insecure,
+            "timeout": self.timeout,
+        }
+
+
+# curl flags that take no value and do not change the request
+_IGNORED_FLAGS = {"-v", "--verbose", "-s", "--silent", "-S", "--show-error"}
+
+
+def parse_curl_command(command: str) -> Optional[HttpRequest]:
+    """
+    Recover the request from a curl command built by build_curl_command.
+
+    Returns None for anything this parser does not fully understand (extra
+    curl options, several URLs, shell syntax), so callers can run the
+    command with curl instead of sending a different request.
+    """
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        return None
+    if not tokens or tokens[0] != "curl":
+        return None
+
+    request = HttpRequest(method="", url="")
+    i = 1
+    while i < len(tokens):
+        token = tokens[i]
+        value = tokens[i + 1] if i + 1 < len(tokens) else None
+        if token in _IGNORED_FLAGS:
+            i += 1
+            continue
+        if token == "--http2-prior-knowledge":
+            request.http2_prior_knowledge = True
+        elif token in ("-k", "--insecure"):
+            request.insecure = True
+        elif token in ("-X", "--request") and value is not None:
+            request.method = value.upper()
+            i += 1
+        elif token in ("-H", "--header") and value is not None:
+            if ":" not in value:
+                return None
+            name, header_value = value.split(":", 1)
+            request.headers.append((name.strip(), header_value.strip()))
+            i += 1
+        elif token in ("-d", "--data", "--data-raw") and value is not None:
+            if value.startswith("@") and token != "--data-raw":
+                return None  # payload read from a file by curl
+            request.body = (
+                value if request.body is None else f"{request.body}&{value}"
+            )
+            i += 1
+        elif token in ("-m", "--max-time") and value is not None:
+            try:
+                request.timeout = float(value)
+            except ValueError:
+                return None
+            i += 1
+        elif token.startswith("-") or request.url:
+            return None
+        else:
+            request.url = token
+        i += 1
+
+    if not request.url or urlsplit(request.url).scheme not in (
+        "http",
+        "https",
+    ):
+        return None
+    if not request.method:
+        request.method = "POST" if request.body is not None else "GET"
+    if request.body is not None and not any(
+        name.lower() == "content-type" for name, _ in request.headers
+    ):
+        # curl's default for -d
+        request.headers.append(
+            ("Content-Type", "application/x-www-form-urlencoded")
+        )
+    return request
+
+
+@dataclass
+class HttpExchange:
+    """A sent request and the response (or transport error) it got."""
+
+    request: HttpRequest
+    status: Optional[int] = None
+    reason: str = ""
+    http_version: str = "1.1"
+    headers: List[Tuple[str, str]] = field(default_factory=list)
+    body: str = ""
+    error: Optional[str] = None
+    duration: float = 0.0
+    started_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_dict(
+        cls, request: HttpRequest, data: Dict[str, Any]
+    ) -> "HttpExchange":
+        return cls(
+            request=request,
+            status=data.get("status"),
+            reason=data.get("reason") or "",
+            http_version=str(data.get("http_version") or "1.1"),
+            headers=[tuple(h) for h in data.get("headers") or []],
+            body=data.get("body") or "",
+            error=data.get("error"),
+            duration=float(data.get("duration") or 0.0),
+        )
+
+    def header(self, name: str) -> Optional[str]:
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return None
+
+    def to_curl_output(self) -> Tuple[str, str]:
+        """
+        Render the exchange as curl -v would print it: (stdout, stderr).
+
+        HTTP/2 header names are lower-cased like curl shows them.
+        """
+        parts = urlsplit(self.request.url)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        version = "HTTP/2" if self.http_version == "2" else "HTTP/1.1"
+
+        trace = [
+            f"> {self.request.method} {target} {version}",
+            f"> Host: {parts.netloc}",
+        ]
+        trace += [f"> {name}: {value}" for name, value in self.request.headers]
+        trace.append(">")
+        if self.error is not None:
+            trace.append(f"* {self.error}")
+            return "", "\n".join(trace)
+
+        if self.http_version == "2":
+            trace.append(f"< HTTP/2 {self.status}")
+        else:
+            status_line = f"< HTTP/{self.http_version} {self.status}"
+            trace.append(
+                f"{status_line} {self.reason}" if self.reason else status_line
+            )
+        for name, value in self.headers:
+            if self.http_version == "2":
+                name = name.lower()
+            trace.append(f"< {name}: {value}")
+        trace.append("<")
+        # execute_command strips curl's stdout the same way
+        return self.body.strip(), "\n".join(trace)
+
+    def to_parsed_output(self) -> Dict[str, Any]:
+        """
+        Return what parse_curl_output() yields for to_curl_output().
+
+        Status and headers come from the structured response instead of
+        being parsed back out of the trace. The curl text is still
+        rendered: raw_output and error carry it, and the payload is looked
+        up in it the way parse_curl_output() does.
+        """
+        output, error = self.to_curl_output()
+        result: Dict[str, Any] = {
+            "raw_output": output,
+            "error": error,
+            "reason": None,
+            "http_status": self.status if self.error is None else None,
+        }
+        headers = {}
+        if self.error is None:
+            for name, value in self.headers:
+                headers[name.strip().lower()] = value.strip()
+        result["headers"] = headers
+        result["raw_output"] = ParsedResponse(output, headers)
+
+        # parse_curl_output only finds a payload after a bare "<" line,
+        # which curl never prints to stdout; mirror that for odd bodies
+        payload = None
+        response = output or error
+        lines = response.splitlines()
+        header_end_idx = None
+        for i, line in enumerate(lines):
+            if line.strip() == "<":
+                header_end_idx = i
+        if header_end_idx is not None and header_end_idx + 1 < len(lines):
+            possible_json = "\n".join(lines[header_end_idx + 1 :]).strip()
+            if possible_json:
+                try:
+                    payload = json.loads(possible_json)
+                except ValueError:
+                    payload = possible_json
+        result["response_payload"] = payload
+
+        reason_match = re.search(r"Reason:\s*(.*)", response)
+        if reason_match:
+            result["reason"] = reason_match.group(1).strip()
+        if result["http_status"] is None and not payload and not headers:
+            result["is_kubectl_logs"] = True
+        return result
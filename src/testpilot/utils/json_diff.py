@@ -1,4 +1,5 @@
-from typing import Any, Dict, List, Tuple
+import math
+from typing import Any, Dict, List, Optional, Tuple
 
 
 def _flatten_leaves(obj: Any, prefix: str = "") -> List[Tuple[str, Any]]:
@@ -39,3 +40,93 @@ def json_match_percent(
     matches = sum(1 for leaf in exp_leaves if leaf in act_leaves)
 
     return matches / len(exp_leaves) * 100.0
+
+
+class _NotJson(Exception):
+    """Raised when a value is not plain JSON data."""
+
+
+_NAN_KEY = ("nan",)
+_JSON_TYPES = (dict, list, str, int, float, bool, type(None))
+
+
+def _element_key(value: Any) -> Any:
+    """
+    Hashable key of a list element with DeepDiff ignore_order semantics.
+
+    Inside lists DeepDiff compares DeepHash values: numbers compare by
+    value (1 == 1.0, NaN == NaN), nested lists ignore order and
+    repetition, and bools, strings and None keep their type.
+    """
+    kind = type(value)
+    if kind is str:
+        return ("s", value)
+    if value is None:
+        return ("z",)
+    if kind is bool:
+        return ("b", value)
+    if kind is int:
+        return ("d", value)
+    if kind is float:
+        return _NAN_KEY if math.isnan(value) else ("d", value)
+    if kind is dict:
+        items = []
+        for k, v in value.items():
+            if type(k) is not str:
+                raise _NotJson(k)
+            items.append((k, _element_key(v)))
+        return ("o", frozenset(items))
+    if kind is list:
+        return ("a", frozenset(_element_key(v) for v in value))
+    raise _NotJson(value)
+
+
+def _lists_equal(expected: List[Any], actual: List[Any]) -> bool:
+    # ignore_order without report_repetition compares the sets of elements
+    wanted = {_element_key(v) for v in expected}
+    seen = set()
+    for v in actual:
+        key = _element_key(v)
+        if key not in wanted:
+            return False
+        seen.add(key)
+    return len(seen) == len(wanted)
+
+
+def _values_equal(expected: Any, actual: Any) -> bool:
+    if expected is actual:
+        return True
+    kind = type(expected)
+    if kind is not type(actual):
+        if kind not in _JSON_TYPES or type(actual) not in _JSON_TYPES:
+            raise _NotJson(actual)
+        return False
+    if kind is dict:
+        if len(expected) != len(actual):
+            return False
+        for k, v in expected.items():
+            if type(k) is not str:
+                raise _NotJson(k)
+            if k not in actual or not _values_equal(v, actual[k]):
+                return False
+        return True
+    if kind is list:
+        return _lists_equal(expected, actual)
+    if kind not in _JSON_TYPES:
+        raise _NotJson(expected)
+    return expected == actual
+
+
+def json_equal(expected: Any, actual: Any) -> Optional[bool]:
+    """
+    Pass/fail verdict of DeepDiff(expected, actual, ignore_order=True).
+
+    Lists are matched through hashed element keys instead of DeepDiff's
+    pairwise search, and the walk stops at the first difference. Returns
+    None when either side holds anything but dict/list/str/number/bool/
+    None data, so the caller can fall back to DeepDiff.
+    """
+    try:
+        return _values_equal(expected, actual)
+    except (_NotJson, RecursionError):
+        return None
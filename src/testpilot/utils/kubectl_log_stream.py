@@ -0,0 +1,358 @@
+"""
+Streaming kubectl/oc log collection for TestPilot
+
+Attaches to `kubectl logs -f` (locally via subprocess or remotely over an SSH
+channel) and hands every line to a matcher as soon as it arrives. Collection
+stops when the matcher is satisfied or a deadline expires, instead of always
+waiting for the full `capture_duration`.
+
+Closing an SSH channel does not stop the remote command by itself: without
+a pty sshd sends no signal, and `kubectl logs -f` on a quiet pod would keep
+running on the jump host. Streams with a deadline therefore run under
+`timeout`, and open-ended ones (tailers, pod watches) get a pty, so closing
+the channel hangs the command up. A pty merges the remote stderr into the
+lines. Streams that write to stdin (HTTP agents) get neither.
+"""
+
+import math
+import os
+import queue
+import shlex
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from .logger import get_logger
+from .ssh_output import ChannelOutputReader
+
+logger = get_logger("TestPilot.LogStream")
+
+LineMatcher = Callable[[str], bool]
+
+_EOF = object()
+_POLL_INTERVAL = 0.1
+# Seconds a remote stream may outlive its deadline before `timeout` ends it
+_REMOTE_MARGIN = 5
+
+
+class LogLineStream:
+    """
+    Line iterator over the output of a long-running command.
+
+    Uses the host's SSH connection when the connector has use_ssh enabled,
+    otherwise a local subprocess. Lines are read on a background thread so
+    callers can poll with a timeout and stop at any point. With stdin=True
+    the command's stdin stays open for write(). An SSH stream holds one of
+    the host's channel pool slots until close(). With time_limit set, the
+    remote command is killed after that many seconds even if the channel
+    was lost.
+    """
+
+    def __init__(
+        self,
+        command: str,
+        host: str = None,
+        connector=None,
+        stdin: bool = False,
+        time_limit: Optional[float] = None,
+    ):
+        self.command = command
+        self.host = host
+        self.connector = connector
+        self.stdin = stdin
+        self.time_limit = time_limit
+        self._lines: "queue.Queue" = queue.Queue()
+        self._errors: List[str] = []
+        self._process = None
+        self._channel = None
+        self._held = None
+        self._channel_reader = None
+        self._reader = None
+        self._stderr_reader = None
+        self._closed = False
+        self.eof = False
+
+    def start(self) -> "LogLineStream":
+        if self.connector is not None and getattr(
+            self.connector, "use_ssh", False
+        ):
+            self._start_ssh()
+        else:
+            self._start_local()
+        return self
+
+    def _start_local(self) -> None:
+        self._process = subprocess.Popen(
+            self.command,
+            shell=True,
+            stdin=subprocess.PIPE if self.stdin else None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            bufsize=1,
+            # Own process group, so close() also stops `kubectl` under the
+            # shell and the pipes reach EOF.
+            start_new_session=(os.name == "posix"),
+        )
+        self._reader = threading.Thread(
+            target=self._read_local, name="testpilot-logstream", daemon=True
+        )
+        self._reader.start()
+        self._stderr_reader = threading.Thread(
+            target=self._drain_local_stderr,
+            name="testpilot-logstream-err",
+            daemon=True,
+        )
+        self._stderr_reader.start()
+
+    def _read_local(self) -> None:
+        try:
+            for line in self._process.stdout:
+                self._lines.put(line.rstrip("\r\n"))
+        except (ValueError, OSError):
+            pass  # pipe closed by close()
+        finally:
+            self._lines.put(_EOF)
+
+    def _drain_local_stderr(self) -> None:
+        try:
+            for line in self._process.stderr:
+                self._errors.append(line.rstrip("\r\n"))
+        except (ValueError, OSError):
+            pass
+
+    def _start_ssh(self) -> None:
+        conn = self.connector.get_connection(self.host, hold_channel=True)
+        if conn is None:
+            raise RuntimeError(f"No SSH connection for host {self.host}")
+        self._held = conn
+        try:
+            self._channel = conn.get_transport().open_session()
+            command = self.command
+            if self.time_limit is not None:
+                command = (
+                    f"timeout {math.ceil(self.time_limit)} "
+                    f"sh -c {shlex.quote(command)}"
+                )
+            elif not self.stdin:
+                # sshd hangs up the command when a channel with a pty closes
+                self._channel.get_pty()
+            self._channel.exec_command(command)
+        except Exception:
+            self._release_slot()
+            raise
+        self._channel_reader = ChannelOutputReader(
+            self._channel, keep_stdout=False, poll_interval=_POLL_INTERVAL
+        )
+        self._reader = threading.Thread(
+            target=self._read_ssh, name="testpilot-logstream", daemon=True
+        )
+        self._reader.start()
+
+    def _read_ssh(self) -> None:
+        try:
+            for line in self._channel_reader.lines(lambda: self._closed):
+                self._lines.put(line)
+        except Exception as e:
+            logger.debug(f"SSH log stream on {self.host} ended: {e}")
+        finally:
+            self._lines.put(_EOF)
+
+    def read_line(self, timeout: float) -> Optional[str]:
+        """
+        Return the next line, or None if none arrived within timeout.
+
+        Sets self.eof once the command has exited and all lines were read.
+        """
+        if self.eof:
+            return None
+        try:
+            item = self._lines.get(timeout=max(0.0, timeout))
+        except queue.Empty:
+            return None
+        if item is _EOF:
+            self.eof = True
+            return None
+        return item
+
+    def write(self, data: str) -> None:
+        """Send data to the command's stdin."""
+        if self._channel is not None:
+            self._channel.sendall(data.encode())
+        elif self._process is not None and self._process.stdin is not None:
+            self._process.stdin.write(data)
+            self._process.stdin.flush()
+        else:
+            raise RuntimeError("Stream was not started with stdin=True")
+
+    @property
+    def error_output(self) -> str:
+        errors = list(self._errors)
+        if self._channel_reader is not None:
+            errors.append(self._channel_reader.stderr.text())
+        return "\n".join(e.strip() for e in errors if e.strip())
+
+    def close(self) -> None:
+        """Stop the underlying command; safe to call more than once."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._process is not None and self._process.stdin is not None:
+            try:
+                self._process.stdin.close()
+            except (OSError, ValueError):
+                pass
+        if self._process is not None and self._process.poll() is None:
+            self._signal_process(signal.SIGTERM)
+            try:
+                self._process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._signal_process(signal.SIGKILL)
+                self._process.wait()
+        if self._stderr_reader is not None:
+            self._stderr_reader.join(timeout=1)
+        if self._channel is not None:
+            try:
+                self._channel.close()
+            except Exception:
+                pass
+            if self._reader is not None:
+                self._reader.join(timeout=1)
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        held, self._held = self._held, None
+        if held is not None:
+            self.connector.release_connection(self.host, held)
+
+    def _signal_process(self, sig) -> None:
+        try:
+            if os.name == "posix":
+                os.killpg(self._process.pid, sig)
+            else:
+                self._process.terminate()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def __enter__(self) -> "LogLineStream":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+@dataclass
+class LogStreamResult:
+    """Outcome of streaming one pod's logs."""
+
+    command: str
+    output: str
+    error: str
+    matched: bool
+    timed_out: bool
+    duration: float
+
+
+def stream_until_match(
+    command: str,
+    matcher: Optional[LineMatcher],
+    timeout: float,
+    host: str = None,
+    connector=None,
+    stop_event: Optional[threading.Event] = None,
+) -> LogStreamResult:
+    """
+    Follow a logs command until matcher(line) is True or timeout expires.
+
+    Args:
+        command: A follow command such as `kubectl logs -f --since=1s pod`
+        matcher: Called for each line; None collects until the deadline
+        timeout: Seconds to wait at most
+        host: Target host name (used for SSH execution)
+        connector: SSHConnector or None for local execution
+        stop_event: Set by another stream to stop this one early
+
+    Returns:
+        LogStreamResult with every line read so far
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    lines: List[str] = []
+    matched = False
+    timed_out = False
+
+    with LogLineStream(
+        command, host, connector, time_limit=timeout + _REMOTE_MARGIN
+    ) as stream:
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            line = stream.read_line(min(_POLL_INTERVAL, remaining))
+            if line is None:
+                if stream.eof:
+                    break
+                continue
+            lines.append(line)
+            if matcher is not None and matcher(line):
+                matched = True
+                if stop_event is not None:
+                    stop_event.set()
+                break
+
+    error = stream.error_output
+    duration = time.monotonic() - start
+    logger.debug(
+        f"Log stream on {host} finished in {duration:.2f}s "
+        f"(matched={matched}, timed_out={timed_out}, lines={len(lines)})"
+    )
+    return LogStreamResult(
+        command=command,
+        output="\n".join(lines),
+        error=error,
+        matched=matched,
+        timed_out=timed_out,
+        duration=duration,
+    )
+
+
+def stream_many_until_match(
+    commands: List[str],
+    matcher: Optional[LineMatcher],
+    timeout: float,
+    host: str = None,
+    connector=None,
+) -> List[LogStreamResult]:
+    """
+    Follow several pods at once; the first matching line stops them all.
+
+    Results are returned in the order of commands.
+    """
+    if not commands:
+        return []
+    stop_event = threading.Event()
+    with ThreadPoolExecutor(
+        max_workers=min(len(commands), 10),
+        thread_name_prefix="testpilot-logstream",
+    ) as executor:
+        futures = [
+            executor.submit(
+                stream_until_match,
+                command,
+                matcher,
+                timeout,
+                host,
+                connector,
+                stop_event,
+            )
+            for command in commands
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,390 @@
+"""
+Long-lived kubectl/oc log tailers for TestPilot
+
+A LogTailer follows one pod's logs for the whole run and keeps the most
+recent lines in a bounded ring buffer, each stamped with the time it was
+received. Log-validation steps query a time window of that buffer (for
+example from just before the preceding HTTP request until now) instead of
+starting a fresh `kubectl logs -f` per step, which removes per-step process
+start-up and the gaps between `--since` windows.
+
+When a stream ends (pod restart, dropped channel) the tailer starts it again
+with a --since window reaching back to its last line. The lines kubectl
+replays from that window are skipped up to the last buffered one, matched by
+pod timestamp when the command uses --timestamps and by content otherwise,
+so a replayed line is never stamped with a new receive time. Restarts back
+off exponentially; after max_restarts streams in a row that ended within
+_HEALTHY_STREAM seconds (the pod was deleted or renamed) the tailer stops
+and leaves its registry. Lines do not count: over SSH the stream has a pty,
+so kubectl's error message arrives as a line.
+
+Tailers are shared per (host, namespace, pod, container) through a
+LogTailerRegistry; the process-wide registry is returned by
+get_log_tailer_registry() and stopped with shutdown_log_tailers().
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .kubectl_log_stream import LogLineStream
+from .logger import get_logger
+
+logger = get_logger("TestPilot.LogTailer")
+
+LineMatcher = Callable[[str], bool]
+TailerKey = Tuple[str, Optional[str], str, Optional[str]]
+
+DEFAULT_MAX_LINES = 5000
+DEFAULT_MAX_RESTARTS = 5
+_RESTART_DELAY = 1.0
+_MAX_RESTART_DELAY = 30.0
+# A stream that lasted this long resets the restart count
+_HEALTHY_STREAM = 10.0
+# How long replayed lines are held back to find the last buffered one
+_REPLAY_SETTLE = 0.5
+
+# `kubectl logs --timestamps` prefix (RFC 3339, up to nanoseconds)
+_TIMESTAMP_RE = re.compile(
+    r"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.(\d{1,9}))?(?:Z|[+-]\d\d:\d\d)\s"
+)
+# The logs subcommand as a word of its own after the kubectl/oc binary
+_LOGS_RE = re.compile(r"(?<![\w-])(?:kubectl|oc)(?!\S).*?(?<!\S)logs(?!\S)")
+_BARE_LOGS_RE = re.compile(r"(?<!\S)logs(?!\S)")
+
+
+def since_to_seconds(since: str, default: float = 1.0) -> float:
+    """Convert a kubectl --since value such as 5s, 2m or 1h to seconds."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*", str(since))
+    if not match:
+        return default
+    value = float(match.group(1))
+    return value * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+
+
+def _with_since(follow_command: str, seconds: float) -> str:
+    """Replace (or add) the --since flag of a `logs -f` command."""
+    since = f"--since={max(1, int(seconds + 0.999))}s"
+    if re.search(r"--since=\S+", follow_command):
+        return re.sub(r"--since=\S+", since, follow_command, count=1)
+    match = _LOGS_RE.search(follow_command) or _BARE_LOGS_RE.search(
+        follow_command
+    )
+    if match is None:
+        return follow_command
+    end = match.end()
+    return f"{follow_command[:end]} {since}{follow_command[end:]}"
+
+
+def _pod_timestamp(line: str) -> Optional[str]:
+    """Sortable pod timestamp of a --timestamps line, or None."""
+    match = _TIMESTAMP_RE.match(line)
+    if not match:
+        return None
+    return f"{match.group(1)}.{(match.group(2) or '').ljust(9, '0')}"
+
+
+class LogTailer:
+    """
+    Follow one pod's logs in the background and buffer recent lines.
+
+    The tailer restarts its log stream if it ends (pod restart, dropped
+    channel) and asks for the time since its last line, so no lines are
+    lost in between and none are buffered twice.
+    """
+
+    def __init__(
+        self,
+        follow_command: str,
+        host: str = None,
+        connector=None,
+        max_lines: int = DEFAULT_MAX_LINES,
+        max_restarts: int = DEFAULT_MAX_RESTARTS,
+        on_stop: Optional[Callable[["LogTailer"], None]] = None,
+    ):
+        """
+        Initialize log tailer.
+
+        Args:
+            follow_command: `kubectl logs -f ... <pod>` command to run
+            host: Target host name (used for SSH execution)
+            connector: SSHConnector or None for local execution
+            max_lines: Ring buffer size; older lines are dropped
+            max_restarts: Restarts in a row of streams that ended early
+                before the tailer gives up
+            on_stop: Called with the tailer when it gives up
+        """
+        self.follow_command = follow_command
+        self.host = host
+        self.connector = connector
+        self.max_restarts = max_restarts
+        self._on_stop = on_stop
+        # (sequence number, receive time, line)
+        self._buffer: deque = deque(maxlen=max_lines)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._stream: Optional[LogLineStream] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        # Last buffered (pod timestamp, line) while a restarted stream
+        # replays its --since window, with the replayed lines held back
+        self._replay: Optional[Tuple[Optional[str], str]] = None
+        self._pending: List[Tuple[float, str]] = []
+        self._replay_until: Optional[float] = None
+        self._failures = 0
+        self._stream_started = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.restarts = 0
+
+    def start(self, backfill_seconds: float = 1.0) -> "LogTailer":
+        """Start following; backfill_seconds of history is read first."""
+        self.started_at = time.time()
+        self._stream = LogLineStream(
+            _with_since(self.follow_command, backfill_seconds),
+            self.host,
+            self.connector,
+        ).start()
+        self._thread = threading.Thread(
+            target=self._pump, name="testpilot-logtail", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def _pump(self) -> None:
+        while not self._stopped.is_set():
+            line = self._stream.read_line(0.5)
+            if line is not None:
+                self._receive(line)
+            if (
+                self._replay_until is not None
+                and time.monotonic() >= self._replay_until
+            ):
+                self._end_replay()
+            if (
+                line is None
+                and self._stream.eof
+                and not self._stopped.is_set()
+            ):
+                self._restart()
+
+    def _append(self, received_at: float, line: str) -> None:
+        with self._cond:
+            self._seq += 1
+            self._buffer.append((self._seq, received_at, line))
+            self._cond.notify_all()
+
+    def _receive(self, line: str) -> None:
+        if self._replay is None:
+            self._append(time.time(), line)
+            return
+        last_stamp, _ = self._replay
+        stamp = _pod_timestamp(line)
+        if last_stamp is not None and stamp is not None:
+            if stamp > last_stamp:
+                self._replay = None
+                self._append(time.time(), line)
+            return
+        if self._replay_until is None:
+            self._replay_until = time.monotonic() + _REPLAY_SETTLE
+        self._pending.append((time.time(), line))
+
+    def _end_replay(self) -> None:
+        """Buffer the held-back lines that follow the last buffered one."""
+        if self._replay is not None:
+            _, last_line = self._replay
+            pending = self._pending
+            for index in range(len(pending) - 1, -1, -1):
+                if pending[index][1] == last_line:
+                    pending = pending[index + 1 :]
+                    break
+            for received_at, line in pending:
+                self._append(received_at, line)
+        self._replay = None
+        self._pending = []
+        self._replay_until = None
+
+    def _restart(self) -> None:
+        self._stream.close()
+        self._end_replay()
+        if time.monotonic() - self._stream_started >= _HEALTHY_STREAM:
+            self._failures = 0
+        if self._failures >= self.max_restarts:
+            logger.warning(
+                f"Log tailer on {self.host} stopped after {self._failures} "
+                f"restarts in a row: {self.follow_command}"
+            )
+            self._give_up()
+            return
+        delay = min(_RESTART_DELAY * 2**self._failures, _MAX_RESTART_DELAY)
+        self._failures += 1
+        logger.debug(
+            f"Log stream ended on {self.host}, restarting in {delay:g}s: "
+            f"{self.follow_command}"
+        )
+        if self._stopped.wait(delay):
+            return
+        with self._cond:
+            last = self._buffer[-1] if self._buffer else None
+        gap = time.time() - (last[1] if last else self.started_at)
+        self.restarts += 1
+        self._stream_started = time.monotonic()
+        try:
+            stream = LogLineStream(
+                _with_since(self.follow_command, gap + _RESTART_DELAY),
+                self.host,
+                self.connector,
+            ).start()
+        except Exception as e:
+            # The pump sees the old stream at EOF and tries again
+            logger.warning(f"Could not restart log tailer on {self.host}: {e}")
+            return
+        if last is not None:
+            self._replay = (_pod_timestamp(last[2]), last[2])
+        self._stream = stream
+
+    def _give_up(self) -> None:
+        self._stopped.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._on_stop is not None:
+            self._on_stop(self)
+
+    @property
+    def alive(self) -> bool:
+        return self._thread is not None and not self._stopped.is_set()
+
+    def lines_between(
+        self, start: float, end: Optional[float] = None
+    ) -> List[str]:
+        """Return buffered lines received in [start, end] (end: now)."""
+        end = time.time() if end is None else end
+        with self._cond:
+            return [line for _, ts, line in self._buffer if start <= ts <= end]
+
+    def wait_for(
+        self,
+        start: float,
+        matcher: Optional[LineMatcher],
+        timeout: float,
+        stop_event: Optional[threading.Event] = None,
+    ) -> Tuple[List[str], bool]:
+        """
+        Wait until a line received after start satisfies matcher.
+
+        Returns (lines received since start, matched). Without a matcher
+        this waits the full timeout, like a capture would. Setting
+        stop_event (e.g. from another pod's waiter) ends the wait early;
+        a match sets it.
+        """
+        deadline = time.monotonic() + timeout
+        checked_seq = -1
+        while True:
+            with self._cond:
+                entries = [e for e in self._buffer if e[1] >= start]
+                seen_seq = self._seq
+            window = [line for _, _, line in entries]
+            if matcher is not None:
+                # Run the matcher outside the lock so the pump keeps going
+                for seq, _, line in entries:
+                    if seq > checked_seq and matcher(line):
+                        if stop_event is not None:
+                            stop_event.set()
+                        return window, True
+                if entries:
+                    checked_seq = entries[-1][0]
+            remaining = deadline - time.monotonic()
+            stopped = stop_event is not None and stop_event.is_set()
+            if remaining <= 0 or stopped or not self.alive:
+                return window, False
+            with self._cond:
+                if self._seq == seen_seq:
+                    self._cond.wait(min(remaining, 0.1))
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._stream is not None:
+            self._stream.close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        with self._cond:
+            self._cond.notify_all()
+
+
+class LogTailerRegistry:
+    """Share one LogTailer per (host, namespace, pod, container)."""
+
+    def __init__(
+        self,
+        max_lines: int = DEFAULT_MAX_LINES,
+        max_restarts: int = DEFAULT_MAX_RESTARTS,
+    ):
+        self.max_lines = max_lines
+        self.max_restarts = max_restarts
+        self._lock = threading.Lock()
+        self._tailers: Dict[TailerKey, LogTailer] = {}
+
+    def get_or_start(
+        self,
+        key: TailerKey,
+        follow_command: str,
+        host: str = None,
+        connector=None,
+        backfill_seconds: float = 1.0,
+    ) -> LogTailer:
+        """Return the running tailer for key, starting one if needed."""
+        with self._lock:
+            tailer = self._tailers.get(key)
+            if tailer is not None and tailer.alive:
+                return tailer
+            tailer = LogTailer(
+                follow_command,
+                host,
+                connector,
+                max_lines=self.max_lines,
+                max_restarts=self.max_restarts,
+                on_stop=lambda stopped: self._forget(key, stopped),
+            ).start(backfill_seconds)
+            self._tailers[key] = tailer
+            logger.debug(f"Started log tailer {key}: {follow_command}")
+            return tailer
+
+    def _forget(self, key: TailerKey, tailer: LogTailer) -> None:
+        with self._lock:
+            if self._tailers.get(key) is tailer:
+                del self._tailers[key]
+
+    def __len__(self) -> int:
+        return len(self._tailers)
+
+    def stop_all(self) -> None:
+        with self._lock:
+            tailers, self._tailers = list(self._tailers.values()), {}
+        for tailer in tailers:
+            tailer.stop()
+
+
+_registry: Optional[LogTailerRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_log_tailer_registry(
+    max_lines: int = DEFAULT_MAX_LINES,
+    max_restarts: int = DEFAULT_MAX_RESTARTS,
+) -> LogTailerRegistry:
+    """Return the process-wide tailer registry, creating it on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LogTailerRegistry(max_lines, max_restarts)
+        return _registry
+
+
+def shutdown_log_tailers() -> None:
+    """Stop every tailer started through the process-wide registry."""
+    global _registry
+    with _registry_lock:
+        registry, _registry = _registry, None
+    if registry is not None:
+        registry.stop_all()
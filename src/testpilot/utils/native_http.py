@@ -0,0 +1,210 @@
+"""
+In-process HTTP execution for TestPilot
+
+In pod_mode every HTTP row is a plain curl command run through a shell, and
+its -v output is parsed again afterwards. The native backend recovers the
+request from that curl command and sends it from the TestPilot process
+itself over pooled keep-alive connections. The structured status, headers
+and body are handed to the validators directly.
+
+HTTP/1.1 goes through a requests Session. h2c prior knowledge (curl's
+--http2-prior-knowledge) and HTTP/2 over TLS use httpx when it is installed
+(`pip install httpx[http2]`). Without httpx, requests that need prior
+knowledge are left to curl under "auto" and "2"; only http_version "1.1"
+sends them as HTTP/1.1.
+
+Requests carry the User-Agent and Accept headers the local curl would
+send (no User-Agent if curl is not installed), unless the row sets them.
+"""
+
+import functools
+import subprocess
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import SKIP_HEADER
+
+from .http_exchange import HttpExchange, HttpRequest
+from .logger import get_logger
+
+try:
+    import httpx
+except ImportError:  # optional: only needed for HTTP/2
+    httpx = None
+
+logger = get_logger("TestPilot.NativeHttp")
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_POOL_SIZE = 20
+
+
+@functools.lru_cache(maxsize=None)
+def curl_user_agent() -> Optional[str]:
+    """User-Agent the local curl sends (curl/<version>), or None."""
+    try:
+        output = subprocess.run(
+            ["curl", "--version"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            timeout=5,
+        ).stdout
+        return f"curl/{output.split()[1]}"
+    except (OSError, subprocess.SubprocessError, IndexError):
+        return None
+
+
+def curl_default_headers() -> Dict[str, str]:
+    """Headers curl adds to every request, in curl's order."""
+    headers = {}
+    user_agent = curl_user_agent()
+    if user_agent:
+        headers["User-Agent"] = user_agent
+    headers["Accept"] = "*/*"
+    return headers
+
+
+class NativeHttpClient:
+    """Send HttpRequests in-process over pooled connections."""
+
+    def __init__(
+        self,
+        http_version: str = "auto",
+        pool_size: int = DEFAULT_POOL_SIZE,
+    ):
+        """
+        Initialize native HTTP client.
+
+        Args:
+            http_version: "auto" (HTTP/2 via httpx where curl would use
+                it), "2" (HTTP/2 only) or "1.1" (always HTTP/1.1)
+            pool_size: Connections kept per origin
+        """
+        self.http_version = str(http_version)
+        self.requests = 0
+        self._session = requests.Session()
+        # Send what curl sends, not the requests defaults; SKIP_HEADER
+        # keeps urllib3 from adding its own User-Agent
+        self._session.headers.clear()
+        self._session.headers.update(
+            {"User-Agent": SKIP_HEADER, **curl_default_headers()}
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._h2_clients = {}
+        self._lock = threading.Lock()
+
+    def supports(self, request: HttpRequest) -> bool:
+        """Return False if the request must be left to curl."""
+        if httpx is not None or self.http_version == "1.1":
+            return True
+        # Sending a prior-knowledge request as HTTP/1.1 would test a
+        # different protocol than the row asks for
+        return not request.http2_prior_knowledge
+
+    def _use_http2(self, request: HttpRequest) -> bool:
+        if self.http_version == "1.1" or httpx is None:
+            return False
+        return request.http2_prior_knowledge or self.http_version == "2"
+
+    def _h2_client(self, scheme: str, insecure: bool):
+        key = (scheme, insecure)
+        with self._lock:
+            client = self._h2_clients.get(key)
+            if client is None:
+                client = httpx.Client(
+                    http1=scheme == "https", http2=True, verify=not insecure
+                )
+                # Replace the httpx defaults (User-Agent included)
+                client.headers.clear()
+                client.headers.update(curl_default_headers())
+                self._h2_clients[key] = client
+            return client
+
+    def send(
+        self, request: HttpRequest, timeout: float = DEFAULT_TIMEOUT
+    ) -> HttpExchange:
+        """Send request and return the exchange (error set on failure)."""
+        started_at = time.time()
+        start = time.perf_counter()
+        exchange = HttpExchange(request=request, started_at=started_at)
+        body = request.body.encode() if request.body is not None else None
+        timeout = request.timeout or timeout
+        try:
+            if self._use_http2(request):
+                client = self._h2_client(
+                    urlsplit(request.url).scheme, request.insecure
+                )
+                response = client.request(
+                    request.method,
+                    request.url,
+                    headers=request.headers,
+                    content=body,
+                    timeout=timeout,
+                )
+                exchange.status = response.status_code
+                exchange.reason = response.reason_phrase
+                exchange.http_version = (
+                    "2" if response.http_version == "HTTP/2" else "1.1"
+                )
+                exchange.headers = list(response.headers.items())
+                content = response.content
+            else:
+                response = self._session.request(
+                    request.method,
+                    request.url,
+                    headers=dict(request.headers),
+                    data=body,
+                    timeout=timeout,
+                    verify=not request.insecure,
+                    allow_redirects=False,
+                )
+                exchange.status = response.status_code
+                exchange.reason = response.reason or ""
+                exchange.http_version = (
+                    "1.0" if response.raw.version == 10 else "1.1"
+                )
+                exchange.headers = list(response.raw.headers.items())
+                content = response.content
+            exchange.body = content.decode("utf-8", "replace")
+        except Exception as e:
+            exchange.error = f"{type(e).__name__}: {e}"
+        exchange.duration = time.perf_counter() - start
+        self.requests += 1
+        return exchange
+
+    def close(self) -> None:
+        self._session.close()
+        with self._lock:
+            clients, self._h2_clients = list(self._h2_clients.values()), {}
+        for client in clients:
+            client.close()
+
+
+_client: Optional[NativeHttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_native_http_client(http_version: str = "auto") -> NativeHttpClient:
+    """Return the process-wide native client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = NativeHttpClient(http_version=http_version)
+        return _client
+
+
+def shutdown_native_http_client() -> None:
+    """Close the process-wide native client's connections."""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
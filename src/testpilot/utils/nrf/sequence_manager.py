@@ -6,6 +6,7 @@ import json
 import logging
 from typing import Any, Dict, List, Optional, Union
 
+from ..parsed_response import load_json
 from .instance_tracker import NRFInstanceTracker
 
 logger = logging.getLogger("NRFSequenceManager")
@@ -131,7 +132,7 @@ def _legacy_nrf_handling(
         return None
 
     try:
-        parsed = json.loads(payload)
+        parsed = load_json(payload)
         nf_instance_id = None
 
         if isinstance(parsed, dict):
@@ -164,7 +165,7 @@ def _extract_nf_instance_id(
     try:
         # Handle both string (JSON) and dict payloads
         if isinstance(payload, str):
-            parsed = json.loads(payload)
+            parsed = load_json(payload)
         elif isinstance(payload, dict):
             parsed = payload
         elif isinstance(payload, list):
@@ -0,0 +1,119 @@
+"""
+Parse-once response text for TestPilot
+
+A step's response body used to be decoded by parse_curl_output, check_diff,
+validate_response_enhanced (once per validator), KubectlPatternValidator
+and again by the exporters. ParsedResponse is the response text itself (a
+str subclass, so every existing string check keeps working) that memoises
+the decoded JSON, the compact JSON string used for pattern matching, the
+compact header string, the line-split view and the canonical digest
+check_diff compares payloads by. load_json() hands out the memoised value,
+so each body is decoded at most once per step.
+
+The decoded value is shared by all readers and must be treated as
+read-only.
+"""
+
+import hashlib
+import json
+from functools import cached_property
+from typing import Any, Dict, Optional, Tuple
+
+
+def canonical_json(value: Any) -> str:
+    """Sorted-key compact JSON: equal for equal JSON documents."""
+    return json.dumps(
+        value, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def json_digest(value: Any) -> str:
+    """SHA-256 of the canonical JSON form of value."""
+    return _sha256(canonical_json(value))
+
+
+class ParsedResponse(str):
+    """Response text with its JSON decoding and derived views memoised."""
+
+    def __new__(
+        cls, text: str, headers: Optional[Dict[str, str]] = None
+    ) -> "ParsedResponse":
+        obj = super().__new__(cls, text)
+        # Kept as the same object so validators can tell it is this
+        # response's header map
+        obj.headers = headers if headers is not None else {}
+        return obj
+
+    @classmethod
+    def wrap(cls, value: Any, headers: Optional[Dict[str, str]] = None) -> Any:
+        """Return value as a ParsedResponse; non-strings pass through."""
+        if isinstance(value, cls) or not isinstance(value, str):
+            return value
+        return cls(value, headers)
+
+    @cached_property
+    def _decoded(self) -> Tuple[Any, Optional[json.JSONDecodeError]]:
+        try:
+            return json.loads(self), None
+        except json.JSONDecodeError as e:
+            return None, e
+
+    @property
+    def is_json(self) -> bool:
+        return self._decoded[1] is None
+
+    def json(self) -> Any:
+        """Decoded body; raises json.JSONDecodeError like json.loads."""
+        value, error = self._decoded
+        if error is not None:
+            raise json.JSONDecodeError(error.msg, error.doc, error.pos)
+        return value
+
+    @cached_property
+    def compact(self) -> str:
+        """Body as validate_response_enhanced matches patterns against it."""
+        value, error = self._decoded
+        if error is None and isinstance(value, (dict, list)):
+            return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+        return str(value if error is None else self)
+
+    @cached_property
+    def canonical(self) -> Optional[str]:
+        """Sorted-key compact JSON, or None when the text is not JSON."""
+        value, error = self._decoded
+        return canonical_json(value) if error is None else None
+
+    @cached_property
+    def digest(self) -> Optional[str]:
+        """SHA-256 of the canonical form, or None when the text is not JSON."""
+        if self.canonical is None:
+            return None
+        return _sha256(self.canonical)
+
+    @cached_property
+    def headers_compact(self) -> str:
+        return json.dumps(
+            self.headers, separators=(",", ":"), ensure_ascii=False
+        )
+
+    @cached_property
+    def lines(self) -> Tuple[str, ...]:
+        return tuple(self.split("\n"))
+
+    def __copy__(self) -> "ParsedResponse":
+        return self
+
+    def __reduce__(self):
+        # Pickles, deep copies and asdict() get the plain text
+        return (str, (str(self),))
+
+
+def load_json(value: Any) -> Any:
+    """json.loads() that reuses the memoised decoding of a ParsedResponse."""
+    if isinstance(value, ParsedResponse):
+        return value.json()
+    return json.loads(value)
@@ -0,0 +1,177 @@
+"""
+In-memory index of enhanced pattern matches for TestPilot
+
+process_patterns() converts every Excel Pattern_Match into an enhanced
+pattern once per run. The store keeps the result as a
+{(sheet, row_number): converted_pattern} index so validators look a row
+up in O(1) instead of re-reading and scanning the JSON files.
+
+When the store was not filled in memory (e.g. validators used on their
+own), it loads the *enhanced_pattern_matches.json files from the pattern
+directories and reloads them only when a file or directory mtime changes.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .logger import get_logger
+
+logger = get_logger("TestPilot.PatternStore")
+
+PATTERN_FILE_SUFFIX = "enhanced_pattern_matches.json"
+
+_PROJECT_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+)
+
+
+def default_pattern_dirs() -> List[str]:
+    """Directories searched for pattern files, in order."""
+    return [
+        # Where process_patterns --export-patterns writes
+        os.path.join(os.getcwd(), "examples", "data"),
+        os.path.join(os.getcwd(), "examples", "patterns"),
+        os.path.join(_PROJECT_ROOT, "examples", "data"),
+        os.path.join(_PROJECT_ROOT, "examples", "patterns"),
+        # Legacy path
+        os.path.join(_PROJECT_ROOT, "src", "testpilot", "core", "patterns"),
+    ]
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+class EnhancedPatternStore:
+    """O(1) lookup of converted patterns by (sheet name, row number)."""
+
+    def __init__(self, pattern_dirs: Optional[Iterable[str]] = None):
+        """
+        Initialize pattern store.
+
+        Args:
+            pattern_dirs: Directories searched for pattern files when the
+                store is used standalone (default: default_pattern_dirs())
+        """
+        self.pattern_dirs = (
+            list(pattern_dirs)
+            if pattern_dirs is not None
+            else default_pattern_dirs()
+        )
+        self.loads = 0
+        self._lock = threading.Lock()
+        self._index: Dict[Tuple[str, int], Any] = {}
+        self._in_memory = False
+        # path -> mtime of everything the file-based index was built from
+        self._stamps: Optional[Dict[str, Optional[float]]] = None
+
+    def load_data(self, enhanced_data: Dict[str, Any]) -> None:
+        """Index enhanced pattern data produced in this process."""
+        with self._lock:
+            self._index = self._build_index([enhanced_data])
+            self._in_memory = True
+            self._stamps = None
+            self.loads += 1
+        logger.debug(f"Indexed {len(self._index)} enhanced patterns")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index = {}
+            self._in_memory = False
+            self._stamps = None
+
+    def lookup(self, sheet_name: str, row_idx: int) -> Optional[Any]:
+        """Return the converted pattern for the row, or None."""
+        with self._lock:
+            if not self._in_memory:
+                self._refresh_from_files()
+            return self._index.get((sheet_name, row_idx))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @staticmethod
+    def _build_index(
+        documents: Iterable[Dict[str, Any]],
+    ) -> Dict[Tuple[str, int], Any]:
+        index: Dict[Tuple[str, int], Any] = {}
+        for document in documents:
+            sheets = (document or {}).get("enhanced_patterns") or {}
+            for sheet_name, entries in sheets.items():
+                for entry in entries or []:
+                    key = (sheet_name, entry.get("row_number"))
+                    # First file and first entry win, as in a linear scan
+                    index.setdefault(key, entry.get("converted_pattern"))
+        return index
+
+    def _pattern_files(self) -> List[str]:
+        """Pattern files of the first directory that has any."""
+        for dir_path in self.pattern_dirs:
+            if not os.path.isdir(dir_path):
+                continue
+            try:
+                names = sorted(
+                    name
+                    for name in os.listdir(dir_path)
+                    if name.endswith(PATTERN_FILE_SUFFIX)
+                )
+            except OSError:
+                continue
+            if names:
+                return [os.path.join(dir_path, n) for n in names]
+        return []
+
+    def _stale(self) -> bool:
+        if self._stamps is None:
+            return True
+        return any(
+            _mtime(path) != stamp for path, stamp in self._stamps.items()
+        )
+
+    def _refresh_from_files(self) -> None:
+        # Directory mtimes change when files are added or removed, file
+        # mtimes when a file is rewritten
+        if not self._stale():
+            return
+        stamps = {path: _mtime(path) for path in self.pattern_dirs}
+        files = self._pattern_files()
+        documents = []
+        for path in files:
+            stamps[path] = _mtime(path)
+            try:
+                with open(path, "r") as f:
+                    documents.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.error(f"Error loading enhanced pattern matches: {e}")
+        self._index = self._build_index(documents)
+        self._stamps = stamps
+        self.loads += 1
+        logger.debug(
+            f"Loaded {len(self._index)} enhanced patterns from "
+            f"{len(files)} file(s)"
+        )
+
+
+_store: Optional[EnhancedPatternStore] = None
+_store_lock = threading.Lock()
+
+
+def get_pattern_store() -> EnhancedPatternStore:
+    """Return the process-wide pattern store, creating it on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EnhancedPatternStore()
+        return _store
+
+
+def reset_pattern_store() -> None:
+    """Forget the process-wide pattern store."""
+    global _store
+    with _store_lock:
+        _store = None
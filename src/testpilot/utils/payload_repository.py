@@ -0,0 +1,110 @@
+"""
+Payload file repository for TestPilot
+
+Request_Payload and Response_Payload cells may name a JSON file in the
+payloads folder (e.g. 'reg_02_payload_01.json'). NRF suites reuse a handful
+of such files on every host and step, and each use used to re-read the file
+and decode it again in the validators.
+
+The repository reads each file once and hands out the same PayloadEntry
+until the file's mtime or size changes. The entry text is a ParsedResponse,
+so the JSON is decoded at most once for all its users, and the digest
+check_diff compares it by is computed once per file version.
+The decoded value is shared and must be treated as read-only.
+"""
+
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from .logger import get_logger
+from .parsed_response import ParsedResponse
+
+logger = get_logger("TestPilot.PayloadRepository")
+
+
+class PayloadEntry:
+    """A payload file's content, decoded and normalised on demand."""
+
+    def __init__(self, path: str, stamp: Optional[Tuple[int, int]], text: str):
+        self.path = path
+        # (st_mtime_ns, st_size) the text was read at
+        self.stamp = stamp
+        self.text = ParsedResponse(text)
+
+    @property
+    def is_json(self) -> bool:
+        return self.text.is_json
+
+    def json(self) -> Any:
+        """Decoded payload; raises json.JSONDecodeError like json.loads."""
+        return self.text.json()
+
+
+class PayloadRepository:
+    """Payload files read once and reused until they change on disk."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, PayloadEntry] = {}
+        self.reads = 0
+
+    def get(self, path: str) -> PayloadEntry:
+        """
+        Entry for path, re-read when its mtime or size changed.
+
+        Raises:
+            FileNotFoundError: path is not a file
+            OSError: the file could not be read
+        """
+        key = os.path.abspath(path)
+        if not os.path.isfile(key):
+            raise FileNotFoundError(f"Payload file not found: {path}")
+        try:
+            st = os.stat(key)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            # Without a stamp a change could not be seen; read every time
+            stamp = None
+
+        entry = self._entries.get(key)
+        if entry is not None and stamp is not None and entry.stamp == stamp:
+            return entry
+
+        with open(key, "r", encoding="utf-8") as f:
+            text = f.read().strip()
+        entry = PayloadEntry(key, stamp, text)
+        with self._lock:
+            self.reads += 1
+            if stamp is not None:
+                self._entries[key] = entry
+        logger.debug(f"Loaded payload file: {path}")
+        return entry
+
+    def load(self, payloads_dir: str, filename: str) -> PayloadEntry:
+        """Entry for filename inside payloads_dir."""
+        return self.get(os.path.join(payloads_dir, filename.strip()))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_repository: Optional[PayloadRepository] = None
+_repository_lock = threading.Lock()
+
+
+def get_payload_repository() -> PayloadRepository:
+    """Return the process-wide payload repository, creating it on first use."""
+    global _repository
+    with _repository_lock:
+        if _repository is None:
+            _repository = PayloadRepository()
+        return _repository
+
+
+def reset_payload_repository() -> None:
+    """Forget the process-wide payload repository."""
+    global _repository
+    with _repository_lock:
+        _repository = None
@@ -0,0 +1,416 @@
+"""
+Pod inventory cache for TestPilot
+
+Pod-name lookups used to list the namespace on every step: `kubectl get pods
+| grep` for log steps (plus one `kubectl get pod -o jsonpath` per pod to
+filter SLF provgw pods) and `kubectl get po | grep -E | head -n 1` embedded
+in every exec command. A PodInventory lists each (host, namespace) once with
+`kubectl get pods -o json`, keeps names, labels and phase in memory and
+answers substring, regex and label lookups from there.
+
+Entries expire after a TTL, can be refreshed on a lookup miss, and can be
+invalidated by a background `kubectl get pods --watch-only` stream so pod
+restarts are picked up before the TTL runs out.
+
+Exec targets are resolved once per (host, namespace, cli, container) and
+pinned, independent of the TTL, until an exec into the pinned pod fails.
+
+Settings come from the "pod_inventory" section of hosts.json:
+enabled, ttl, refresh_on_miss, watch and direct_exec.
+"""
+
+import json
+import re
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from .config_resolver import get_config_snapshot
+from .kubectl_log_stream import LogLineStream
+from .logger import get_logger
+
+logger = get_logger("TestPilot.PodInventory")
+
+InventoryKey = Tuple[Optional[str], Optional[str], str]
+ExecKey = Tuple[Optional[str], Optional[str], str, str]
+
+DEFAULT_TTL = 30.0
+_FETCH_TIMEOUT = 30
+
+
+@dataclass(frozen=True)
+class PodInfo:
+    """One pod from a `get pods -o json` listing."""
+
+    name: str
+    labels: Mapping[str, str] = field(default_factory=dict)
+    phase: str = ""
+
+    @property
+    def running(self) -> bool:
+        return self.phase == "Running"
+
+
+def parse_pod_list(output: str) -> List[PodInfo]:
+    """
+    Parse `kubectl get pods -o json` output into PodInfo objects.
+
+    Raises ValueError when the output is not a pod list.
+    """
+    try:
+        data = json.loads(output)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"not a JSON pod list: {e}") from e
+    if not isinstance(data, dict) or not isinstance(data.get("items"), list):
+        raise ValueError("not a JSON pod list: missing items")
+    pods = []
+    for item in data["items"]:
+        metadata = item.get("metadata") or {}
+        name = metadata.get("name")
+        if not name:
+            continue
+        pods.append(
+            PodInfo(
+                name=name,
+                labels=dict(metadata.get("labels") or {}),
+                phase=(item.get("status") or {}).get("phase", ""),
+            )
+        )
+    return pods
+
+
+def _run_command(command: str, host: str, connector) -> Optional[str]:
+    """Run command on host (SSH) or locally and return its stdout."""
+    if connector is not None and getattr(connector, "use_ssh", False):
+        result = connector.run_command(command, [host])
+        res = result.get(host, {"output": "", "error": ""})
+        return res.get("output", "")
+    result = subprocess.run(
+        command,
+        shell=True,
+        capture_output=True,
+        text=True,
+        timeout=_FETCH_TIMEOUT,
+    )
+    if result.returncode != 0:
+        return None
+    return result.stdout
+
+
+def _namespace_flag(namespace: Optional[str]) -> str:
+    return f" -n {namespace}" if namespace else ""
+
+
+@dataclass
+class _Entry:
+    pods: List[PodInfo]
+    fetched_at: float
+
+
+class _PodWatch:
+    """Invalidate one inventory entry whenever the namespace's pods change."""
+
+    def __init__(self, inventory, key: InventoryKey, connector):
+        host, namespace, cli_type = key
+        self.inventory = inventory
+        self.key = key
+        self.command = (
+            f"{cli_type} get pods{_namespace_flag(namespace)} "
+            f"--watch-only -o name"
+        )
+        self._stream = LogLineStream(self.command, host, connector)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="testpilot-podwatch", daemon=True
+        )
+
+    def start(self) -> "_PodWatch":
+        self._stream.start()
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            line = self._stream.read_line(0.5)
+            if line is not None:
+                logger.debug(f"Pod change on {self.key}: {line}")
+                self.inventory.invalidate(self.key[0], self.key[1])
+            elif self._stream.eof:
+                logger.debug(f"Pod watch ended on {self.key}")
+                break
+
+    @property
+    def alive(self) -> bool:
+        return self._thread.is_alive() and not self._stopped.is_set()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._stream.close()
+        self._thread.join(timeout=2)
+
+
+class PodInventory:
+    """
+    Cache of pod listings per (host, namespace, cli).
+
+    Lookups return None when the listing could not be fetched, so callers
+    can fall back to their own pod discovery.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        refresh_on_miss: bool = True,
+        watch: bool = False,
+        direct_exec: bool = True,
+    ):
+        """
+        Initialize pod inventory.
+
+        Args:
+            ttl: Seconds a listing stays valid
+            refresh_on_miss: Re-list once when a lookup matches no pod
+            watch: Start a `get pods --watch-only` stream per listing that
+                drops the entry as soon as a pod changes
+            direct_exec: Exec into the pinned pod by name instead of
+                looking it up inside every exec command
+        """
+        self.ttl = ttl
+        self.refresh_on_miss = refresh_on_miss
+        self.watch = watch
+        self.direct_exec = direct_exec
+        self.reresolves = 0
+        self.fetches = 0
+        self._lock = threading.Lock()
+        self._entries: Dict[InventoryKey, _Entry] = {}
+        self._fetch_locks: Dict[InventoryKey, threading.Lock] = {}
+        self._watches: Dict[InventoryKey, _PodWatch] = {}
+        self._exec_pods: Dict[ExecKey, str] = {}
+
+    def _fetch(self, key: InventoryKey, connector) -> Optional[List[PodInfo]]:
+        host, namespace, cli_type = key
+        command = f"{cli_type} get pods{_namespace_flag(namespace)} -o json"
+        self.fetches += 1
+        try:
+            pods = parse_pod_list(_run_command(command, host, connector))
+        except (ValueError, subprocess.SubprocessError, OSError) as e:
+            logger.debug(f"Pod inventory fetch failed on {host}: {e}")
+            return None
+        logger.debug(f"Pod inventory for {host}/{namespace}: {len(pods)} pods")
+        return pods
+
+    def pods(
+        self,
+        host: str,
+        namespace: Optional[str],
+        connector=None,
+        cli_type: str = "kubectl",
+        refresh: bool = False,
+    ) -> Optional[List[PodInfo]]:
+        """Return the cached pod list, listing the namespace if needed."""
+        entry, _ = self._get((host, namespace, cli_type), connector, refresh)
+        return entry.pods if entry is not None else None
+
+    def _get(
+        self, key: InventoryKey, connector, refresh: bool
+    ) -> Tuple[Optional[_Entry], bool]:
+        """Return (entry, fetched by this call)."""
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+        # One listing per key at a time; concurrent callers reuse it
+        with fetch_lock:
+            now = time.monotonic()
+            with self._lock:
+                entry = self._entries.get(key)
+            if (
+                entry is not None
+                and not refresh
+                and now - entry.fetched_at < self.ttl
+            ):
+                return entry, False
+            pods = self._fetch(key, connector)
+            if pods is None:
+                return None, True
+            entry = _Entry(pods, time.monotonic())
+            with self._lock:
+                self._entries[key] = entry
+            if self.watch:
+                self._ensure_watch(key, connector)
+            return entry, True
+
+    def find(
+        self,
+        host: str,
+        namespace: Optional[str],
+        search: str,
+        connector=None,
+        cli_type: str = "kubectl",
+        regex: bool = False,
+        exclude_labels: Optional[Mapping[str, str]] = None,
+    ) -> Optional[List[PodInfo]]:
+        """
+        Return pods whose name contains search (or matches it as a regex).
+
+        Pods carrying any of exclude_labels (label: value) are skipped.
+        Returns None if the namespace could not be listed.
+        """
+        if regex:
+            pattern = re.compile(search)
+            matches_name = lambda name: pattern.search(name) is not None
+        else:
+            matches_name = lambda name: search in name
+
+        def select(entry: _Entry) -> List[PodInfo]:
+            return [
+                pod
+                for pod in entry.pods
+                if matches_name(pod.name)
+                and not any(
+                    pod.labels.get(label) == value
+                    for label, value in (exclude_labels or {}).items()
+                )
+            ]
+
+        key = (host, namespace, cli_type)
+        entry, fetched = self._get(key, connector, refresh=False)
+        if entry is None:
+            return None
+        matches = select(entry)
+        if not matches and not fetched and self.refresh_on_miss:
+            entry, _ = self._get(key, connector, refresh=True)
+            if entry is None:
+                return None
+            matches = select(entry)
+        return matches
+
+    def invalidate(
+        self, host: str = None, namespace: Optional[str] = None
+    ) -> None:
+        """Drop cached listings for host/namespace (None: everything)."""
+        with self._lock:
+            for key in list(self._entries):
+                if (host is None or key[0] == host) and (
+                    namespace is None or key[1] == namespace
+                ):
+                    del self._entries[key]
+            for key in list(self._exec_pods):
+                if (host is None or key[0] == host) and (
+                    namespace is None or key[1] == namespace
+                ):
+                    del self._exec_pods[key]
+
+    def exec_pod(
+        self,
+        host: str,
+        namespace: Optional[str],
+        container: str,
+        connector=None,
+        cli_type: str = "kubectl",
+    ) -> Optional[str]:
+        """
+        Return the pod to exec into for container, resolving it only once.
+
+        Matches the <container>-<hash>-<id> names of the get po | grep -E
+        lookup and prefers running pods. The choice stays pinned until
+        forget_exec_pod() or invalidate() drops it.
+        """
+        key = (host, namespace, cli_type, container)
+        with self._lock:
+            pinned = self._exec_pods.get(key)
+        if pinned:
+            return pinned
+        pods = self.find(
+            host,
+            namespace,
+            f"{re.escape(container)}-[a-z0-9]+-[a-z0-9]+$",
+            connector,
+            cli_type,
+            regex=True,
+        )
+        if not pods:
+            return None
+        running = [pod for pod in pods if pod.running]
+        name = (running or pods)[0].name
+        with self._lock:
+            self._exec_pods[key] = name
+        logger.debug(f"Exec pod for {container} on {host}: {name}")
+        return name
+
+    def forget_exec_pod(
+        self,
+        host: str,
+        namespace: Optional[str],
+        container: str,
+        cli_type: str = "kubectl",
+    ) -> Optional[str]:
+        """
+        Drop the pinned exec pod after an exec into it failed.
+
+        The namespace listing is dropped too, so the next exec_pod() call
+        resolves against a fresh listing. Returns the forgotten pod name.
+        """
+        with self._lock:
+            pinned = self._exec_pods.pop(
+                (host, namespace, cli_type, container), None
+            )
+        if pinned:
+            self.reresolves += 1
+            self.invalidate(host, namespace)
+        return pinned
+
+    def _ensure_watch(self, key: InventoryKey, connector) -> None:
+        with self._lock:
+            watch = self._watches.get(key)
+            if watch is not None and watch.alive:
+                return
+            try:
+                self._watches[key] = _PodWatch(self, key, connector).start()
+            except Exception as e:
+                logger.warning(f"Could not start pod watch for {key}: {e}")
+
+    def close(self) -> None:
+        """Stop pod watches and drop every cached listing."""
+        with self._lock:
+            watches, self._watches = list(self._watches.values()), {}
+            self._entries.clear()
+            self._exec_pods.clear()
+        for watch in watches:
+            watch.stop()
+
+
+_inventory: Optional[PodInventory] = None
+_inventory_lock = threading.Lock()
+
+
+def get_pod_inventory() -> Optional[PodInventory]:
+    """
+    Return the process-wide inventory, or None when disabled in hosts.json.
+
+    The inventory is created on first use from the "pod_inventory" section
+    of the active config snapshot.
+    """
+    global _inventory
+    snapshot = get_config_snapshot()
+    settings = (snapshot.get("pod_inventory") if snapshot else None) or {}
+    if not settings.get("enabled", True):
+        return None
+    with _inventory_lock:
+        if _inventory is None:
+            _inventory = PodInventory(
+                ttl=float(settings.get("ttl", DEFAULT_TTL)),
+                refresh_on_miss=bool(settings.get("refresh_on_miss", True)),
+                watch=bool(settings.get("watch", False)),
+                direct_exec=bool(settings.get("direct_exec", True)),
+            )
+        return _inventory
+
+
+def shutdown_pod_inventory() -> None:
+    """Stop pod watches and forget the process-wide inventory."""
+    global _inventory
+    with _inventory_lock:
+        inventory, _inventory = _inventory, None
+    if inventory is not None:
+        inventory.close()
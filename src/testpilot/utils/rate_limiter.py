@@ -4,16 +4,74 @@ Rate Limiter Utility for TestPilot
 Implements token bucket algorithm for rate limiting HTTP requests.
 Supports per-host rate limiting and global rate limiting.
 Thread-safe implementation for concurrent request handling.
+
+acquire() blocks until the request may be sent and acquire_async() waits
+the same way without blocking the event loop. Both reserve their tokens
+up front, including tokens that only refill later (a bucket can go into
+debt). Concurrent callers therefore queue up behind each other instead of
+all computing their delay from the same deficit.
+
+Besides the base rate, optional ceilings can be configured per host, per
+NF endpoint (URL template), per sheet and for the whole run ("limits").
+A request takes a token from every bucket that applies to it and waits
+for the slowest one. A per-row Excel rate (reqs_sec) spaces that row at
+least 1/reqs_sec after the previous request on the same base (or host)
+bucket. The row is still charged to that bucket, the bucket's own rate is
+left alone and the ceilings still apply.
 """
 
+import asyncio
+import fnmatch
 import threading
 import time
-from typing import Dict, Optional
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+@dataclass
+class ThrottleStats:
+    """Time requests spent waiting on one bucket."""
+
+    requests: int = 0
+    seconds: float = 0.0
+
+
+def _parse_rate(value, where: str) -> Optional[float]:
+    """Positive rate from a config value, None (with a warning) otherwise."""
+    try:
+        rate = float(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring rate limit {where}: {value!r} is not a number")
+        return None
+    if rate <= 0:
+        logger.warning(f"Ignoring rate limit {where}: {rate} (must be > 0)")
+        return None
+    return rate
+
+
+def _parse_rate_map(values, dimension: str) -> Dict[str, float]:
+    rates = {}
+    for key, value in (values or {}).items():
+        if str(key).startswith('_'):
+            continue
+        rate = _parse_rate(value, f"{dimension}.{key}")
+        if rate is not None:
+            rates[str(key)] = rate
+    return rates
+
+
+def endpoint_template(url) -> Optional[str]:
+    """Path of a step URL, without scheme, authority and query."""
+    if not isinstance(url, str) or not url.strip():
+        return None
+    return urlsplit(url.strip()).path or None
+
+
 class RateLimiter:
     """
     Token bucket rate limiter implementation.
@@ -25,7 +83,8 @@ class RateLimiter:
     def __init__(self,
                  default_rate: float = 10.0,
                  per_host: bool = False,
-                 burst_size: Optional[int] = None):
+                 burst_size: Optional[int] = None,
+                 limits: Optional[Dict] = None):
         """
         Initialize rate limiter.
 
@@ -33,6 +92,10 @@ class RateLimiter:
             default_rate: Default requests per second (float)
             per_host: If True, maintain separate limits per host
             burst_size: Maximum burst tokens (defaults to rate, not rate * 2)
+            limits: Optional ceilings: {"global": rate, "host": {...},
+                "endpoint": {...}, "sheet": {...}}. The per-dimension maps
+                take a rate per name ("default" for all others); endpoint
+                names are glob patterns matched against the URL path.
         """
         self.default_rate = max(0.1, default_rate)  # Minimum 0.1 reqs/sec
         self.per_host = per_host
@@ -47,15 +110,31 @@ class RateLimiter:
 
         # Global bucket for non-per-host mode
         # Start with 1 token to allow first request immediately, but enforce rate after that
-        self._global_bucket = {
-            'tokens': 1.0,
-            'last_update': time.time(),
-            'rate': self.default_rate
-        }
+        self._global_bucket = self._new_bucket(self.default_rate)
+
+        # Ceiling buckets by name, e.g. 'sheet:Sheet1'
+        self._buckets: Dict[str, Dict] = {}
+        self._set_limits(limits or {})
+
+        # Throttling counters by the bucket that made requests wait
+        self._stats: Dict[str, ThrottleStats] = {}
+        self._requests = 0
+        self._throttled = 0
 
         logger.info(f"RateLimiter initialized: rate={self.default_rate} reqs/sec, "
                    f"per_host={per_host}, burst_size={self.burst_size}")
 
+    def _set_limits(self, limits: Dict) -> None:
+        self._global_limit = None
+        if limits.get('global') is not None:
+            self._global_limit = _parse_rate(limits['global'], 'global')
+        self._host_limits = _parse_rate_map(limits.get('host'), 'host')
+        self._sheet_limits = _parse_rate_map(limits.get('sheet'), 'sheet')
+        # Patterns are tried in config order
+        self._endpoint_limits = list(
+            _parse_rate_map(limits.get('endpoint'), 'endpoint').items()
+        )
+
     def set_rate(self, rate: float, host: Optional[str] = None) -> None:
         """
         Update rate for specific host or globally.
@@ -77,47 +156,187 @@ class RateLimiter:
                 self.default_rate = rate
                 logger.debug(f"Global rate updated: {rate} reqs/sec")
 
-    def acquire(self, host: Optional[str] = None, tokens: int = 1) -> float:
+    def reserve(self,
+                host: Optional[str] = None,
+                tokens: int = 1,
+                sheet: Optional[str] = None,
+                url: Optional[str] = None,
+                row: Optional[int] = None,
+                row_rate: Optional[float] = None) -> float:
         """
-        Acquire tokens for request execution.
+        Reserve tokens for a request without waiting.
 
         Args:
-            host: Target host (used if per_host=True)
+            host: Target host (used if per_host=True or for host limits)
             tokens: Number of tokens to acquire (default: 1)
+            sheet: Sheet of the step (for sheet limits and row rates)
+            url: URL template of the step (for endpoint limits)
+            row: Row index of the step (for row rates)
+            row_rate: Excel reqs_sec of the row; spaces it from the previous
+                request on the base (or host) bucket
 
         Returns:
-            float: Delay in seconds needed to maintain rate (0 if no delay needed)
+            float: Seconds the caller has to wait before sending
+        """
+        return self._reserve(host, tokens, sheet, url, row, row_rate)[0]
+
+    def acquire(self,
+                host: Optional[str] = None,
+                tokens: int = 1,
+                sheet: Optional[str] = None,
+                url: Optional[str] = None,
+                row: Optional[int] = None,
+                row_rate: Optional[float] = None) -> float:
         """
+        Acquire tokens for request execution, waiting until the request may
+        be sent. Arguments as for reserve().
+
+        Returns:
+            float: Seconds waited (0 if no delay was needed)
+        """
+        delay = self._reserve(host, tokens, sheet, url, row, row_rate)[0]
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self,
+                            host: Optional[str] = None,
+                            tokens: int = 1,
+                            sheet: Optional[str] = None,
+                            url: Optional[str] = None,
+                            row: Optional[int] = None,
+                            row_rate: Optional[float] = None) -> float:
+        """
+        acquire() for the async core: waits without blocking the event loop.
+        A cancelled wait gives its tokens back.
+        """
+        delay, buckets = self._reserve(host, tokens, sheet, url, row, row_rate)
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self._refund(buckets, tokens)
+                raise
+        return delay
+
+    def _reserve(self, host, tokens, sheet, url, row,
+                 row_rate) -> Tuple[float, List[Dict]]:
         with self._lock:
-            bucket = self._get_bucket(host)
-            current_time = time.time()
+            current_time = time.monotonic()
+            buckets = self._buckets_for(host, sheet, url)
+
+            # The request goes out once the slowest bucket has its tokens
+            delay, limiting = 0.0, None
+            for name, bucket in buckets:
+                self._refill(bucket, current_time)
+                wait = (tokens - bucket['tokens']) / bucket['rate']
+                if wait > delay:
+                    delay, limiting = wait, name
+
+            # A row rate spaces the row from the previous request of the
+            # stream it belongs to (the first bucket)
+            base = buckets[0][1]
+            if row_rate is not None and base['last_sent'] is not None:
+                wait = base['last_sent'] + 1.0 / row_rate - current_time
+                if wait > delay:
+                    name = f"row:{sheet}:{row}"
+                    if self.per_host and host:
+                        name += f":{host}"
+                    delay, limiting = wait, name
+            base['last_sent'] = current_time + delay
+
+            # Take the tokens now, going into debt where they are not there
+            # yet, so later callers wait behind this request
+            for _, bucket in buckets:
+                bucket['tokens'] -= tokens
 
-            # Refill tokens based on elapsed time
-            elapsed = current_time - bucket['last_update']
-            bucket['tokens'] = min(
-                self.burst_size,
-                bucket['tokens'] + elapsed * bucket['rate']
-            )
-            bucket['last_update'] = current_time
+            self._requests += 1
+            if limiting is not None:
+                self._throttled += 1
+                stats = self._stats.setdefault(limiting, ThrottleStats())
+                stats.requests += 1
+                stats.seconds += delay
 
-            # Check if we have enough tokens
-            if bucket['tokens'] >= tokens:
-                # Consume tokens immediately
-                bucket['tokens'] -= tokens
-                logger.debug(f"Tokens acquired for {host or 'global'}: "
-                           f"remaining={bucket['tokens']:.2f}")
-                return 0.0
+        if limiting is not None:
+            logger.debug(f"Rate limit delay for {host or 'global'}: "
+                       f"{delay:.2f}s ({limiting})")
+        return delay, [bucket for _, bucket in buckets]
+
+    def _refund(self, buckets: List[Dict], tokens: int) -> None:
+        with self._lock:
+            for bucket in buckets:
+                bucket['tokens'] = min(bucket['burst'],
+                                       bucket['tokens'] + tokens)
+
+    def _buckets_for(self, host, sheet, url) -> List[Tuple[str, Dict]]:
+        """
+        (name, bucket) for every limit that applies to a request, the base
+        (or host) bucket first.
+        """
+        if self.per_host and host:
+            buckets = [(f"rate:{host}", self._get_bucket(host))]
+        else:
+            buckets = [('rate', self._global_bucket)]
+
+        if self._global_limit is not None:
+            buckets.append(
+                ('global', self._named_bucket('global', self._global_limit))
+            )
+        for dimension, value, limits in (
+            ('host', host, self._host_limits),
+            ('sheet', sheet, self._sheet_limits),
+        ):
+            if value is None:
+                continue
+            rate = limits.get(str(value), limits.get('default'))
+            if rate is not None:
+                name = f"{dimension}:{value}"
+                buckets.append((name, self._named_bucket(name, rate)))
+
+        path = endpoint_template(url) if self._endpoint_limits else None
+        if path is not None:
+            for pattern, rate in self._endpoint_limits:
+                if pattern == 'default':
+                    continue
+                if fnmatch.fnmatchcase(path, pattern):
+                    name = f"endpoint:{pattern}"
+                    break
             else:
-                # Calculate delay needed
-                deficit = tokens - bucket['tokens']
-                delay = deficit / bucket['rate']
+                rate = dict(self._endpoint_limits).get('default')
+                name = f"endpoint:{path}"
+            if rate is not None:
+                buckets.append((name, self._named_bucket(name, rate)))
+        return buckets
+
+    def _named_bucket(self, name: str, rate: float) -> Dict:
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = self._buckets[name] = self._new_bucket(
+                rate, max(1, int(rate))
+            )
+        elif bucket['rate'] != rate:
+            bucket['rate'] = rate
+            bucket['burst'] = max(1, int(rate))
+        return bucket
 
-                # Consume available tokens
-                bucket['tokens'] = 0
+    def _new_bucket(self, rate: float, burst: Optional[float] = None) -> Dict:
+        return {
+            'tokens': 1.0,
+            'last_update': time.monotonic(),
+            'rate': rate,
+            'burst': burst if burst is not None else self.burst_size,
+            # Send time of the last request reserved on this bucket
+            'last_sent': None,
+        }
 
-                logger.debug(f"Rate limit delay for {host or 'global'}: "
-                           f"{delay:.2f}s (deficit={deficit:.2f} tokens)")
-                return delay
+    @staticmethod
+    def _refill(bucket: Dict, current_time: float) -> None:
+        elapsed = max(0.0, current_time - bucket['last_update'])
+        bucket['tokens'] = min(
+            bucket['burst'],
+            bucket['tokens'] + elapsed * bucket['rate']
+        )
+        bucket['last_update'] = current_time
 
     def get_status(self, host: Optional[str] = None) -> Dict:
         """
@@ -131,12 +350,12 @@ class RateLimiter:
         """
         with self._lock:
             bucket = self._get_bucket(host)
-            current_time = time.time()
+            current_time = time.monotonic()
 
-            # Update tokens before reporting
+            # Update tokens before reporting (negative while in debt)
             elapsed = current_time - bucket['last_update']
             current_tokens = min(
-                self.burst_size,
+                bucket['burst'],
                 bucket['tokens'] + elapsed * bucket['rate']
             )
 
@@ -148,6 +367,37 @@ class RateLimiter:
                 'per_host_mode': self.per_host
             }
 
+    def get_throttle_stats(self) -> Dict[str, ThrottleStats]:
+        """
+        Return a copy of the throttling counters by bucket name ('rate',
+        'rate:<host>', 'row:<sheet>:<row>[:<host>]', 'global', 'host:<host>',
+        'endpoint:<pattern>', 'sheet:<sheet>').
+        """
+        with self._lock:
+            return {
+                name: ThrottleStats(stats.requests, stats.seconds)
+                for name, stats in self._stats.items()
+            }
+
+    def format_report(self) -> List[str]:
+        """Human readable throttling cost, one line per limiting bucket."""
+        stats = self.get_throttle_stats()
+        with self._lock:
+            requests, throttled = self._requests, self._throttled
+        if not requests:
+            return []
+        lines = [
+            f"{name}: {entry.seconds:.1f}s over {entry.requests} requests"
+            for name, entry in sorted(
+                stats.items(), key=lambda item: -item[1].seconds
+            )
+        ]
+        lines.append(
+            f"Total throttling: {sum(s.seconds for s in stats.values()):.1f}s, "
+            f"{throttled}/{requests} requests delayed"
+        )
+        return lines
+
     def reset(self, host: Optional[str] = None) -> None:
         """
         Reset rate limiter state.
@@ -163,11 +413,11 @@ class RateLimiter:
             else:
                 # Reset all
                 self._host_buckets.clear()
-                self._global_bucket = {
-                    'tokens': 1.0,
-                    'last_update': time.time(),
-                    'rate': self.default_rate
-                }
+                self._buckets.clear()
+                self._stats.clear()
+                self._requests = 0
+                self._throttled = 0
+                self._global_bucket = self._new_bucket(self.default_rate)
                 logger.debug("Rate limiter reset (all)")
 
     def _get_bucket(self, host: Optional[str] = None) -> Dict:
@@ -181,11 +431,8 @@ class RateLimiter:
 
     def _init_bucket_for_host(self, host: str) -> None:
         """Initialize bucket for new host."""
-        self._host_buckets[host] = {
-            'tokens': 1.0,  # Start with 1 token like global bucket
-            'last_update': time.time(),
-            'rate': self.default_rate
-        }
+        # Start with 1 token like global bucket
+        self._host_buckets[host] = self._new_bucket(self.default_rate)
         logger.debug(f"Initialized rate bucket for {host}")
 
 
@@ -208,13 +455,15 @@ def create_rate_limiter_from_config(config: Dict) -> Optional[RateLimiter]:
     default_rate = rate_config.get('default_reqs_per_sec', 10.0)
     per_host = rate_config.get('per_host', False)
     burst_size = rate_config.get('burst_size')
+    limits = rate_config.get('limits')
 
     logger.info(f"Creating rate limiter from config: rate={default_rate}, per_host={per_host}")
 
     return RateLimiter(
         default_rate=default_rate,
         per_host=per_host,
-        burst_size=burst_size
+        burst_size=burst_size,
+        limits=limits
     )
 
 
@@ -244,4 +493,4 @@ def parse_excel_rate_limit(step_data: Dict, default_rate: Optional[float] = None
             except (ValueError, TypeError):
                 logger.warning(f"Could not parse rate limit from Excel column '{key}': {step_data[key]}")
 
-    return default_rate
\ No newline at end of file
+    return default_rate
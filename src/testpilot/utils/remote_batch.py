@@ -0,0 +1,179 @@
+"""
+Batched remote command execution for TestPilot
+
+Every step normally costs one SSH exec: a new channel, a remote shell and a
+round trip to the jump host, which often takes longer than the request to
+the NF itself. run_batch() sends several commands to a host as one shell
+script. The commands run back to back, in order, and each one's stdout and
+stderr is framed with a random marker line that carries its exit status and
+timing. split_batch_output() cuts the two streams back into per-command
+BatchItems that parse_curl_output() can read as if each command had run on
+its own.
+
+With a rate limiter, the caller reserves one slot per command and passes
+the gaps between the slots as delays; the script sleeps them out on the
+host, so a batch is no faster on the wire than the same steps sent one by
+one.
+
+Each command runs in a subshell via ``eval``, so quoting and pipes behave as
+they would in a standalone exec. An item is only ``complete`` when its end
+marker arrived. If the connection drops partway through a batch, callers
+can run the remaining commands one by one.
+"""
+
+import shlex
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from .logger import get_logger
+
+logger = get_logger("TestPilot.RemoteBatch")
+
+
+@dataclass
+class BatchItem:
+    """Output of one command of a batch."""
+
+    command: str
+    output: str = ""
+    error: str = ""
+    exit_status: Optional[int] = None
+    duration: float = 0.0
+    # False when the end marker never arrived (batch cut short)
+    complete: bool = False
+
+
+def build_batch_script(
+    commands: Sequence[str],
+    marker: str,
+    delays: Optional[Sequence[float]] = None,
+) -> str:
+    """
+    Shell script running commands in order with framed output.
+
+    stdout gets "<marker> B <i>" before command i and
+    "<marker> E <i> <exit status> <start ns> <end ns>" after it; stderr gets
+    the same begin/end lines without the status and times. End markers are
+    preceded by a newline so output without a trailing newline still ends
+    before them. delays[i] is slept before command i starts and is not part
+    of its duration.
+    """
+    lines = []
+    for index, command in enumerate(commands):
+        delay = delays[index] if delays and index < len(delays) else 0
+        lines.append(
+            (f"sleep {delay:.3f}; " if delay > 0 else "")
+            + f"printf '%s B %d\\n' {marker} {index}; "
+            f"printf '%s B %d\\n' {marker} {index} >&2; "
+            "_tp_s=$(date +%s%N); "
+            f"( eval {shlex.quote(command)} ); _tp_rc=$?; "
+            "_tp_e=$(date +%s%N); "
+            f"printf '\\n%s E %d %s %s %s\\n' {marker} {index} "
+            '"$_tp_rc" "$_tp_s" "$_tp_e"; '
+            f"printf '\\n%s E %d\\n' {marker} {index} >&2"
+        )
+    return "\n".join(lines)
+
+
+def _frames(text: str, marker: str) -> Dict[int, List]:
+    """index -> [body, end marker fields or None] for one framed stream."""
+    frames: Dict[int, List] = {}
+    current = None
+    body: List[str] = []
+    for line in text.split("\n"):
+        if line.startswith(marker):
+            fields = line[len(marker) :].split()
+            if len(fields) >= 2 and fields[1].isdigit():
+                if fields[0] == "B":
+                    current, body = int(fields[1]), []
+                    frames[current] = ["", None]
+                    continue
+                if fields[0] == "E" and current == int(fields[1]):
+                    frames[current] = ["\n".join(body).strip(), fields[2:]]
+                    current = None
+                    continue
+        if current is not None:
+            body.append(line)
+    if current is not None:
+        # Cut short: keep what arrived, without an end marker
+        frames[current] = ["\n".join(body).strip(), None]
+    return frames
+
+
+def _duration(fields: List[str]) -> Optional[float]:
+    try:
+        return (int(fields[2]) - int(fields[1])) / 1e9
+    except (IndexError, ValueError):
+        # date without %N support (busybox)
+        return None
+
+
+def split_batch_output(
+    commands: Sequence[str],
+    marker: str,
+    stdout: str,
+    stderr: str,
+    total_duration: float = 0.0,
+) -> List[BatchItem]:
+    """Per-command items cut out of a batch's stdout and stderr."""
+    out_frames = _frames(stdout or "", marker)
+    err_frames = _frames(stderr or "", marker)
+    items = []
+    for index, command in enumerate(commands):
+        output, end = out_frames.get(index, ["", None])
+        error = err_frames.get(index, ["", None])[0]
+        item = BatchItem(command, output, error)
+        if end is not None:
+            item.complete = True
+            if end and end[0].lstrip("-").isdigit():
+                item.exit_status = int(end[0])
+            item.duration = _duration(end)
+        items.append(item)
+
+    # Commands without their own timing share what is left of the total
+    untimed = [i for i in items if i.complete and i.duration is None]
+    if untimed:
+        timed = sum(i.duration for i in items if i.duration)
+        share = max(total_duration - timed, 0.0) / len(untimed)
+        for item in untimed:
+            item.duration = share
+    for item in items:
+        item.duration = item.duration or 0.0
+    return items
+
+
+def run_batch(
+    commands: Sequence[str],
+    host: str,
+    connector,
+    timeout: int = 30,
+    delays: Optional[Sequence[float]] = None,
+) -> List[BatchItem]:
+    """
+    Run commands on host in one SSH exec and split the results.
+
+    timeout is the longest silence allowed between two outputs, as for
+    SSHConnector.run_command(), so it applies per command rather than to
+    the whole batch. delays are slept on the host before each command (see
+    build_batch_script()).
+    """
+    marker = f"__TP_BATCH_{uuid.uuid4().hex}__"
+    script = build_batch_script(commands, marker, delays)
+    if delays:
+        # A sleep is silence too
+        timeout = timeout + int(max(delays)) + 1
+    start = time.time()
+    result = connector.run_command(script, [host], timeout=timeout)
+    duration = time.time() - start
+    res = result.get(host, {"output": "", "error": ""})
+    items = split_batch_output(
+        commands, marker, res["output"], res["error"], duration
+    )
+    missing = sum(not item.complete for item in items)
+    logger.debug(
+        f"Batch of {len(commands)} commands on {host} took {duration:.2f}s"
+        + (f" ({missing} incomplete)" if missing else "")
+    )
+    return items
@@ -8,6 +8,7 @@ import pandas as pd
 
 from . import parse_instant_utils as piu
 from .parse_utils import extract_request_json_manual
+from .parsed_response import ParsedResponse
 
 logger = logging.getLogger("TestPilot.ResponseParser")
 
@@ -58,6 +59,8 @@ def parse_curl_output(output: str, error: str) -> dict:
 
     if result.get("headers", None):
         logger.debug(f"Extracted Headers ==> {result['headers']}")
+    # Decoded lazily, once, by whichever validator or exporter asks first
+    result["raw_output"] = ParsedResponse.wrap(output, result.get("headers"))
 
     # print headers information if headers are present
     if headers:
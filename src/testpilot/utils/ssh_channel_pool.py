@@ -0,0 +1,407 @@
+"""
+SSH channel pool for TestPilot
+
+SSHConnector used to open one exec channel per command on a single
+paramiko transport per host, with nothing capping how many channels were
+open at once. Parallel kubectl logs captures and host fan-out then all
+contended on that transport, and bursts could exceed sshd's MaxSessions
+(10 by default).
+
+HostChannelPool keeps up to ``transports_per_host`` transports to a host and
+lets each carry at most ``channels_per_transport`` concurrent channels.
+A command takes a slot on the least busy live transport. A second transport
+is opened only once the existing ones are busy, and callers wait when every
+slot is in use. Long-lived channels (log streams, log tailers, HTTP
+agents) run on their own ``held_transports_per_host`` transports, so however
+many of them are open, commands always find a slot. When those are full,
+hold() gives up after ``hold_timeout`` seconds instead of queueing for the
+rest of the run. Transports send keepalives, idle ones are probed before
+reuse, and a transport that died is dropped and reconnected on demand.
+Reconnects are single-flight per slot and spaced by ``reconnect_backoff`` so
+a host that is down does not cause a reconnect storm.
+
+Settings live under ``ssh_settings`` in hosts.json:
+
+    "ssh_settings": {
+        "transports_per_host": 2,
+        "channels_per_transport": 8,
+        "held_transports_per_host": 1,
+        "keepalive_interval": 30,
+        "health_check_interval": 60,
+        "reconnect_backoff": 5,
+        "max_workers": 32
+    }
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, fields, replace
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+import paramiko
+
+from .logger import get_logger
+
+logger = get_logger("SSHChannelPool")
+
+
+@dataclass(frozen=True)
+class SSHPoolSettings:
+    transports_per_host: int = 1
+    # OpenSSH allows 10 sessions per connection (MaxSessions)
+    channels_per_transport: int = 8
+    # Extra transports for long-lived channels, channels_per_transport each
+    held_transports_per_host: int = 1
+    keepalive_interval: int = 30
+    # Idle transports older than this are probed before they are reused
+    health_check_interval: float = 60.0
+    # Minimum seconds between two connection attempts for the same slot
+    reconnect_backoff: float = 5.0
+    # Longest wait for a free channel before a command fails
+    acquire_timeout: float = 120.0
+    # Longest wait for a long-lived channel slot; those are kept for long,
+    # so waiting longer rarely frees one
+    hold_timeout: float = 2.0
+    # Threads shared by all multi-host run_command calls
+    max_workers: int = 32
+
+    @classmethod
+    def from_dict(cls, settings: Optional[Mapping[str, Any]]):
+        settings = settings or {}
+        values = {}
+        for f in fields(cls):
+            if settings.get(f.name) is not None:
+                values[f.name] = type(f.default)(settings[f.name])
+        result = cls(**values)
+        if (
+            result.transports_per_host < 1
+            or result.channels_per_transport < 1
+            or result.held_transports_per_host < 1
+        ):
+            raise ValueError(
+                "ssh_settings transports_per_host, channels_per_transport and held_transports_per_host must be at least 1"
+            )
+        return result
+
+
+class _Transport:
+    """One SSH connection in a host pool."""
+
+    __slots__ = ("client", "in_use", "checked_at")
+
+    def __init__(self, client: paramiko.SSHClient):
+        self.client = client
+        self.in_use = 0
+        self.checked_at = time.monotonic()
+
+    def active(self) -> bool:
+        transport = self.client.get_transport()
+        return transport is not None and transport.is_active()
+
+
+# Slot placeholder while its transport is being connected
+_CONNECTING = object()
+
+
+class HostChannelPool:
+    """Transports to one host, shared by concurrent remote commands."""
+
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[], Optional[paramiko.SSHClient]],
+        settings: SSHPoolSettings,
+        initial: Optional[paramiko.SSHClient] = None,
+    ):
+        """
+        Args:
+            name: Host name, for logging
+            connect: Opens a new connected SSHClient, or returns None
+            settings: Pool limits and timings
+            initial: An already connected client to use as the first
+                transport
+        """
+        self.name = name
+        self.settings = settings
+        self._connect = connect
+        self._cond = threading.Condition()
+        self._slots: List[Any] = [None] * settings.transports_per_host
+        self._attempted_at: List[float] = [
+            float("-inf")
+        ] * settings.transports_per_host
+        # Transports opened by the pool, and transports found dead
+        self.connects = 0
+        self.drops = 0
+        # Transports for long-lived channels, opened on the first hold()
+        self._held: Optional["HostChannelPool"] = None
+        if initial is not None:
+            self._slots[0] = self._adopt(initial)
+
+    def _adopt(self, client: paramiko.SSHClient) -> _Transport:
+        transport = client.get_transport()
+        if transport is not None and self.settings.keepalive_interval:
+            transport.set_keepalive(self.settings.keepalive_interval)
+        return _Transport(client)
+
+    def _healthy(self, slot: _Transport) -> bool:
+        """Called with the lock held."""
+        if not slot.active():
+            return False
+        now = time.monotonic()
+        if (
+            slot.in_use == 0
+            and now - slot.checked_at >= self.settings.health_check_interval
+        ):
+            try:
+                # An SSH_MSG_IGNORE fails fast on a half-closed socket
+                slot.client.get_transport().send_ignore()
+            except Exception as e:
+                logger.debug(f"Health probe to {self.name} failed: {e}")
+                return False
+            slot.checked_at = now
+        return True
+
+    def _drop(self, index: int) -> None:
+        """Called with the lock held."""
+        slot = self._slots[index]
+        self._slots[index] = None
+        if isinstance(slot, _Transport):
+            self.drops += 1
+            logger.warning(
+                f"SSH transport {index} to {self.name} is down, reconnecting on next use"
+            )
+            try:
+                slot.client.close()
+            except Exception:
+                pass
+
+    def _pick(self) -> Any:
+        """
+        Reserve a channel on a live transport, or choose a slot to connect.
+
+        Returns a _Transport (reserved), an int (slot index to connect) or
+        None (nothing available yet). Called with the lock held.
+        """
+        best = None
+        live = 0
+        for index, slot in enumerate(self._slots):
+            if not isinstance(slot, _Transport):
+                continue
+            if not self._healthy(slot):
+                self._drop(index)
+                continue
+            live += 1
+            if slot.in_use < self.settings.channels_per_transport and (
+                best is None or slot.in_use < best.in_use
+            ):
+                best = slot
+
+        # Spread load over another transport before stacking channels
+        if best is None or best.in_use > 0:
+            now = time.monotonic()
+            for index, slot in enumerate(self._slots):
+                if (
+                    slot is None
+                    and now - self._attempted_at[index]
+                    >= self.settings.reconnect_backoff
+                ):
+                    return index
+
+        if best is not None:
+            best.in_use += 1
+            return best
+
+        if live == 0 and _CONNECTING not in self._slots:
+            raise ConnectionError(
+                f"No SSH connection to {self.name} (retrying in at most {self.settings.reconnect_backoff:g}s)"
+            )
+        return None
+
+    def _open(self, index: int) -> None:
+        """Connect slot index; the lock must not be held."""
+        client = None
+        try:
+            client = self._connect()
+        except Exception as e:
+            logger.warning(f"SSH connect to {self.name} failed: {e}")
+        with self._cond:
+            if client is not None:
+                self._slots[index] = self._adopt(client)
+                self.connects += 1
+                logger.debug(f"Opened SSH transport {index} to {self.name}")
+            else:
+                self._slots[index] = None
+            self._cond.notify_all()
+
+    def acquire(self) -> _Transport:
+        """Reserve a channel slot; release it with release()."""
+        deadline = time.monotonic() + self.settings.acquire_timeout
+        with self._cond:
+            while True:
+                picked = self._pick()
+                if isinstance(picked, _Transport):
+                    return picked
+                if isinstance(picked, int):
+                    self._slots[picked] = _CONNECTING
+                    self._attempted_at[picked] = time.monotonic()
+                    self._cond.release()
+                    try:
+                        self._open(picked)
+                    finally:
+                        self._cond.acquire()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"No free SSH channel to {self.name} after {self.settings.acquire_timeout:g}s"
+                    )
+                # Also wakes up when a backoff period ends
+                self._cond.wait(
+                    min(remaining, self.settings.reconnect_backoff or 1.0)
+                )
+
+    def release(self, slot: _Transport) -> None:
+        with self._cond:
+            slot.in_use -= 1
+            if not slot.active():
+                for index, current in enumerate(self._slots):
+                    if current is slot:
+                        self._drop(index)
+            self._cond.notify_all()
+
+    @contextmanager
+    def channel(self) -> Iterator[paramiko.SSHClient]:
+        """Client whose transport has a channel reserved for the caller."""
+        slot = self.acquire()
+        try:
+            yield slot.client
+        finally:
+            self.release(slot)
+
+    def primary(self) -> Optional[paramiko.SSHClient]:
+        """
+        A live client for callers that manage their own short-lived
+        channels; reconnects if none is up.
+        """
+        try:
+            slot = self.acquire()
+        except (ConnectionError, TimeoutError) as e:
+            logger.error(str(e))
+            return None
+        self.release(slot)
+        return slot.client
+
+    def _held_pool(self) -> "HostChannelPool":
+        with self._cond:
+            if self._held is None:
+                self._held = HostChannelPool(
+                    f"{self.name} (long-lived channels)",
+                    self._connect,
+                    replace(
+                        self.settings,
+                        transports_per_host=self.settings.held_transports_per_host,
+                        acquire_timeout=self.settings.hold_timeout,
+                    ),
+                )
+            return self._held
+
+    def hold(self) -> Optional[paramiko.SSHClient]:
+        """
+        A live client with one channel slot reserved for a long-lived
+        channel (log streams, tailers, HTTP agents) until unhold().
+
+        The slot is taken on the host's separate long-lived transports, so
+        it never competes with commands. Returns None after hold_timeout
+        seconds when they are all taken.
+        """
+        try:
+            slot = self._held_pool().acquire()
+        except (ConnectionError, TimeoutError) as e:
+            logger.error(str(e))
+            return None
+        return slot.client
+
+    def unhold(self, client: paramiko.SSHClient) -> None:
+        """Give back the slot taken by hold() on client's transport."""
+        held = self._held
+        if held is None:
+            return
+        with held._cond:
+            for slot in held._slots:
+                if isinstance(slot, _Transport) and slot.client is client:
+                    held.release(slot)
+                    return
+        # The transport was dropped in the meantime; nothing to give back
+
+    def stats(self) -> Dict[str, int]:
+        held = self._held.stats() if self._held is not None else None
+        with self._cond:
+            live = [s for s in self._slots if isinstance(s, _Transport)]
+            return {
+                "transports": len(live),
+                "channels_in_use": sum(s.in_use for s in live),
+                "held_transports": held["transports"] if held else 0,
+                "held_channels": held["channels_in_use"] if held else 0,
+                "connects": self.connects + (held["connects"] if held else 0),
+                "drops": self.drops + (held["drops"] if held else 0),
+            }
+
+    def close(self) -> None:
+        with self._cond:
+            held, self._held = self._held, None
+            for index, slot in enumerate(self._slots):
+                if isinstance(slot, _Transport):
+                    slot.client.close()
+                self._slots[index] = None
+            self._cond.notify_all()
+        if held is not None:
+            held.close()
+
+
+class SSHChannelPool:
+    """Host pools plus the executor shared by multi-host commands."""
+
+    def __init__(self, settings: Optional[SSHPoolSettings] = None):
+        self.settings = settings or SSHPoolSettings()
+        self.hosts: Dict[str, HostChannelPool] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def add_host(
+        self,
+        name: str,
+        connect: Callable[[], Optional[paramiko.SSHClient]],
+        initial: Optional[paramiko.SSHClient] = None,
+    ) -> HostChannelPool:
+        pool = HostChannelPool(name, connect, self.settings, initial)
+        with self._lock:
+            old = self.hosts.get(name)
+            self.hosts[name] = pool
+        if old is not None:
+            old.close()
+        return pool
+
+    def get(self, name: str) -> Optional[HostChannelPool]:
+        return self.hosts.get(name)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.settings.max_workers,
+                    thread_name_prefix="testpilot-ssh",
+                )
+            return self._executor
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            pools = list(self.hosts.values())
+            self.hosts.clear()
+        if executor is not None:
+            executor.shutdown(wait=False)
+        for pool in pools:
+            pool.close()
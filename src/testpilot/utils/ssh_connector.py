@@ -13,6 +13,8 @@ from .config_resolver import (
     validate_host_config,
 )
 from .logger import get_logger
+from .ssh_channel_pool import SSHChannelPool, SSHPoolSettings
+from .ssh_output import ChannelOutputReader, OutputLimits
 
 logger = get_logger("SSHConnector")
 
@@ -47,6 +49,8 @@ class SSHConnector:
         self.auto_add_hosts = False  # Secure by default
         self.max_retries = 3  # Default retry count
         self.retry_delay = 2  # Seconds between retries
+        self.pool = SSHChannelPool()
+        self.output_limits = OutputLimits()
         self._load_config()
 
     def _load_config(self):
@@ -81,6 +85,8 @@ class SSHConnector:
         )
         self.max_retries = ssh_settings.get("max_retries", self.max_retries)
         self.retry_delay = ssh_settings.get("retry_delay", self.retry_delay)
+        self.pool = SSHChannelPool(SSHPoolSettings.from_dict(ssh_settings))
+        self.output_limits = OutputLimits.from_dict(ssh_settings)
 
         if self.auto_add_hosts:
             logger.warning(
@@ -237,56 +243,145 @@ class SSHConnector:
                 name, conn = future.result()
                 if conn:
                     self.connections[name] = conn
+                    self._add_to_pool(name, conn)
+
+    def _add_to_pool(self, name: str, conn: paramiko.SSHClient) -> None:
+        host_config = self.get_host_config(name)
+        if host_config is None:
+            return
+        self.pool.add_host(
+            name,
+            lambda: self._connect_host(host_config)[1],
+            initial=conn,
+        )
+
+    def _open_channel(self, conn, command, timeout):
+        channel = conn.get_transport().open_session(timeout=timeout)
+        try:
+            channel.exec_command(command)
+        except Exception:
+            channel.close()
+            raise
+        return channel
+
+    def _exec(self, conn, command, timeout):
+        """Run command on conn, draining stdout and stderr together."""
+        return self._collect(
+            self._open_channel(conn, command, timeout), timeout
+        )
+
+    def _collect(self, channel, timeout):
+        """Read a started command's output to the end."""
+        reader = ChannelOutputReader(
+            channel, self.output_limits, idle_timeout=timeout
+        )
+        try:
+            output = reader.wait()
+            return {
+                "output": output.output,
+                "error": output.error,
+                "exit_status": output.exit_status,
+                # Output past ssh_settings.output_max_bytes was dropped
+                "truncated": output.truncated,
+            }
+        finally:
+            reader.close()
+            reader.stdout.close()
+            reader.stderr.close()
+
+    def _run_on_host(self, name, command, timeout):
+        host_pool = self.pool.get(name)
+        try:
+            if host_pool is None:
+                return name, self._exec(
+                    self.connections[name], command, timeout
+                )
+            # A transport found dead when the command is sent is replaced
+            # once. Once the command has started it is never sent again:
+            # a PUT or POST must not reach the NF twice.
+            for attempt in range(2):
+                with host_pool.channel() as conn:
+                    try:
+                        channel = self._open_channel(conn, command, timeout)
+                    except (paramiko.SSHException, EOFError, OSError):
+                        transport = conn.get_transport()
+                        if attempt or (
+                            transport is not None and transport.is_active()
+                        ):
+                            raise
+                    else:
+                        return name, self._collect(channel, timeout)
+                logger.warning(
+                    f"SSH transport to {name} dropped, retrying on a new one"
+                )
+        except Exception as e:
+            logger.error(f"Command execution failed on {name}: {e}")
+            return name, {"output": "", "error": str(e), "exit_status": None}
 
     def run_command(self, command, target_hosts, timeout=30):
         """Execute command on target hosts with timeout protection"""
         results = {}
 
-        def run_on_host(name, conn):
-            try:
-                # Set timeout for the command execution
-                stdin, stdout, stderr = conn.exec_command(
-                    command, timeout=timeout
-                )
-                # Read with timeout
-                stdout_data = stdout.read().decode().strip()
-                stderr_data = stderr.read().decode().strip()
-                return name, stdout_data, stderr_data
-            except Exception as e:
-                logger.error(f"Command execution failed on {name}: {e}")
-                return name, "", str(e)
-
         # Validate connections exist
         valid_targets = [
-            name for name in target_hosts if name in self.connections
+            name
+            for name in target_hosts
+            if name in self.connections or self.pool.get(name)
         ]
         if not valid_targets:
             logger.error("No valid SSH connections available for target hosts")
             return results
 
-        with ThreadPoolExecutor(max_workers=len(valid_targets)) as executor:
-            futures = {
-                executor.submit(
-                    run_on_host, name, self.connections[name]
-                ): name
-                for name in valid_targets
-            }
+        if len(valid_targets) == 1:
+            name, result = self._run_on_host(
+                valid_targets[0], command, timeout
+            )
+            results[name] = result
+            return results
 
-            for future in as_completed(futures):
-                try:
-                    name, out, err = future.result(
-                        timeout=timeout + 5
-                    )  # Give extra time for cleanup
-                    results[name] = {"output": out, "error": err}
-                except Exception as e:
-                    name = futures[future]
-                    logger.error(f"Failed to get result from {name}: {e}")
-                    results[name] = {"output": "", "error": str(e)}
+        executor = self.pool.executor
+        futures = {
+            executor.submit(self._run_on_host, name, command, timeout): name
+            for name in valid_targets
+        }
+
+        for future in as_completed(futures):
+            try:
+                name, result = future.result(
+                    timeout=timeout + 5
+                )  # Give extra time for cleanup
+                results[name] = result
+            except Exception as e:
+                name = futures[future]
+                logger.error(f"Failed to get result from {name}: {e}")
+                results[name] = {
+                    "output": "",
+                    "error": str(e),
+                    "exit_status": None,
+                }
 
         return results
 
-    def get_connection(self, host_name):
-        return self.connections.get(host_name)
+    def get_connection(self, host_name, hold_channel=False):
+        """
+        Live client for host_name, reconnected if its transport died.
+
+        With hold_channel=True, one of the host's pool slots stays reserved
+        for the caller's long-lived channel until release_connection().
+        """
+        host_pool = self.pool.get(host_name)
+        if host_pool is None:
+            return self.connections.get(host_name)
+        conn = host_pool.hold() if hold_channel else host_pool.primary()
+        if conn is not None:
+            self.connections[host_name] = conn
+        return conn
+
+    def release_connection(self, host_name, conn):
+        """Free the slot taken by get_connection(hold_channel=True)."""
+        host_pool = self.pool.get(host_name)
+        if host_pool is not None:
+            host_pool.unhold(conn)
 
     def get_all_connections(self):
         return self.connections
@@ -301,3 +396,4 @@ class SSHConnector:
         for name, conn in self.connections.items():
             conn.close()
             logger.debug(f"Closed connection to {name}")
+        self.pool.close()
@@ -0,0 +1,278 @@
+"""
+Streaming reader for SSH command output
+
+run_command used to read stdout to EOF and only then stderr. A command that
+filled the stderr window first (curl -v) stalled until the channel timed out.
+Large kubectl logs captures were also held in memory as one bytes object and
+then as one str.
+
+ChannelOutputReader drains both streams of an exec channel in one loop, so
+neither can block the other. Output goes into OutputBuffers, which keep up
+to ``memory_limit`` bytes in memory and spill the rest to a temporary file.
+Anything past ``max_bytes`` is dropped and the buffer is marked truncated;
+SSHConnector.run_command reports that as ``truncated`` in its result.
+Log streams and tailers iterate over lines() as the output arrives and do
+not keep it at all. A capture run through run_command (the default
+"capture" log collector) still goes through wait() and comes back as one
+str, so very large captures are best collected with "stream" or "tail".
+
+Limits live under ``ssh_settings`` in hosts.json:
+
+    "ssh_settings": {
+        "output_memory_limit": 8388608,
+        "output_max_bytes": 67108864
+    }
+"""
+
+import codecs
+import socket
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Mapping, Optional
+
+from .logger import get_logger
+
+logger = get_logger("SSHOutput")
+
+# paramiko's default window is 2 MB; reading in 64 KB steps keeps it open
+_CHUNK_SIZE = 65536
+_POLL_INTERVAL = 0.1
+# sshd may send exit-status just after EOF
+_EXIT_STATUS_WAIT = 1.0
+
+
+@dataclass(frozen=True)
+class OutputLimits:
+    # Bytes of one stream kept in memory before spilling to disk
+    memory_limit: int = 8 * 1024 * 1024
+    # Bytes of one stream kept at all; the rest is counted and dropped
+    max_bytes: int = 64 * 1024 * 1024
+
+    @classmethod
+    def from_dict(cls, settings: Optional[Mapping[str, Any]]):
+        settings = settings or {}
+        return cls(
+            memory_limit=int(
+                settings.get("output_memory_limit", cls.memory_limit)
+            ),
+            max_bytes=int(settings.get("output_max_bytes", cls.max_bytes)),
+        )
+
+
+class OutputBuffer:
+    """Bytes of one output stream, spilled to a temporary file when large."""
+
+    def __init__(self, limits: Optional[OutputLimits] = None):
+        self.limits = limits or OutputLimits()
+        self._chunks = []
+        self._memory = 0
+        self._file = None
+        # Bytes received, including any that were dropped
+        self.size = 0
+        self.truncated = False
+
+    @property
+    def spilled(self) -> bool:
+        return self._file is not None
+
+    @property
+    def stored(self) -> int:
+        return min(self.size, self.limits.max_bytes)
+
+    def write(self, data: bytes) -> None:
+        room = self.limits.max_bytes - self.stored
+        self.size += len(data)
+        if len(data) > room:
+            data = data[:room]
+            self.truncated = True
+        if not data:
+            return
+        if self._file is None and (
+            self._memory + len(data) > self.limits.memory_limit
+        ):
+            self._file = tempfile.TemporaryFile(prefix="testpilot-ssh-")
+            self._file.writelines(self._chunks)
+            self._chunks = []
+        if self._file is not None:
+            self._file.write(data)
+        else:
+            self._chunks.append(data)
+            self._memory += len(data)
+
+    def getvalue(self) -> bytes:
+        if self._file is None:
+            return b"".join(self._chunks)
+        self._file.seek(0)
+        data = self._file.read()
+        self._file.seek(0, 2)
+        return data
+
+    def text(self) -> str:
+        return self.getvalue().decode("utf-8", errors="replace")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._chunks = []
+        self._memory = 0
+
+
+@dataclass
+class CommandOutput:
+    """Everything a finished remote command produced."""
+
+    stdout: OutputBuffer
+    stderr: OutputBuffer
+    exit_status: Optional[int]
+
+    @property
+    def output(self) -> str:
+        return self.stdout.text().strip()
+
+    @property
+    def error(self) -> str:
+        return self.stderr.text().strip()
+
+    @property
+    def truncated(self) -> bool:
+        return self.stdout.truncated or self.stderr.truncated
+
+    def close(self) -> None:
+        self.stdout.close()
+        self.stderr.close()
+
+
+class ChannelOutputReader:
+    """
+    Drains stdout and stderr of a paramiko exec channel together.
+
+    Use wait() to collect the whole output, or lines() to consume stdout
+    line by line while the command runs. Both run on the caller's thread.
+    """
+
+    def __init__(
+        self,
+        channel,
+        limits: Optional[OutputLimits] = None,
+        idle_timeout: Optional[float] = None,
+        keep_stdout: bool = True,
+        poll_interval: float = _POLL_INTERVAL,
+    ):
+        """
+        Args:
+            channel: Channel the command was started on
+            limits: Buffer limits for each stream
+            idle_timeout: Raise socket.timeout when neither stream produced
+                anything for this many seconds (None waits forever)
+            keep_stdout: False when stdout is only consumed through lines()
+            poll_interval: Longest wait for stdout in one read
+        """
+        self.channel = channel
+        self.idle_timeout = idle_timeout
+        self.keep_stdout = keep_stdout
+        self.stdout = OutputBuffer(limits)
+        self.stderr = OutputBuffer(limits)
+        self.exit_status: Optional[int] = None
+        self.done = False
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+        self._last_data = time.monotonic()
+        channel.settimeout(poll_interval)
+
+    def _drain_stderr(self) -> bool:
+        got = False
+        while self.channel.recv_stderr_ready():
+            data = self.channel.recv_stderr(_CHUNK_SIZE)
+            if not data:
+                break
+            self.stderr.write(data)
+            got = True
+        return got
+
+    def _finish(self) -> None:
+        self._drain_stderr()
+        status_event = getattr(self.channel, "status_event", None)
+        if status_event is not None:
+            status_event.wait(_EXIT_STATUS_WAIT)
+        if self.channel.exit_status_ready():
+            self.exit_status = self.channel.recv_exit_status()
+        self.done = True
+
+    def _read(self) -> bytes:
+        """
+        One step of draining: all waiting stderr, then one stdout chunk.
+
+        Waits up to poll_interval for stdout when there was nothing else to
+        read. Returns the stdout bytes read (b"" when none).
+        """
+        got_stderr = self._drain_stderr()
+        if got_stderr and not self.channel.recv_ready():
+            self._last_data = time.monotonic()
+            return b""
+        try:
+            data = self.channel.recv(_CHUNK_SIZE)
+        except socket.timeout:
+            if (
+                self.channel.exit_status_ready()
+                and not self.channel.recv_ready()
+                and not self.channel.recv_stderr_ready()
+            ):
+                self._finish()
+            elif (
+                self.idle_timeout is not None
+                and time.monotonic() - self._last_data > self.idle_timeout
+            ):
+                raise socket.timeout(
+                    f"No output for {self.idle_timeout:g}s"
+                ) from None
+            return b""
+        if not data:
+            self._finish()
+            return b""
+        self._last_data = time.monotonic()
+        if self.keep_stdout:
+            self.stdout.write(data)
+        return data
+
+    def lines(
+        self, stop: Optional[Callable[[], bool]] = None
+    ) -> Iterator[str]:
+        """
+        Yield stdout lines as they arrive, without line endings.
+
+        Multi-byte characters split across reads are decoded correctly.
+        Iteration ends at EOF or as soon as stop() returns True.
+        """
+        while not self.done:
+            if stop is not None and stop():
+                return
+            data = self._read()
+            if not data:
+                continue
+            text = self._partial + self._decoder.decode(data)
+            *complete, self._partial = text.split("\n")
+            for line in complete:
+                yield line.rstrip("\r")
+        text = self._partial + self._decoder.decode(b"", final=True)
+        self._partial = ""
+        if text:
+            yield text.rstrip("\r")
+
+    def wait(self) -> CommandOutput:
+        """Read both streams to EOF and return the collected output."""
+        while not self.done:
+            self._read()
+        if self.stdout.truncated or self.stderr.truncated:
+            logger.warning(
+                f"Command output truncated to {self.stdout.limits.max_bytes} bytes "
+                f"(stdout {self.stdout.size} bytes, stderr {self.stderr.size} bytes)"
+            )
+        return CommandOutput(self.stdout, self.stderr, self.exit_status)
+
+    def close(self) -> None:
+        try:
+            self.channel.close()
+        except Exception:
+            pass
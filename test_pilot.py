@@ -12,6 +12,7 @@ if sys.version_info < (3, 8):
     sys.exit(1)
 
 import argparse
+import asyncio
 import datetime
 import json
 import os
@@ -38,16 +39,31 @@ from examples.scripts.pattern_to_dict_converter import (
     PatternToDictConverter,
     integrate_with_excel_parser,
 )
-from src.testpilot.core.test_pilot_core import process_single_step
+from src.testpilot.core.async_runner import AsyncStepRuntime, run_flows_async
+from src.testpilot.core.flow_scheduler import FlowScheduler
+from src.testpilot.core.step_pacer import StepPacer
+from src.testpilot.core.test_pilot_core import (
+    plan_step_batches,
+    process_single_step_async,
+    process_step_batch,
+)
+from src.testpilot.core.validation_engine import validation_preflight
 from src.testpilot.ui.console_table_fmt import LiveProgressTable
 from src.testpilot.utils.config_resolver import (
+    ConfigSnapshot,
     load_config_with_env,
     mask_sensitive_data,
+    set_config_snapshot,
 )
 from src.testpilot.utils.rate_limiter import create_rate_limiter_from_config
 from src.testpilot.utils.excel_parser import ExcelParser, parse_excel_to_flows
+from src.testpilot.utils.http_agent import shutdown_http_agents
+from src.testpilot.utils.log_tailer import shutdown_log_tailers
 from src.testpilot.utils.logger import get_logger, set_global_log_level
 from src.testpilot.utils.myutils import set_pdb_trace
+from src.testpilot.utils.native_http import shutdown_native_http_client
+from src.testpilot.utils.pattern_store import get_pattern_store
+from src.testpilot.utils.pod_inventory import shutdown_pod_inventory
 from src.testpilot.utils.ssh_connector import SSHConnector
 
 logger = get_logger("TestPilot")
@@ -87,7 +103,13 @@ def parse_args():
         "--step-delay",
         type=float,
         default=1,
-        help="Delay (in seconds) between each test step [default: 1]",
+        help="Delay (in seconds) between each test step [default: 1]. With --pacing event it is only applied before steps that depend on an earlier one",
+    )
+    parser.add_argument(
+        "--pacing",
+        choices=["event", "fixed"],
+        default="event",
+        help="event: wait only before Compare_With GETs after a write, kubectl logs captures and wait() rows; fixed: sleep --step-delay after every step [default: event]",
     )
     parser.add_argument(
         "-v",
@@ -175,6 +197,69 @@ def parse_args():
         default="mock_data/test_results_20250719_122220.json",
         help="Real response data file for mock server (default: mock_data/test_results_20250719_122220.json)",
     )
+    parser.add_argument(
+        "--parallel-flows",
+        type=int,
+        default=1,
+        help="Number of test flows (Test_Name groups) to run concurrently; steps inside a flow stay ordered [default: 1]",
+    )
+    parser.add_argument(
+        "--log-collector",
+        choices=["capture", "stream", "tail"],
+        default=None,
+        help="How kubectl logs rows collect logs: capture (follow for capture_duration seconds), stream (stop at the first line matching Pattern_Match) or tail (one background tailer per pod, shared by all steps) [default: kubectl_logs_settings.collector or capture]",
+    )
+    parser.add_argument(
+        "--http-backend",
+        choices=["curl", "agent", "native"],
+        default=None,
+        help="How HTTP rows are sent: curl (kubectl exec + curl per request), agent (one long-lived request-runner per pod that keeps connections open) or native (pod_mode: send from this process over pooled connections) [default: http_settings.backend or curl]",
+    )
+    parser.add_argument(
+        "--parallel-hosts",
+        action="store_true",
+        help="Run each step on all target hosts at the same time instead of one host after another",
+    )
+    parser.add_argument(
+        "--batch-steps",
+        type=int,
+        default=0,
+        help="Send up to N consecutive independent GET rows of a flow to each host as one remote script (one SSH exec instead of N); needs SSH and the curl HTTP backend [default: 0, off]",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["threads", "async"],
+        default="threads",
+        help="Execution core: threads (one worker thread per parallel flow or host) or async (all flows on one event loop; waits cost no thread and blocking SSH/HTTP calls share one bounded pool) [default: threads]",
+    )
+    parser.add_argument(
+        "--step-timeout",
+        type=float,
+        default=None,
+        help="With --engine async: cancel a step that takes longer than N seconds on a host and record it as failed [default: no limit]",
+    )
+    parser.add_argument(
+        "--export-patterns",
+        action="store_true",
+        help="Also write the enhanced pattern matches and pattern type summary JSON files to examples/data (patterns are always indexed in memory)",
+    )
+    parser.add_argument(
+        "--revalidate",
+        metavar="RESULTS_JSON",
+        default=None,
+        help="Validate the outputs stored in a previous JSON results file against the current workbook and write a new report, without running any command",
+    )
+    parser.add_argument(
+        "--revalidate-workers",
+        type=int,
+        default=None,
+        help="Processes used by --revalidate [default: CPU count]",
+    )
+    parser.add_argument(
+        "--preflight",
+        action="store_true",
+        help="Only print which validation strategy each row will use, without connecting to any host",
+    )
     return parser.parse_args()
 
 
@@ -186,6 +271,9 @@ def load_config_and_targets(config_file):
         # Check for sensitive data in config
         check_config_security(data)
 
+        # Share one frozen copy with every step instead of re-reading the file
+        set_config_snapshot(ConfigSnapshot.from_dict(data, config_file))
+
     except FileNotFoundError:
         logger.error(f"Configuration file not found: {config_file}")
         logger.info("Please create a config file from the template:")
@@ -612,6 +700,53 @@ def substitute_placeholders(command, svc_map, placeholder_pattern):
     return placeholder_pattern.sub(repl, command)
 
 
+def revalidate_results(args, excel_parser, valid_sheets, enhanced_patterns):
+    """Re-run validation on a stored results file and export a new report."""
+    from src.testpilot.core.revalidate import load_result_records, revalidate
+
+    flows = parse_excel_to_flows(excel_parser, valid_sheets)
+    records = load_result_records(args.revalidate)
+    if args.test_name:
+        test_name = args.test_name.strip()
+        flows = [flow for flow in flows if flow.test_name == test_name]
+        records = [r for r in records if r.get("test_name") == test_name]
+
+    start = time.time()
+    report = revalidate(
+        records, flows, args.revalidate_workers, enhanced_patterns
+    )
+    logger.info(
+        f"Re-validated {report.revalidated} results in {time.time() - start:.2f}s: "
+        f"{report.changed} changed verdict, {report.kept} kubectl logs rows kept, "
+        f"{report.unmatched} without a workbook row"
+    )
+
+    steps = {
+        (flow.sheet, flow.test_name, step.row_idx): step
+        for flow in flows
+        for step in flow.steps
+    }
+    for result in report.results:
+        step = steps.get((result.sheet, result.test_name, result.row_idx))
+        if step is not None:
+            step.result = result
+    if report.results:
+        export_workflow_results(report.results, flows)
+
+
+def print_validation_preflight(flows, test_name=None):
+    """Print the validation strategy planned for every row."""
+    if test_name:
+        flows = [flow for flow in flows if flow.test_name == test_name.strip()]
+    rows = validation_preflight(flows)
+    if not rows:
+        print("No test steps found.")
+        return
+    print(tabulate(rows, headers="keys", tablefmt="grid"))
+    unmatched = [row for row in rows if row["Strategy"] == "(no matching rule)"]
+    print(f"{len(rows)} steps, {len(unmatched)} without a matching rule")
+
+
 def clear():
     os.system("cls" if os.name == "nt" else "clear")
 
@@ -657,9 +792,16 @@ def execute_flows(
     userargs=None,
     step_delay=1,
     rate_limiter=None,
+    parallel_flows=1,
+    parallel_hosts=False,
+    pacing="event",
+    batch_steps=0,
+    engine="threads",
+    step_timeout=None,
 ):
     test_results = []
     dashboard = None
+    pacer = StepPacer(step_delay) if pacing == "event" else None
 
     if show_table:
         try:
@@ -681,28 +823,127 @@ def execute_flows(
 
             dashboard = LiveProgressTable()
 
-    for flow in flows:
-        for step in flow.steps:
-            process_single_step(
-                step,
-                flow,
-                target_hosts,
-                svc_maps,
-                placeholder_pattern,
-                connector,
-                host_cli_map,
-                test_results,
-                show_table,
-                dashboard,
-                args=userargs,
-                step_delay=step_delay,
-                rate_limiter=rate_limiter,
+    def on_flow_done(flow, flow_results):
+        if show_table and dashboard is not None:
+            for result in flow_results:
+                dashboard.add_result(result)
+
+    if engine == "async":
+        # Every flow is a task on one event loop with a private results list;
+        # results are released to the dashboard in flow order.
+        runtime = AsyncStepRuntime(step_timeout=step_timeout)
+
+        async def run_flow_async(flow):
+            flow_results = []
+            for steps in plan_step_batches(flow.steps, batch_steps):
+                step_args = (
+                    flow,
+                    target_hosts,
+                    svc_maps,
+                    placeholder_pattern,
+                    connector,
+                    host_cli_map,
+                    flow_results,
+                    show_table,
+                    None,
+                )
+                step_kwargs = dict(
+                    args=userargs,
+                    step_delay=step_delay,
+                    rate_limiter=rate_limiter,
+                    host_fanout=parallel_hosts,
+                    pacer=pacer,
+                )
+                if len(steps) > 1:
+                    # A remote batch is one blocking SSH exec per host
+                    await runtime.call(
+                        process_step_batch, steps, *step_args, **step_kwargs
+                    )
+                else:
+                    await process_single_step_async(
+                        steps[0], *step_args, runtime=runtime, **step_kwargs
+                    )
+            return flow_results
+
+        try:
+            test_results.extend(
+                asyncio.run(
+                    run_flows_async(
+                        flows,
+                        run_flow_async,
+                        on_flow_done,
+                        max_concurrency=parallel_flows or 1,
+                    )
+                )
             )
+        finally:
+            runtime.close()
+    elif parallel_flows and parallel_flows > 1:
+        # Concurrent mode: each flow runs on its own worker with a private
+        # results list; results are released to the dashboard in flow order.
+        def run_flow(flow):
+            flow_results = []
+            for steps in plan_step_batches(flow.steps, batch_steps):
+                process_step_batch(
+                    steps,
+                    flow,
+                    target_hosts,
+                    svc_maps,
+                    placeholder_pattern,
+                    connector,
+                    host_cli_map,
+                    flow_results,
+                    show_table,
+                    None,
+                    args=userargs,
+                    step_delay=step_delay,
+                    rate_limiter=rate_limiter,
+                    host_fanout=parallel_hosts,
+                    pacer=pacer,
+                )
+            return flow_results
+
+        scheduler = FlowScheduler(max_workers=parallel_flows)
+        test_results.extend(scheduler.run(flows, run_flow, on_flow_done))
+    else:
+        for flow in flows:
+            for steps in plan_step_batches(flow.steps, batch_steps):
+                process_step_batch(
+                    steps,
+                    flow,
+                    target_hosts,
+                    svc_maps,
+                    placeholder_pattern,
+                    connector,
+                    host_cli_map,
+                    test_results,
+                    show_table,
+                    dashboard,
+                    args=userargs,
+                    step_delay=step_delay,
+                    rate_limiter=rate_limiter,
+                    host_fanout=parallel_hosts,
+                    pacer=pacer,
+                )
     # Print final summary if dashboard is present
     if dashboard:
         dashboard.print_final_summary()
 
+    if pacer is not None:
+        for line in pacer.format_report():
+            logger.info(f"⏱️  Pacing: {line}")
+
+    if rate_limiter is not None:
+        for line in rate_limiter.format_report():
+            logger.info(f"⏱️  Throttling: {line}")
+
     # Always print/export results summary, even if show_table is False
+    # Background log tailers, pod watches and HTTP agents hold channels on
+    # the connections
+    shutdown_log_tailers()
+    shutdown_pod_inventory()
+    shutdown_http_agents()
+    shutdown_native_http_client()
     if connector is not None:
         connector.close_all()
     if test_results:
@@ -850,13 +1091,15 @@ def safe_str(val):
     return str(val)
 
 
-def process_patterns(input_path):
+def process_patterns(input_path, export=False):
     """
-    Process patterns from Excel file and generate enhanced pattern matches JSON file.
+    Process patterns from Excel file and index the enhanced pattern matches.
     This function is integrated from patterns/pattern_main.py.
 
     Args:
         input_path (str): Path to the Excel file
+        export (bool): Also write the enhanced pattern matches and the
+            pattern type summary JSON files to examples/data
 
     Returns:
         dict: Enhanced pattern data
@@ -873,7 +1116,13 @@ def process_patterns(input_path):
         logger.debug("🔄 Converting patterns to dictionaries...")
         enhanced_data = integrate_with_excel_parser(raw_pattern_data)
 
-        # Step 3: Export results to patterns directory
+        # Step 3: Index them for the validators, without a file round-trip
+        get_pattern_store().load_data(enhanced_data)
+
+        if not export:
+            return enhanced_data
+
+        # Step 4: Export results to patterns directory
         logger.debug("💾 Exporting enhanced pattern matches...")
         patterns_dir = os.path.join(
             os.path.dirname(os.path.abspath(__file__)), "examples", "data"
@@ -1035,9 +1284,16 @@ def main():
                 f"Running tests for sheets: {', '.join(requested_sheets)}"
             )
 
-    # Process patterns from Excel file and generate enhanced pattern matches
-    # This step has to be at the beginning where it processes and creates files
-    # in the patterns folder, overwriting them each time the logic runs
+    if args.preflight:
+        print_validation_preflight(
+            parse_excel_to_flows(excel_parser, valid_sheets), args.test_name
+        )
+        return
+
+    # Process patterns from Excel file and index the enhanced pattern matches
+    # This step has to be at the beginning, before any step is validated;
+    # with --export-patterns it also (over)writes the JSON files in
+    # examples/data
 
     # Skip pattern processing in mock mode to improve performance
     if args.execution_mode == "mock":
@@ -1047,7 +1303,9 @@ def main():
         enhanced_patterns = None
     else:
         logger.info("Processing patterns from Excel file...")
-        enhanced_patterns = process_patterns(args.input)
+        enhanced_patterns = process_patterns(
+            args.input, export=args.export_patterns
+        )
         if enhanced_patterns:
             logger.info("Pattern processing completed successfully")
         else:
@@ -1075,6 +1333,11 @@ def main():
         logger.info(f"Rate limiting enabled from CLI: {args.rate_limit} reqs/sec")
     elif rate_limiter is not None:
         logger.info(f"Rate limiting enabled from config: {rate_limiter.default_rate} reqs/sec")
+    if args.revalidate:
+        load_config_and_targets(config_file)
+        revalidate_results(args, excel_parser, valid_sheets, enhanced_patterns)
+        return
+
     if args.dry_run:
         show_table = not args.no_table
         # Use dummy mapping for dry-run: map each placeholder to a dummy value for each host
@@ -1205,6 +1468,12 @@ def main():
                 args,
                 args.step_delay,
                 rate_limiter,
+                args.parallel_flows,
+                args.parallel_hosts,
+                args.pacing,
+                args.batch_steps,
+                args.engine,
+                args.step_timeout,
             )
 
         except ImportError:
@@ -1226,6 +1495,12 @@ def main():
             args,
             args.step_delay,
             rate_limiter,
+            args.parallel_flows,
+            args.parallel_hosts,
+            args.pacing,
+            args.batch_steps,
+            args.engine,
+            args.step_timeout,
         )
 
 
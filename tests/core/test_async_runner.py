@@ -0,0 +1,405 @@
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.testpilot.core import test_result
+from src.testpilot.core.async_runner import (
+    SYNC_RUNTIME,
+    AsyncStepRuntime,
+    run_blocking,
+    run_flows_async,
+)
+from src.testpilot.core.step_pacer import StepPacer
+from src.testpilot.core.test_pilot_core import (
+    process_single_step,
+    process_single_step_async,
+)
+from src.testpilot.mock.mock_connector import MockConnectorWrapper
+from src.testpilot.utils.rate_limiter import RateLimiter
+
+HEADERS = "< HTTP/2 200\n< content-type: application/json\n<"
+
+
+def _flow(name, *commands):
+    flow = test_result.TestFlow("Sheet1", name)
+    for row_idx, command in enumerate(commands, start=1):
+        flow.add_step(
+            test_result.TestStep(
+                row_idx,
+                "GET",
+                f"http://nf/{row_idx}",
+                None,
+                {},
+                200,
+                "UDR",
+                {
+                    "Command": command,
+                    "Compare_With": float("nan"),
+                    "Save_As": float("nan"),
+                },
+            )
+        )
+    return flow
+
+
+class FakeTarget:
+    """Answers every command like curl -v after a delay"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, command, host, connector, args=None, step_data=None):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        body = json.dumps({"nfType": "UDR", "host": host})
+        return body, HEADERS, self.delay, None
+
+
+def _run_async(flows, target, runtime, hosts=("host1",), **kwargs):
+    async def run_flow(flow):
+        results = []
+        for step in flow.steps:
+            await process_single_step_async(
+                step,
+                flow,
+                list(hosts),
+                {},
+                None,
+                None,
+                {},
+                results,
+                True,
+                None,
+                runtime=runtime,
+                **kwargs,
+            )
+        return results
+
+    with patch(
+        "src.testpilot.core.test_pilot_core.build_command_for_step",
+        side_effect=lambda data, *a, **kw: data["command"],
+    ), patch(
+        "src.testpilot.core.test_pilot_core._run_step_command",
+        side_effect=target,
+    ):
+        return asyncio.run(
+            run_flows_async(flows, run_flow, max_concurrency=len(flows))
+        )
+
+
+class TestRunBlocking:
+    """Test cases for run_blocking"""
+
+    def test_returns_value(self):
+        async def answer():
+            await SYNC_RUNTIME.sleep(0)
+            return 42
+
+        assert run_blocking(answer()) == 42
+
+    def test_suspending_coroutine_rejected(self):
+        with pytest.raises(RuntimeError, match="suspended"):
+            run_blocking(asyncio.sleep(0))
+
+    def test_usable_inside_running_loop(self):
+        async def outer():
+            flow = _flow("test_1", "curl http://nf/1")
+            results = []
+            with patch(
+                "src.testpilot.core.test_pilot_core.build_command_for_step",
+                side_effect=lambda data, *a, **kw: data["command"],
+            ), patch(
+                "src.testpilot.core.test_pilot_core._run_step_command",
+                side_effect=FakeTarget(),
+            ):
+                process_single_step(
+                    flow.steps[0],
+                    flow,
+                    ["host1"],
+                    {},
+                    None,
+                    None,
+                    {},
+                    results,
+                    True,
+                    None,
+                    step_delay=0,
+                )
+            return results
+
+        results = asyncio.run(outer())
+
+        assert [r.passed for r in results] == [True]
+
+
+class TestRunFlowsAsync:
+    """Test cases for run_flows_async"""
+
+    def test_results_in_flow_order(self):
+        flows = [_flow(f"test_{i}") for i in range(4)]
+        delays = [0.04, 0.0, 0.02, 0.01]
+        done = []
+
+        async def run_flow(flow):
+            index = int(flow.test_name.split("_")[1])
+            await asyncio.sleep(delays[index])
+            return [flow.test_name]
+
+        results = asyncio.run(
+            run_flows_async(
+                flows,
+                run_flow,
+                lambda flow, res: done.append(flow.test_name),
+                max_concurrency=4,
+            )
+        )
+
+        assert results == ["test_0", "test_1", "test_2", "test_3"]
+        assert done == results
+
+    def test_concurrency_limit(self):
+        flows = [_flow(f"test_{i}") for i in range(6)]
+        state = {"running": 0, "max": 0}
+
+        async def run_flow(flow):
+            state["running"] += 1
+            state["max"] = max(state["max"], state["running"])
+            await asyncio.sleep(0.01)
+            state["running"] -= 1
+            return []
+
+        asyncio.run(run_flows_async(flows, run_flow, max_concurrency=2))
+
+        assert state["max"] == 2
+
+    def test_failure_cancels_other_flows(self):
+        flows = [_flow("test_0"), _flow("test_1")]
+        cancelled = []
+
+        async def run_flow(flow):
+            if flow.test_name == "test_0":
+                await asyncio.sleep(0.01)
+                raise ValueError("boom")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(flow.test_name)
+                raise
+
+        start = time.time()
+        with pytest.raises(ValueError):
+            asyncio.run(run_flows_async(flows, run_flow, max_concurrency=2))
+
+        assert cancelled == ["test_1"]
+        assert time.time() - start < 5
+
+
+class TestAsyncStepRuntime:
+    """Steps on the async core share one loop and one bounded pool"""
+
+    def test_waiting_steps_do_not_hold_threads(self):
+        flows = [
+            _flow(f"test_{i}", "curl http://nf/1", "curl http://nf/2")
+            for i in range(20)
+        ]
+        target = FakeTarget(delay=0.01)
+        runtime = AsyncStepRuntime(max_io_workers=4)
+
+        start = time.time()
+        try:
+            results = _run_async(flows, target, runtime, step_delay=0.2)
+        finally:
+            runtime.close()
+
+        # 20 flows x 2 steps x 0.2s step_delay, overlapped on the loop
+        assert time.time() - start < 2
+        assert len(results) == 40 and all(r.passed for r in results)
+        assert target.max_in_flight <= 4
+        assert all(name.startswith("testpilot-io") for name in target.threads)
+
+    def test_host_fanout(self):
+        target = FakeTarget(delay=0.05)
+        runtime = AsyncStepRuntime(max_io_workers=8)
+        hosts = ("host1", "host2", "host3", "host4")
+
+        try:
+            results = _run_async(
+                [_flow("test_1", "curl http://nf/1")],
+                target,
+                runtime,
+                hosts,
+                step_delay=0,
+                host_fanout=True,
+            )
+        finally:
+            runtime.close()
+
+        assert target.max_in_flight == 4
+        assert [r.host for r in results] == list(hosts)
+
+    def test_step_timeout_records_failure(self):
+        target = FakeTarget(delay=0.5)
+        runtime = AsyncStepRuntime(step_timeout=0.1)
+
+        try:
+            results = _run_async(
+                [_flow("test_1", "curl http://nf/1")],
+                target,
+                runtime,
+                step_delay=0,
+            )
+        finally:
+            runtime.close()
+
+        assert len(results) == 1
+        assert not results[0].passed
+        assert "timed out" in results[0].fail_reason
+
+    def test_pacer_waits_on_loop(self):
+        pacer = StepPacer(settle_delay=0)
+        flows = [_flow(f"test_{i}", "wait(1)") for i in range(10)]
+        runtime = AsyncStepRuntime(max_io_workers=1)
+
+        start = time.time()
+        try:
+            results = _run_async(flows, FakeTarget(), runtime, pacer=pacer)
+        finally:
+            runtime.close()
+
+        assert results == []
+        assert time.time() - start < 3
+        assert pacer.report()["Sheet1"].by_reason["wait"] == 10
+
+
+class TestAsyncMockContext:
+    """The mock sees each step's sheet, test and row on the async core"""
+
+    def test_mock_receives_step_context(self):
+        connector = MockConnectorWrapper(Mock(mock_server_url="http://mock"))
+        flows = [
+            _flow(f"test_{i}", "curl http://nf/1", "curl http://nf/2")
+            for i in range(4)
+        ]
+        seen = []
+        lock = threading.Lock()
+
+        def mock_command(command, host, conn, sheet_name, test_name):
+            time.sleep(0.01)
+            with lock:
+                seen.append((sheet_name, test_name, conn._current_row_idx))
+            body = json.dumps({"nfType": "UDR"})
+            return body, HEADERS, 0.0
+
+        async def run_flow(flow):
+            results = []
+            for step in flow.steps:
+                await process_single_step_async(
+                    step,
+                    flow,
+                    ["host1"],
+                    {},
+                    None,
+                    connector,
+                    {},
+                    results,
+                    True,
+                    None,
+                    step_delay=0,
+                    runtime=runtime,
+                )
+            return results
+
+        runtime = AsyncStepRuntime(max_io_workers=4)
+        try:
+            with patch(
+                "src.testpilot.core.test_pilot_core.build_command_for_step",
+                side_effect=lambda data, *a, **kw: data["command"],
+            ), patch(
+                "src.testpilot.core.test_pilot_core.execute_mock_command",
+                side_effect=mock_command,
+            ):
+                results = asyncio.run(
+                    run_flows_async(flows, run_flow, max_concurrency=4)
+                )
+        finally:
+            runtime.close()
+
+        assert len(results) == 8 and all(r.passed for r in results)
+        assert sorted(seen) == sorted(
+            ("Sheet1", f"test_{i}", row) for i in range(4) for row in (1, 2)
+        )
+
+
+class TestRateLimitedSteps:
+    """Rate limit waits on both runtimes"""
+
+    def test_async_flows_share_the_rate(self):
+        limiter = RateLimiter(default_rate=20.0, burst_size=1)
+        flows = [_flow(f"test_{i}", "curl http://nf/1") for i in range(10)]
+        runtime = AsyncStepRuntime(max_io_workers=2)
+
+        start = time.time()
+        try:
+            results = _run_async(
+                flows,
+                FakeTarget(),
+                runtime,
+                step_delay=0,
+                rate_limiter=limiter,
+            )
+        finally:
+            runtime.close()
+
+        assert len(results) == 10
+        assert time.time() - start >= 0.4
+        assert limiter.get_throttle_stats()["rate"].requests == 9
+
+    def test_row_rate_does_not_leak(self):
+        limiter = RateLimiter(default_rate=50.0)
+        flow = _flow("test_1", "curl http://nf/1", "curl http://nf/2")
+        flow.steps[0].other_fields["reqs_sec"] = 1
+        results = []
+
+        with patch(
+            "src.testpilot.core.test_pilot_core.build_command_for_step",
+            side_effect=lambda data, *a, **kw: data["command"],
+        ), patch(
+            "src.testpilot.core.test_pilot_core._run_step_command",
+            side_effect=FakeTarget(),
+        ):
+            for step in flow.steps:
+                process_single_step(
+                    step,
+                    flow,
+                    ["host1", "host2"],
+                    {},
+                    None,
+                    None,
+                    {},
+                    results,
+                    True,
+                    None,
+                    rate_limiter=limiter,
+                )
+
+        stats = limiter.get_throttle_stats()
+        assert len(results) == 4
+        assert stats["row:Sheet1:1"].seconds == pytest.approx(1.0, abs=0.05)
+        assert limiter.get_status()["rate"] == 50.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
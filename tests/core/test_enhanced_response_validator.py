@@ -14,6 +14,9 @@ from src.testpilot.core.enhanced_response_validator import (
     _list_dicts_match,
     _remove_ignored_fields,
     _search_nested_key_value,
+    clear_pattern_cache,
+    compile_pattern,
+    pattern_cache_info,
     validate_response_enhanced,
 )
 
@@ -1064,6 +1067,62 @@ class TestValidateResponseEnhanced:
         )  # Empty pattern should be treated as None
 
 
+class TestCompiledPattern:
+    """Test cases for the compiled Pattern_Match cache"""
+
+    def setup_method(self):
+        clear_pattern_cache()
+
+    def test_same_text_returns_cached_pattern(self):
+        first = compile_pattern("status:active")
+        second = compile_pattern("status:active")
+
+        assert first is second
+        assert pattern_cache_info().hits == 1
+
+    def test_compiled_fields(self):
+        compiled = compile_pattern('"count:3","name:John"')
+
+        assert compiled.key_value_pairs == (
+            ("count", "3", 3),
+            ("name", "John", "John"),
+        )
+        assert compiled.regex.search('"count:3","name:John"')
+        assert compiled.is_json is False
+
+        json_pattern = compile_pattern('{"a": 1}')
+        assert json_pattern.skip_key_value == "JSON string pattern"
+        assert json_pattern.json_value == {"a": 1}
+
+    def test_invalid_regex_is_kept_as_error(self):
+        compiled = compile_pattern("[unclosed")
+
+        assert compiled.regex is None
+        assert compiled.regex_error
+        assert compiled.json_error
+
+    def test_pattern_compiled_once_across_lines(self):
+        """Per-line kubectl validation reuses one compiled pattern"""
+        mock_logger = Mock()
+        lines = [f'{{"level":"INFO","msg":"line {i}"}}' for i in range(50)]
+
+        with patch(
+            "src.testpilot.core.enhanced_response_validator.re.compile",
+            wraps=re.compile,
+        ) as mock_compile:
+            for line in lines:
+                validate_response_enhanced(
+                    pattern_match="msg:line 49x",
+                    response_headers={},
+                    response_body=line,
+                    response_payload=None,
+                    logger=mock_logger,
+                )
+
+        assert mock_compile.call_count == 1
+        assert pattern_cache_info().misses == 1
+
+
 class TestEdgeCases:
     """Additional edge case tests"""
 
@@ -0,0 +1,119 @@
+import random
+import threading
+import time
+
+import pytest
+
+from src.testpilot.core.flow_scheduler import FlowScheduler
+from src.testpilot.core.test_result import TestFlow, TestStep
+
+
+def _make_flows(num_flows, steps_per_flow):
+    flows = []
+    for f in range(num_flows):
+        flow = TestFlow("Sheet1", f"test_{f}")
+        for s in range(steps_per_flow):
+            flow.add_step(
+                TestStep(
+                    row_idx=f * steps_per_flow + s,
+                    method="GET",
+                    url=None,
+                    payload=None,
+                    headers={},
+                    expected_status=200,
+                    pattern_match=None,
+                )
+            )
+        flows.append(flow)
+    return flows
+
+
+def _ordered_runner(delay_range=(0.0, 0.01)):
+    """Runner returning one fake result (row_idx) per step."""
+
+    def run_flow(flow):
+        results = []
+        for step in flow.steps:
+            time.sleep(random.uniform(*delay_range))
+            flow.context.setdefault("seen", []).append(step.row_idx)
+            results.append(step.row_idx)
+        return results
+
+    return run_flow
+
+
+class TestFlowScheduler:
+    """Test cases for FlowScheduler"""
+
+    def test_sequential_mode_preserves_order(self):
+        """max_workers=1 behaves like the plain sequential loop"""
+        flows = _make_flows(3, 2)
+        results = FlowScheduler(max_workers=1).run(flows, _ordered_runner())
+        assert results == list(range(6))
+
+    def test_parallel_results_are_in_flow_order(self):
+        """Results come back in sheet/row order regardless of completion"""
+        flows = _make_flows(8, 3)
+        results = FlowScheduler(max_workers=4).run(
+            flows, _ordered_runner((0.0, 0.02))
+        )
+        assert results == list(range(24))
+
+    def test_steps_within_flow_stay_ordered(self):
+        """Each flow's steps are executed in order by a single worker"""
+        flows = _make_flows(5, 4)
+        FlowScheduler(max_workers=5).run(flows, _ordered_runner())
+        for flow in flows:
+            assert flow.context["seen"] == [s.row_idx for s in flow.steps]
+
+    def test_flows_actually_run_concurrently(self):
+        """Independent flows overlap in time when workers > 1"""
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def run_flow(flow):
+            with lock:
+                active.append(flow)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(flow)
+            return []
+
+        FlowScheduler(max_workers=4).run(_make_flows(4, 1), run_flow)
+        assert max(peak) > 1
+
+    def test_on_flow_done_called_in_order_on_caller_thread(self):
+        """Completion callback runs in flow order on the calling thread"""
+        flows = _make_flows(6, 1)
+        calls = []
+        caller = threading.current_thread()
+
+        def on_flow_done(flow, flow_results):
+            assert threading.current_thread() is caller
+            calls.append(flow.test_name)
+
+        FlowScheduler(max_workers=3).run(
+            flows, _ordered_runner((0.0, 0.02)), on_flow_done
+        )
+        assert calls == [f.test_name for f in flows]
+
+    def test_worker_exception_propagates(self):
+        """A failing flow surfaces its exception to the caller"""
+
+        def run_flow(flow):
+            if flow.test_name == "test_1":
+                raise RuntimeError("boom")
+            return []
+
+        with pytest.raises(RuntimeError, match="boom"):
+            FlowScheduler(max_workers=2).run(_make_flows(3, 1), run_flow)
+
+    def test_empty_flow_list(self):
+        """No flows means no results"""
+        assert FlowScheduler(max_workers=4).run([], _ordered_runner()) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
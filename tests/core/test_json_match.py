@@ -0,0 +1,174 @@
+import copy
+import json
+import os
+import random
+
+import pytest
+
+from src.testpilot.core.json_match import (
+    _flatten_json,
+    compare_json_objects,
+    compare_structure_and_values,
+)
+
+MOCK_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "mock_data"
+)
+
+
+def _reference_flatten(obj, ignore_array_order=True, parent_key="", sep="."):
+    """The original recursive flatten_json, kept as the behaviour oracle"""
+
+    def normalize(arr):
+        try:
+            if all(
+                isinstance(item, (str, int, float, bool, type(None)))
+                for item in arr
+            ):
+                return sorted(arr, key=str)
+            return sorted(
+                arr,
+                key=lambda x: (
+                    json.dumps(x, sort_keys=True)
+                    if isinstance(x, (dict, list))
+                    else str(x)
+                ),
+            )
+        except (TypeError, ValueError):
+            return arr
+
+    items = []
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            new_key = f"{parent_key}{sep}{k}" if parent_key else k
+            items.extend(
+                _reference_flatten(v, ignore_array_order, new_key).items()
+            )
+    elif isinstance(obj, list):
+        if ignore_array_order:
+            for i, v in enumerate(normalize(obj)):
+                new_key = f"{parent_key}[item_{i}]"
+                items.extend(
+                    _reference_flatten(v, ignore_array_order, new_key).items()
+                )
+        else:
+            for i, v in enumerate(obj):
+                new_key = f"{parent_key}[{i}]"
+                items.extend(
+                    _reference_flatten(v, ignore_array_order, new_key).items()
+                )
+    else:
+        return {parent_key: obj}
+    return dict(items)
+
+
+def _mock_data_payloads():
+    """JSON bodies recorded in mock_data/, grouped by sheet"""
+    payloads = {}
+    for name in sorted(os.listdir(MOCK_DATA_DIR)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(MOCK_DATA_DIR, name)) as f:
+            results = json.load(f).get("results", [])
+        for entry in results:
+            try:
+                body = json.loads(entry.get("output") or "")
+            except ValueError:
+                continue
+            if isinstance(body, (dict, list)):
+                payloads.setdefault(entry["sheet"], []).append(body)
+    return payloads
+
+
+def _random_json(rng, depth=0):
+    kind = rng.random()
+    if depth > 4 or kind < 0.35:
+        return rng.choice(
+            [rng.randint(0, 5), "a", "b", None, True, 1.5, "", "x.y"]
+        )
+    if kind < 0.7:
+        return {
+            rng.choice(["a", "b", "c", "d.e", ""]): _random_json(
+                rng, depth + 1
+            )
+            for _ in range(rng.randint(0, 4))
+        }
+    return [_random_json(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+
+
+class TestFlattenJson:
+    """_flatten_json matches the original recursive flattening"""
+
+    @pytest.mark.parametrize("ignore_array_order", [True, False])
+    def test_random_documents(self, ignore_array_order):
+        rng = random.Random(1234)
+        for _ in range(500):
+            doc = _random_json(rng)
+            flat = _flatten_json(doc, ignore_array_order)
+            expected = _reference_flatten(doc, ignore_array_order)
+            assert flat == expected
+            assert list(flat) == list(expected)
+
+    def test_unsortable_array_keeps_order(self):
+        doc = {"a": [{"x": 1}, {1: "int key", "y": 2}]}
+
+        assert _flatten_json(doc) == _reference_flatten(doc)
+
+    def test_circular_reference_raises(self):
+        doc = {"key": "value"}
+        doc["circular"] = doc
+
+        with pytest.raises(RecursionError):
+            _flatten_json(doc)
+
+    def test_empty_containers_have_no_keys(self):
+        assert _flatten_json({"a": {}, "b": []}) == {}
+        assert _flatten_json(5) == {"": 5}
+
+
+class TestCompareStructureAndValues:
+    """Results stay identical on recorded payloads"""
+
+    def test_mock_data_payloads(self):
+        payloads = _mock_data_payloads()
+        assert payloads
+
+        for bodies in payloads.values():
+            for first, second in zip(bodies, bodies[1:] + bodies[:1]):
+                result = compare_structure_and_values(first, second)
+                flat1 = _reference_flatten(first)
+                flat2 = _reference_flatten(second)
+                keys = set(flat1) | set(flat2)
+                matching = sum(
+                    1
+                    for k in keys
+                    if k in flat1 and k in flat2 and flat1[k] == flat2[k]
+                )
+                assert result["total_fields"] == len(keys)
+                assert result["matching_fields"] == matching
+
+    def test_reordered_nf_services_match(self):
+        profile = {
+            "nfType": "UDR",
+            "nfServices": [
+                {
+                    "serviceName": f"nudr-{i}",
+                    "versions": [{"apiVersionInUri": "v1"}],
+                    "ipEndPoints": [{"port": 8000 + i}, {"port": 9000 + i}],
+                }
+                for i in range(50)
+            ],
+        }
+        shuffled = copy.deepcopy(profile)
+        random.Random(7).shuffle(shuffled["nfServices"])
+        for service in shuffled["nfServices"]:
+            service["ipEndPoints"].reverse()
+
+        result = compare_json_objects(profile, shuffled)
+
+        assert result["match_percentage"] == 100.0
+        assert result["missing_details"] == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,162 @@
+import copy
+import logging
+import pickle
+from dataclasses import asdict
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.testpilot.core import enhanced_response_validator, test_result
+from src.testpilot.core.test_result import LazyDetails
+from src.testpilot.core.validation_engine import (
+    GetCompareWithPutValidator,
+    ValidationContext,
+    ValidationDispatcher,
+    check_diff,
+)
+
+
+def _context(expected, actual, saved_payload=None, method="PUT"):
+    return ValidationContext(
+        method=method,
+        request_payload=None,
+        expected_status=200,
+        response_payload=expected,
+        pattern_match=None,
+        actual_status=200,
+        response_body=actual,
+        response_headers={},
+        saved_payload=saved_payload,
+    )
+
+
+def _test_result(details):
+    return test_result.TestResult(
+        sheet="Sheet1",
+        row_idx=1,
+        host="host1",
+        command="curl",
+        output="",
+        error="",
+        expected_status=200,
+        actual_status=200,
+        pattern_match=None,
+        pattern_found=None,
+        passed=False,
+        fail_reason="mismatch",
+        details=details,
+    )
+
+
+class TestLazyDetails:
+    """Test cases for LazyDetails"""
+
+    def test_built_once_on_first_read(self):
+        factory = Mock(return_value={"difference": {"values_changed": {}}})
+        details = LazyDetails(factory)
+
+        factory.assert_not_called()
+        assert not details.materialized
+        assert "difference" in details
+        assert details["difference"] == {"values_changed": {}}
+        assert dict(details) == factory.return_value
+        factory.assert_called_once()
+        assert details.materialized
+
+    def test_empty_factory_result_is_falsy(self):
+        details = LazyDetails(lambda: None)
+
+        assert not details
+        assert details.get("difference") is None
+
+    def test_copies_are_plain_dicts(self):
+        details = LazyDetails(lambda: {"expected": {"a": 1}})
+
+        assert type(copy.deepcopy(details)) is dict
+        assert pickle.loads(pickle.dumps(details)) == {"expected": {"a": 1}}
+        assert asdict(_test_result(details))["details"] == {
+            "expected": {"a": 1}
+        }
+
+
+class TestLazyValidationDetails:
+    """Failure details are only built when they are read"""
+
+    def test_check_diff_defers_deepdiff(self):
+        with patch(
+            "src.testpilot.core.validation_engine.DeepDiff"
+        ) as deep_diff:
+            deep_diff.return_value.to_dict.return_value = {"values_changed": 1}
+            result = check_diff(_context({"a": 1}, '{"a": 2}'))
+
+            assert not result.passed
+            deep_diff.assert_not_called()
+
+            assert result.details["difference"] == {"values_changed": 1}
+            assert result.details["actual"] == {"a": 2}
+            deep_diff.assert_called_once()
+
+    def test_get_compare_defers_deepdiff(self):
+        context = _context(
+            None, '{"a": [1, 2]}', saved_payload='{"a": [2, 1]}', method="GET"
+        )
+
+        with patch(
+            "src.testpilot.core.validation_engine.DeepDiff",
+            wraps=__import__("deepdiff").DeepDiff,
+        ) as deep_diff:
+            result = GetCompareWithPutValidator().validate(context)
+            deep_diff.assert_not_called()
+
+            # Order-only differences leave nothing to report
+            assert not result.passed
+            assert not result.details
+            deep_diff.assert_called_once()
+
+    def test_debug_messages_are_not_built_above_debug(self):
+        class Status(int):
+            def __format__(self, spec):
+                raise AssertionError("debug message was formatted")
+
+        context = _context({"a": 1}, '{"a": 2}')
+        context.expected_status = context.actual_status = Status(200)
+
+        with patch("logging.Logger.isEnabledFor", return_value=False):
+            result = ValidationDispatcher().dispatch(context)
+
+        assert not result.passed
+
+    def test_enhanced_dict_diff_is_deferred(self):
+        logger = Mock()
+        logger.isEnabledFor.return_value = False
+
+        with patch.object(
+            enhanced_response_validator,
+            "_dict_diff",
+            wraps=enhanced_response_validator._dict_diff,
+        ) as dict_diff:
+            result = enhanced_response_validator.validate_response_enhanced(
+                {"a": 1}, {}, '{"a": 2}', None, logger
+            )
+            dict_diff.assert_not_called()
+
+            assert result["dict_match"] is False
+            assert result["differences"] == {"a": {"expected": 1, "actual": 2}}
+            dict_diff.assert_called_once()
+
+    def test_enhanced_differences_still_logged_at_info(self, caplog):
+        logger = logging.getLogger("test.enhanced_differences")
+
+        with caplog.at_level(logging.INFO, logger=logger.name):
+            enhanced_response_validator.validate_response_enhanced(
+                {"a": 1}, {}, '{"a": 2}', None, logger
+            )
+
+        assert (
+            "Differences: {'a': {'expected': 1, 'actual': 2}}"
+            in caplog.messages
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
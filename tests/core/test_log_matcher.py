@@ -0,0 +1,125 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from src.testpilot.core.enhanced_response_validator import (
+    validate_response_enhanced,
+)
+from src.testpilot.core.log_matcher import LogPatternMatcher, line_anchors
+
+
+def _log(target_line=None, lines=200):
+    """Multi-pod JSON log with an optional line in the middle"""
+    entries = []
+    for i in range(lines):
+        entries.append(
+            json.dumps(
+                {
+                    "level": "INFO",
+                    "pod": f"nudr-drservice-{i % 3}",
+                    "message": f"Processed request {i}",
+                    "latency": i * 0.5,
+                }
+            )
+        )
+        if target_line is not None and i == lines // 2:
+            entries.append(target_line)
+    return "\n".join(entries)
+
+
+def _check_line(pattern, headers=None):
+    def check(line):
+        result = validate_response_enhanced(
+            pattern, headers or {}, line, None, Mock()
+        )
+        return result["pattern_match_overall"] is True
+
+    return check
+
+
+def _brute_force(pattern, text, headers=None):
+    check = _check_line(pattern, headers)
+    return next((line for line in text.split("\n") if check(line)), None)
+
+
+class TestLineAnchors:
+    """Test cases for line_anchors"""
+
+    def test_substring_pattern(self):
+        assert line_anchors("Subscriber not found") == ["Subscriber"]
+
+    def test_key_value_pattern_anchors_every_key(self):
+        anchors = line_anchors("nfType:SLF,nfStatus:REGISTERED")
+
+        assert "nfType" in anchors
+        assert "nfStatus" in anchors
+
+    def test_patterns_without_required_words(self):
+        assert line_anchors("Error|Warn") is None
+        assert line_anchors("(?i)error") is None
+        assert line_anchors("{}") is None
+        assert line_anchors("") is None
+        assert line_anchors(None) is None
+
+
+class TestLogPatternMatcher:
+    """The prefiltered scan finds the same line as checking every line"""
+
+    @pytest.mark.parametrize(
+        "pattern,target",
+        [
+            ("Subscriber not found", "E0101 Subscriber not found for imsi"),
+            (
+                "level:ERROR",
+                '{"level": "ERROR", "message": "Connection refused"}',
+            ),
+            ('"message":"timeout"', '{"message": "timeout", "level": "WARN"}'),
+            ('{"level": "ERROR"}', '{"level": "ERROR", "pod": "x"}'),
+            ('["nudr-notify"]', '{"tags": ["nudr-notify", "audit"]}'),
+            ("Error.*timed out", "Error: request timed out after 5s"),
+            ("café", '{"message": "caf\\u00e9 opened"}'),
+            ("Processed request 150", None),
+            ("never logged", None),
+        ],
+    )
+    def test_same_result_as_every_line(self, pattern, target):
+        text = _log(target)
+        matcher = LogPatternMatcher(pattern, _check_line(pattern))
+
+        assert matcher.find(text) == _brute_force(pattern, text)
+
+    def test_only_candidate_lines_are_checked(self):
+        text = _log("E0101 Subscriber not found for imsi")
+        matcher = LogPatternMatcher(
+            "Subscriber not found", _check_line("Subscriber not found")
+        )
+
+        assert matcher.find(text) == "E0101 Subscriber not found for imsi"
+        # Header probe plus the one candidate line
+        assert matcher.lines_checked == 2
+
+    def test_header_match_falls_back_to_every_line(self):
+        headers = {"x-reason": "Subscriber not found"}
+        text = _log()
+        matcher = LogPatternMatcher(
+            "Subscriber not found",
+            _check_line("Subscriber not found", headers),
+        )
+
+        assert matcher.find(text) == _brute_force(
+            "Subscriber not found", text, headers
+        )
+
+    def test_short_logs_are_checked_line_by_line(self):
+        check = Mock(side_effect=[False, True])
+        matcher = LogPatternMatcher("test_pattern", check)
+
+        assert matcher.find("line1\nline2 test_pattern\nline3") == (
+            "line2 test_pattern"
+        )
+        assert check.call_count == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
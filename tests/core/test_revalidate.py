@@ -0,0 +1,145 @@
+import json
+
+import pytest
+
+from src.testpilot.core import test_result
+from src.testpilot.core.revalidate import load_result_records, revalidate
+from src.testpilot.core.test_pilot_core import (
+    extract_step_data,
+    validate_and_create_result,
+)
+from src.testpilot.core.validation_engine import plan_flow_validation
+from src.testpilot.exporters import test_results_exporter
+from src.testpilot.utils.response_parser import parse_curl_output
+
+BODY = json.dumps({"nfStatus": "REGISTERED", "nfType": "UDR"})
+ERROR = "< HTTP/2 200\n< content-type: application/json\n<\n"
+
+
+def _step(row_idx, method, pattern, command="curl -X GET http://nf/x"):
+    return test_result.TestStep(
+        row_idx,
+        method,
+        "http://nf/x",
+        None,
+        {},
+        200,
+        pattern,
+        {
+            "Command": command,
+            "Response_Payload": float("nan"),
+            "Compare_With": float("nan"),
+            "Save_As": float("nan"),
+        },
+    )
+
+
+def _flow(*steps):
+    flow = test_result.TestFlow("Sheet1", "test_1")
+    for step in steps:
+        flow.add_step(step)
+    plan_flow_validation(flow)
+    return flow
+
+
+def _run(flow, hosts=("host1",)):
+    """Results as a live run would record them, one per step and host"""
+    results = []
+    for step in flow.steps:
+        for host in hosts:
+            results.append(
+                validate_and_create_result(
+                    step,
+                    flow,
+                    extract_step_data(step),
+                    parse_curl_output(BODY, ERROR),
+                    BODY,
+                    ERROR,
+                    0.1,
+                    host,
+                    step.other_fields["Command"],
+                )
+            )
+    return results
+
+
+def _export(results, tmp_path):
+    exporter = test_results_exporter.TestResultsExporter(str(tmp_path))
+    return load_result_records(
+        exporter.export_to_json(results, str(tmp_path / "results.json"))
+    )
+
+
+class TestRevalidate:
+    """Stored outputs are validated again against the current workbook"""
+
+    def test_tuned_pattern_changes_verdict(self, tmp_path):
+        records = _export(_run(_flow(_step(1, "GET", "SUSPENDED"))), tmp_path)
+        assert not records[0]["passed"]
+
+        report = revalidate(
+            records, [_flow(_step(1, "GET", "REGISTERED"))], workers=1
+        )
+
+        assert report.revalidated == 1
+        assert report.changed == 1
+        assert report.results[0].passed
+        assert report.results[0].actual_status == 200
+
+    def test_matches_old_files_by_position(self, tmp_path):
+        flow = _flow(_step(1, "PUT", None), _step(2, "GET", "UDR"))
+        records = _export(_run(flow, hosts=("host1", "host2")), tmp_path)
+        for record in records:
+            del record["excel_row"]
+
+        report = revalidate(records, [flow], workers=1)
+
+        assert [(r.row_idx, r.host) for r in report.results] == [
+            (1, "host1"),
+            (1, "host2"),
+            (2, "host1"),
+            (2, "host2"),
+        ]
+        assert report.changed == 0
+
+    def test_kubectl_logs_rows_are_kept(self, tmp_path):
+        flow = _flow(
+            _step(1, "GET", "ERROR", command="kubectl logs nudr-0 -n ns"),
+            _step(2, "GET", "UDR"),
+        )
+        records = _export(_run(flow), tmp_path)
+        records[0]["passed"] = True
+
+        report = revalidate(records, [flow], workers=1)
+
+        assert report.kept == 1
+        assert report.revalidated == 1
+        assert report.results[0].passed
+
+    def test_rows_missing_from_workbook_are_skipped(self, tmp_path):
+        records = _export(_run(_flow(_step(7, "GET", "UDR"))), tmp_path)
+
+        report = revalidate(records, [_flow(_step(1, "GET", "UDR"))])
+
+        assert report.unmatched == 1
+        assert report.results == []
+
+    def test_process_pool_gives_same_results(self, tmp_path):
+        flow = _flow(*(_step(i, "GET", "UDR") for i in range(1, 9)))
+        records = _export(_run(flow, hosts=("host1", "host2")), tmp_path)
+        records[3]["passed"] = False
+
+        serial = revalidate(records, [flow], workers=1)
+        pooled = revalidate(records, [flow], workers=2)
+
+        assert [r.passed for r in pooled.results] == [
+            r.passed for r in serial.results
+        ]
+        assert [(r.row_idx, r.host) for r in pooled.results] == [
+            (r.row_idx, r.host) for r in serial.results
+        ]
+        assert pooled.changed == serial.changed == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,218 @@
+import json
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.testpilot.core import test_result
+from src.testpilot.core.test_pilot_core import (
+    plan_step_batches,
+    process_step_batch,
+)
+from src.testpilot.utils.rate_limiter import RateLimiter
+
+posix_only = pytest.mark.skipif(
+    sys.platform.startswith("win"), reason="uses POSIX shell commands"
+)
+
+HEADERS = "< HTTP/2 200\n< content-type: application/json\n<"
+
+
+def _step(row_idx, method="GET", pattern="UDR", **fields):
+    other_fields = {
+        "Command": f"curl -X {method} http://nf/{row_idx}",
+        "Compare_With": float("nan"),
+        "Save_As": float("nan"),
+    }
+    other_fields.update(fields)
+    return test_result.TestStep(
+        row_idx,
+        method,
+        f"http://nf/{row_idx}",
+        None,
+        {},
+        200,
+        pattern,
+        other_fields,
+    )
+
+
+def _remote_command(data, *args, step=None, **kwargs):
+    """A shell command answering like curl -v for the step's row"""
+    body = json.dumps({"nfType": "UDR", "row": step.row_idx})
+    return f"echo '{body}'; printf '{HEADERS}\\n' >&2"
+
+
+class LocalSSHConnector:
+    """SSH connector stand-in running commands in a local shell"""
+
+    use_ssh = True
+
+    def __init__(self, cut_after=None):
+        self.commands = []
+        self.cut_after = cut_after
+
+    def get_host_config(self, host):
+        return None
+
+    def run_command(self, command, target_hosts, timeout=30):
+        self.commands.append(command)
+        result = subprocess.run(
+            command, shell=True, capture_output=True, text=True
+        )
+        output = result.stdout
+        if self.cut_after is not None and "__TP_BATCH_" in command:
+            # Connection lost partway through the batch
+            output = output[: output.index(self.cut_after)]
+        return {
+            target_hosts[0]: {
+                "output": output.strip(),
+                "error": result.stderr.strip(),
+            }
+        }
+
+
+def _run(
+    steps, connector, hosts=("host1", "host2"), args=None, rate_limiter=None
+):
+    flow = test_result.TestFlow("Sheet1", "test_1")
+    for step in steps:
+        flow.add_step(step)
+    results = []
+    with patch(
+        "src.testpilot.core.test_pilot_core.build_command_for_step",
+        side_effect=_remote_command,
+    ):
+        for group in plan_step_batches(flow.steps, 8):
+            process_step_batch(
+                group,
+                flow,
+                list(hosts),
+                {},
+                None,
+                connector,
+                {},
+                results,
+                True,
+                None,
+                args=args,
+                step_delay=0,
+                rate_limiter=rate_limiter,
+            )
+    return results
+
+
+class TestPlanStepBatches:
+    """Test cases for plan_step_batches"""
+
+    def test_groups_consecutive_gets(self):
+        steps = [
+            _step(1),
+            _step(2),
+            _step(3, method="PUT"),
+            _step(4, Compare_With="put_payload"),
+            _step(5),
+            _step(6),
+            _step(7),
+            _step(8, Command="kubectl logs pod"),
+        ]
+
+        groups = plan_step_batches(steps, 2)
+
+        assert [[s.row_idx for s in g] for g in groups] == [
+            [1, 2],
+            [3],
+            [4],
+            [5, 6],
+            [7],
+            [8],
+        ]
+
+    def test_disabled_below_two(self):
+        steps = [_step(1), _step(2)]
+
+        assert plan_step_batches(steps, 0) == [[steps[0]], [steps[1]]]
+        assert plan_step_batches(steps, 1) == [[steps[0]], [steps[1]]]
+
+    def test_per_row_rate_limit_not_batched(self):
+        steps = [_step(1), _step(2, reqs_sec=5), _step(3)]
+
+        groups = plan_step_batches(steps, 8)
+
+        assert [[s.row_idx for s in g] for g in groups] == [[1], [2], [3]]
+
+
+@posix_only
+class TestProcessStepBatch:
+    """Batched steps give the same results as one exec per step"""
+
+    def test_one_exec_per_host(self):
+        connector = LocalSSHConnector()
+
+        results = _run([_step(1), _step(2), _step(3)], connector)
+
+        assert len(connector.commands) == 2
+        assert [(r.row_idx, r.host) for r in results] == [
+            (1, "host1"),
+            (1, "host2"),
+            (2, "host1"),
+            (2, "host2"),
+            (3, "host1"),
+            (3, "host2"),
+        ]
+        assert all(r.passed for r in results)
+        assert [r.actual_status for r in results] == [200] * 6
+        assert json.loads(str(results[4].output))["row"] == 3
+
+    def test_matches_unbatched_verdicts(self):
+        steps = [_step(1), _step(2, pattern="SMF"), _step(3)]
+        batched = _run(steps, LocalSSHConnector())
+
+        with patch(
+            "src.testpilot.core.test_pilot_core._batching_available",
+            return_value=False,
+        ):
+            connector = LocalSSHConnector()
+            single = _run(steps, connector)
+
+        assert len(connector.commands) == 6
+        assert [r.passed for r in batched] == [r.passed for r in single]
+        assert [r.passed for r in batched] == [
+            True,
+            True,
+            False,
+            False,
+            True,
+            True,
+        ]
+
+    def test_cut_short_batch_reruns_remaining_steps(self):
+        connector = LocalSSHConnector(cut_after='{"nfType": "UDR", "row": 2}')
+
+        results = _run([_step(1), _step(2), _step(3)], connector, ("host1",))
+
+        # One batch, then rows 2 and 3 on their own
+        assert len(connector.commands) == 3
+        assert all(r.passed for r in results)
+        assert json.loads(str(results[2].output))["row"] == 3
+
+    def test_batch_keeps_the_rate(self):
+        connector = LocalSSHConnector()
+        limiter = RateLimiter(default_rate=10.0, burst_size=1)
+        steps = [_step(row) for row in range(1, 5)]
+
+        start = time.monotonic()
+        results = _run(steps, connector, ("host1",), rate_limiter=limiter)
+
+        # Still one exec, with the commands 0.1s apart inside it
+        assert len(connector.commands) == 1
+        assert connector.commands[0].count("sleep 0.") == 3
+        assert time.monotonic() - start >= 0.3
+        assert all(r.passed for r in results)
+        assert all(r.duration < 0.1 for r in results)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
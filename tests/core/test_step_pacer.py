@@ -0,0 +1,178 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.testpilot.core.step_pacer import StepPacer
+from src.testpilot.core.test_pilot_core import process_single_step
+from src.testpilot.core.test_result import TestFlow
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    fake = FakeClock()
+    with patch(
+        "src.testpilot.core.step_pacer.time.monotonic", fake.monotonic
+    ), patch("src.testpilot.core.step_pacer.time.sleep", fake.sleep):
+        yield fake
+
+
+def _step(method="GET", command="curl", compare_with=None):
+    return {
+        "method": method,
+        "command": command,
+        "compare_with_key": compare_with,
+    }
+
+
+class TestStepPacer:
+    """Test cases for StepPacer"""
+
+    def test_independent_steps_do_not_sleep(self, clock):
+        """Plain requests run back-to-back"""
+        pacer = StepPacer(settle_delay=1.0)
+        flow = TestFlow("Sheet1", "t1")
+        for _ in range(5):
+            pacer.before_step(flow, _step())
+            pacer.after_step(flow, _step())
+        assert clock.sleeps == []
+
+    def test_compare_with_get_after_put_waits(self, clock):
+        """A Compare_With GET waits out the settle delay after a PUT"""
+        pacer = StepPacer(settle_delay=1.0)
+        flow = TestFlow("Sheet1", "t1")
+        pacer.before_step(flow, _step("PUT"))
+        pacer.after_step(flow, _step("PUT"))
+        clock.now += 0.25
+
+        pacer.before_step(flow, _step("GET", compare_with="put_payload"))
+        assert clock.sleeps == [pytest.approx(0.75)]
+
+    def test_compare_with_nan_is_ignored(self, clock):
+        """Blank Excel cells (NaN) are not Compare_With dependencies"""
+        pacer = StepPacer(settle_delay=1.0)
+        flow = TestFlow("Sheet1", "t1")
+        pacer.after_step(flow, _step("PUT"))
+        pacer.before_step(flow, _step("GET", compare_with=float("nan")))
+        assert clock.sleeps == []
+
+    def test_no_wait_once_settled(self, clock):
+        """No sleep when enough time already passed since the write"""
+        pacer = StepPacer(settle_delay=1.0)
+        flow = TestFlow("Sheet1", "t1")
+        pacer.after_step(flow, _step("POST"))
+        clock.now += 5
+        pacer.before_step(flow, _step("GET", compare_with="key"))
+        assert clock.sleeps == []
+
+    def test_logs_capture_waits_after_request(self, clock):
+        """kubectl logs captures wait for the previous request to settle"""
+        pacer = StepPacer(settle_delay=2.0)
+        flow = TestFlow("Sheet1", "t1")
+        pacer.after_step(flow, _step("GET"))
+        pacer.before_step(
+            flow, _step("GET", command="kubectl logs -n ns {pod}")
+        )
+        assert clock.sleeps == [pytest.approx(2.0)]
+
+    def test_flows_are_paced_independently(self, clock):
+        """A write in one flow does not delay another flow"""
+        pacer = StepPacer(settle_delay=1.0)
+        pacer.after_step(TestFlow("Sheet1", "a"), _step("PUT"))
+        pacer.before_step(
+            TestFlow("Sheet1", "b"), _step("GET", compare_with="key")
+        )
+        assert clock.sleeps == []
+
+    def test_report_per_sheet(self, clock):
+        """Pacing cost is accounted per sheet and per reason"""
+        pacer = StepPacer(settle_delay=1.0)
+        flow_a = TestFlow("SheetA", "t1")
+        flow_b = TestFlow("SheetB", "t1")
+        pacer.after_step(flow_a, _step("PUT"))
+        pacer.before_step(flow_a, _step("GET", compare_with="key"))
+        pacer.wait(flow_b, 3)
+        pacer.before_step(flow_b, _step())
+
+        report = pacer.report()
+        assert report["SheetA"].total_seconds == pytest.approx(1.0)
+        assert report["SheetA"].by_reason == {
+            "compare_with": pytest.approx(1.0)
+        }
+        assert report["SheetB"].total_seconds == pytest.approx(3.0)
+        assert report["SheetB"].paced_steps == 1
+        assert report["SheetB"].steps == 2
+        lines = pacer.format_report()
+        assert lines[-1] == "Total pacing: 4.0s"
+
+
+class TestProcessSingleStepPacing:
+    """process_single_step with a pacer instead of the fixed step_delay"""
+
+    def _run(self, command, pacer):
+        step = Mock()
+        step.other_fields = {}
+        step_data = {
+            "command": command,
+            "method": "GET",
+            "compare_with_key": None,
+        }
+        with patch(
+            "src.testpilot.core.test_pilot_core.extract_step_data",
+            return_value=step_data,
+        ), patch(
+            "src.testpilot.core.test_pilot_core.manage_workflow_context"
+        ), patch(
+            "src.testpilot.core.test_pilot_core._execute_step_on_host",
+            return_value=None,
+        ) as mock_execute, patch(
+            "src.testpilot.core.test_pilot_core.time.sleep"
+        ) as mock_sleep:
+            process_single_step(
+                step,
+                TestFlow("Sheet1", "t1"),
+                ["host1", "host2"],
+                {},
+                None,
+                None,
+                {},
+                [],
+                True,
+                None,
+                step_delay=1,
+                pacer=pacer,
+            )
+        return mock_execute, mock_sleep
+
+    def test_no_fixed_sleep_with_pacer(self):
+        """The fixed step_delay sleep is skipped when a pacer is used"""
+        pacer = StepPacer(settle_delay=1.0)
+        mock_execute, mock_sleep = self._run("curl http://x", pacer)
+
+        assert mock_execute.call_count == 2
+        mock_sleep.assert_not_called()
+
+    def test_wait_row_sleeps_once_for_all_hosts(self):
+        """wait(N) rows are handled once by the pacer, not per host"""
+        pacer = Mock()
+        mock_execute, _ = self._run("wait(5)", pacer)
+
+        pacer.wait.assert_called_once()
+        assert pacer.wait.call_args[0][1] == 5
+        mock_execute.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,190 @@
+import itertools
+from unittest.mock import Mock, patch
+
+import pandas as pd
+import pytest
+
+from src.testpilot.core import test_result
+from src.testpilot.core.validation_engine import (
+    ValidationContext,
+    ValidationDispatcher,
+    ValidationPlan,
+    plan_flow_validation,
+    select_strategy,
+    strategy_key,
+    validation_preflight,
+)
+from src.testpilot.utils.excel_parser import parse_excel_to_flows
+
+METHODS = ["PUT", "GET", "DELETE", "POST", "PATCH", "HEAD"]
+
+
+def _cascade(method, status, payload, pattern, saved, kubectl):
+    """The if/elif rules ValidationDispatcher.dispatch used to walk"""
+    prefix = method.lower()
+    if method == "GET" and saved:
+        return "get_compare_with_put"
+    if status and method in ("PUT", "POST", "PATCH", "GET"):
+        if method == "GET" and payload and pattern:
+            return "get_full"
+        if not payload and not pattern:
+            return f"{prefix}_status_only"
+        if payload and not pattern:
+            return f"{prefix}_status_and_payload"
+        if pattern and not payload:
+            return f"{prefix}_status_and_pattern"
+        if method != "GET":
+            return f"{prefix}_status_payload_pattern"
+    if status and method == "DELETE" and not payload and not pattern:
+        return "delete_status_only"
+    if kubectl and pattern:
+        return "kubectl_pattern"
+    return None
+
+
+def _context(method="GET", pattern_match=None, saved_payload=None):
+    return ValidationContext(
+        method=method,
+        request_payload=None,
+        expected_status=200,
+        response_payload=None,
+        pattern_match=pattern_match,
+        actual_status=200,
+        response_body='{"a": 1}',
+        response_headers={},
+        saved_payload=saved_payload,
+    )
+
+
+def _step(row_idx, method, command="curl", **fields):
+    other_fields = {
+        "Command": command,
+        "Response_Payload": float("nan"),
+        "Compare_With": float("nan"),
+        "Save_As": float("nan"),
+        **fields,
+    }
+    return test_result.TestStep(
+        row_idx,
+        method,
+        "/nf",
+        fields.get("Request_Payload"),
+        {},
+        200,
+        fields.get("Pattern_Match", float("nan")),
+        other_fields,
+    )
+
+
+def _flow(*steps):
+    flow = test_result.TestFlow("Sheet1", "test_1")
+    for step in steps:
+        flow.add_step(step)
+    return flow
+
+
+class TestSelectStrategy:
+    """The strategy table picks what the rule cascade picked"""
+
+    @pytest.mark.parametrize("method", METHODS)
+    def test_matches_rule_cascade(self, method):
+        for flags in itertools.product([False, True], repeat=5):
+            assert select_strategy(method, *flags) == _cascade(
+                method, *flags
+            ), (method, flags)
+
+    def test_key_uses_truthiness(self):
+        context = _context("get", pattern_match="", saved_payload={})
+
+        assert strategy_key(context) == (
+            "GET",
+            True,
+            False,
+            False,
+            True,
+            False,
+        )
+
+
+class TestValidationPlan:
+    """Strategies are planned per step when the workbook is parsed"""
+
+    def test_plans_each_step(self):
+        flow = _flow(
+            _step(1, "PUT", Request_Payload='{"a": 1}', Save_As="subs"),
+            _step(2, "GET", Compare_With="subs"),
+            _step(3, "GET", Compare_With="other"),
+            _step(4, "GET", Pattern_Match="nudr", Response_Payload="{}"),
+            _step(5, "GET", "kubectl logs {pod} -n ns", Pattern_Match="error"),
+            _step(6, "GET", command=float("nan")),
+        )
+
+        plan_flow_validation(flow)
+
+        assert [
+            step.validation_plan and step.validation_plan.strategy
+            for step in flow.steps
+        ] == [
+            "put_status_only",
+            "get_compare_with_put",
+            "get_status_only",
+            "get_full",
+            "get_status_and_pattern",
+            None,
+        ]
+
+    def test_parser_plans_flows(self):
+        parser = Mock()
+        parser.get_sheet.return_value = pd.DataFrame(
+            [
+                {
+                    "Test_Name": "t1",
+                    "Command": "curl -X DELETE http://nf/x",
+                    "Method": "DELETE",
+                    "Expected_Status": 204,
+                }
+            ]
+        )
+
+        flows = parse_excel_to_flows(parser, ["Sheet1"])
+
+        step = flows[0].steps[0]
+        assert step.validation_plan.strategy == "delete_status_only"
+        assert validation_preflight(flows) == [
+            {
+                "Sheet": "Sheet1",
+                "Row": step.row_idx,
+                "Test_Name": "t1",
+                "Method": "DELETE",
+                "Strategy": "delete_status_only",
+            }
+        ]
+
+    def test_dispatch_uses_matching_plan(self):
+        context = _context()
+        plan = ValidationPlan(strategy_key(context), "get_status_only")
+
+        with patch(
+            "src.testpilot.core.validation_engine.select_strategy"
+        ) as select:
+            result = ValidationDispatcher().dispatch(context, plan)
+
+        assert result.passed
+        select.assert_not_called()
+
+    def test_dispatch_ignores_stale_plan(self):
+        # Planned without a saved payload, but the PUT has saved one
+        context = _context(saved_payload='{"a": 2}')
+        key = strategy_key(context)
+        plan = ValidationPlan(key[:4] + (False,) + key[5:], "get_status_only")
+
+        result = ValidationDispatcher().dispatch(context, plan)
+
+        assert not result.passed
+        assert result.fail_reason == (
+            "GET response does not match saved PUT payload"
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,24 +1,32 @@
 import json
 import os
 import re
+import threading
+import time
 from typing import Any, Dict
-from unittest.mock import MagicMock, Mock, call, patch
+from unittest.mock import ANY, MagicMock, Mock, call, patch
 
 import pandas as pd
 import pytest
 
 from src.testpilot.core.test_pilot_core import (
+    _build_log_line_matcher,
     _extract_and_display_epoch_timestamps,
+    _generate_logs_capture_command,
     _load_response_payload_file,
+    _resolve_log_collector,
+    _split_logs_capture_command,
     build_command_for_step,
     build_kubectl_logs_command,
     build_url_based_command,
     execute_command,
     execute_kubectl_logs_parallel,
+    execute_kubectl_logs_streaming,
     extract_step_data,
     manage_workflow_context,
     process_single_step,
     resolve_namespace,
+    validate_and_create_result,
 )
 from src.testpilot.core.test_result import TestFlow, TestResult, TestStep
 
@@ -540,6 +548,41 @@ class TestExecuteCommand:
             duration > 0
         )  # Duration is calculated by execute_command, not from mock
 
+    def test_truncated_ssh_output_named_in_failure(self):
+        """A cut-off capture is flagged on step_data and in the failure"""
+        connector = Mock()
+        connector.use_ssh = True
+        connector.run_command.return_value = {
+            "test-host": {"output": "INFO a", "error": "", "truncated": True}
+        }
+        step_data = {
+            "expected_status": None,
+            "pattern_match": "NF registered",
+            "compare_with_key": None,
+            "from_excel_response_payload": None,
+            "method": "GET",
+            "is_kubectl": True,
+        }
+
+        output, error, _ = execute_command(
+            "kubectl logs pod", "test-host", connector, step_data
+        )
+        result = validate_and_create_result(
+            TestStep(1, "GET", None, None, {}, None, "NF registered"),
+            TestFlow("Sheet1", "test_1"),
+            step_data,
+            {"raw_output": output, "is_kubectl_logs": True},
+            output,
+            error,
+            0.1,
+            "test-host",
+            "kubectl logs pod",
+        )
+
+        assert step_data["output_truncated"]
+        assert not result.passed
+        assert "output_max_bytes" in result.fail_reason
+
 
 class TestExecuteKubectlLogsParallel:
     """Test cases for execute_kubectl_logs_parallel function"""
@@ -602,7 +645,7 @@ class TestExecuteKubectlLogsParallel:
 
         # Verify execute_command was called correctly
         mock_execute.assert_called_once_with(
-            "kubectl logs test-pod-123", "test-host", connector
+            "kubectl logs test-pod-123", "test-host", connector, None
         )
 
         # Verify kubectl logs were saved
@@ -649,7 +692,7 @@ class TestExecuteKubectlLogsParallel:
 
         # Verify execute_command was called correctly
         mock_execute.assert_called_once_with(
-            "kubectl logs app-pod-456", "localhost", connector
+            "kubectl logs app-pod-456", "localhost", connector, None
         )
 
     @patch("src.testpilot.core.test_pilot_core.execute_command")
@@ -661,7 +704,7 @@ class TestExecuteKubectlLogsParallel:
         """Test parallel execution with multiple kubectl commands"""
 
         # Setup mocks for multiple commands
-        def mock_execute_side_effect(command, host, connector):
+        def mock_execute_side_effect(command, host, connector, step_data):
             if "pod1" in command:
                 return ("logs from pod1", "", 1.0)
             elif "pod2" in command:
@@ -809,6 +852,108 @@ class TestExecuteKubectlLogsParallel:
             assert pod_names[0] == expected_pod
 
 
+class TestKubectlLogStreaming:
+    """Test cases for the streaming kubectl logs collector"""
+
+    def test_split_capture_command_round_trip(self):
+        """Capture commands split back into follow command and deadline"""
+        with patch(
+            "src.testpilot.core.test_pilot_core._get_kubectl_logs_settings",
+            return_value={"capture_duration": 12, "since_duration": "2s"},
+        ):
+            capture = _generate_logs_capture_command(
+                "kubectl logs pod-1 -n ns", "ns", None, "host1"
+            )
+
+        assert _split_logs_capture_command(capture) == (
+            "kubectl logs -f --since=2s pod-1 -n ns",
+            12,
+        )
+        assert _split_logs_capture_command("kubectl get pods") is None
+
+    def test_resolve_collector(self):
+        """CLI flag wins over config; mock mode always captures"""
+        args = Mock(log_collector="stream")
+        assert _resolve_log_collector(args, None) == "stream"
+
+        with patch(
+            "src.testpilot.core.test_pilot_core._get_kubectl_logs_settings",
+            return_value={"collector": "stream"},
+        ):
+            assert _resolve_log_collector(None, None) == "stream"
+            assert (
+                _resolve_log_collector(args, Mock(execution_mode="mock"))
+                == "capture"
+            )
+
+        with patch(
+            "src.testpilot.core.test_pilot_core._get_kubectl_logs_settings",
+            side_effect=FileNotFoundError,
+        ):
+            assert _resolve_log_collector(None, None) == "capture"
+
+    @patch("src.testpilot.core.test_pilot_core.save_kubectl_logs")
+    @patch("src.testpilot.core.test_pilot_core.stream_many_until_match")
+    def test_streaming_uses_follow_commands(self, mock_stream, mock_save):
+        """Capture commands are streamed with their own deadline"""
+        mock_stream.return_value = [
+            Mock(
+                command="kubectl logs -f --since=1s pod-a",
+                output="x\nmatch",
+                error="",
+                matched=True,
+                duration=0.2,
+            ),
+            Mock(
+                command="kubectl logs -f --since=1s pod-b",
+                output="",
+                error="",
+                matched=False,
+                duration=0.2,
+            ),
+        ]
+        commands = [
+            "kubectl logs -f --since=1s pod-a & sleep 30; kill $!",
+            "kubectl logs -f --since=1s pod-b & sleep 30; kill $!",
+        ]
+        matcher = Mock()
+        step = Mock(row_idx=4)
+        flow = Mock(test_name="t1")
+
+        raw_output, pod_names, duration = execute_kubectl_logs_streaming(
+            commands, "host1", None, step, flow, matcher, show_table=True
+        )
+
+        mock_stream.assert_called_once_with(
+            [
+                "kubectl logs -f --since=1s pod-a",
+                "kubectl logs -f --since=1s pod-b",
+            ],
+            matcher,
+            30,
+            "host1",
+            None,
+        )
+        assert raw_output == "x\nmatch\n"
+        assert pod_names == ["pod-a", "pod-b"]
+        assert duration == 0.2
+        mock_save.assert_called_once()
+
+    def test_line_matcher_uses_pattern(self):
+        """The line matcher accepts lines containing the Pattern_Match"""
+        step = Mock(row_idx=1)
+        flow = Mock(sheet="Sheet1")
+        matcher = _build_log_line_matcher(
+            step, flow, {"pattern_match": "Registered"}
+        )
+
+        assert matcher("2024 INFO NF Registered ok") is True
+        assert matcher("2024 INFO heartbeat") is False
+        assert (
+            _build_log_line_matcher(step, flow, {"pattern_match": ""}) is None
+        )
+
+
 class TestKubectlParallelIntegration:
     """Integration tests for kubectl parallel execution in main command flow"""
 
@@ -902,11 +1047,12 @@ class TestKubectlParallelIntegration:
             step,
             flow,
             True,
+            ANY,
         )
 
         # Verify that regular execution was called with non-kubectl command
         mock_execute.assert_called_once_with(
-            "curl http://api.example.com/health", "test-host", connector
+            "curl http://api.example.com/health", "test-host", connector, ANY
         )
 
         # Verify results were created
@@ -1057,6 +1203,148 @@ class TestProcessSingleStep:
         mock_execute.assert_called_once()
 
 
+class TestProcessSingleStepHostFanout:
+    """Test cases for process_single_step with host_fanout enabled"""
+
+    HOSTS = ["host1", "host2", "host3", "host4"]
+
+    def _step_data(self):
+        return {
+            "command": "curl http://example.com",
+            "url": "http://example.com",
+            "method": "GET",
+            "expected_status": 200,
+            "pattern_match": "",
+            "from_excel_response_payload": None,
+            "compare_with_key": None,
+            "headers": {},
+            "request_payload": None,
+            "pod_exec": None,
+        }
+
+    def _run(self, execute_side_effect, host_fanout=True):
+        step = Mock()
+        step.other_fields = {}
+        flow = Mock()
+        flow.context = {}
+        test_results = []
+
+        def fake_validate(step, flow, step_data, parsed_output, *args):
+            host = args[3]
+            return TestResult(
+                sheet="Sheet1",
+                row_idx=1,
+                host=host,
+                command=args[4],
+                output=parsed_output["raw_output"],
+                error="",
+                expected_status=200,
+                actual_status=200,
+                pattern_match=None,
+                pattern_found=None,
+                passed=True,
+                fail_reason=None,
+                details={"truncated": bool(step_data.get("output_truncated"))},
+            )
+
+        with patch(
+            "src.testpilot.core.test_pilot_core.extract_step_data",
+            return_value=self._step_data(),
+        ), patch(
+            "src.testpilot.core.test_pilot_core.manage_workflow_context"
+        ), patch(
+            "src.testpilot.core.test_pilot_core.resolve_namespace",
+            return_value=None,
+        ), patch(
+            "src.testpilot.core.test_pilot_core.build_command_for_step",
+            side_effect=lambda data, svc_map, *a, **kw: f"curl {a[3]}",
+        ), patch(
+            "src.testpilot.core.test_pilot_core.execute_command",
+            side_effect=execute_side_effect,
+        ), patch(
+            "src.testpilot.core.test_pilot_core.parse_curl_output",
+            side_effect=lambda out, err: {"raw_output": out},
+        ), patch(
+            "src.testpilot.core.test_pilot_core.validate_and_create_result",
+            side_effect=fake_validate,
+        ), patch(
+            "src.testpilot.core.test_pilot_core.log_test_result"
+        ):
+            process_single_step(
+                step,
+                flow,
+                self.HOSTS,
+                {},
+                None,
+                None,
+                {},
+                test_results,
+                True,
+                None,
+                step_delay=0,
+                host_fanout=host_fanout,
+            )
+        return test_results
+
+    def test_results_follow_target_host_order(self):
+        """Results are recorded in target_hosts order, not finish order"""
+        delays = {"host1": 0.04, "host2": 0.0, "host3": 0.02, "host4": 0.01}
+
+        def execute(command, host, connector, step_data=None):
+            time.sleep(delays[host])
+            return f"out-{host}", "", delays[host]
+
+        results = self._run(execute)
+
+        assert [r.host for r in results] == self.HOSTS
+        assert [r.output for r in results] == [f"out-{h}" for h in self.HOSTS]
+        assert [r.command for r in results] == [
+            f"curl {h}" for h in self.HOSTS
+        ]
+
+    def test_hosts_run_concurrently(self):
+        """All hosts are in flight at the same time"""
+        barrier = threading.Barrier(len(self.HOSTS), timeout=5)
+
+        def execute(command, host, connector, step_data=None):
+            # Would time out if hosts were visited one after another
+            barrier.wait()
+            return "ok", "", 0.0
+
+        results = self._run(execute)
+        assert len(results) == len(self.HOSTS)
+
+    def test_sequential_mode_unchanged(self):
+        """Without fan-out every host still produces one ordered result"""
+        seen = []
+
+        def execute(command, host, connector, step_data=None):
+            seen.append(threading.current_thread())
+            return f"out-{host}", "", 0.0
+
+        results = self._run(execute, host_fanout=False)
+
+        assert [r.host for r in results] == self.HOSTS
+        assert set(seen) == {threading.current_thread()}
+
+    def test_truncation_flag_is_per_host(self):
+        """One host's cut-off output is not reported for the next hosts"""
+
+        def execute(command, host, connector, step_data=None):
+            if host == "host2":
+                step_data["output_truncated"] = True
+            return "out", "", 0.0
+
+        results = self._run(execute, host_fanout=False)
+
+        assert [r.details["truncated"] for r in results] == [
+            False,
+            True,
+            False,
+            False,
+        ]
+
+
 class TestUtilityFunctions:
     """Test cases for utility functions"""
 
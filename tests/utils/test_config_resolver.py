@@ -0,0 +1,193 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.testpilot.core.test_pilot_core import (
+    _generate_logs_capture_command,
+    build_command_for_step,
+    resolve_namespace,
+)
+from src.testpilot.core.validation_engine import ValidationDispatcher
+from src.testpilot.utils.config_resolver import (
+    ConfigSnapshot,
+    get_config_snapshot,
+    load_config_snapshot,
+    reload_config_snapshot,
+    set_config_snapshot,
+)
+
+SAMPLE_CONFIG = {
+    "connect_to": "host1",
+    "pod_mode": False,
+    "nf_name": "SLF",
+    "hosts": [
+        {"name": "host1", "hostname": "10.0.0.1", "namespace": "ns-one"},
+        {"name": "host2", "hostname": "10.0.0.2", "namespace": "ns-two"},
+    ],
+    "kubectl_logs_settings": {"capture_duration": 7, "since_duration": "5s"},
+    "validation_settings": {"json_match_threshold": 80},
+}
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "hosts.json"
+    path.write_text(json.dumps(SAMPLE_CONFIG))
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def clear_snapshot():
+    set_config_snapshot(None)
+    yield
+    set_config_snapshot(None)
+
+
+class TestConfigSnapshot:
+    """Test cases for ConfigSnapshot and the process-wide snapshot hooks"""
+
+    def test_snapshot_is_read_only(self):
+        """Nested dicts and lists cannot be modified"""
+        snapshot = ConfigSnapshot.from_dict(SAMPLE_CONFIG, "hosts.json")
+
+        with pytest.raises(TypeError):
+            snapshot.data["pod_mode"] = True
+        with pytest.raises(TypeError):
+            snapshot.kubectl_logs_settings["capture_duration"] = 1
+        assert isinstance(snapshot.get("hosts"), tuple)
+
+    def test_snapshot_does_not_alias_source(self):
+        """Later edits to the source dict do not leak into the snapshot"""
+        source = json.loads(json.dumps(SAMPLE_CONFIG))
+        snapshot = ConfigSnapshot.from_dict(source)
+        source["kubectl_logs_settings"]["capture_duration"] = 99
+
+        assert snapshot.kubectl_logs_settings["capture_duration"] == 7
+
+    def test_typed_accessors(self):
+        """Typed properties expose the settings used on the step path"""
+        snapshot = ConfigSnapshot.from_dict(SAMPLE_CONFIG)
+
+        assert snapshot.pod_mode is False
+        assert snapshot.nf_name == "SLF"
+        assert snapshot.namespace == "ns-one"
+        assert snapshot.validation_settings["json_match_threshold"] == 80
+
+    def test_namespace_with_dict_hosts(self):
+        """Namespace lookup also supports the dict form of 'hosts'"""
+        snapshot = ConfigSnapshot.from_dict(
+            {"connect_to": "h", "hosts": {"h": {"namespace": "dict-ns"}}}
+        )
+        assert snapshot.namespace == "dict-ns"
+
+    def test_to_dict_round_trip(self):
+        """to_dict returns a plain mutable copy"""
+        snapshot = ConfigSnapshot.from_dict(SAMPLE_CONFIG)
+        assert snapshot.to_dict() == SAMPLE_CONFIG
+
+    def test_load_and_reload(self, config_file):
+        """Reload re-reads the same file and swaps the active snapshot"""
+        first = load_config_snapshot(config_file)
+        assert get_config_snapshot() is first
+
+        updated = dict(SAMPLE_CONFIG, pod_mode=True)
+        with open(config_file, "w") as f:
+            json.dump(updated, f)
+
+        second = reload_config_snapshot()
+        assert get_config_snapshot() is second
+        assert second.pod_mode is True
+        assert first.pod_mode is False
+
+    def test_reload_without_snapshot_raises(self):
+        """Reload needs either an installed snapshot or an explicit path"""
+        with pytest.raises(ValueError):
+            reload_config_snapshot()
+
+    def test_env_vars_resolved(self, tmp_path, monkeypatch):
+        """Snapshots are built through load_config_with_env"""
+        monkeypatch.setenv("TP_TEST_NS", "env-ns")
+        path = tmp_path / "hosts.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "connect_to": "h",
+                    "hosts": {"h": {"namespace": "${TP_TEST_NS}"}},
+                }
+            )
+        )
+        assert load_config_snapshot(str(path)).namespace == "env-ns"
+
+
+class TestSnapshotConsumers:
+    """Step-path helpers read from the snapshot instead of the file"""
+
+    def _no_file_reads(self):
+        return patch("builtins.open", side_effect=AssertionError("file read"))
+
+    def test_resolve_namespace(self, config_file):
+        load_config_snapshot(config_file)
+        connector = Mock(use_ssh=False)
+
+        with self._no_file_reads():
+            assert resolve_namespace(connector, "host1") == "ns-one"
+
+    def test_logs_capture_command(self, config_file):
+        load_config_snapshot(config_file)
+
+        with self._no_file_reads():
+            command = _generate_logs_capture_command(
+                "kubectl logs pod-1 -n ns", "ns", None, "host1"
+            )
+
+        assert "--since=5s" in command
+        assert "sleep 7" in command
+
+    def test_validation_config(self, config_file):
+        load_config_snapshot(config_file)
+        dispatcher = ValidationDispatcher()
+
+        with self._no_file_reads():
+            config = dispatcher._get_validation_config()
+
+        assert config["json_match_threshold"] == 80
+
+    def test_build_command_for_step_pod_mode(self, config_file):
+        load_config_snapshot(config_file)
+        step_data = {
+            "url": "http://svc/api",
+            "command": "curl",
+            "method": "GET",
+            "headers": {},
+            "request_payload": None,
+        }
+
+        with self._no_file_reads(), patch(
+            "src.testpilot.core.test_pilot_core.build_url_based_command",
+            return_value="curl http://svc/api",
+        ) as mock_build:
+            command = build_command_for_step(
+                step_data, {}, None, "ns", {}, "host1", None
+            )
+
+        # pod_mode is False in the snapshot, so the URL builder is used
+        mock_build.assert_called_once()
+        assert command == "curl http://svc/api"
+
+    def test_legacy_file_read_without_snapshot(self):
+        """Without an installed snapshot the old file lookup still runs"""
+        config = {"connect_to": "h", "hosts": {"h": {"namespace": "file-ns"}}}
+        connector = Mock(use_ssh=False)
+
+        with patch("builtins.open", create=True) as mock_file, patch(
+            "os.path.exists", return_value=True
+        ):
+            mock_file.return_value.__enter__.return_value.read.return_value = (
+                json.dumps(config)
+            )
+            assert resolve_namespace(connector, "h") == "file-ns"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
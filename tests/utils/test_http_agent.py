@@ -0,0 +1,433 @@
+import json
+import shutil
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from werkzeug.serving import make_server
+
+from src.testpilot.core.test_pilot_core import (
+    _run_step_command,
+    _send_via_agent,
+    _split_exec_curl_command,
+)
+from src.testpilot.mock.enhanced_mock_server import EnhancedMockServer
+from src.testpilot.utils.config_resolver import (
+    ConfigSnapshot,
+    set_config_snapshot,
+)
+from src.testpilot.utils.http_agent import (
+    HttpAgentPool,
+    HttpAgentSession,
+    HttpAgentTimeout,
+    HttpAgentUnavailable,
+    agent_command,
+    get_http_agent_pool,
+    shutdown_http_agents,
+)
+from src.testpilot.utils.http_exchange import (
+    HttpExchange,
+    HttpRequest,
+    parse_curl_command,
+)
+from src.testpilot.utils.response_parser import parse_curl_output
+
+posix_only = pytest.mark.skipif(
+    sys.platform.startswith("win"), reason="uses POSIX shell commands"
+)
+
+
+@pytest.fixture(scope="module")
+def mock_server():
+    """Enhanced mock server on a free local port"""
+    server = EnhancedMockServer(enhanced_data_file="missing.json", port=0)
+    http_server = make_server("127.0.0.1", 0, server.app, threaded=True)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{http_server.server_port}"
+    http_server.shutdown()
+
+
+@pytest.fixture(scope="module")
+def slow_server():
+    """Answers every request after 0.3s"""
+
+    def app(environ, start_response):
+        time.sleep(0.3)
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [environ["PATH_INFO"].encode()]
+
+    http_server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{http_server.server_port}"
+    http_server.shutdown()
+
+
+class _RecordingHandler(socketserver.StreamRequestHandler):
+    """Keep-alive HTTP/1.1 handler that closes on the requests in drop"""
+
+    def handle(self):
+        server = self.server
+        while True:
+            request_line = self.rfile.readline()
+            if not request_line:
+                return
+            headers = {}
+            for line in iter(self.rfile.readline, b"\r\n"):
+                if not line:
+                    return
+                name, value = line.decode().split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+            self.rfile.read(int(headers.get("content-length", 0)))
+            with server.lock:
+                server.requests.append((request_line.split()[0], headers))
+                number = len(server.requests)
+            if number in server.drop:
+                return
+            self.wfile.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+
+
+@pytest.fixture
+def recording_server():
+    """Records (method, headers) of every request it reads"""
+    server = socketserver.ThreadingTCPServer(
+        ("127.0.0.1", 0), _RecordingHandler
+    )
+    server.daemon_threads = True
+    server.requests = []
+    server.drop = set()
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _curl_user_agent():
+    if shutil.which("curl") is None:
+        return None
+    output = subprocess.run(
+        ["curl", "--version"], capture_output=True, text=True
+    ).stdout
+    return "curl/" + output.split()[1]
+
+
+@pytest.fixture
+def session():
+    session = HttpAgentSession(agent_command(sys.executable)).start()
+    yield session
+    session.close()
+
+
+class TestParseCurlCommand:
+    """Test cases for parse_curl_command"""
+
+    def test_builder_output(self):
+        request = parse_curl_command(
+            "curl -v --http2-prior-knowledge -X PUT "
+            "'http://svc:8080/a?b=1' -H 'Content-Type: application/json' "
+            """-d '{"k": "it'"'"'s"}'"""
+        )
+
+        assert request.method == "PUT"
+        assert request.url == "http://svc:8080/a?b=1"
+        assert request.headers == [("Content-Type", "application/json")]
+        assert request.body == '{"k": "it\'s"}'
+        assert request.http2_prior_knowledge is True
+
+    def test_unknown_options_are_rejected(self):
+        """Commands the parser cannot fully express stay with curl"""
+        assert parse_curl_command("curl -v -o out.txt http://svc/a") is None
+        assert parse_curl_command("curl -d @body.json http://svc/a") is None
+        assert parse_curl_command("kubectl get pods") is None
+        assert parse_curl_command("curl http://a/ http://b/") is None
+
+    def test_defaults_follow_curl(self):
+        request = parse_curl_command("curl -d x=1 http://svc/a")
+
+        assert request.method == "POST"
+        assert request.headers == [
+            ("Content-Type", "application/x-www-form-urlencoded")
+        ]
+
+
+class TestHttpExchange:
+    """Test cases for rendering exchanges as curl -v output"""
+
+    def test_round_trip_through_parse_curl_output(self):
+        exchange = HttpExchange(
+            request=HttpRequest("GET", "http://svc/a?x=1"),
+            status=404,
+            http_version="2",
+            headers=[("Content-Type", "application/problem+json")],
+            body='{"cause": "NOT_FOUND"}\n',
+        )
+
+        output, error = exchange.to_curl_output()
+        parsed = parse_curl_output(output, error)
+
+        assert "> GET /a?x=1 HTTP/2" in error
+        assert parsed["http_status"] == 404
+        assert parsed["headers"] == {
+            "content-type": "application/problem+json"
+        }
+        assert output == '{"cause": "NOT_FOUND"}'
+
+    def test_transport_error_has_no_status(self):
+        exchange = HttpExchange(
+            request=HttpRequest("GET", "http://svc/a"),
+            error="ConnectionRefusedError: refused",
+        )
+
+        output, error = exchange.to_curl_output()
+
+        assert output == ""
+        assert parse_curl_output(output, error)["http_status"] is None
+
+
+@posix_only
+class TestHttpAgentSession:
+    """The request-runner against the enhanced mock server"""
+
+    def test_requests_reuse_one_runner(self, session, mock_server):
+        server, base_url = mock_server
+        before = server.request_count
+        for _ in range(3):
+            exchange = session.request(
+                HttpRequest(
+                    "POST",
+                    f"{base_url}/nudr-dr/v1/subscription-data",
+                    headers=[("Content-Type", "application/json")],
+                    body='{"imsi": "1"}',
+                )
+            )
+            assert exchange.error is None
+            assert exchange.status is not None
+
+        assert session.requests == 3
+        assert session.alive
+        assert server.request_count == before + 3
+
+    def test_health_endpoint_parses_like_curl(self, session, mock_server):
+        _, base_url = mock_server
+        exchange = session.request(HttpRequest("GET", f"{base_url}/health"))
+        parsed = parse_curl_output(*exchange.to_curl_output())
+
+        assert parsed["http_status"] == 200
+        assert parsed["headers"]["content-type"] == "application/json"
+        assert json.loads(exchange.body)["status"] == "healthy"
+
+    def test_connection_error_is_reported(self, session):
+        exchange = session.request(
+            HttpRequest("GET", "http://127.0.0.1:1/"), timeout=5
+        )
+
+        assert exchange.status is None
+        assert "ConnectionRefusedError" in exchange.error
+        assert session.alive
+
+    def test_runner_that_does_not_start(self):
+        with pytest.raises(RuntimeError):
+            HttpAgentSession("echo not-an-agent").start(timeout=5)
+
+    def test_concurrent_requests_overlap(self, session, slow_server):
+        exchanges = {}
+
+        def send(index):
+            exchanges[index] = session.request(
+                HttpRequest("GET", f"{slow_server}/{index}")
+            )
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=send, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # 4 x 0.3s one after the other would take 1.2s
+        assert time.monotonic() - start < 0.9
+        assert {i: e.body for i, e in exchanges.items()} == {
+            i: f"/{i}" for i in range(4)
+        }
+        assert session.requests == 4
+
+    def test_timeout_keeps_session_usable(self, session, slow_server):
+        with patch(
+            "src.testpilot.utils.http_agent._ANSWER_GRACE", 0
+        ), patch.object(session._stream, "write"):
+            with pytest.raises(HttpAgentTimeout):
+                session.request(HttpRequest("GET", f"{slow_server}/x"), 0.1)
+
+        exchange = session.request(HttpRequest("GET", f"{slow_server}/next"))
+        assert exchange.body == "/next"
+        assert session.alive
+
+    @pytest.mark.parametrize(
+        "method, sent, error", [("POST", 2, True), ("GET", 3, False)]
+    )
+    def test_resend_after_idle_connection_closed(
+        self, session, recording_server, method, sent, error
+    ):
+        """Only safe methods are sent again once the NF may have seen them"""
+        server, base_url = recording_server
+        server.drop.add(2)
+
+        session.request(HttpRequest(method, f"{base_url}/a"))
+        exchange = session.request(HttpRequest(method, f"{base_url}/a"))
+
+        assert len(server.requests) == sent
+        assert (exchange.error is not None) is error
+        if error:
+            assert "RemoteDisconnected" in exchange.error
+
+    def test_fresh_connection_is_not_retried(self, session, recording_server):
+        server, base_url = recording_server
+        server.drop.add(1)
+
+        exchange = session.request(HttpRequest("GET", f"{base_url}/a"))
+
+        assert len(server.requests) == 1
+        assert "RemoteDisconnected" in exchange.error
+
+    def test_sends_curl_user_agent(self, session, recording_server):
+        server, base_url = recording_server
+
+        session.request(HttpRequest("GET", f"{base_url}/a"))
+        session.request(
+            HttpRequest(
+                "GET", f"{base_url}/b", headers=[("User-Agent", "suite/1")]
+            )
+        )
+
+        first, second = [headers for _, headers in server.requests]
+        assert first.get("user-agent") == _curl_user_agent()
+        assert first["accept"] == "*/*"
+        assert second["user-agent"] == "suite/1"
+
+    def test_prior_knowledge_needs_http2_runner(self, session):
+        session.http2 = False
+        request = HttpRequest("GET", "http://svc/", http2_prior_knowledge=True)
+
+        with pytest.raises(HttpAgentUnavailable):
+            session.request(request)
+        assert session.alive
+
+
+@posix_only
+class TestHttpAgentPool:
+    """Test cases for HttpAgentPool"""
+
+    def test_same_key_reuses_session(self):
+        pool = HttpAgentPool()
+        command = agent_command(sys.executable)
+        try:
+            first = pool.get_or_start(("h", "ns", "pod", "c"), command)
+            second = pool.get_or_start(("h", "ns", "pod", "c"), command)
+            assert first is second
+            assert len(pool) == 1
+        finally:
+            pool.close_all()
+        assert not first.alive
+
+    def test_failed_start_is_not_retried(self):
+        pool = HttpAgentPool()
+        with patch.object(
+            HttpAgentSession, "start", side_effect=RuntimeError("no python3")
+        ) as mock_start:
+            for _ in range(2):
+                with pytest.raises(RuntimeError):
+                    pool.get_or_start(("h", "ns", "pod", "c"), "runner")
+
+        assert mock_start.call_count == 1
+
+
+@posix_only
+class TestRunStepCommandViaAgent:
+    """Test cases for the agent backend of _run_step_command"""
+
+    @pytest.fixture(autouse=True)
+    def host_agent(self):
+        set_config_snapshot(
+            ConfigSnapshot.from_dict(
+                {
+                    "http_settings": {
+                        "backend": "agent",
+                        "agent_launch": "host",
+                        "agent_python": sys.executable,
+                    }
+                }
+            )
+        )
+        yield
+        set_config_snapshot(None)
+        shutdown_http_agents()
+
+    def test_direct_exec_command_goes_through_agent(self, mock_server):
+        _, base_url = mock_server
+        command = (
+            "kubectl exec -it nudr-config-7d9f-x2b4c -n ns -c nudr-config -- "
+            f"curl -v -X GET {base_url}/health "
+            "-H 'Content-Type: application/json'"
+        )
+
+        output, error, duration, exchange = _run_step_command(
+            command, None, None
+        )
+
+        assert parse_curl_output(output, error)["http_status"] == 200
+        assert duration > 0
+        assert exchange.status == 200
+
+    def test_prior_knowledge_without_httpx_is_left_to_curl(self):
+        runner = agent_command(sys.executable)
+        session = get_http_agent_pool().get_or_start(
+            (None, None, None, None), runner
+        )
+        session.http2 = False
+        command = "curl -v --http2-prior-knowledge http://127.0.0.1:1/"
+
+        assert _send_via_agent(command, None, None) is None
+        assert session.alive
+
+    def test_timeout_is_not_sent_again(self):
+        with patch.object(
+            HttpAgentSession,
+            "request",
+            side_effect=HttpAgentTimeout("HTTP agent did not answer"),
+        ), patch(
+            "src.testpilot.core.test_pilot_core.execute_command"
+        ) as mock_execute:
+            output, error, _, exchange = _run_step_command(
+                "curl -X POST http://svc/a -d '{}'", None, None
+            )
+
+        mock_execute.assert_not_called()
+        assert exchange.error == "HTTP agent did not answer"
+        assert output == ""
+
+    def test_unparseable_command_is_left_to_curl(self):
+        assert _send_via_agent("curl -o out http://svc/", None, None) is None
+
+    def test_split_exec_curl_command(self):
+        split = _split_exec_curl_command(
+            "oc exec -it pod-a -n ns -c app -- curl -v http://svc/"
+        )
+        assert split == (("oc", "pod-a", "ns", "app"), "curl -v http://svc/")
+        assert (
+            _split_exec_curl_command(
+                "kubectl get po -n ns | head -n 1 | xargs -I{} kubectl "
+                "exec -it {} -n ns -c app -- curl http://svc/"
+            )
+            is None
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
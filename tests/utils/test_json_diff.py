@@ -0,0 +1,180 @@
+import copy
+import json
+import random
+from collections import OrderedDict
+from unittest.mock import patch
+
+import pytest
+from deepdiff import DeepDiff
+
+from src.testpilot.core.validation_engine import (
+    GetCompareWithPutValidator,
+    ValidationContext,
+    check_diff,
+)
+from src.testpilot.utils import json_diff
+from src.testpilot.utils.json_diff import json_equal
+from src.testpilot.utils.parsed_response import ParsedResponse
+
+
+def _deepdiff_equal(expected, actual):
+    return not DeepDiff(expected, actual, ignore_order=True)
+
+
+def _random_json(rng, depth=0):
+    kind = rng.random()
+    if depth > 3 or kind < 0.4:
+        return rng.choice(
+            [0, 1, 1.0, 2, True, False, None, "a", "1", "", -0.0, 1.5]
+        )
+    if kind < 0.7:
+        return {
+            rng.choice("abc"): _random_json(rng, depth + 1)
+            for _ in range(rng.randint(0, 3))
+        }
+    return [_random_json(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+
+
+def _context(expected, actual, diff_details=True, saved_payload=None):
+    return ValidationContext(
+        method="GET",
+        request_payload=None,
+        expected_status=200,
+        response_payload=expected,
+        pattern_match=None,
+        actual_status=200,
+        response_body=actual,
+        response_headers={},
+        saved_payload=saved_payload,
+        diff_details=diff_details,
+    )
+
+
+class TestJsonEqual:
+    """json_equal gives the same verdict as DeepDiff(ignore_order=True)"""
+
+    def test_random_documents(self):
+        rng = random.Random(2024)
+        for _ in range(3000):
+            expected = _random_json(rng)
+            if rng.random() < 0.5:
+                actual = copy.deepcopy(expected)
+                if isinstance(actual, list):
+                    actual = list(reversed(actual)) + actual[:1]
+            else:
+                actual = _random_json(rng)
+
+            assert json_equal(expected, actual) == _deepdiff_equal(
+                expected, actual
+            ), (expected, actual)
+
+    @pytest.mark.parametrize(
+        "expected,actual",
+        [
+            ([1, 1, 2], [2, 1]),
+            ([1], [1.0]),
+            ([{"a": 1}], [{"a": 1.0}]),
+            ([[1, 2]], [[2, 1]]),
+            ([float("nan")], [float("nan")]),
+            ({"a": 1}, {"a": 1.0}),
+            ([True], [1]),
+            ({"a": float("nan")}, {"a": float("nan")}),
+            ([0.1 + 0.2], [0.3]),
+            ([[]], [{}]),
+            ("a", ["a"]),
+        ],
+    )
+    def test_deepdiff_edge_cases(self, expected, actual):
+        assert json_equal(expected, actual) == _deepdiff_equal(
+            expected, actual
+        )
+
+    def test_non_json_data_is_unsupported(self):
+        assert json_equal({"a": (1, 2)}, {"a": tuple([1, 2])}) is None
+        assert json_equal({1: "a"}, {1: "a"}) is None
+        assert json_equal(OrderedDict(a=1), {"a": 1}) is None
+
+    def test_stops_at_first_difference(self):
+        expected = list(range(1000))
+        actual = [-1] + expected[1:]
+
+        with patch(
+            "src.testpilot.utils.json_diff._element_key",
+            wraps=json_diff._element_key,
+        ) as element_key:
+            assert json_equal(expected, actual) is False
+
+        # The expected side plus the first element of the actual side
+        assert element_key.call_count == len(expected) + 1
+
+
+class TestCheckDiff:
+    """check_diff uses DeepDiff only to explain failures"""
+
+    def test_reordered_payload_passes_without_deepdiff(self):
+        expected = {"items": [{"id": i} for i in range(50)]}
+        actual = {"items": list(reversed(expected["items"]))}
+
+        with patch(
+            "src.testpilot.core.validation_engine.DeepDiff"
+        ) as deep_diff:
+            result = check_diff(_context(expected, json.dumps(actual)))
+
+        assert result.passed
+        deep_diff.assert_not_called()
+
+    def test_equal_digests_skip_the_walk(self):
+        expected = ParsedResponse('{"b": [1, 2], "a": "x"}')
+        actual = ParsedResponse('{"a": "x", "b": [1, 2]}')
+
+        with patch(
+            "src.testpilot.core.validation_engine.json_equal"
+        ) as native, patch(
+            "src.testpilot.core.validation_engine.DeepDiff"
+        ) as deep_diff:
+            result = check_diff(_context(expected, actual))
+
+        assert result.passed
+        native.assert_not_called()
+        deep_diff.assert_not_called()
+        # Memoised on the payload text, shared by every step using it
+        assert "digest" in vars(expected)
+
+    def test_failure_report_has_deepdiff_difference(self):
+        result = check_diff(_context({"a": 1}, '{"a": 2}'))
+
+        assert not result.passed
+        assert "values_changed" in result.details["difference"]
+
+    def test_verdict_only_skips_deepdiff(self):
+        with patch(
+            "src.testpilot.core.validation_engine.DeepDiff"
+        ) as deep_diff:
+            result = check_diff(
+                _context({"a": 1}, '{"a": 2}', diff_details=False)
+            )
+
+        assert not result.passed
+        assert result.details["actual"] == {"a": 2}
+        assert "difference" not in result.details
+        deep_diff.assert_not_called()
+
+    def test_non_json_data_falls_back_to_deepdiff(self):
+        result = check_diff(_context({"a": (1, 2)}, {"a": (2, 1)}))
+
+        assert result.passed
+
+    def test_get_compare_verdict_only_skips_deepdiff(self):
+        context = _context(None, '{"a": 2}', False, saved_payload='{"a": 1}')
+
+        with patch(
+            "src.testpilot.core.validation_engine.DeepDiff"
+        ) as deep_diff:
+            result = GetCompareWithPutValidator().validate(context)
+
+        assert not result.passed
+        deep_diff.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
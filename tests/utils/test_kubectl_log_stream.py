@@ -0,0 +1,204 @@
+import socket
+import sys
+import time
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from src.testpilot.utils.kubectl_log_stream import (
+    LogLineStream,
+    stream_many_until_match,
+    stream_until_match,
+)
+
+posix_only = pytest.mark.skipif(
+    sys.platform.startswith("win"), reason="uses POSIX shell commands"
+)
+
+
+class FakeChannel:
+    """Minimal paramiko Channel stand-in fed from a list of chunks."""
+
+    def __init__(self, chunks, stderr=b""):
+        self.chunks = list(chunks)
+        self.stderr = stderr
+        self.closed = False
+        self.command = None
+        self.pty = False
+
+    def get_pty(self):
+        self.pty = True
+
+    def settimeout(self, timeout):
+        pass
+
+    def exec_command(self, command):
+        self.command = command
+
+    def recv_stderr_ready(self):
+        return bool(self.stderr)
+
+    def recv_stderr(self, size):
+        data, self.stderr = self.stderr, b""
+        return data
+
+    def recv(self, size):
+        if self.closed:
+            return b""
+        if self.chunks:
+            chunk = self.chunks.pop(0)
+            if chunk is None:
+                time.sleep(0.05)
+                raise socket.timeout()
+            return chunk
+        time.sleep(0.05)
+        raise socket.timeout()
+
+    def recv_ready(self):
+        return bool(self.chunks)
+
+    def exit_status_ready(self):
+        return False
+
+    def close(self):
+        self.closed = True
+
+
+def _ssh_connector(channel):
+    connector = Mock()
+    connector.use_ssh = True
+    transport = MagicMock()
+    transport.open_session.return_value = channel
+    connector.get_connection.return_value.get_transport.return_value = (
+        transport
+    )
+    return connector
+
+
+@posix_only
+class TestLocalStreaming:
+    """Test cases for streaming through a local subprocess"""
+
+    def test_stops_at_first_matching_line(self):
+        """Collection returns as soon as the matcher accepts a line"""
+        command = "for i in 1 2 3; do echo line$i; done; sleep 30"
+        start = time.monotonic()
+        result = stream_until_match(command, lambda l: l == "line2", 10)
+
+        assert result.matched is True
+        assert result.timed_out is False
+        assert result.output == "line1\nline2"
+        assert time.monotonic() - start < 5
+
+    def test_deadline_without_match(self):
+        """Without a match the stream stops at the deadline"""
+        result = stream_until_match("echo a; sleep 30", lambda l: False, 0.3)
+
+        assert result.matched is False
+        assert result.timed_out is True
+        assert result.output == "a"
+        assert result.duration < 5
+
+    def test_no_matcher_collects_until_exit(self):
+        """A finished command ends the stream before the deadline"""
+        result = stream_until_match("echo a; echo b", None, 10)
+
+        assert result.output == "a\nb"
+        assert result.timed_out is False
+
+    def test_stderr_is_reported_separately(self):
+        """stderr output does not mix into the log lines"""
+        result = stream_until_match("echo out; echo oops >&2", None, 5)
+
+        assert result.output == "out"
+        assert result.error == "oops"
+
+    def test_many_pods_stop_together(self):
+        """A match in one pod stops streams on the other pods"""
+        results = stream_many_until_match(
+            [
+                "sleep 0.2; echo hit; sleep 30",
+                "while true; do echo noise; sleep 0.05; done",
+            ],
+            lambda l: l == "hit",
+            10,
+        )
+
+        assert [r.matched for r in results] == [True, False]
+        assert all(r.duration < 5 for r in results)
+
+
+class TestSSHStreaming:
+    """Test cases for streaming over an SSH channel"""
+
+    def test_lines_split_across_chunks(self):
+        """Partial chunks are joined into whole lines"""
+        channel = FakeChannel([b"first li", b"ne\nsec", None, b"ond\r\n"])
+        result = stream_until_match(
+            "kubectl logs -f pod",
+            lambda l: l == "second",
+            5,
+            "host1",
+            _ssh_connector(channel),
+        )
+
+        assert result.matched is True
+        assert result.output == "first line\nsecond"
+        # Bounded on the remote side even if the channel is lost
+        assert channel.command == "timeout 10 sh -c 'kubectl logs -f pod'"
+        assert channel.closed is True
+
+    def test_stderr_collected(self):
+        """Channel stderr ends up in the result's error text"""
+        channel = FakeChannel([b"line\n"], stderr=b"warning\n")
+        result = stream_until_match(
+            "kubectl logs -f pod", None, 0.3, "host1", _ssh_connector(channel)
+        )
+
+        assert result.output == "line"
+        assert result.error == "warning"
+
+    def test_stream_holds_a_pool_slot_until_closed(self):
+        """The channel counts against the host's pool until close()"""
+        connector = _ssh_connector(FakeChannel([b"line\n"]))
+        conn = connector.get_connection.return_value
+
+        stream = LogLineStream("kubectl logs -f pod", "host1", connector)
+        stream.start()
+        connector.get_connection.assert_called_once_with(
+            "host1", hold_channel=True
+        )
+        connector.release_connection.assert_not_called()
+        stream.close()
+        stream.close()
+
+        connector.release_connection.assert_called_once_with("host1", conn)
+
+    def test_open_ended_stream_gets_a_pty(self):
+        """Closing the channel hangs up a stream without a deadline"""
+        channel = FakeChannel([b"line\n"])
+        stream = LogLineStream(
+            "kubectl logs -f pod", "host1", _ssh_connector(channel)
+        ).start()
+        stream.close()
+
+        assert channel.pty is True
+        assert channel.command == "kubectl logs -f pod"
+
+        agent = FakeChannel([])
+        LogLineStream(
+            "python3 -", "host1", _ssh_connector(agent), stdin=True
+        ).start().close()
+        assert agent.pty is False
+
+    def test_missing_connection_raises(self):
+        """A host without an SSH connection is an error"""
+        connector = Mock(use_ssh=True)
+        connector.get_connection.return_value = None
+
+        with pytest.raises(RuntimeError):
+            LogLineStream("kubectl logs -f pod", "host1", connector).start()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,262 @@
+import sys
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.testpilot.core.test_pilot_core import execute_kubectl_logs_tailing
+from src.testpilot.core.test_result import TestFlow
+from src.testpilot.utils.log_tailer import (
+    LogTailer,
+    LogTailerRegistry,
+    _with_since,
+    since_to_seconds,
+)
+
+pytestmark = pytest.mark.skipif(
+    sys.platform.startswith("win"), reason="uses POSIX shell commands"
+)
+
+# `logs` keeps _with_since happy; the shell just echoes the words
+EMITTER = "echo logs start; for i in 1 2 3 4 5 6; do echo line$i; sleep 0.05; done; sleep 30"
+
+
+def _replaying(tmp_path, first, second):
+    """Print first and exit, then on the restart print second and wait."""
+    runs = tmp_path / "runs"
+    return (
+        f"if [ -e {runs} ]; then printf '{second}'; sleep 30; "
+        f"else touch {runs}; printf '{first}'; fi"
+    )
+
+
+@pytest.fixture
+def tailer():
+    tailer = LogTailer(EMITTER, max_lines=100).start()
+    yield tailer
+    tailer.stop()
+
+
+class TestHelpers:
+    """Test cases for the --since helpers"""
+
+    def test_since_to_seconds(self):
+        assert since_to_seconds("5s") == 5
+        assert since_to_seconds("2m") == 120
+        assert since_to_seconds("1h") == 3600
+        assert since_to_seconds("bogus", default=7) == 7
+
+    def test_with_since(self):
+        assert (
+            _with_since("kubectl logs -f --since=1s pod", 12.2)
+            == "kubectl logs -f --since=13s pod"
+        )
+        assert (
+            _with_since("kubectl logs -f pod", 0)
+            == "kubectl logs --since=1s -f pod"
+        )
+
+    def test_with_since_finds_the_logs_subcommand(self):
+        assert (
+            _with_since("kubectl -n catalogs logs -f pod", 5)
+            == "kubectl -n catalogs logs --since=5s -f pod"
+        )
+        assert (
+            _with_since("/usr/bin/oc -n app-logs logs -f pod", 5)
+            == "/usr/bin/oc -n app-logs logs --since=5s -f pod"
+        )
+
+
+class TestLogTailer:
+    """Test cases for LogTailer"""
+
+    def test_wait_for_returns_at_first_match(self, tailer):
+        """Waiting stops once a matching line is buffered"""
+        start = time.monotonic()
+        lines, matched = tailer.wait_for(0, lambda l: l == "line3", 10)
+
+        assert matched is True
+        assert lines[-1] == "line3"
+        assert time.monotonic() - start < 5
+
+    def test_window_excludes_older_lines(self, tailer):
+        """Only lines received after the window start are returned"""
+        tailer.wait_for(0, lambda l: l == "line6", 10)
+        cutoff = time.time()
+
+        lines, matched = tailer.wait_for(cutoff, lambda l: True, 0.2)
+        assert matched is False
+        assert lines == []
+        assert "line1" in tailer.lines_between(0)
+
+    def test_ring_buffer_is_bounded(self):
+        """Old lines are dropped once max_lines is reached"""
+        tailer = LogTailer(EMITTER, max_lines=3).start()
+        try:
+            tailer.wait_for(0, lambda l: l == "line6", 10)
+            assert tailer.lines_between(0) == ["line4", "line5", "line6"]
+        finally:
+            tailer.stop()
+
+    def test_stop_event_ends_wait(self, tailer):
+        """Another waiter's match ends this wait early"""
+        stop_event = threading.Event()
+        threading.Timer(0.2, stop_event.set).start()
+        start = time.monotonic()
+
+        _, matched = tailer.wait_for(0, lambda l: False, 10, stop_event)
+        assert matched is False
+        assert time.monotonic() - start < 5
+
+    @pytest.mark.parametrize(
+        "first, second",
+        [
+            ("one\\ntwo\\n", "one\\ntwo\\nthree\\n"),
+            (
+                "2024-01-01T00:00:01.5Z one\\n2024-01-01T00:00:02Z two\\n",
+                "2024-01-01T00:00:01.5Z one\\n2024-01-01T00:00:02Z two\\n"
+                "2024-01-01T00:00:02.25Z three\\n",
+            ),
+        ],
+        ids=["content", "timestamps"],
+    )
+    def test_restart_skips_replayed_lines(self, tmp_path, first, second):
+        """Lines replayed by the --since window are not buffered again"""
+        with patch("src.testpilot.utils.log_tailer._RESTART_DELAY", 0.05):
+            tailer = LogTailer(_replaying(tmp_path, first, second)).start()
+            try:
+                lines, matched = tailer.wait_for(
+                    0, lambda l: l.endswith("three"), 10
+                )
+            finally:
+                tailer.stop()
+
+        assert matched is True
+        assert [line.split()[-1] for line in lines] == ["one", "two", "three"]
+        assert tailer.restarts == 1
+
+
+class TestLogTailerRegistry:
+    """Test cases for LogTailerRegistry"""
+
+    def test_same_key_reuses_tailer(self):
+        """Steps on the same pod share one tailer"""
+        registry = LogTailerRegistry()
+        key = ("host1", "ns", "pod-a", None)
+        try:
+            first = registry.get_or_start(key, EMITTER)
+            second = registry.get_or_start(key, EMITTER)
+            other = registry.get_or_start(
+                ("host1", "ns", "pod-b", None), EMITTER
+            )
+
+            assert first is second
+            assert other is not first
+            assert len(registry) == 2
+        finally:
+            registry.stop_all()
+        assert len(registry) == 0
+        assert not first.alive
+
+    def test_tailer_of_a_missing_pod_gives_up(self):
+        """A stream that keeps ending at once is not restarted forever"""
+        registry = LogTailerRegistry(max_restarts=3)
+        key = ("host1", "ns", "gone", None)
+
+        with patch("src.testpilot.utils.log_tailer._RESTART_DELAY", 0.05):
+            # Over SSH kubectl's error arrives as a line (pty)
+            tailer = registry.get_or_start(key, "echo not found; exit 1")
+            lines, matched = tailer.wait_for(0, lambda l: False, 10)
+
+        assert matched is False
+        # The replayed error line is buffered once
+        assert lines == ["not found"]
+        assert not tailer.alive
+        assert tailer.restarts == 3
+        assert len(registry) == 0
+
+
+class TestExecuteKubectlLogsTailing:
+    """Test cases for execute_kubectl_logs_tailing"""
+
+    def test_queries_window_since_previous_request(self):
+        """Log steps read the tailer window from the flow's last request"""
+        flow = TestFlow("Sheet1", "t1")
+        flow.last_request_started_at = 123.0
+        tailer = Mock()
+        tailer.wait_for.return_value = (["a", "match"], True)
+        registry = Mock()
+        registry.get_or_start.return_value = tailer
+        registry.__len__ = Mock(return_value=1)
+        matcher = Mock()
+
+        with patch(
+            "src.testpilot.core.test_pilot_core.get_log_tailer_registry",
+            return_value=registry,
+        ), patch(
+            "src.testpilot.core.test_pilot_core._get_kubectl_logs_settings",
+            return_value={},
+        ), patch(
+            "src.testpilot.core.test_pilot_core.save_kubectl_logs"
+        ):
+            raw_output, pod_names, _ = execute_kubectl_logs_tailing(
+                [
+                    "kubectl logs -f --since=1s pod-a -n ns -c app "
+                    "& sleep 20; kill $!"
+                ],
+                "host1",
+                None,
+                Mock(row_idx=3),
+                flow,
+                matcher,
+                namespace="ns",
+                show_table=True,
+            )
+
+        key = registry.get_or_start.call_args[0][0]
+        assert key == ("host1", "ns", "pod-a", "app")
+        args = tailer.wait_for.call_args[0]
+        assert args[0] == 123.0
+        assert args[1] is matcher
+        assert args[2] == 20
+        assert raw_output == "a\nmatch\n"
+        assert pod_names == ["pod-a"]
+
+    def test_captures_when_tailer_cannot_start(self):
+        """No long-lived channel left: the pod is captured on a command slot"""
+        command = "kubectl logs -f --since=1s pod-a -n ns & sleep 20; kill $!"
+        registry = Mock()
+        registry.get_or_start.side_effect = RuntimeError("no channel")
+        registry.__len__ = Mock(return_value=0)
+
+        with patch(
+            "src.testpilot.core.test_pilot_core.get_log_tailer_registry",
+            return_value=registry,
+        ), patch(
+            "src.testpilot.core.test_pilot_core._get_kubectl_logs_settings",
+            return_value={},
+        ), patch(
+            "src.testpilot.core.test_pilot_core.execute_command",
+            return_value=("a\nmatch", "", 20.0),
+        ) as execute, patch(
+            "src.testpilot.core.test_pilot_core.save_kubectl_logs"
+        ):
+            raw_output, pod_names, _ = execute_kubectl_logs_tailing(
+                [command],
+                "host1",
+                None,
+                Mock(row_idx=3),
+                TestFlow("Sheet1", "t1"),
+                Mock(),
+                namespace="ns",
+                show_table=True,
+            )
+
+        execute.assert_called_once_with(command, "host1", None)
+        assert raw_output == "a\nmatch\n"
+        assert pod_names == ["pod-a"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,217 @@
+import json
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+from werkzeug.serving import make_server
+
+from src.testpilot.core.test_pilot_core import _run_step_command
+from src.testpilot.mock.enhanced_mock_server import EnhancedMockServer
+from src.testpilot.utils.config_resolver import (
+    ConfigSnapshot,
+    set_config_snapshot,
+)
+from src.testpilot.utils.http_exchange import HttpExchange, HttpRequest
+from src.testpilot.utils.native_http import (
+    NativeHttpClient,
+    curl_user_agent,
+    shutdown_native_http_client,
+)
+from src.testpilot.utils.response_parser import parse_curl_output
+
+
+@pytest.fixture(scope="module")
+def mock_server():
+    """Enhanced mock server on a free local port"""
+    server = EnhancedMockServer(enhanced_data_file="missing.json", port=0)
+    http_server = make_server("127.0.0.1", 0, server.app, threaded=True)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{http_server.server_port}"
+    http_server.shutdown()
+
+
+@pytest.fixture(scope="module")
+def header_server():
+    """Answers with the request's User-Agent and Accept headers"""
+
+    def app(environ, start_response):
+        start_response("200 OK", [("Content-Type", "application/json")])
+        headers = {
+            "user-agent": environ.get("HTTP_USER_AGENT"),
+            "accept": environ.get("HTTP_ACCEPT"),
+        }
+        return [json.dumps(headers).encode()]
+
+    http_server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{http_server.server_port}"
+    http_server.shutdown()
+
+
+@pytest.fixture
+def client():
+    client = NativeHttpClient(http_version="1.1")
+    yield client
+    client.close()
+
+
+class TestNativeHttpClient:
+    """Test cases for NativeHttpClient against the enhanced mock server"""
+
+    def test_structured_response(self, client, mock_server):
+        _, base_url = mock_server
+        exchange = client.send(HttpRequest("GET", f"{base_url}/health"))
+
+        assert exchange.error is None
+        assert exchange.status == 200
+        assert exchange.header("content-type") == "application/json"
+        assert json.loads(exchange.body)["status"] == "healthy"
+
+    def test_body_and_headers_are_sent(self, client, mock_server):
+        server, base_url = mock_server
+        before = server.request_count
+        exchange = client.send(
+            HttpRequest(
+                "PUT",
+                f"{base_url}/nudr-dr/v1/subscription-data/imsi-1",
+                headers=[("Content-Type", "application/json")],
+                body='{"imsi": "1"}',
+            )
+        )
+
+        assert exchange.status is not None
+        assert server.request_count == before + 1
+
+    def test_sends_curl_headers(self, client, header_server):
+        default = client.send(HttpRequest("GET", header_server))
+        custom = client.send(
+            HttpRequest(
+                "GET", header_server, headers=[("User-Agent", "suite/1")]
+            )
+        )
+
+        assert json.loads(default.body) == {
+            "user-agent": curl_user_agent(),
+            "accept": "*/*",
+        }
+        assert json.loads(custom.body)["user-agent"] == "suite/1"
+
+    def test_no_user_agent_without_curl(self, header_server):
+        with patch(
+            "src.testpilot.utils.native_http.curl_user_agent",
+            return_value=None,
+        ):
+            client = NativeHttpClient(http_version="1.1")
+        try:
+            exchange = client.send(HttpRequest("GET", header_server))
+        finally:
+            client.close()
+
+        assert json.loads(exchange.body)["user-agent"] is None
+
+    def test_connection_error(self, client):
+        exchange = client.send(HttpRequest("GET", "http://127.0.0.1:1/"))
+
+        assert exchange.status is None
+        assert "ConnectionError" in exchange.error
+
+    def test_prior_knowledge_without_httpx_is_left_to_curl(self):
+        request = HttpRequest("GET", "http://svc/", http2_prior_knowledge=True)
+        plain = HttpRequest("GET", "http://svc/")
+        with patch("src.testpilot.utils.native_http.httpx", None):
+            for version in ("2", "auto"):
+                client = NativeHttpClient(http_version=version)
+                assert client.supports(request) is False
+                assert client.supports(plain)
+            assert NativeHttpClient(http_version="1.1").supports(request)
+
+
+class TestParsedOutput:
+    """to_parsed_output() matches parse_curl_output() on the curl text"""
+
+    @pytest.mark.parametrize(
+        "exchange",
+        [
+            HttpExchange(
+                request=HttpRequest("GET", "http://svc/a"),
+                status=200,
+                http_version="2",
+                headers=[("Content-Type", "application/json")],
+                body='{"a": 1}',
+            ),
+            HttpExchange(
+                request=HttpRequest("POST", "http://svc/a", body="{}"),
+                status=400,
+                reason="Bad Request",
+                headers=[("X-Trace", "a:b"), ("x-trace", "c")],
+                body="Reason: missing imsi",
+            ),
+            HttpExchange(
+                request=HttpRequest("DELETE", "http://svc/a"),
+                status=204,
+                headers=[("Server", "nf")],
+            ),
+            HttpExchange(
+                request=HttpRequest("GET", "http://svc/a"),
+                error="ConnectionError: refused",
+            ),
+        ],
+    )
+    def test_matches_parse_curl_output(self, exchange):
+        assert exchange.to_parsed_output() == parse_curl_output(
+            *exchange.to_curl_output()
+        )
+
+
+class TestRunStepCommandNative:
+    """_run_step_command with the native backend"""
+
+    @pytest.fixture(autouse=True)
+    def native_backend(self):
+        set_config_snapshot(
+            ConfigSnapshot.from_dict(
+                {
+                    "http_settings": {
+                        "backend": "native",
+                        "native_http_version": "1.1",
+                    }
+                }
+            )
+        )
+        yield
+        set_config_snapshot(None)
+        shutdown_native_http_client()
+
+    def test_pod_mode_curl_is_sent_in_process(self, mock_server):
+        _, base_url = mock_server
+        with patch(
+            "src.testpilot.core.test_pilot_core.execute_command"
+        ) as mock_execute:
+            output, error, duration, exchange = _run_step_command(
+                f"curl -v -X GET {base_url}/health", "host1", None
+            )
+
+        mock_execute.assert_not_called()
+        assert exchange.status == 200
+        assert "< HTTP/1.1 200" in error
+        assert json.loads(output)["status"] == "healthy"
+
+    def test_ssh_commands_still_use_curl(self):
+        """Over SSH the request must leave from the remote host"""
+        connector = Mock(use_ssh=True, execution_mode="ssh")
+        with patch(
+            "src.testpilot.core.test_pilot_core.execute_command",
+            return_value=("out", "err", 0.1),
+        ) as mock_execute:
+            result = _run_step_command(
+                "curl -v http://svc/a", "host1", connector
+            )
+
+        mock_execute.assert_called_once()
+        assert result == ("out", "err", 0.1, None)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
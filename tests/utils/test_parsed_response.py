@@ -0,0 +1,127 @@
+import copy
+import json
+import pickle
+from unittest.mock import patch
+
+import pytest
+
+from src.testpilot.core import test_result
+from src.testpilot.core.test_pilot_core import validate_and_create_result
+from src.testpilot.exporters import test_results_exporter
+from src.testpilot.utils.parsed_response import ParsedResponse, load_json
+from src.testpilot.utils.response_parser import parse_curl_output
+
+BODY = json.dumps(
+    {
+        "nfInstanceId": "6faf1bbc-6e4a-4454-a507-a14ef8e1bc5c",
+        "nfStatus": "REGISTERED",
+        "nfServices": [{"serviceName": "nudr-dr", "port": 8080}],
+    }
+)
+ERROR = "< HTTP/2 200\n< content-type: application/json\n<\n"
+
+
+def _step_data(method, response_payload=None, pattern_match=None):
+    return {
+        "expected_status": 200,
+        "pattern_match": pattern_match,
+        "compare_with_key": None,
+        "from_excel_response_payload": response_payload,
+        "method": method,
+    }
+
+
+class TestParsedResponse:
+    """Test cases for ParsedResponse"""
+
+    def test_decodes_once(self):
+        response = ParsedResponse(BODY)
+
+        with patch("json.loads", wraps=json.loads) as loads:
+            first = load_json(response)
+            second = response.json()
+
+        assert first is second
+        assert loads.call_count == 1
+
+    def test_behaves_like_the_text(self):
+        response = ParsedResponse('{"a": 1}\n{"b": 2}', {"x-id": "1"})
+
+        assert response == '{"a": 1}\n{"b": 2}'
+        assert response.lines == ('{"a": 1}', '{"b": 2}')
+        assert response.headers_compact == '{"x-id":"1"}'
+        assert copy.copy(response) is response
+        assert type(copy.deepcopy(response)) is str
+        assert type(pickle.loads(pickle.dumps(response))) is str
+
+    def test_invalid_json_raises_like_json_loads(self):
+        response = ParsedResponse("Subscriber not found")
+
+        for _ in range(2):
+            with pytest.raises(json.JSONDecodeError):
+                load_json(response)
+        assert not response.is_json
+        assert response.compact == "Subscriber not found"
+
+    def test_compact_matches_validator_rendering(self):
+        for text in (BODY, "[1, 2]", "5", '"text"', "not json"):
+            try:
+                value = json.loads(text)
+            except ValueError:
+                value = text
+            expected = (
+                json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+                if isinstance(value, (dict, list))
+                else str(value)
+            )
+            assert ParsedResponse(text).compact == expected
+
+    def test_parser_output_is_parsed_response(self):
+        parsed = parse_curl_output(BODY, ERROR)
+
+        assert isinstance(parsed["raw_output"], ParsedResponse)
+        assert parsed["raw_output"].headers is parsed["headers"]
+
+
+class TestParseOncePerStep:
+    """A step decodes its response body and payload once"""
+
+    @pytest.mark.parametrize(
+        "step_data",
+        [
+            _step_data("PUT", response_payload=BODY),
+            _step_data("GET", response_payload=BODY, pattern_match="nudr-dr"),
+        ],
+    )
+    def test_body_and_payload_decoded_once(self, step_data):
+        flow = test_result.TestFlow("Sheet1", "test_1")
+        step = test_result.TestStep(
+            1, step_data["method"], "/nf", None, {}, 200, None
+        )
+        parsed = parse_curl_output(BODY, ERROR)
+
+        with patch("json.loads", wraps=json.loads) as loads:
+            result = validate_and_create_result(
+                step,
+                flow,
+                step_data,
+                parsed,
+                BODY,
+                ERROR,
+                0.1,
+                "host1",
+                "curl",
+            )
+            exporter = test_results_exporter.TestResultsExporter
+            exporter.__new__(exporter)._extract_response_body(result)
+
+        assert result.passed
+        decoded = [call.args[0] for call in loads.call_args_list]
+        # At most the response body and Response_Payload, once each
+        assert 1 <= len(decoded) <= 2
+        assert all(isinstance(text, ParsedResponse) for text in decoded)
+        assert len({id(text) for text in decoded}) == len(decoded)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
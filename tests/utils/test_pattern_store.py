@@ -0,0 +1,105 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from src.testpilot.core.validation_engine import load_enhanced_pattern_matches
+from src.testpilot.utils.pattern_store import (
+    EnhancedPatternStore,
+    get_pattern_store,
+    reset_pattern_store,
+)
+
+ENHANCED_DATA = {
+    "enhanced_patterns": {
+        "Sheet1": [
+            {"row_number": 3, "converted_pattern": {"nfType": "SLF"}},
+            {"row_number": 5, "converted_pattern": ["tag1"]},
+            {"row_number": 3, "converted_pattern": {"duplicate": True}},
+        ]
+    }
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_store():
+    reset_pattern_store()
+    yield
+    reset_pattern_store()
+
+
+def _write(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+class TestEnhancedPatternStore:
+    """Test cases for EnhancedPatternStore"""
+
+    def test_in_memory_lookup(self, tmp_path):
+        store = EnhancedPatternStore(pattern_dirs=[str(tmp_path)])
+        store.load_data(ENHANCED_DATA)
+
+        assert store.lookup("Sheet1", 3) == {"nfType": "SLF"}
+        assert store.lookup("Sheet1", 5) == ["tag1"]
+        assert store.lookup("Sheet1", 4) is None
+        assert store.lookup("Other", 3) is None
+
+    def test_in_memory_data_does_not_touch_files(self, tmp_path):
+        store = EnhancedPatternStore(pattern_dirs=[str(tmp_path)])
+        store.load_data(ENHANCED_DATA)
+
+        with patch("builtins.open") as mock_open:
+            store.lookup("Sheet1", 3)
+        mock_open.assert_not_called()
+
+    def test_files_are_loaded_once(self, tmp_path):
+        _write(tmp_path / "a_enhanced_pattern_matches.json", ENHANCED_DATA)
+        store = EnhancedPatternStore(pattern_dirs=[str(tmp_path)])
+
+        for _ in range(10):
+            assert store.lookup("Sheet1", 3) == {"nfType": "SLF"}
+
+        assert store.loads == 1
+
+    def test_changed_file_is_reloaded(self, tmp_path):
+        path = tmp_path / "a_enhanced_pattern_matches.json"
+        _write(path, ENHANCED_DATA)
+        store = EnhancedPatternStore(pattern_dirs=[str(tmp_path)])
+        assert store.lookup("Sheet1", 5) == ["tag1"]
+
+        changed = {
+            "enhanced_patterns": {
+                "Sheet1": [{"row_number": 5, "converted_pattern": ["tag2"]}]
+            }
+        }
+        _write(path, changed)
+        mtime = os.stat(path).st_mtime + 10
+        os.utime(path, (mtime, mtime))
+
+        assert store.lookup("Sheet1", 5) == ["tag2"]
+        assert store.loads == 2
+
+    def test_first_directory_with_files_wins(self, tmp_path):
+        first, second = tmp_path / "first", tmp_path / "second"
+        first.mkdir()
+        second.mkdir()
+        _write(second / "b_enhanced_pattern_matches.json", ENHANCED_DATA)
+        store = EnhancedPatternStore(pattern_dirs=[str(first), str(second)])
+
+        assert store.lookup("Sheet1", 3) == {"nfType": "SLF"}
+
+
+class TestLoadEnhancedPatternMatches:
+    """load_enhanced_pattern_matches serves from the process-wide store"""
+
+    def test_uses_indexed_patterns(self):
+        get_pattern_store().load_data(ENHANCED_DATA)
+
+        assert load_enhanced_pattern_matches("Sheet1", 3) == {"nfType": "SLF"}
+        assert load_enhanced_pattern_matches("Sheet1", 99) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,117 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from src.testpilot.core.test_pilot_core import _load_response_payload_file
+from src.testpilot.utils.curl_builder import build_curl_command
+from src.testpilot.utils.parsed_response import ParsedResponse, load_json
+from src.testpilot.utils.payload_repository import (
+    PayloadRepository,
+    get_payload_repository,
+    reset_payload_repository,
+)
+
+PAYLOAD = {"nfInstanceId": "6faf1bbc", "nfType": "UDR", "priority": 1}
+
+
+@pytest.fixture
+def payloads_dir(tmp_path):
+    reset_payload_repository()
+    with open(tmp_path / "reg_01.json", "w") as f:
+        json.dump(PAYLOAD, f, indent=2)
+    yield tmp_path
+    reset_payload_repository()
+
+
+class TestPayloadRepository:
+    """Test cases for PayloadRepository"""
+
+    def test_reads_each_file_once(self, payloads_dir):
+        repository = PayloadRepository()
+
+        first = repository.load(str(payloads_dir), "reg_01.json")
+        second = repository.load(str(payloads_dir), " reg_01.json ")
+
+        assert first is second
+        assert repository.reads == 1
+        assert isinstance(first.text, ParsedResponse)
+        assert first.json() == PAYLOAD
+
+    def test_reloads_when_file_changes(self, payloads_dir):
+        repository = PayloadRepository()
+        path = str(payloads_dir / "reg_01.json")
+        first = repository.get(path)
+
+        with open(path, "w") as f:
+            json.dump({**PAYLOAD, "priority": 2}, f)
+        os.utime(path, ns=(first.stamp[0] + 10**9, first.stamp[0] + 10**9))
+
+        second = repository.get(path)
+        assert second is not first
+        assert second.json()["priority"] == 2
+        assert repository.reads == 2
+
+    def test_canonical_form_ignores_key_order(self, payloads_dir):
+        path = payloads_dir / "reordered.json"
+        path.write_text(json.dumps(dict(reversed(list(PAYLOAD.items())))))
+        repository = PayloadRepository()
+
+        original = repository.load(str(payloads_dir), "reg_01.json")
+        reordered = repository.get(str(path))
+
+        assert original.text != reordered.text
+        assert original.text.canonical == reordered.text.canonical
+        assert original.text.digest == reordered.text.digest
+
+    def test_non_json_file(self, payloads_dir):
+        (payloads_dir / "note.json").write_text("not json")
+
+        entry = PayloadRepository().load(str(payloads_dir), "note.json")
+
+        assert not entry.is_json
+        assert entry.text.canonical is None and entry.text.digest is None
+        with pytest.raises(json.JSONDecodeError):
+            entry.json()
+
+    def test_missing_file(self, payloads_dir):
+        with pytest.raises(FileNotFoundError):
+            PayloadRepository().load(str(payloads_dir), "missing.json")
+
+
+class TestPayloadRepositoryUsers:
+    """Response and request payload files come from the repository"""
+
+    def test_response_payload_decoded_once(self, payloads_dir):
+        with patch("json.loads", wraps=json.loads) as loads:
+            for _ in range(3):
+                payload = _load_response_payload_file(
+                    "reg_01.json", str(payloads_dir)
+                )
+                assert load_json(payload) == PAYLOAD
+
+        assert loads.call_count == 1
+        assert get_payload_repository().reads == 1
+
+    def test_curl_builder_uses_repository(self, payloads_dir):
+        commands = [
+            build_curl_command(
+                "http://nf/x",
+                "PUT",
+                payload="reg_01.json",
+                payloads_folder=str(payloads_dir),
+            )
+            for _ in range(3)
+        ]
+
+        assert get_payload_repository().reads == 1
+        resolved = commands[0][1]
+        assert resolved == (payloads_dir / "reg_01.json").read_text().strip()
+        assert resolved is _load_response_payload_file(
+            "reg_01.json", str(payloads_dir)
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
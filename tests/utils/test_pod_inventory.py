@@ -0,0 +1,363 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.testpilot.core.test_pilot_core import (
+    _execute_step_on_host,
+    build_kubectl_logs_command,
+    build_url_based_command,
+)
+from src.testpilot.utils import pod_inventory as pod_inventory_module
+from src.testpilot.utils.config_resolver import (
+    ConfigSnapshot,
+    set_config_snapshot,
+)
+from src.testpilot.utils.pod_inventory import (
+    PodInventory,
+    get_pod_inventory,
+    parse_pod_list,
+    shutdown_pod_inventory,
+)
+
+
+def _pod(name, instance="ns", phase="Running"):
+    return {
+        "metadata": {
+            "name": name,
+            "labels": {"app.kubernetes.io/instance": instance},
+        },
+        "status": {"phase": phase},
+    }
+
+
+POD_LIST = json.dumps(
+    {
+        "items": [
+            _pod("provgw-prov-ingressgateway-def456", instance="provgw"),
+            _pod("slf-group-prov-ghi789"),
+            _pod("slf-ingressgateway-prov-abc123"),
+            _pod("nudr-config-7d9f-old11", phase="Pending"),
+            _pod("nudr-config-7d9f-x2b4c"),
+        ]
+    }
+)
+
+
+RESTARTED_POD_LIST = json.dumps({"items": [_pod("nudr-config-7d9f-n3w99")]})
+
+
+def _ssh_connector(output=POD_LIST):
+    connector = Mock()
+    connector.use_ssh = True
+    connector.execution_mode = "ssh"
+    connector.run_command.return_value = {
+        "host1": {"output": output, "error": ""}
+    }
+    return connector
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    set_config_snapshot(None)
+    shutdown_pod_inventory()
+    yield
+    set_config_snapshot(None)
+    shutdown_pod_inventory()
+
+
+class TestParsePodList:
+    """Test cases for parse_pod_list"""
+
+    def test_names_labels_and_phase(self):
+        pods = parse_pod_list(POD_LIST)
+
+        assert pods[0].name == "provgw-prov-ingressgateway-def456"
+        assert pods[0].labels["app.kubernetes.io/instance"] == "provgw"
+        assert pods[3].running is False
+        assert pods[4].running is True
+
+    def test_rejects_non_json(self):
+        with pytest.raises(ValueError):
+            parse_pod_list("NAME READY STATUS\nslf-pod 1/1 Running")
+
+
+class TestPodInventory:
+    """Test cases for PodInventory"""
+
+    def test_lookups_share_one_listing(self):
+        """Repeated lookups within the TTL list the namespace once"""
+        connector = _ssh_connector()
+        inventory = PodInventory(ttl=60)
+
+        first = inventory.find("host1", "ns", "ingressgateway", connector)
+        second = inventory.find("host1", "ns", "slf-group", connector)
+
+        assert [p.name for p in first] == [
+            "provgw-prov-ingressgateway-def456",
+            "slf-ingressgateway-prov-abc123",
+        ]
+        assert [p.name for p in second] == ["slf-group-prov-ghi789"]
+        assert connector.run_command.call_count == 1
+        assert connector.run_command.call_args[0][0] == (
+            "kubectl get pods -n ns -o json"
+        )
+
+    def test_exclude_labels(self):
+        """Pods are filtered by label without extra kubectl calls"""
+        inventory = PodInventory()
+        pods = inventory.find(
+            "host1",
+            "ns",
+            "prov",
+            _ssh_connector(),
+            exclude_labels={"app.kubernetes.io/instance": "provgw"},
+        )
+
+        assert [p.name for p in pods] == [
+            "slf-group-prov-ghi789",
+            "slf-ingressgateway-prov-abc123",
+        ]
+
+    def test_ttl_expiry_lists_again(self):
+        connector = _ssh_connector()
+        inventory = PodInventory(ttl=10)
+        with patch.object(
+            pod_inventory_module.time, "monotonic", return_value=100.0
+        ):
+            inventory.find("host1", "ns", "slf", connector)
+        with patch.object(
+            pod_inventory_module.time, "monotonic", return_value=111.0
+        ):
+            inventory.find("host1", "ns", "slf", connector)
+
+        assert connector.run_command.call_count == 2
+
+    def test_refresh_on_miss(self):
+        """A lookup that matches nothing lists the namespace again"""
+        connector = _ssh_connector()
+        inventory = PodInventory(ttl=60, refresh_on_miss=True)
+        inventory.find("host1", "ns", "slf", connector)
+
+        assert inventory.find("host1", "ns", "new-pod", connector) == []
+        assert connector.run_command.call_count == 2
+
+        no_refresh = PodInventory(ttl=60, refresh_on_miss=False)
+        connector = _ssh_connector()
+        no_refresh.find("host1", "ns", "slf", connector)
+        no_refresh.find("host1", "ns", "new-pod", connector)
+        assert connector.run_command.call_count == 1
+
+    def test_invalidate(self):
+        connector = _ssh_connector()
+        inventory = PodInventory(ttl=60)
+        inventory.find("host1", "ns", "slf", connector)
+        inventory.invalidate("host1", "ns")
+        inventory.find("host1", "ns", "slf", connector)
+
+        assert connector.run_command.call_count == 2
+
+    def test_failed_listing_returns_none(self):
+        """Unparseable output is not cached and reports None"""
+        connector = _ssh_connector(output="")
+        inventory = PodInventory()
+
+        assert inventory.find("host1", "ns", "slf", connector) is None
+        assert inventory.find("host1", "ns", "slf", connector) is None
+        assert connector.run_command.call_count == 2
+
+    def test_disabled_in_config(self):
+        set_config_snapshot(
+            ConfigSnapshot.from_dict({"pod_inventory": {"enabled": False}})
+        )
+        assert get_pod_inventory() is None
+
+        set_config_snapshot(
+            ConfigSnapshot.from_dict({"pod_inventory": {"ttl": 5}})
+        )
+        assert get_pod_inventory().ttl == 5
+
+    def test_exec_pod_is_pinned(self):
+        """The exec target outlives the listing TTL"""
+        connector = _ssh_connector()
+        inventory = PodInventory(ttl=0)
+
+        first = inventory.exec_pod("host1", "ns", "nudr-config", connector)
+        second = inventory.exec_pod("host1", "ns", "nudr-config", connector)
+
+        # Running pod wins over the pending one listed first
+        assert first == second == "nudr-config-7d9f-x2b4c"
+        assert connector.run_command.call_count == 1
+
+    def test_forget_exec_pod_resolves_again(self):
+        connector = _ssh_connector()
+        inventory = PodInventory(ttl=60)
+        inventory.exec_pod("host1", "ns", "nudr-config", connector)
+        connector.run_command.return_value = {
+            "host1": {"output": RESTARTED_POD_LIST, "error": ""}
+        }
+
+        forgotten = inventory.forget_exec_pod("host1", "ns", "nudr-config")
+
+        assert forgotten == "nudr-config-7d9f-x2b4c"
+        assert (
+            inventory.exec_pod("host1", "ns", "nudr-config", connector)
+            == "nudr-config-7d9f-n3w99"
+        )
+        assert inventory.reresolves == 1
+
+
+class TestInventoryBackedLookups:
+    """build_* helpers resolve pods from the inventory"""
+
+    def test_kubectl_logs_slf_filter_from_labels(self):
+        """SLF provgw filtering needs no per-pod jsonpath calls"""
+        set_config_snapshot(ConfigSnapshot.from_dict({"nf_name": "SLF_TEST"}))
+        connector = _ssh_connector()
+
+        with patch(
+            "src.testpilot.core.test_pilot_core._generate_logs_capture_command",
+            side_effect=lambda command, *args: command,
+        ):
+            result = build_kubectl_logs_command(
+                "kubectl logs {ingressgateway}", "ns", connector, "host1"
+            )
+
+        assert result == ["kubectl logs slf-ingressgateway-prov-abc123"]
+        assert connector.run_command.call_count == 1
+
+    def test_url_command_execs_into_resolved_pod(self):
+        """The exec command names the pod instead of listing pods first"""
+        connector = _ssh_connector()
+        step_data = {
+            "url": "http://svc/api",
+            "method": "GET",
+            "headers": {},
+            "request_payload": None,
+            "pod_exec": "nudr-config",
+        }
+
+        command = build_url_based_command(
+            step_data, {}, None, "ns", None, "host1", connector=connector
+        )
+
+        assert command.startswith(
+            "kubectl exec -it nudr-config-7d9f-x2b4c -n ns -c nudr-config -- "
+        )
+        assert "get po" not in command
+
+    def test_url_command_without_match_keeps_pipeline(self):
+        connector = _ssh_connector(output=json.dumps({"items": []}))
+        step_data = {
+            "url": "http://svc/api",
+            "method": "GET",
+            "headers": {},
+            "request_payload": None,
+            "pod_exec": "nudr-config",
+        }
+
+        command = build_url_based_command(
+            step_data, {}, None, "ns", None, "host1", connector=connector
+        )
+
+        assert command.startswith("kubectl get po -n ns")
+
+    def test_direct_exec_disabled_keeps_pipeline(self):
+        set_config_snapshot(
+            ConfigSnapshot.from_dict({"pod_inventory": {"direct_exec": False}})
+        )
+        connector = _ssh_connector()
+        step_data = {
+            "url": "http://svc/api",
+            "method": "GET",
+            "headers": {},
+            "request_payload": None,
+            "pod_exec": "nudr-config",
+        }
+
+        command = build_url_based_command(
+            step_data, {}, None, "ns", None, "host1", connector=connector
+        )
+
+        assert "| xargs -I{} kubectl exec" in command
+        connector.run_command.assert_not_called()
+
+
+class TestExecReresolve:
+    """A failed direct exec is retried once on a freshly resolved pod"""
+
+    def _run(self, exec_results):
+        set_config_snapshot(ConfigSnapshot.from_dict({}))
+        connector = _ssh_connector()
+        connector.run_command.side_effect = [
+            {"host1": {"output": POD_LIST, "error": ""}},
+            {"host1": {"output": RESTARTED_POD_LIST, "error": ""}},
+        ]
+        step_data = {
+            "url": "http://svc/api",
+            "command": "curl",
+            "method": "GET",
+            "headers": {},
+            "request_payload": None,
+            "pod_exec": "nudr-config",
+        }
+        step = Mock(row_idx=2, pattern_match=None)
+
+        with patch(
+            "src.testpilot.core.test_pilot_core.resolve_namespace",
+            return_value="ns",
+        ), patch(
+            "src.testpilot.core.test_pilot_core.execute_command",
+            side_effect=exec_results,
+        ) as mock_execute, patch(
+            "src.testpilot.core.test_pilot_core.validate_and_create_result",
+            return_value="result",
+        ):
+            result = _execute_step_on_host(
+                step,
+                Mock(),
+                step_data,
+                "host1",
+                {},
+                None,
+                connector,
+                None,
+                True,
+            )
+        assert result == "result"
+        return [call[0][0] for call in mock_execute.call_args_list]
+
+    def test_pod_gone_retries_on_new_pod(self):
+        commands = self._run(
+            [
+                (
+                    "",
+                    'Error from server (NotFound): pods "nudr-config-7d9f-x2b4c" not found',
+                    0.1,
+                ),
+                ('{"ok": true}', "", 0.1),
+            ]
+        )
+
+        assert len(commands) == 2
+        assert commands[0].startswith(
+            "kubectl exec -it nudr-config-7d9f-x2b4c"
+        )
+        assert commands[1].startswith(
+            "kubectl exec -it nudr-config-7d9f-n3w99"
+        )
+        assert (
+            commands[0].split(" -- ", 1)[1] == commands[1].split(" -- ", 1)[1]
+        )
+
+    def test_curl_errors_are_not_retried(self):
+        """HTTP failures from inside the pod keep the pinned pod"""
+        commands = self._run(
+            [("", "curl: (7) Failed to connect to svc port 80", 0.1)]
+        )
+
+        assert len(commands) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
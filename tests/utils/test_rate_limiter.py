@@ -0,0 +1,188 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.testpilot.utils.rate_limiter import (
+    RateLimiter,
+    create_rate_limiter_from_config,
+    endpoint_template,
+)
+
+
+class TestReservation:
+    """Concurrent callers queue up instead of sharing one deficit"""
+
+    def test_concurrent_acquire_spreads_requests(self):
+        limiter = RateLimiter(default_rate=20.0, burst_size=1)
+        sent = []
+        lock = threading.Lock()
+
+        def worker():
+            limiter.acquire()
+            with lock:
+                sent.append(time.monotonic())
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # One token up front, then 9 more at 20/s
+        assert time.monotonic() - start >= 0.4
+        sent.sort()
+        gaps = [b - a for a, b in zip(sent, sent[1:])]
+        assert min(gaps) > 0.02
+
+    def test_reserve_goes_into_debt(self):
+        limiter = RateLimiter(default_rate=10.0, burst_size=1)
+
+        delays = [limiter.reserve() for _ in range(4)]
+
+        assert delays[0] == 0
+        assert delays[1:] == pytest.approx([0.1, 0.2, 0.3], abs=0.02)
+
+    def test_acquire_async(self):
+        limiter = RateLimiter(default_rate=20.0, burst_size=1)
+
+        async def run():
+            start = time.monotonic()
+            await asyncio.gather(*(limiter.acquire_async() for _ in range(10)))
+            return time.monotonic() - start
+
+        assert 0.4 <= asyncio.run(run()) < 2
+
+    def test_cancelled_wait_refunds_tokens(self):
+        limiter = RateLimiter(default_rate=1.0, burst_size=1)
+        limiter.reserve()
+
+        async def run():
+            task = asyncio.ensure_future(limiter.acquire_async())
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+
+        # Only the first reservation still counts
+        assert limiter.reserve() == pytest.approx(0.95, abs=0.05)
+
+
+class TestLimits:
+    """Test cases for rows, ceilings and throttle counters"""
+
+    def test_row_rate_spaces_row_from_previous_request(self):
+        limiter = RateLimiter(default_rate=10.0)
+
+        assert limiter.reserve(sheet="S", row=1) == 0
+        assert limiter.reserve(
+            sheet="S", row=2, row_rate=0.5
+        ) == pytest.approx(2.0, abs=0.02)
+        assert "row:S:2" in limiter.get_throttle_stats()
+        # The row was charged to the base bucket, whose rate is unchanged
+        assert limiter.get_status()["tokens"] < 0
+        assert limiter.get_status()["rate"] == 10.0
+
+    def test_row_rate_applies_to_its_row_only(self):
+        limiter = RateLimiter(default_rate=100.0)
+
+        assert limiter.reserve("h1", sheet="S", row=5, row_rate=1.0) == 0
+        assert limiter.reserve(
+            "h1", sheet="S", row=5, row_rate=1.0
+        ) == pytest.approx(1.0, abs=0.02)
+        assert limiter.reserve("h1", sheet="S", row=6) < 0.05
+        assert limiter.get_status()["rate"] == 100.0
+
+    def test_row_rate_per_host(self):
+        limiter = RateLimiter(default_rate=100.0, per_host=True)
+
+        limiter.reserve("h1", sheet="S", row=1)
+
+        assert limiter.reserve(
+            "h1", sheet="S", row=2, row_rate=1.0
+        ) == pytest.approx(1.0, abs=0.02)
+        assert limiter.reserve("h2", sheet="S", row=2, row_rate=1.0) == 0
+
+    def test_global_ceiling_over_per_host_rates(self):
+        limiter = RateLimiter(
+            default_rate=100.0, per_host=True, limits={"global": 1}
+        )
+
+        assert limiter.reserve("h1") == 0
+        assert limiter.reserve("h2") == pytest.approx(1.0, abs=0.02)
+        assert limiter.get_throttle_stats()["global"].requests == 1
+
+    def test_host_limits(self):
+        limiter = RateLimiter(
+            default_rate=100.0, limits={"host": {"h1": 1, "_comment": "x"}}
+        )
+
+        limiter.reserve("h1")
+        assert limiter.reserve("h1") == pytest.approx(1.0, abs=0.02)
+        assert limiter.reserve("h2") < 0.05
+
+    def test_endpoint_patterns_share_a_bucket(self):
+        limiter = RateLimiter(
+            default_rate=100.0,
+            burst_size=10,
+            limits={"endpoint": {"/nudr-dr/*": 1, "default": 100}},
+        )
+
+        limiter.reserve(url="http://udr:8080/nudr-dr/v2/{{ueId}}")
+        delay = limiter.reserve(url="https://udr/nudr-dr/v2/imsi-1?x=1")
+        other = limiter.reserve(url="/nsmf-pdusession/v1/sm-contexts")
+
+        assert delay == pytest.approx(1.0, abs=0.02)
+        # Only the base rate (one token up front) applies
+        assert other < 0.05
+        assert "endpoint:/nudr-dr/*" in limiter.get_throttle_stats()
+
+    def test_sheet_default_limit(self):
+        limiter = RateLimiter(
+            default_rate=100.0, burst_size=10, limits={"sheet": {"default": 1}}
+        )
+
+        limiter.reserve(sheet="Sheet1")
+
+        assert limiter.reserve(sheet="Sheet1") == pytest.approx(1.0, abs=0.02)
+        assert limiter.reserve(sheet="Sheet2") < 0.05
+
+    def test_report(self):
+        limiter = RateLimiter(default_rate=10.0, burst_size=1)
+        for _ in range(3):
+            limiter.reserve()
+
+        lines = limiter.format_report()
+
+        assert lines[0].startswith("rate: 0.3s over 2 requests")
+        assert lines[-1] == "Total throttling: 0.3s, 2/3 requests delayed"
+        limiter.reset()
+        assert limiter.format_report() == []
+
+    def test_config_limits(self):
+        limiter = create_rate_limiter_from_config(
+            {
+                "rate_limiting": {
+                    "enabled": True,
+                    "default_reqs_per_sec": 100,
+                    "limits": {"global": "2", "sheet": {"Sheet1": -1}},
+                }
+            }
+        )
+
+        limiter.reserve(sheet="Sheet1")
+        # The invalid sheet limit is ignored, the global one applies
+        assert limiter.reserve(sheet="Sheet1") == pytest.approx(0.5, abs=0.02)
+
+    def test_endpoint_template(self):
+        assert endpoint_template("http://nf:80/a/{{id}}?q=1") == "/a/{{id}}"
+        assert endpoint_template("/a/b") == "/a/b"
+        assert endpoint_template(float("nan")) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
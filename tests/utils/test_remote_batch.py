@@ -0,0 +1,127 @@
+import subprocess
+import sys
+
+import pytest
+
+from src.testpilot.utils.remote_batch import (
+    build_batch_script,
+    run_batch,
+    split_batch_output,
+)
+
+posix_only = pytest.mark.skipif(
+    sys.platform.startswith("win"), reason="uses POSIX shell commands"
+)
+
+MARKER = "__TP_BATCH_test__"
+COMMANDS = [
+    "echo '{\"a\": 1}'; echo '< HTTP/2 200' >&2",
+    "printf 'no newline'",
+    "sh -c 'echo gone >&2; exit 3'",
+    'echo "it\'s quoted" | tr a-z A-Z',
+]
+
+
+class LocalConnector:
+    """Runs the batch script in a local shell, like a remote exec would"""
+
+    def __init__(self, cut_after=None):
+        self.scripts = []
+        self.cut_after = cut_after
+
+    def run_command(self, command, target_hosts, timeout=30):
+        self.scripts.append(command)
+        result = subprocess.run(
+            command, shell=True, capture_output=True, text=True
+        )
+        output = result.stdout
+        if self.cut_after is not None:
+            output = output[: output.index(self.cut_after)]
+        return {
+            target_hosts[0]: {
+                "output": output.strip(),
+                "error": result.stderr.strip(),
+            }
+        }
+
+
+@posix_only
+class TestRemoteBatch:
+    """Test cases for batched command execution"""
+
+    def test_outputs_split_per_command(self):
+        script = build_batch_script(COMMANDS, MARKER)
+        result = subprocess.run(
+            script, shell=True, capture_output=True, text=True
+        )
+
+        items = split_batch_output(
+            COMMANDS, MARKER, result.stdout.strip(), result.stderr.strip()
+        )
+
+        assert [i.output for i in items] == [
+            '{"a": 1}',
+            "no newline",
+            "",
+            "IT'S QUOTED",
+        ]
+        assert [i.error for i in items] == ["< HTTP/2 200", "", "gone", ""]
+        assert [i.exit_status for i in items] == [0, 0, 3, 0]
+        assert all(i.complete for i in items)
+        assert all(i.duration >= 0 for i in items)
+
+    def test_one_exec_per_batch(self):
+        connector = LocalConnector()
+
+        items = run_batch(COMMANDS, "host1", connector)
+
+        assert len(connector.scripts) == 1
+        assert items[3].output == "IT'S QUOTED"
+
+    def test_cut_short_batch_marks_rest_incomplete(self):
+        connector = LocalConnector(cut_after="no newline")
+
+        items = run_batch(COMMANDS, "host1", connector)
+
+        assert items[0].complete and items[0].output == '{"a": 1}'
+        assert [i.complete for i in items[1:]] == [False, False, False]
+
+    def test_delays_are_slept_before_commands(self):
+        connector = LocalConnector()
+
+        items = run_batch(COMMANDS[:2], "host1", connector, delays=[0.0, 0.2])
+
+        assert "sleep 0.200; printf" in connector.scripts[0]
+        assert [i.output for i in items] == ['{"a": 1}', "no newline"]
+        # The wait is not part of the command's own duration
+        assert items[1].duration < 0.2
+
+
+class TestSplitBatchOutput:
+    """Test cases for split_batch_output"""
+
+    def test_missing_timing_shares_total(self):
+        stdout = "\n".join(
+            [
+                f"{MARKER} B 0",
+                "one",
+                f"{MARKER} E 0 0 %s %s",
+                f"{MARKER} B 1",
+                "two",
+                f"{MARKER} E 1 0 %s %s",
+            ]
+        )
+
+        items = split_batch_output(["a", "b"], MARKER, stdout, "", 1.0)
+
+        assert [i.output for i in items] == ["one", "two"]
+        assert [i.duration for i in items] == [0.5, 0.5]
+
+    def test_failed_exec_gives_incomplete_items(self):
+        items = split_batch_output(["a", "b"], MARKER, "", "Socket closed")
+
+        assert not any(i.complete for i in items)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,311 @@
+import json
+import threading
+from unittest.mock import Mock
+
+import paramiko
+import pytest
+
+from src.testpilot.utils.ssh_channel_pool import (
+    HostChannelPool,
+    SSHPoolSettings,
+)
+from src.testpilot.utils.ssh_connector import SSHConnector
+
+
+class FakeChannel:
+    """Exec channel that returns output at once and exits with 0"""
+
+    def __init__(self, transport, output):
+        self.transport = transport
+        self.pending = output
+
+    def settimeout(self, timeout):
+        pass
+
+    def exec_command(self, command):
+        if not self.transport.is_active():
+            raise paramiko.SSHException("SSH session not active")
+
+    def recv_stderr_ready(self):
+        return False
+
+    def recv_ready(self):
+        return bool(self.pending)
+
+    def recv(self, size):
+        data, self.pending = self.pending, b""
+        return data
+
+    def exit_status_ready(self):
+        return True
+
+    def recv_exit_status(self):
+        return 0
+
+    def close(self):
+        pass
+
+
+def _client(output=b"ok"):
+    """Mock SSHClient whose transport stays active until it is killed"""
+    client = Mock()
+    transport = Mock()
+    transport.is_active.return_value = True
+    transport.open_session.side_effect = lambda timeout=None: FakeChannel(
+        transport, output
+    )
+    client.get_transport.return_value = transport
+    return client
+
+
+def _kill(client):
+    client.get_transport.return_value.is_active.return_value = False
+
+
+def _settings(**overrides):
+    values = {"acquire_timeout": 0.2, "reconnect_backoff": 0.05}
+    values.update(overrides)
+    return SSHPoolSettings(**values)
+
+
+class TestHostChannelPool:
+    """Test cases for HostChannelPool"""
+
+    def test_settings_from_ssh_settings(self):
+        settings = SSHPoolSettings.from_dict(
+            {"transports_per_host": "2", "channels_per_transport": 4}
+        )
+        assert settings.transports_per_host == 2
+        assert settings.channels_per_transport == 4
+        assert settings.keepalive_interval == 30
+        with pytest.raises(ValueError):
+            SSHPoolSettings.from_dict({"channels_per_transport": 0})
+
+    def test_channels_per_transport_limit(self):
+        initial = _client()
+        pool = HostChannelPool(
+            "host1",
+            Mock(return_value=None),
+            _settings(channels_per_transport=2),
+            initial=initial,
+        )
+        initial.get_transport.return_value.set_keepalive.assert_called_with(30)
+
+        first = pool.acquire()
+        second = pool.acquire()
+        assert first is second
+        with pytest.raises(TimeoutError):
+            pool.acquire()
+
+        pool.release(first)
+        assert pool.acquire() is first
+
+    def test_held_channels_use_separate_transports(self):
+        initial = _client()
+        held_client = _client()
+        connect = Mock(return_value=held_client)
+        pool = HostChannelPool(
+            "host1",
+            connect,
+            _settings(channels_per_transport=2),
+            initial=initial,
+        )
+
+        held = [pool.hold(), pool.hold()]
+        assert held == [held_client, held_client]
+        # Commands still have every slot of their own transport
+        first = pool.acquire()
+        second = pool.acquire()
+        assert first is second
+        assert first.client is initial
+        stats = pool.stats()
+        assert stats["channels_in_use"] == 2
+        assert stats["held_channels"] == 2
+
+        # A full long-lived budget fails fast instead of blocking
+        assert pool.hold() is None
+
+        pool.unhold(held_client)
+        assert pool.hold() is held_client
+        assert connect.call_count == 1
+
+    def test_hold_timeout(self):
+        pool = HostChannelPool(
+            "host1",
+            Mock(return_value=_client()),
+            _settings(channels_per_transport=1, hold_timeout=0.05),
+            initial=_client(),
+        )
+        pool.hold()
+
+        with pool.channel():
+            assert pool.hold() is None
+
+    def test_second_transport_opened_when_busy(self):
+        extra = _client()
+        connect = Mock(return_value=extra)
+        pool = HostChannelPool(
+            "host1", connect, _settings(transports_per_host=2), _client()
+        )
+
+        with pool.channel() as a, pool.channel() as b, pool.channel() as c:
+            assert a is not b
+            assert b is extra
+            assert c is a
+            assert pool.stats()["channels_in_use"] == 3
+
+        assert connect.call_count == 1
+        assert pool.stats()["transports"] == 2
+
+    def test_dead_transport_is_replaced(self):
+        initial, replacement = _client(), _client()
+        pool = HostChannelPool(
+            "host1", Mock(return_value=replacement), _settings(), initial
+        )
+        _kill(initial)
+
+        with pool.channel() as client:
+            assert client is replacement
+        initial.close.assert_called_once()
+        assert pool.stats()["drops"] == 1
+        assert pool.stats()["connects"] == 1
+
+    def test_failed_probe_drops_idle_transport(self):
+        initial, replacement = _client(), _client()
+        initial.get_transport.return_value.send_ignore.side_effect = EOFError()
+        pool = HostChannelPool(
+            "host1",
+            Mock(return_value=replacement),
+            _settings(health_check_interval=0),
+            initial,
+        )
+
+        assert pool.primary() is replacement
+
+    def test_reconnect_backoff(self):
+        initial = _client()
+        connect = Mock(return_value=None)
+        pool = HostChannelPool(
+            "host1", connect, _settings(reconnect_backoff=60), initial
+        )
+        _kill(initial)
+
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                pool.acquire()
+        assert connect.call_count == 1
+
+    def test_concurrent_reconnect_is_single_flight(self):
+        initial = _client()
+        gate = threading.Event()
+
+        def connect():
+            gate.wait(1)
+            return _client()
+
+        connect_mock = Mock(side_effect=connect)
+        pool = HostChannelPool("host1", connect_mock, _settings(), initial)
+        _kill(initial)
+
+        clients = []
+        threads = [
+            threading.Thread(target=lambda: clients.append(pool.primary()))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        gate.set()
+        for thread in threads:
+            thread.join(2)
+
+        assert connect_mock.call_count == 1
+        assert len(clients) == 4 and len({id(c) for c in clients}) == 1
+
+
+@pytest.fixture
+def connector(tmp_path):
+    config = tmp_path / "hosts.json"
+    config.write_text(json.dumps({"use_ssh": False}))
+    connector = SSHConnector(str(config))
+    yield connector
+    connector.close_all()
+
+
+class TestSSHConnectorPool:
+    """SSHConnector sends commands through the channel pool"""
+
+    def test_command_retried_after_transport_drop(self, connector):
+        initial, replacement = _client(), _client(b"after reconnect")
+        connector.connections["host1"] = initial
+        connector.pool.add_host(
+            "host1", Mock(return_value=replacement), initial=initial
+        )
+
+        def drop(timeout=None):
+            _kill(initial)
+            raise paramiko.SSHException("Socket is closed")
+
+        initial.get_transport.return_value.open_session.side_effect = drop
+
+        results = connector.run_command("echo", ["host1"])
+
+        assert results == {
+            "host1": {
+                "output": "after reconnect",
+                "error": "",
+                "exit_status": 0,
+                "truncated": False,
+            }
+        }
+        assert connector.get_connection("host1") is replacement
+        assert connector.connections["host1"] is replacement
+
+    def test_started_command_is_not_retried(self, connector):
+        initial, replacement = _client(), _client()
+        connector.connections["host1"] = initial
+        connector.pool.add_host(
+            "host1", Mock(return_value=replacement), initial=initial
+        )
+
+        def drop(size):
+            _kill(initial)
+            raise OSError("Socket is closed")
+
+        channel = FakeChannel(initial.get_transport.return_value, b"")
+        channel.recv_ready = lambda: True
+        channel.recv = drop
+        initial.get_transport.return_value.open_session.side_effect = (
+            lambda timeout=None: channel
+        )
+
+        results = connector.run_command("curl -X POST", ["host1"])
+
+        assert results["host1"]["exit_status"] is None
+        assert "Socket is closed" in results["host1"]["error"]
+        replacement.get_transport.return_value.open_session.assert_not_called()
+
+    def test_hosts_share_one_executor(self, connector):
+        for name in ("host1", "host2"):
+            client = _client(name.encode())
+            connector.connections[name] = client
+            connector.pool.add_host(name, Mock(), initial=client)
+
+        first = connector.run_command("hostname", ["host1", "host2"])
+        executor = connector.pool.executor
+        second = connector.run_command("hostname", ["host1", "host2"])
+
+        assert first == second
+        assert first["host2"]["output"] == "host2"
+        assert connector.pool.executor is executor
+
+    def test_host_without_pool_uses_connection(self, connector):
+        connector.connections["host1"] = _client()
+
+        results = connector.run_command("echo", ["host1", "unknown"])
+
+        assert list(results) == ["host1"]
+        assert results["host1"]["output"] == "ok"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,206 @@
+import json
+import socket
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from src.testpilot.utils.ssh_connector import SSHConnector
+from src.testpilot.utils.ssh_output import (
+    ChannelOutputReader,
+    OutputBuffer,
+    OutputLimits,
+)
+
+
+class FakeChannel:
+    """
+    paramiko Channel stand-in for a command that writes stderr first.
+
+    Like a remote process blocked on a full stderr window, no stdout is
+    available until every stderr chunk has been read.
+    """
+
+    def __init__(self, stdout=(), stderr=(), exit_status=0, eof=True):
+        self.stdout = list(stdout)
+        self.stderr = list(stderr)
+        self.exit_status = exit_status
+        self.eof = eof
+        self.closed = False
+        self.command = None
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def exec_command(self, command):
+        self.command = command
+
+    def recv_stderr_ready(self):
+        return bool(self.stderr)
+
+    def recv_stderr(self, size):
+        return self.stderr.pop(0)
+
+    def recv_ready(self):
+        return bool(self.stdout) and not self.stderr
+
+    def recv(self, size):
+        if self.recv_ready():
+            return self.stdout.pop(0)
+        if self.eof and not self.stderr:
+            return b""
+        time.sleep(0.01)
+        raise socket.timeout()
+
+    def exit_status_ready(self):
+        return self.eof and not self.stdout and not self.stderr
+
+    def recv_exit_status(self):
+        return self.exit_status
+
+    def close(self):
+        self.closed = True
+
+
+class TestOutputBuffer:
+    """Test cases for OutputBuffer"""
+
+    def test_spills_to_disk(self):
+        buffer = OutputBuffer(OutputLimits(memory_limit=16, max_bytes=1024))
+        for _ in range(10):
+            buffer.write(b"0123456789")
+
+        assert buffer.spilled
+        assert buffer.getvalue() == b"0123456789" * 10
+        buffer.write(b"end")
+        assert buffer.text().endswith("89end")
+        buffer.close()
+
+    def test_truncates_at_max_bytes(self):
+        buffer = OutputBuffer(OutputLimits(memory_limit=16, max_bytes=25))
+        for _ in range(5):
+            buffer.write(b"0123456789")
+
+        assert buffer.truncated
+        assert buffer.size == 50
+        assert buffer.getvalue() == b"0123456789" * 2 + b"01234"
+
+    def test_limits_from_ssh_settings(self):
+        limits = OutputLimits.from_dict({"output_max_bytes": "1024"})
+        assert limits.max_bytes == 1024
+        assert limits.memory_limit == OutputLimits().memory_limit
+
+
+class TestChannelOutputReader:
+    """Test cases for ChannelOutputReader"""
+
+    def test_drains_stderr_while_stdout_waits(self):
+        channel = FakeChannel(
+            stdout=[b'{"status": "ok"}\n'],
+            stderr=[b"< HTTP/2 200\n"] * 50,
+            exit_status=0,
+        )
+
+        output = ChannelOutputReader(channel).wait()
+
+        assert output.output == '{"status": "ok"}'
+        assert output.error.count("HTTP/2 200") == 50
+        assert output.exit_status == 0
+
+    def test_exit_status_reported(self):
+        channel = FakeChannel(stdout=[b"not found\n"], exit_status=1)
+
+        output = ChannelOutputReader(channel).wait()
+
+        assert output.exit_status == 1
+        assert not output.truncated
+
+    def test_lines_decode_split_characters(self):
+        text = "café ok\nnaïve\n".encode("utf-8")
+        channel = FakeChannel(stdout=[text[:4], text[4:12], text[12:]])
+
+        reader = ChannelOutputReader(channel, keep_stdout=False)
+        lines = list(reader.lines())
+
+        assert lines == ["café ok", "naïve"]
+        assert reader.stdout.size == 0
+
+    def test_lines_stop_early(self):
+        channel = FakeChannel(stdout=[b"a\n", b"b\n"], eof=False)
+        reader = ChannelOutputReader(channel, poll_interval=0.01)
+
+        seen = []
+        for line in reader.lines(stop=lambda: "a" in seen):
+            seen.append(line)
+
+        assert seen == ["a"]
+
+    def test_idle_timeout(self):
+        channel = FakeChannel(stdout=[b"partial"], eof=False)
+        reader = ChannelOutputReader(channel, idle_timeout=0.05)
+
+        with pytest.raises(socket.timeout):
+            reader.wait()
+
+    def test_large_output_spills(self):
+        chunk = b"x" * 1000 + b"\n"
+        channel = FakeChannel(stdout=[chunk] * 100)
+        limits = OutputLimits(memory_limit=4096, max_bytes=50000)
+
+        output = ChannelOutputReader(channel, limits).wait()
+
+        assert output.stdout.spilled
+        assert output.stdout.truncated
+        assert output.stdout.size == len(chunk) * 100
+        assert len(output.output) == 50000
+        output.close()
+
+
+class TestSSHConnectorStreaming:
+    """SSHConnector reads output through ChannelOutputReader"""
+
+    @pytest.fixture
+    def connector(self, tmp_path):
+        config = tmp_path / "hosts.json"
+        config.write_text(json.dumps({"use_ssh": False}))
+        connector = SSHConnector(str(config))
+        yield connector
+        connector.close_all()
+
+    def _add_host(self, connector, channel):
+        client = Mock()
+        client.get_transport.return_value.is_active.return_value = True
+        client.get_transport.return_value.open_session.return_value = channel
+        connector.connections["host1"] = client
+        connector.pool.add_host("host1", Mock(), initial=client)
+
+    def test_run_command_reports_exit_status(self, connector):
+        channel = FakeChannel(
+            stdout=[b"out\n"], stderr=[b"err\n"], exit_status=3
+        )
+        self._add_host(connector, channel)
+
+        results = connector.run_command("false", ["host1"])
+
+        assert results["host1"] == {
+            "output": "out",
+            "error": "err",
+            "exit_status": 3,
+            "truncated": False,
+        }
+        assert channel.command == "false"
+        assert channel.closed
+
+    def test_run_command_reports_truncation(self, connector):
+        channel = FakeChannel(stdout=[b"x" * 100])
+        self._add_host(connector, channel)
+        connector.output_limits = OutputLimits(memory_limit=10, max_bytes=40)
+
+        results = connector.run_command("kubectl logs pod", ["host1"])
+
+        assert results["host1"]["truncated"]
+        assert results["host1"]["output"] == "x" * 40
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])